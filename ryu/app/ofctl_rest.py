@@ -34,6 +34,9 @@ from ryu.app.wsgi import ControllerBase, WSGIApplication
 
 LOG = logging.getLogger('ryu.app.ofctl_rest')
 
+# the size of the chunks of a streamed JSON response
+STREAM_CHUNK_SIZE = 64 * 1024
+
 # REST API
 #
 ## Retrieve the switch stats
@@ -47,6 +50,10 @@ LOG = logging.getLogger('ryu.app.ofctl_rest')
 # get flows stats of the switch
 # GET /stats/flow/<dpid>
 #
+# get flows stats of the switch filtered by the fields of the body
+# (OpenFlow 1.3 only)
+# POST /stats/flow/<dpid>
+#
 # get ports stats of the switch
 # GET /stats/port/<dpid>
 #
@@ -106,6 +113,25 @@ LOG = logging.getLogger('ryu.app.ofctl_rest')
 # POST /stats/experimenter/<dpid>
 
 
+def _stream_json_list(key, items):
+    # yields {key: list(items)} in JSON as json.dumps() does, in chunks
+    # of about STREAM_CHUNK_SIZE bytes.
+    chunk = ['{%s: [' % json.dumps(key)]
+    size = 0
+    sep = ''
+    for item in items:
+        data = sep + json.dumps(item)
+        chunk.append(data)
+        size += len(data)
+        if size >= STREAM_CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+        sep = ', '
+    chunk.append(']}')
+    yield ''.join(chunk)
+
+
 class StatsController(ControllerBase):
     def __init__(self, req, link, data, **config):
         super(StatsController, self).__init__(req, link, data, **config)
@@ -136,16 +162,40 @@ class StatsController(ControllerBase):
         return (Response(content_type='application/json', body=body))
 
     def get_flow_stats(self, req, dpid, **_kwargs):
+        if req.body:
+            try:
+                flow = json.loads(req.body)
+            except ValueError:
+                LOG.debug('invalid syntax %s', req.body)
+                return Response(status=400)
+        else:
+            flow = {}
+
         dp = self.dpset.get(int(dpid))
         if dp is None:
             return Response(status=404)
 
+        if dp.ofproto.OFP_VERSION == ofproto_v1_3.OFP_VERSION:
+            # the filter is parsed here, so that an invalid one is
+            # rejected before the response starts.  the entries are sent
+            # as the parts of the reply arrive from the switch, without
+            # the whole of them in memory.
+            try:
+                flows = ofctl_v1_3.get_flow_stats_iter(dp, self.waiters,
+                                                       flow)
+            except ValueError:
+                LOG.debug('invalid filter %s', req.body)
+                return Response(status=400)
+            return Response(content_type='application/json',
+                            app_iter=_stream_json_list(str(dp.id), flows))
+
+        if flow:
+            LOG.debug('Unsupported OF protocol for filtering')
+            return Response(status=501)
         if dp.ofproto.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
             flows = ofctl_v1_0.get_flow_stats(dp, self.waiters)
         elif dp.ofproto.OFP_VERSION == ofproto_v1_2.OFP_VERSION:
             flows = ofctl_v1_2.get_flow_stats(dp, self.waiters)
-        elif dp.ofproto.OFP_VERSION == ofproto_v1_3.OFP_VERSION:
-            flows = ofctl_v1_3.get_flow_stats(dp, self.waiters)
         else:
             LOG.debug('Unsupported OF protocol')
             return Response(status=501)
@@ -436,7 +486,7 @@ class RestStatsApi(app_manager.RyuApp):
         uri = path + '/flow/{dpid}'
         mapper.connect('stats', uri,
                        controller=StatsController, action='get_flow_stats',
-                       conditions=dict(method=['GET']))
+                       conditions=dict(method=['GET', 'POST']))
 
         uri = path + '/port/{dpid}'
         mapper.connect('stats', uri,
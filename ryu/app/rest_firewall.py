@@ -24,6 +24,7 @@ from ryu.app.wsgi import WSGIApplication
 from ryu.base import app_manager
 from ryu.controller import ofp_event
 from ryu.controller import dpset
+from ryu.controller import stats_collector
 from ryu.controller.handler import MAIN_DISPATCHER
 from ryu.controller.handler import set_ev_cls
 from ryu.exception import OFPUnknownVersion
@@ -32,6 +33,7 @@ from ryu.lib import dpid as dpid_lib
 from ryu.lib import ofctl_v1_0
 from ryu.lib import ofctl_v1_2
 from ryu.lib import ofctl_v1_3
+from ryu.lib import ofctl_utils
 from ryu.lib.packet import packet
 from ryu.ofproto import ether
 from ryu.ofproto import inet
@@ -138,6 +140,22 @@ from ryu.ofproto import ofproto_v1_3_parser
 #     <field>  : <value>
 #    "rule_id" : "<int>" or "all"
 #
+#
+# set or delete many rules of the firewall switches at once
+#  The FlowMods are sent in batches, each followed by a barrier request,
+#  and the result is reported for each rule.
+# * for no vlan
+# POST /firewall/rules/{switch-id}/bulk
+# DELETE /firewall/rules/{switch-id}/bulk
+#
+# * for specific vlan group
+# POST /firewall/rules/{switch-id}/{vlan-id}/bulk
+# DELETE /firewall/rules/{switch-id}/{vlan-id}/bulk
+#
+#  request body format:
+#   a list of the request bodies of setting or deleting a rule
+#   [{"<field1>":"<value1>",...}, {"<field1>":"<value1>",...},...]
+#
 
 
 SWITCHID_PATTERN = dpid_lib.DPID_PATTERN + r'|all'
@@ -201,6 +219,7 @@ class RestFirewallAPI(app_manager.RyuApp):
                     ofproto_v1_3.OFP_VERSION]
 
     _CONTEXTS = {'dpset': dpset.DPSet,
+                 'stats_collector': stats_collector.StatsCollector,
                  'wsgi': WSGIApplication}
 
     def __init__(self, *args, **kwargs):
@@ -215,6 +234,7 @@ class RestFirewallAPI(app_manager.RyuApp):
         self.data = {}
         self.data['dpset'] = self.dpset
         self.data['waiters'] = self.waiters
+        self.data['collector'] = kwargs['stats_collector']
 
         mapper = wsgi.mapper
         wsgi.registory['FirewallController'] = self.data
@@ -292,6 +312,29 @@ class RestFirewallAPI(app_manager.RyuApp):
                        conditions=dict(method=['DELETE']),
                        requirements=requirements)
 
+        # for bulk rules
+        uri = path + '/rules/{switchid}/bulk'
+        mapper.connect('firewall', uri, controller=FirewallController,
+                       action='set_rules',
+                       conditions=dict(method=['POST']),
+                       requirements=requirements)
+
+        mapper.connect('firewall', uri, controller=FirewallController,
+                       action='delete_rules',
+                       conditions=dict(method=['DELETE']),
+                       requirements=requirements)
+
+        uri = path + '/rules/{switchid}/{vlanid}/bulk'
+        mapper.connect('firewall', uri, controller=FirewallController,
+                       action='set_vlan_rules',
+                       conditions=dict(method=['POST']),
+                       requirements=requirements)
+
+        mapper.connect('firewall', uri, controller=FirewallController,
+                       action='delete_vlan_rules',
+                       conditions=dict(method=['DELETE']),
+                       requirements=requirements)
+
     def stats_reply_handler(self, ev):
         msg = ev.msg
         dp = msg.datapath
@@ -332,6 +375,14 @@ class RestFirewallAPI(app_manager.RyuApp):
     def stats_reply_handler_v1_2(self, ev):
         self.stats_reply_handler(ev)
 
+    @set_ev_cls(ofp_event.EventOFPBarrierReply, MAIN_DISPATCHER)
+    def barrier_reply_handler(self, ev):
+        ofctl_utils.barrier_reply_handler(self.waiters, ev.msg)
+
+    @set_ev_cls(ofp_event.EventOFPErrorMsg, MAIN_DISPATCHER)
+    def error_msg_handler(self, ev):
+        ofctl_utils.error_msg_handler(self.waiters, ev.msg)
+
     @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
     def packet_in_handler(self, ev):
         FirewallController.packet_in_handler(ev.msg)
@@ -372,6 +423,7 @@ class FirewallController(ControllerBase):
         super(FirewallController, self).__init__(req, link, data, **config)
         self.dpset = data['dpset']
         self.waiters = data['waiters']
+        self.collector = data['collector']
 
     @classmethod
     def set_logger(cls, logger):
@@ -409,8 +461,7 @@ class FirewallController(ControllerBase):
 
     # GET /firewall/module/status
     def get_status(self, req, **_kwargs):
-        return self._access_module(REST_ALL, 'get_status',
-                                   waiters=self.waiters)
+        return self._get_flows_module(REST_ALL, 'get_status')
 
     # POST /firewall/module/enable/{switchid}
     def set_enable(self, req, switchid, **_kwargs):
@@ -422,8 +473,7 @@ class FirewallController(ControllerBase):
 
     # GET /firewall/log/status
     def get_log_status(self, dummy, **_kwargs):
-        return self._access_module(REST_ALL, 'get_log_status',
-                                   waiters=self.waiters)
+        return self._get_flows_module(REST_ALL, 'get_log_status')
 
     # PUT /firewall/log/enable/{switchid}
     def set_log_enable(self, dummy, switchid, **_kwargs):
@@ -450,6 +500,34 @@ class FirewallController(ControllerBase):
         body = json.dumps(msgs)
         return Response(content_type='application/json', body=body)
 
+    def _get_flows_module(self, switchid, func, *args):
+        try:
+            dps = self._OFS_LIST.get_ofs(switchid)
+        except ValueError, message:
+            return Response(status=400, body=str(message))
+
+        msgs = self._collect_flows(dps, func, *args)
+        body = json.dumps(msgs)
+        return Response(content_type='application/json', body=body)
+
+    def _collect_flows(self, dps, func, *args):
+        # the flow stats of all of the switches are requested at once.
+        # a switch which doesn't reply has the failure in its result.
+        results = self.collector.collect(
+            lambda dp: dps[dp.id].ofctl.to_flow_stats_request(dp),
+            [f_ofs.dp for f_ofs in dps.values()])
+
+        msgs = []
+        for dp_id, f_ofs in dps.items():
+            result = results[dp_id]
+            if result.status == stats_collector.STATUS_OK:
+                flows = f_ofs.ofctl.flow_stats_to_str(result.msgs)
+                msg = getattr(f_ofs, func)(*args, flows=flows)
+            else:
+                msg = f_ofs.get_flows_failure(result)
+            msgs.append(msg)
+        return msgs
+
     # GET /firewall/rules/{switchid}
     def get_rules(self, req, switchid, **_kwargs):
         return self._get_rules(switchid)
@@ -474,20 +552,30 @@ class FirewallController(ControllerBase):
     def delete_vlan_rule(self, req, switchid, vlanid, **_kwargs):
         return self._delete_rule(req, switchid, vlan_id=vlanid)
 
+    # POST /firewall/rules/{switchid}/bulk
+    def set_rules(self, req, switchid, **_kwargs):
+        return self._bulk_rules(req, switchid, 'set_rules')
+
+    # POST /firewall/rules/{switchid}/{vlanid}/bulk
+    def set_vlan_rules(self, req, switchid, vlanid, **_kwargs):
+        return self._bulk_rules(req, switchid, 'set_rules', vlan_id=vlanid)
+
+    # DELETE /firewall/rules/{switchid}/bulk
+    def delete_rules(self, req, switchid, **_kwargs):
+        return self._bulk_rules(req, switchid, 'delete_rules')
+
+    # DELETE /firewall/rules/{switchid}/{vlanid}/bulk
+    def delete_vlan_rules(self, req, switchid, vlanid, **_kwargs):
+        return self._bulk_rules(req, switchid, 'delete_rules',
+                                vlan_id=vlanid)
+
     def _get_rules(self, switchid, vlan_id=VLANID_NONE):
         try:
-            dps = self._OFS_LIST.get_ofs(switchid)
             vid = FirewallController._conv_toint_vlanid(vlan_id)
         except ValueError, message:
             return Response(status=400, body=str(message))
 
-        msgs = []
-        for f_ofs in dps.values():
-            rules = f_ofs.get_rules(self.waiters, vid)
-            msgs.append(rules)
-
-        body = json.dumps(msgs)
-        return Response(content_type='application/json', body=body)
+        return self._get_flows_module(switchid, 'get_rules', None, vid)
 
     def _set_rule(self, req, switchid, vlan_id=VLANID_NONE):
         try:
@@ -537,6 +625,35 @@ class FirewallController(ControllerBase):
         body = json.dumps(msgs)
         return Response(content_type='application/json', body=body)
 
+    def _bulk_rules(self, req, switchid, func, vlan_id=VLANID_NONE):
+        try:
+            rules = json.loads(req.body)
+        except ValueError:
+            FirewallController._LOGGER.debug('invalid syntax %s', req.body)
+            return Response(status=400)
+        if (not isinstance(rules, list) or
+                not all(isinstance(rule, dict) for rule in rules)):
+            return Response(status=400, body='The rules must be a list.')
+
+        try:
+            dps = self._OFS_LIST.get_ofs(switchid)
+            vid = FirewallController._conv_toint_vlanid(vlan_id)
+        except ValueError, message:
+            return Response(status=400, body=str(message))
+
+        msgs = []
+        for f_ofs in dps.values():
+            try:
+                # each call gets its own copies as the rules are updated
+                rest_list = [dict(rule) for rule in rules]
+                msg = getattr(f_ofs, func)(rest_list, self.waiters, vid)
+                msgs.append(msg)
+            except ValueError, message:
+                return Response(status=400, body=str(message))
+
+        body = json.dumps(msgs)
+        return Response(content_type='application/json', body=body)
+
     @staticmethod
     def _conv_toint_vlanid(vlan_id):
         if vlan_id != REST_ALL:
@@ -609,16 +726,28 @@ class Firewall(object):
                     key: value}
         return _rest_command
 
-    @rest_command
-    def get_status(self, waiters):
+    def _get_flows(self, waiters):
         msgs = self.ofctl.get_flow_stats(self.dp, waiters)
+        return msgs.get(str(self.dp.id), [])
+
+    @rest_command
+    def get_flows_failure(self, result):
+        details = 'Flows not got. : %s' % result.status
+        if result.error is not None:
+            details += ' : %s' % ofctl_utils.error_to_str(result.error)
+        msg = {'result': 'failure',
+               'details': details}
+        return REST_COMMAND_RESULT, msg
+
+    @rest_command
+    def get_status(self, waiters=None, flows=None):
+        if flows is None:
+            flows = self._get_flows(waiters)
 
         status = REST_STATUS_ENABLE
-        if str(self.dp.id) in msgs:
-            flow_stats = msgs[str(self.dp.id)]
-            for flow_stat in flow_stats:
-                if flow_stat['priority'] == STATUS_FLOW_PRIORITY:
-                    status = REST_STATUS_DISABLE
+        for flow_stat in flows:
+            if flow_stat['priority'] == STATUS_FLOW_PRIORITY:
+                status = REST_STATUS_DISABLE
 
         return REST_STATUS, status
 
@@ -655,16 +784,15 @@ class Firewall(object):
         return REST_COMMAND_RESULT, msg
 
     @rest_command
-    def get_log_status(self, waiters):
-        msgs = self.ofctl.get_flow_stats(self.dp, waiters)
+    def get_log_status(self, waiters=None, flows=None):
+        if flows is None:
+            flows = self._get_flows(waiters)
 
         status = REST_STATUS_DISABLE
-        if str(self.dp.id) in msgs:
-            flow_stats = msgs[str(self.dp.id)]
-            for flow_stat in flow_stats:
-                if flow_stat['priority'] == LOG_FLOW_PRIORITY:
-                    if flow_stat['actions']:
-                        status = REST_STATUS_ENABLE
+        for flow_stat in flows:
+            if flow_stat['priority'] == LOG_FLOW_PRIORITY:
+                if flow_stat['actions']:
+                    status = REST_STATUS_ENABLE
 
         return REST_LOG_STATUS, status
 
@@ -688,24 +816,20 @@ class Firewall(object):
         cmd = self.dp.ofproto.OFPFC_ADD
 
         if waiters:
-            msgs = self.ofctl.get_flow_stats(self.dp, waiters)
-
-            if str(self.dp.id) in msgs:
-                flow_stats = msgs[str(self.dp.id)]
-                for flow_stat in flow_stats:
-                    priority = flow_stat[REST_PRIORITY]
-                    if (priority == STATUS_FLOW_PRIORITY
-                            or priority == ARP_FLOW_PRIORITY):
-                        continue
-                    action = flow_stat[REST_ACTION]
-                    if action == ['OUTPUT:%d' % self.dp.ofproto.OFPP_NORMAL]:
-                        continue
-
-                    cookie = flow_stat[REST_COOKIE]
-                    match = Match.to_mod_openflow(flow_stat[REST_MATCH])
-                    flow = self._to_of_flow(cookie=cookie, priority=priority,
-                                            match=match, actions=actions)
-                    self.ofctl.mod_flow_entry(self.dp, flow, cmd)
+            for flow_stat in self._get_flows(waiters):
+                priority = flow_stat[REST_PRIORITY]
+                if (priority == STATUS_FLOW_PRIORITY
+                        or priority == ARP_FLOW_PRIORITY):
+                    continue
+                action = flow_stat[REST_ACTION]
+                if action == ['OUTPUT:%d' % self.dp.ofproto.OFPP_NORMAL]:
+                    continue
+
+                cookie = flow_stat[REST_COOKIE]
+                match = Match.to_mod_openflow(flow_stat[REST_MATCH])
+                flow = self._to_of_flow(cookie=cookie, priority=priority,
+                                        match=match, actions=actions)
+                self.ofctl.mod_flow_entry(self.dp, flow, cmd)
         else:
             # Initialize.
             flow = self._to_of_flow(cookie=0, priority=LOG_FLOW_PRIORITY,
@@ -738,6 +862,64 @@ class Firewall(object):
         return REST_COMMAND_RESULT, msgs
 
     def _set_rule(self, cookie, rest, waiters, vlan_id):
+        log_status = None
+        if rest.get(REST_ACTION) == REST_ACTION_DENY:
+            result = self.get_log_status(waiters)
+            log_status = result[REST_LOG_STATUS]
+        flow = self._to_rule_flow(cookie, rest, vlan_id, log_status)
+
+        cmd = self.dp.ofproto.OFPFC_ADD
+        try:
+            self.ofctl.mod_flow_entry(self.dp, flow, cmd)
+        except:
+            raise ValueError('Invalid rule parameter.')
+
+        return self._set_result(cookie, vlan_id)
+
+    @rest_command
+    def set_rules(self, rest_list, waiters, vlan_id):
+        # the log status is the same for all of the rules
+        log_status = None
+        for rest in rest_list:
+            if rest.get(REST_ACTION) == REST_ACTION_DENY:
+                result = self.get_log_status(waiters)
+                log_status = result[REST_LOG_STATUS]
+                break
+
+        cmd = self.dp.ofproto.OFPFC_ADD
+        msgs = []
+        flow_mods = []
+        for rest in rest_list:
+            rule_msgs = []
+            for cookie, vid in self._get_cookie(vlan_id):
+                try:
+                    flow = self._to_rule_flow(cookie, rest, vid, log_status)
+                    try:
+                        flow_mod = self.ofctl.to_flow_mod(self.dp, flow, cmd)
+                    except:
+                        raise ValueError('Invalid rule parameter.')
+                except ValueError, message:
+                    msg = {'result': 'failure',
+                           'details': str(message)}
+                    if vid != VLANID_NONE:
+                        msg.setdefault(REST_VLANID, vid)
+                else:
+                    msg = self._set_result(cookie, vid)
+                    flow_mods.append((flow_mod, msg))
+                rule_msgs.append(msg)
+            msgs.append(rule_msgs)
+
+        errors = ofctl_utils.send_msgs_with_barrier(
+            self.dp, [flow_mod for flow_mod, _msg in flow_mods], waiters)
+        for (_flow_mod, msg), error in zip(flow_mods, errors):
+            if error is not None:
+                msg['result'] = 'failure'
+                msg['details'] = ('Rule not added. : %s' %
+                                  ofctl_utils.error_to_str(error))
+
+        return REST_COMMAND_RESULT, msgs
+
+    def _to_rule_flow(self, cookie, rest, vlan_id, log_status):
         priority = int(rest.get(REST_PRIORITY, ACL_FLOW_PRIORITY_MIN))
 
         if (priority < ACL_FLOW_PRIORITY_MIN
@@ -749,20 +931,14 @@ class Firewall(object):
             rest[REST_DL_VLAN] = vlan_id
 
         match = Match.to_openflow(rest)
-        if rest.get(REST_ACTION) == REST_ACTION_DENY:
-            result = self.get_log_status(waiters)
-            if result[REST_LOG_STATUS] == REST_STATUS_ENABLE:
-                rest[REST_ACTION] = REST_ACTION_PACKETIN
+        if (rest.get(REST_ACTION) == REST_ACTION_DENY and
+                log_status == REST_STATUS_ENABLE):
+            rest[REST_ACTION] = REST_ACTION_PACKETIN
         actions = Action.to_openflow(self.dp, rest)
-        flow = self._to_of_flow(cookie=cookie, priority=priority,
+        return self._to_of_flow(cookie=cookie, priority=priority,
                                 match=match, actions=actions)
 
-        cmd = self.dp.ofproto.OFPFC_ADD
-        try:
-            self.ofctl.mod_flow_entry(self.dp, flow, cmd)
-        except:
-            raise ValueError('Invalid rule parameter.')
-
+    def _set_result(self, cookie, vlan_id):
         rule_id = Firewall._cookie_to_ruleid(cookie)
         msg = {'result': 'success',
                'details': 'Rule added. : rule_id=%d' % rule_id}
@@ -772,22 +948,21 @@ class Firewall(object):
         return msg
 
     @rest_command
-    def get_rules(self, waiters, vlan_id):
+    def get_rules(self, waiters, vlan_id, flows=None):
         rules = {}
-        msgs = self.ofctl.get_flow_stats(self.dp, waiters)
-
-        if str(self.dp.id) in msgs:
-            flow_stats = msgs[str(self.dp.id)]
-            for flow_stat in flow_stats:
-                priority = flow_stat[REST_PRIORITY]
-                if (priority != STATUS_FLOW_PRIORITY
-                        and priority != ARP_FLOW_PRIORITY
-                        and priority != LOG_FLOW_PRIORITY):
-                    vid = flow_stat[REST_MATCH].get(REST_DL_VLAN, VLANID_NONE)
-                    if vlan_id == REST_ALL or vlan_id == vid:
-                        rule = self._to_rest_rule(flow_stat)
-                        rules.setdefault(vid, [])
-                        rules[vid].append(rule)
+        if flows is None:
+            flows = self._get_flows(waiters)
+
+        for flow_stat in flows:
+            priority = flow_stat[REST_PRIORITY]
+            if (priority != STATUS_FLOW_PRIORITY
+                    and priority != ARP_FLOW_PRIORITY
+                    and priority != LOG_FLOW_PRIORITY):
+                vid = flow_stat[REST_MATCH].get(REST_DL_VLAN, VLANID_NONE)
+                if vlan_id == REST_ALL or vlan_id == vid:
+                    rule = self._to_rest_rule(flow_stat)
+                    rules.setdefault(vid, [])
+                    rules[vid].append(rule)
 
         get_data = []
         for vid, rule in rules.items():
@@ -801,69 +976,143 @@ class Firewall(object):
 
     @rest_command
     def delete_rule(self, rest, waiters, vlan_id):
-        try:
-            if rest[REST_RULE_ID] == REST_ALL:
-                rule_id = REST_ALL
-            else:
-                rule_id = int(rest[REST_RULE_ID])
-        except:
-            raise ValueError('Invalid ruleID.')
+        rule_id = Firewall._to_rule_id(rest)
 
         vlan_list = []
         delete_list = []
 
-        msgs = self.ofctl.get_flow_stats(self.dp, waiters)
-        if str(self.dp.id) in msgs:
-            flow_stats = msgs[str(self.dp.id)]
-            for flow_stat in flow_stats:
-                cookie = flow_stat[REST_COOKIE]
-                ruleid = Firewall._cookie_to_ruleid(cookie)
-                priority = flow_stat[REST_PRIORITY]
-                dl_vlan = flow_stat[REST_MATCH].get(REST_DL_VLAN, VLANID_NONE)
-
-                if (priority != STATUS_FLOW_PRIORITY
-                        and priority != ARP_FLOW_PRIORITY
-                        and priority != LOG_FLOW_PRIORITY):
-                    if ((rule_id == REST_ALL or rule_id == ruleid) and
-                            (vlan_id == dl_vlan or vlan_id == REST_ALL)):
-                        match = Match.to_mod_openflow(flow_stat[REST_MATCH])
-                        delete_list.append([cookie, priority, match])
-                    else:
-                        if dl_vlan not in vlan_list:
-                            vlan_list.append(dl_vlan)
+        for flow_stat in self._get_acl_flows(waiters):
+            cookie = flow_stat[REST_COOKIE]
+            ruleid = Firewall._cookie_to_ruleid(cookie)
+            priority = flow_stat[REST_PRIORITY]
+            dl_vlan = flow_stat[REST_MATCH].get(REST_DL_VLAN, VLANID_NONE)
+
+            if ((rule_id == REST_ALL or rule_id == ruleid) and
+                    (vlan_id == dl_vlan or vlan_id == REST_ALL)):
+                match = Match.to_mod_openflow(flow_stat[REST_MATCH])
+                delete_list.append([cookie, priority, match])
+            else:
+                if dl_vlan not in vlan_list:
+                    vlan_list.append(dl_vlan)
 
         self._update_vlan_list(vlan_list)
 
-        if len(delete_list) == 0:
-            msg_details = 'Rule is not exist.'
-            if rule_id != REST_ALL:
-                msg_details += ' : ruleID=%d' % rule_id
-            msg = {'result': 'failure',
-                   'details': msg_details}
-        else:
-            cmd = self.dp.ofproto.OFPFC_DELETE_STRICT
-            actions = []
-            delete_ids = {}
+        cmd = self.dp.ofproto.OFPFC_DELETE_STRICT
+        for cookie, priority, match in delete_list:
+            flow = self._to_of_flow(cookie=cookie, priority=priority,
+                                    match=match, actions=[])
+            self.ofctl.mod_flow_entry(self.dp, flow, cmd)
+
+        msg = self._delete_result(rule_id, delete_list)
+        return REST_COMMAND_RESULT, msg
+
+    @rest_command
+    def delete_rules(self, rest_list, waiters, vlan_id):
+        rule_ids = [Firewall._to_rule_id(rest) for rest in rest_list]
+        # a flow is deleted by the first rule which matches it
+        indexes = {}
+        for i, rule_id in enumerate(rule_ids):
+            indexes.setdefault(rule_id, i)
+        any_index = indexes.get(REST_ALL)
+
+        vlan_list = []
+        delete_lists = [[] for _rule_id in rule_ids]
+
+        for flow_stat in self._get_acl_flows(waiters):
+            cookie = flow_stat[REST_COOKIE]
+            ruleid = Firewall._cookie_to_ruleid(cookie)
+            priority = flow_stat[REST_PRIORITY]
+            dl_vlan = flow_stat[REST_MATCH].get(REST_DL_VLAN, VLANID_NONE)
+
+            index = None
+            if vlan_id == dl_vlan or vlan_id == REST_ALL:
+                matched = [i for i in (indexes.get(ruleid), any_index)
+                           if i is not None]
+                if matched:
+                    index = min(matched)
+            if index is not None:
+                match = Match.to_mod_openflow(flow_stat[REST_MATCH])
+                delete_lists[index].append([cookie, priority, match])
+            else:
+                if dl_vlan not in vlan_list:
+                    vlan_list.append(dl_vlan)
+
+        self._update_vlan_list(vlan_list)
+
+        cmd = self.dp.ofproto.OFPFC_DELETE_STRICT
+        flow_mods = []
+        for delete_list in delete_lists:
             for cookie, priority, match in delete_list:
                 flow = self._to_of_flow(cookie=cookie, priority=priority,
-                                        match=match, actions=actions)
-                self.ofctl.mod_flow_entry(self.dp, flow, cmd)
+                                        match=match, actions=[])
+                flow_mods.append(self.ofctl.to_flow_mod(self.dp, flow, cmd))
+        errors = ofctl_utils.send_msgs_with_barrier(self.dp, flow_mods,
+                                                    waiters)
+
+        msgs = []
+        start = 0
+        for rule_id, delete_list in zip(rule_ids, delete_lists):
+            end = start + len(delete_list)
+            msgs.append(self._delete_result(rule_id, delete_list,
+                                            errors[start:end]))
+            start = end
+
+        return REST_COMMAND_RESULT, msgs
 
-                vid = match.get(REST_DL_VLAN, VLANID_NONE)
-                rule_id = Firewall._cookie_to_ruleid(cookie)
-                delete_ids.setdefault(vid, '')
-                delete_ids[vid] += (('%d' if delete_ids[vid] == ''
-                                     else ',%d') % rule_id)
+    @staticmethod
+    def _to_rule_id(rest):
+        try:
+            if rest[REST_RULE_ID] == REST_ALL:
+                return REST_ALL
+            else:
+                return int(rest[REST_RULE_ID])
+        except:
+            raise ValueError('Invalid ruleID.')
 
-            msg = []
-            for vid, rule_ids in delete_ids.items():
-                del_msg = {'result': 'success',
-                           'details': 'Rule deleted. : ruleID=%s' % rule_ids}
+    def _get_acl_flows(self, waiters):
+        flows = []
+        for flow_stat in self._get_flows(waiters):
+            priority = flow_stat[REST_PRIORITY]
+            if (priority != STATUS_FLOW_PRIORITY
+                    and priority != ARP_FLOW_PRIORITY
+                    and priority != LOG_FLOW_PRIORITY):
+                flows.append(flow_stat)
+        return flows
+
+    def _delete_result(self, rule_id, delete_list, errors=None):
+        if len(delete_list) == 0:
+            msg_details = 'Rule is not exist.'
+            if rule_id != REST_ALL:
+                msg_details += ' : ruleID=%d' % rule_id
+            return {'result': 'failure',
+                    'details': msg_details}
+
+        if errors is None:
+            errors = [None] * len(delete_list)
+        delete_ids = {}
+        msg = []
+        for (cookie, _priority, match), error in zip(delete_list, errors):
+            vid = match.get(REST_DL_VLAN, VLANID_NONE)
+            rule_id = Firewall._cookie_to_ruleid(cookie)
+            if error is not None:
+                del_msg = {'result': 'failure',
+                           'details': 'Rule not deleted. : ruleID=%d : %s' %
+                           (rule_id, ofctl_utils.error_to_str(error))}
                 if vid != VLANID_NONE:
                     del_msg.setdefault(REST_VLANID, vid)
                 msg.append(del_msg)
-
-        return REST_COMMAND_RESULT, msg
+                continue
+            delete_ids.setdefault(vid, '')
+            delete_ids[vid] += (('%d' if delete_ids[vid] == ''
+                                 else ',%d') % rule_id)
+
+        for vid, rule_ids in delete_ids.items():
+            del_msg = {'result': 'success',
+                       'details': 'Rule deleted. : ruleID=%s' % rule_ids}
+            if vid != VLANID_NONE:
+                del_msg.setdefault(REST_VLANID, vid)
+            msg.append(del_msg)
+        return msg
 
     def _to_of_flow(self, cookie, priority, match, actions):
         flow = {'cookie': cookie,
@@ -0,0 +1,62 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from webob import Response
+
+from ryu.app.wsgi import ControllerBase, WSGIApplication
+from ryu.base import app_manager
+from ryu.base import profiler
+
+# REST API for the event handler profiler
+# (enabled by ryu-manager --event-profile)
+#
+# get the statistics
+# GET /v1.0/profile
+#
+# clear the statistics
+# DELETE /v1.0/profile
+
+
+class ProfilerController(ControllerBase):
+    def get_stats(self, req, **kwargs):
+        stats = profiler.get_stats()
+        stats['enabled'] = profiler.is_enabled()
+        body = json.dumps(stats)
+        return Response(content_type='application/json', body=body)
+
+    def reset_stats(self, req, **kwargs):
+        profiler.reset()
+        return Response(status=200)
+
+
+class ProfilerAPI(app_manager.RyuApp):
+    _CONTEXTS = {
+        'wsgi': WSGIApplication
+    }
+
+    def __init__(self, *args, **kwargs):
+        super(ProfilerAPI, self).__init__(*args, **kwargs)
+        mapper = kwargs['wsgi'].mapper
+
+        controller = ProfilerController
+        route_name = 'profiler'
+        uri = '/v1.0/profile'
+        mapper.connect(route_name, uri, controller=controller,
+                       action='get_stats',
+                       conditions=dict(method=['GET']))
+        mapper.connect(route_name, uri, controller=controller,
+                       action='reset_stats',
+                       conditions=dict(method=['DELETE']))
@@ -33,6 +33,7 @@ from ryu.exception import RyuException
 from ryu.lib import dpid as dpid_lib
 from ryu.lib import hub
 from ryu.lib import mac as mac_lib
+from ryu.lib import ofctl_utils
 from ryu.lib import addrconv
 from ryu.lib.packet import arp
 from ryu.lib.packet import ethernet
@@ -97,6 +98,23 @@ from ryu.ofproto import ofproto_v1_3
 #    parameter = {"route_id": "<int>"} or {"route_id": "all"}
 #
 #
+## 4. set or delete many address data or routing data at once.
+#
+#  The flows are sent in batches, each followed by a barrier request,
+#  and the result is reported for each parameter.
+#
+# * set or delete data of no vlan
+# POST /router/{switch_id}/bulk
+# DELETE /router/{switch_id}/bulk
+#
+# * set or delete data of specific vlan group
+# POST /router/{switch_id}/{vlan_id}/bulk
+# DELETE /router/{switch_id}/{vlan_id}/bulk
+#
+#  parameter = a list of the parameters of 2. or 3.
+#    [{"address": "A.B.C.D/M"}, {"destination": ..., "gateway": ...}, ...]
+#
+#
 
 
 UINT16_MAX = 0xffff
@@ -256,6 +274,25 @@ class RestRouterAPI(app_manager.RyuApp):
                        requirements=requirements,
                        action='delete_vlan_data',
                        conditions=dict(method=['DELETE']))
+        # For bulk data
+        path = '/router/{switch_id}/bulk'
+        mapper.connect('router', path, controller=RouterController,
+                       requirements=requirements,
+                       action='set_bulk_data',
+                       conditions=dict(method=['POST']))
+        mapper.connect('router', path, controller=RouterController,
+                       requirements=requirements,
+                       action='delete_bulk_data',
+                       conditions=dict(method=['DELETE']))
+        path = '/router/{switch_id}/{vlan_id}/bulk'
+        mapper.connect('router', path, controller=RouterController,
+                       requirements=requirements,
+                       action='set_vlan_bulk_data',
+                       conditions=dict(method=['POST']))
+        mapper.connect('router', path, controller=RouterController,
+                       requirements=requirements,
+                       action='delete_vlan_bulk_data',
+                       conditions=dict(method=['DELETE']))
 
     @set_ev_cls(dpset.EventDP, dpset.DPSET_EV_DISPATCHER)
     def datapath_handler(self, ev):
@@ -268,6 +305,14 @@ class RestRouterAPI(app_manager.RyuApp):
     def packet_in_handler(self, ev):
         RouterController.packet_in_handler(ev.msg)
 
+    @set_ev_cls(ofp_event.EventOFPBarrierReply, MAIN_DISPATCHER)
+    def barrier_reply_handler(self, ev):
+        ofctl_utils.barrier_reply_handler(self.waiters, ev.msg)
+
+    @set_ev_cls(ofp_event.EventOFPErrorMsg, MAIN_DISPATCHER)
+    def error_msg_handler(self, ev):
+        ofctl_utils.error_msg_handler(self.waiters, ev.msg)
+
     def _stats_reply_handler(self, ev):
         msg = ev.msg
         dp = msg.datapath
@@ -407,6 +452,30 @@ class RouterController(ControllerBase):
         return self._access_router(switch_id, vlan_id,
                                    'delete_data', req.body)
 
+    # POST /router/{switch_id}/bulk
+    @rest_command
+    def set_bulk_data(self, req, switch_id, **_kwargs):
+        return self._access_router(switch_id, VLANID_NONE,
+                                   'set_bulk_data', req.body)
+
+    # POST /router/{switch_id}/{vlan_id}/bulk
+    @rest_command
+    def set_vlan_bulk_data(self, req, switch_id, vlan_id, **_kwargs):
+        return self._access_router(switch_id, vlan_id,
+                                   'set_bulk_data', req.body)
+
+    # DELETE /router/{switch_id}/bulk
+    @rest_command
+    def delete_bulk_data(self, req, switch_id, **_kwargs):
+        return self._access_router(switch_id, VLANID_NONE,
+                                   'delete_bulk_data', req.body)
+
+    # DELETE /router/{switch_id}/{vlan_id}/bulk
+    @rest_command
+    def delete_vlan_bulk_data(self, req, switch_id, vlan_id, **_kwargs):
+        return self._access_router(switch_id, vlan_id,
+                                   'delete_bulk_data', req.body)
+
     def _access_router(self, switch_id, vlan_id, func, rest_param):
         rest_message = []
         routers = self._get_router(switch_id)
@@ -560,6 +629,42 @@ class Router(dict):
         return {REST_SWITCHID: self.dpid_str,
                 REST_COMMAND_RESULT: msgs}
 
+    def set_bulk_data(self, vlan_id, param, waiters):
+        if not isinstance(param, list):
+            raise ValueError('Invalid parameter.')
+
+        vlan_routers = self._get_vlan_router(vlan_id)
+        if not vlan_routers:
+            vlan_routers = [self._add_vlan_router(vlan_id)]
+
+        msgs = []
+        for vlan_router in vlan_routers:
+            results = vlan_router.set_bulk_data(param, waiters)
+            msgs.extend(results)
+            if any(msg[REST_RESULT] == REST_NG for msg in results):
+                # Remove the VlanRouter if no data is set.
+                self._del_vlan_router(vlan_router.vlan_id, waiters)
+
+        return {REST_SWITCHID: self.dpid_str,
+                REST_COMMAND_RESULT: msgs}
+
+    def delete_bulk_data(self, vlan_id, param, waiters):
+        if not isinstance(param, list):
+            raise ValueError('Invalid parameter.')
+
+        msgs = []
+        vlan_routers = self._get_vlan_router(vlan_id)
+        for vlan_router in vlan_routers:
+            msgs.extend(vlan_router.delete_bulk_data(param, waiters))
+            # Check unnecessary VlanRouter.
+            self._del_vlan_router(vlan_router.vlan_id, waiters)
+        if not msgs:
+            msgs = [{REST_RESULT: REST_NG,
+                     REST_DETAILS: 'Data is nothing.'}]
+
+        return {REST_SWITCHID: self.dpid_str,
+                REST_COMMAND_RESULT: msgs}
+
     def packet_in_handler(self, msg):
         pkt = packet.Packet(msg.data)
         #TODO: Packet library convert to string
@@ -684,6 +789,12 @@ class VlanRouter(object):
         return {REST_ROUTE: routing_data}
 
     def set_data(self, data):
+        msg, _added = self._set_data(data)
+        return msg
+
+    def _set_data(self, data):
+        # Returns the response and the (REST_ADDRESSID or REST_ROUTEID, id)
+        # of the data added, or None if nothing is added.
         details = None
 
         try:
@@ -692,6 +803,7 @@ class VlanRouter(object):
                 address = data[REST_ADDRESS]
                 address_id = self._set_address_data(address)
                 details = 'Add address [address_id=%d]' % address_id
+                added = (REST_ADDRESSID, address_id)
             # Set routing data
             elif REST_GATEWAY in data:
                 gateway = data[REST_GATEWAY]
@@ -701,17 +813,96 @@ class VlanRouter(object):
                     destination = DEFAULT_ROUTE
                 route_id = self._set_routing_data(destination, gateway)
                 details = 'Add route [route_id=%d]' % route_id
+                added = (REST_ROUTEID, route_id)
 
         except CommandFailure as err_msg:
             msg = {REST_RESULT: REST_NG, REST_DETAILS: str(err_msg)}
-            return self._response(msg)
+            return self._response(msg), None
 
         if details is not None:
             msg = {REST_RESULT: REST_OK, REST_DETAILS: details}
-            return self._response(msg)
+            return self._response(msg), added
         else:
             raise ValueError('Invalid parameter.')
 
+    def set_bulk_data(self, data_list, waiters):
+        # Each data is set locally at once while its messages are held
+        # and sent together afterwards.
+        self.ofctl.start_batch()
+        try:
+            results = []
+            added_list = []
+            for data in data_list:
+                start = len(self.ofctl.batch)
+                added = None
+                try:
+                    msg, added = self._set_data(data)
+                except ValueError as err_msg:
+                    msg = self._response({REST_RESULT: REST_NG,
+                                          REST_DETAILS: str(err_msg)})
+                results.append((msg, start, len(self.ofctl.batch)))
+                added_list.append(added)
+        finally:
+            batch = self.ofctl.end_batch()
+
+        msgs = self._send_bulk(batch, results, waiters)
+        self._rollback_bulk(msgs, added_list, waiters)
+        return msgs
+
+    def _rollback_bulk(self, msgs, added_list, waiters):
+        # Remove the data whose messages the switch rejected, so that
+        # only the data reported as added is kept.  A route is added
+        # after the address of its gateway, so they are removed in
+        # reverse order, and the routes through a removed address too.
+        failed = [added for msg, added in zip(msgs, added_list)
+                  if added is not None and msg[REST_RESULT] == REST_NG]
+        if not failed:
+            return
+        route_msgs = dict((added[1], msg)
+                          for msg, added in zip(msgs, added_list)
+                          if added is not None and added[0] == REST_ROUTEID)
+
+        flows = self._get_all_flow(waiters)
+        for key, data_id in reversed(failed):
+            if key == REST_ROUTEID:
+                self._rollback_routing_data(data_id, waiters, flows)
+                continue
+            for route in self.routing_tbl.values():
+                address = self.address_data.get_data(ip=route.gateway_ip)
+                if address is None or address.address_id != data_id:
+                    continue
+                msg = route_msgs.get(route.route_id)
+                if msg is not None and msg[REST_RESULT] == REST_OK:
+                    msg[REST_RESULT] = REST_NG
+                    msg[REST_DETAILS] += \
+                        ' : address_id=%d is not added' % data_id
+                self._rollback_routing_data(route.route_id, waiters, flows)
+            self._delete_address_data(data_id, waiters, flows=flows)
+            # the flows of the address can be missing from the switch
+            address = self.address_data.get_data(addr_id=data_id)
+            if address is not None:
+                self.packet_buffer.delete(del_addr=address)
+                self.address_data.delete(data_id)
+
+    def _rollback_routing_data(self, route_id, waiters, flows):
+        self._delete_routing_data(route_id, waiters, flows=flows)
+        # the flow of the route can be missing from the switch
+        self.routing_tbl.delete(route_id)
+
+    def _send_bulk(self, batch, results, waiters):
+        errors = ofctl_utils.send_msgs_with_barrier(self.dp, batch, waiters)
+
+        msgs = []
+        for msg, start, end in results:
+            for error in errors[start:end]:
+                if error is not None:
+                    msg[REST_RESULT] = REST_NG
+                    msg[REST_DETAILS] += ' : %s' % \
+                        ofctl_utils.error_to_str(error)
+                    break
+            msgs.append(msg)
+        return msgs
+
     def _set_address_data(self, address):
         address = self.address_data.add(address)
 
@@ -802,7 +993,50 @@ class VlanRouter(object):
 
         return self._response(msg)
 
-    def _delete_address_data(self, address_id, waiters):
+    def delete_bulk_data(self, data_list, waiters):
+        # The flows are got only once and shared by all of the data.
+        flows = self._get_all_flow(waiters)
+
+        self.ofctl.start_batch()
+        try:
+            results = []
+            for data in data_list:
+                start = len(self.ofctl.batch)
+                try:
+                    if REST_ROUTEID in data:
+                        msg = self._delete_routing_data(
+                            data[REST_ROUTEID], waiters, flows=flows)
+                    elif REST_ADDRESSID in data:
+                        msg = self._delete_address_data(
+                            data[REST_ADDRESSID], waiters, flows=flows)
+                    else:
+                        raise ValueError('Invalid parameter.')
+                    if not msg:
+                        msg = {REST_RESULT: REST_NG,
+                               REST_DETAILS: 'Data is nothing.'}
+                except ValueError as err_msg:
+                    msg = {REST_RESULT: REST_NG, REST_DETAILS: str(err_msg)}
+                results.append((self._response(msg), start,
+                                len(self.ofctl.batch)))
+        finally:
+            batch = self.ofctl.end_batch()
+
+        return self._send_bulk(batch, results, waiters)
+
+    def _get_all_flow(self, waiters, flows=None):
+        if flows is None:
+            flows = []
+            for msg in self.ofctl.get_all_flow(waiters):
+                flows.extend(msg.body)
+        return flows
+
+    @staticmethod
+    def _remove_flows(flows, delete_list):
+        # Keep the shared flows of delete_bulk_data() up to date.
+        deleted = set(id(stats) for stats in delete_list)
+        flows[:] = [stats for stats in flows if id(stats) not in deleted]
+
+    def _delete_address_data(self, address_id, waiters, flows=None):
         if address_id != REST_ALL:
             try:
                 address_id = int(address_id)
@@ -814,23 +1048,23 @@ class VlanRouter(object):
 
         # Get all flow.
         delete_list = []
-        msgs = self.ofctl.get_all_flow(waiters)
+        all_flow = self._get_all_flow(waiters, flows)
         max_id = UINT16_MAX
-        for msg in msgs:
-            for stats in msg.body:
-                vlan_id = VlanRouter._cookie_to_id(REST_VLANID, stats.cookie)
-                if vlan_id != self.vlan_id:
+        for stats in all_flow:
+            vlan_id = VlanRouter._cookie_to_id(REST_VLANID, stats.cookie)
+            if vlan_id != self.vlan_id:
+                continue
+            addr_id = VlanRouter._cookie_to_id(REST_ADDRESSID, stats.cookie)
+            if addr_id in skip_ids:
+                continue
+            elif address_id == REST_ALL:
+                if addr_id <= COOKIE_DEFAULT_ID or max_id < addr_id:
                     continue
-                addr_id = VlanRouter._cookie_to_id(REST_ADDRESSID,
-                                                   stats.cookie)
-                if addr_id in skip_ids:
-                    continue
-                elif address_id == REST_ALL:
-                    if addr_id <= COOKIE_DEFAULT_ID or max_id < addr_id:
-                        continue
-                elif address_id != addr_id:
-                    continue
-                delete_list.append(stats)
+            elif address_id != addr_id:
+                continue
+            delete_list.append(stats)
+        if flows is not None:
+            self._remove_flows(flows, delete_list)
 
         delete_ids = []
         for flow_stats in delete_list:
@@ -866,7 +1100,7 @@ class VlanRouter(object):
 
         return msg
 
-    def _delete_routing_data(self, route_id, waiters):
+    def _delete_routing_data(self, route_id, waiters, flows=None):
         if route_id != REST_ALL:
             try:
                 route_id = int(route_id)
@@ -875,21 +1109,22 @@ class VlanRouter(object):
                 raise ValueError(err_msg % (REST_ROUTEID, e.message))
 
         # Get all flow.
-        msgs = self.ofctl.get_all_flow(waiters)
+        all_flow = self._get_all_flow(waiters, flows)
 
         delete_list = []
-        for msg in msgs:
-            for stats in msg.body:
-                vlan_id = VlanRouter._cookie_to_id(REST_VLANID, stats.cookie)
-                if vlan_id != self.vlan_id:
-                    continue
-                rt_id = VlanRouter._cookie_to_id(REST_ROUTEID, stats.cookie)
-                if route_id == REST_ALL:
-                    if rt_id == COOKIE_DEFAULT_ID:
-                        continue
-                elif route_id != rt_id:
+        for stats in all_flow:
+            vlan_id = VlanRouter._cookie_to_id(REST_VLANID, stats.cookie)
+            if vlan_id != self.vlan_id:
+                continue
+            rt_id = VlanRouter._cookie_to_id(REST_ROUTEID, stats.cookie)
+            if route_id == REST_ALL:
+                if rt_id == COOKIE_DEFAULT_ID:
                     continue
-                delete_list.append(stats)
+            elif route_id != rt_id:
+                continue
+            delete_list.append(stats)
+        if flows is not None:
+            self._remove_flows(flows, delete_list)
 
         # Delete flow.
         delete_ids = []
@@ -1168,7 +1403,7 @@ class VlanRouter(object):
                 gateway_flg = True
                 if value.gateway_mac == src_mac:
                     continue
-                self.routing_tbl[key].gateway_mac = src_mac
+                self.routing_tbl.set_gateway_mac(key, src_mac)
 
                 cookie = self._id_to_cookie(REST_ROUTEID, value.route_id)
                 priority, log_msg = self._get_priority(PRIORITY_TYPE_ROUTE,
@@ -1315,6 +1550,35 @@ class RoutingTable(dict):
     def __init__(self):
         super(RoutingTable, self).__init__()
         self.route_id = 1
+        # indexes of the routes
+        self._trie = PrefixTrie()
+        self._route_ids = {}    # route_id -> key
+        self._gateway_macs = {}  # gateway_mac -> set of keys
+
+    def __setitem__(self, key, route):
+        if key in self:
+            del self[key]
+        super(RoutingTable, self).__setitem__(key, route)
+        self._trie.insert(ipv4_text_to_int(route.dst_ip), route.netmask,
+                          route)
+        self._route_ids[route.route_id] = key
+        if route.gateway_mac is not None:
+            self._gateway_macs.setdefault(route.gateway_mac, set()).add(key)
+
+    def __delitem__(self, key):
+        route = self[key]
+        super(RoutingTable, self).__delitem__(key)
+        self._trie.delete(ipv4_text_to_int(route.dst_ip), route.netmask)
+        if self._route_ids.get(route.route_id) == key:
+            del self._route_ids[route.route_id]
+        self._discard_gateway_mac(key, route.gateway_mac)
+
+    def _discard_gateway_mac(self, key, gateway_mac):
+        keys = self._gateway_macs.get(gateway_mac)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._gateway_macs[gateway_mac]
 
     def add(self, dst_nw_addr, gateway_ip):
         err_msg = 'Invalid [%s] value.'
@@ -1353,38 +1617,137 @@ class RoutingTable(dict):
         return routing_data
 
     def delete(self, route_id):
-        for key, value in self.items():
-            if value.route_id == route_id:
-                del self[key]
-                return
+        key = self._route_ids.get(route_id)
+        if key is not None:
+            del self[key]
+
+    def set_gateway_mac(self, key, gateway_mac):
+        route = self[key]
+        self._discard_gateway_mac(key, route.gateway_mac)
+        route.gateway_mac = gateway_mac
+        if gateway_mac is not None:
+            self._gateway_macs.setdefault(gateway_mac, set()).add(key)
 
     def get_gateways(self):
         return [routing_data.gateway_ip for routing_data in self.values()]
 
     def get_data(self, gw_mac=None, dst_ip=None):
         if gw_mac is not None:
-            for route in self.values():
-                if gw_mac == route.gateway_mac:
-                    return route
+            keys = self._gateway_macs.get(gw_mac)
+            if keys:
+                return self[next(iter(keys))]
             return None
 
         elif dst_ip is not None:
-            get_route = None
-            mask = 0
-            for route in self.values():
-                if ipv4_apply_mask(dst_ip, route.netmask) == route.dst_ip:
-                    # For longest match
-                    if mask < route.netmask:
-                        get_route = route
-                        mask = route.netmask
-
-            if get_route is None:
-                get_route = self.get(DEFAULT_ROUTE, None)
-            return get_route
+            # The longest match, or the default route
+            return self._trie.lookup(ipv4_text_to_int(dst_ip))
         else:
             return None
 
 
+class PrefixTrie(object):
+    """
+    Path-compressed binary trie of IPv4 prefixes for longest prefix
+    match.  Lookup visits at most one node per bit of the prefix.
+    """
+
+    class _Node(object):
+        __slots__ = ['prefix', 'length', 'value', 'children']
+
+        def __init__(self, prefix, length, value=None):
+            self.prefix = prefix
+            self.length = length
+            self.value = value
+            self.children = [None, None]
+
+    _MASKS = [(UINT32_MAX << (32 - i)) & UINT32_MAX for i in range(33)]
+
+    def __init__(self):
+        super(PrefixTrie, self).__init__()
+        self._root = self._Node(0, 0)
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def _common_length(self, a, b, limit):
+        diff = (a ^ b) & self._MASKS[limit]
+        if not diff:
+            return limit
+        return 32 - diff.bit_length()
+
+    def insert(self, prefix, length, value):
+        """
+        Sets *value* for *prefix*/*length*.  *prefix* is an integer
+        whose host bits are zero.
+        """
+        node = self._root
+        while node.length < length:
+            bit = (prefix >> (31 - node.length)) & 1
+            child = node.children[bit]
+            if child is None:
+                node.children[bit] = self._Node(prefix, length, value)
+                self._len += 1
+                return
+            common = self._common_length(prefix, child.prefix,
+                                         min(length, child.length))
+            if common < child.length:
+                # split the edge to the child
+                mid = self._Node(prefix & self._MASKS[common], common)
+                mid.children[(child.prefix >> (31 - common)) & 1] = child
+                node.children[bit] = mid
+            node = node.children[bit]
+        if node.value is None:
+            self._len += 1
+        node.value = value
+
+    def delete(self, prefix, length):
+        """
+        Removes the value for *prefix*/*length* and returns it, or None.
+        """
+        path = []
+        node = self._root
+        while node is not None and node.length < length:
+            path.append(node)
+            child = node.children[(prefix >> (31 - node.length)) & 1]
+            if child is not None and (child.length > length or
+                                      (prefix ^ child.prefix) &
+                                      self._MASKS[child.length]):
+                child = None
+            node = child
+        if node is None or node.length != length or node.value is None:
+            return None
+        value = node.value
+        node.value = None
+        self._len -= 1
+        # remove the nodes which no longer branch
+        while path and node.value is None:
+            parent = path.pop()
+            bit = (node.prefix >> (31 - parent.length)) & 1
+            children = [c for c in node.children if c is not None]
+            if len(children) > 1:
+                break
+            parent.children[bit] = children[0] if children else None
+            node = parent
+        return value
+
+    def lookup(self, addr):
+        """
+        Returns the value of the longest prefix which matches the
+        integer *addr*, or None.
+        """
+        node = self._root
+        masks = self._MASKS
+        value = node.value
+        while node.length < 32:
+            node = node.children[(addr >> (31 - node.length)) & 1]
+            if node is None or (addr ^ node.prefix) & masks[node.length]:
+                break
+            if node.value is not None:
+                value = node.value
+        return value
+
+
 class Route(object):
     def __init__(self, route_id, dst_ip, netmask, gateway_ip):
         super(Route, self).__init__()
@@ -1463,6 +1826,23 @@ class OfCtl(object):
         self.dp = dp
         self.sw_id = {'sw_id': dpid_lib.dpid_to_str(dp.id)}
         self.logger = logger
+        # the messages held between start_batch() and end_batch()
+        self.batch = None
+
+    def start_batch(self):
+        # Hold the messages instead of sending them.
+        self.batch = []
+
+    def end_batch(self):
+        msgs = self.batch
+        self.batch = None
+        return msgs
+
+    def _send_msg(self, msg):
+        if self.batch is None:
+            self.dp.send_msg(msg)
+        else:
+            self.batch.append(msg)
 
     def set_sw_config_for_ttl(self):
         # OpenFlow v1_2/1_3.
@@ -1560,8 +1940,9 @@ class OfCtl(object):
 
     def send_packet_out(self, in_port, output, data, data_str=None):
         actions = [self.dp.ofproto_parser.OFPActionOutput(output, 0)]
-        self.dp.send_packet_out(buffer_id=UINT32_MAX, in_port=in_port,
-                                actions=actions, data=data)
+        packet_out = self.dp.ofproto_parser.OFPPacketOut(
+            self.dp, UINT32_MAX, in_port, actions, data)
+        self._send_msg(packet_out)
         #TODO: Packet library convert to string
         #if data_str is None:
         #    data_str = str(packet.Packet(data))
@@ -1652,7 +2033,7 @@ class OfCtl_v1_0(OfCtl):
         m = ofp_parser.OFPFlowMod(self.dp, match, cookie, cmd,
                                   idle_timeout=idle_timeout,
                                   priority=priority, actions=actions)
-        self.dp.send_msg(m)
+        self._send_msg(m)
 
     def set_routing_flow(self, cookie, priority, outport, dl_vlan=0,
                          nw_src=0, src_mask=32, nw_dst=0, dst_mask=32,
@@ -1686,7 +2067,7 @@ class OfCtl_v1_0(OfCtl):
 
         flow_mod = self.dp.ofproto_parser.OFPFlowMod(
             self.dp, match, cookie, cmd, priority=priority, actions=actions)
-        self.dp.send_msg(flow_mod)
+        self._send_msg(flow_mod)
         self.logger.info('Delete flow [cookie=0x%x]', cookie, extra=self.sw_id)
 
 
@@ -1744,7 +2125,7 @@ class OfCtl_after_v1_2(OfCtl):
         m = ofp_parser.OFPFlowMod(self.dp, cookie, 0, 0, cmd, idle_timeout,
                                   0, priority, UINT32_MAX, ofp.OFPP_ANY,
                                   ofp.OFPG_ANY, 0, match, inst)
-        self.dp.send_msg(m)
+        self._send_msg(m)
 
     def set_routing_flow(self, cookie, priority, outport, dl_vlan=0,
                          nw_src=0, src_mask=32, nw_dst=0, dst_mask=32,
@@ -1782,7 +2163,7 @@ class OfCtl_after_v1_2(OfCtl):
         flow_mod = ofp_parser.OFPFlowMod(self.dp, cookie, cookie_mask, 0, cmd,
                                          0, 0, 0, UINT32_MAX, ofp.OFPP_ANY,
                                          ofp.OFPG_ANY, 0, match, inst)
-        self.dp.send_msg(flow_mod)
+        self._send_msg(flow_mod)
         self.logger.info('Delete flow [cookie=0x%x]', cookie, extra=self.sw_id)
 
 
@@ -1797,7 +2178,7 @@ class OfCtl_v1_2(OfCtl_after_v1_2):
         miss_send_len = UINT16_MAX
         m = self.dp.ofproto_parser.OFPSetConfig(self.dp, flags,
                                                 miss_send_len)
-        self.dp.send_msg(m)
+        self._send_msg(m)
         self.logger.info('Set SW config for TTL error packet in.',
                          extra=self.sw_id)
 
@@ -1829,7 +2210,7 @@ class OfCtl_v1_3(OfCtl_after_v1_2):
         m = self.dp.ofproto_parser.OFPSetAsync(
             self.dp, [packet_in_mask, 0], [port_status_mask, 0],
             [flow_removed_mask, 0])
-        self.dp.send_msg(m)
+        self._send_msg(m)
         self.logger.info('Set SW config for TTL error packet in.',
                          extra=self.sw_id)
 
@@ -14,13 +14,19 @@
 # limitations under the License.
 
 import json
+import math
+import time
 from webob import Response
 
 from ryu.app.wsgi import ControllerBase, WSGIApplication
 from ryu.base import app_manager
+from ryu.controller.handler import set_ev_cls
 from ryu.lib import dpid as dpid_lib
+from ryu.lib import hub
 from ryu.lib import port_no as port_no_lib
+from ryu.topology import event
 from ryu.topology.api import get_switch, get_link
+from ryu.topology.api import get_topology, get_topology_changes
 
 # REST API for switch configuration
 #
@@ -36,8 +42,43 @@ from ryu.topology.api import get_switch, get_link
 # get the links of a switch
 # GET /v1.0/topology/links/<dpid>
 #
+# get all the switches and the links with the revision of the topology
+# GET /v1.0/topology
+#
+# get the changes of the topology since the revision
+# GET /v1.0/topology/changes/<revision>[?timeout=<timeout>]
+#
 # where
 # <dpid>: datapath id in 16 hex
+# <timeout>: seconds to wait for a change if there is none yet
+#
+# The changes are returned as
+#     {"revision": <current revision>,
+#      "changes": [{"revision": <revision>, "type": <type>,
+#                   <"switch", "port" or "link">: <its dict>}, ...]}
+# where <type> is one of switch_enter, switch_leave, port_add,
+# port_delete, port_modify, link_add and link_delete.  If the changes
+# since the revision are not kept any more, 410 Gone is returned and
+# GET /v1.0/topology should be used again.
+
+# the maximum timeout of GET /v1.0/topology/changes
+MAX_CHANGES_TIMEOUT = 60
+
+_CHANGE_TYPES = {
+    event.EventSwitchEnter: ('switch_enter', 'switch'),
+    event.EventSwitchLeave: ('switch_leave', 'switch'),
+    event.EventPortAdd: ('port_add', 'port'),
+    event.EventPortDelete: ('port_delete', 'port'),
+    event.EventPortModify: ('port_modify', 'port'),
+    event.EventLinkAdd: ('link_add', 'link'),
+    event.EventLinkDelete: ('link_delete', 'link'),
+}
+
+
+def _change_to_dict(revision, ev):
+    type_, attr = _CHANGE_TYPES[ev.__class__]
+    return {'revision': revision, 'type': type_,
+            attr: getattr(ev, attr).to_dict()}
 
 
 class TopologyController(ControllerBase):
@@ -61,6 +102,28 @@ class TopologyController(ControllerBase):
         body = json.dumps([link.to_dict() for link in links])
         return Response(content_type='application/json', body=body)
 
+    def get_topology(self, req, **kwargs):
+        body = self.topology_api_app.get_topology_body()
+        return Response(content_type='application/json', body=body)
+
+    def list_changes(self, req, revision, **kwargs):
+        try:
+            timeout = float(req.GET.get('timeout', 0))
+        except ValueError:
+            return Response(status=400)
+        if math.isnan(timeout) or math.isinf(timeout) or timeout < 0:
+            return Response(status=400)
+        timeout = min(timeout, MAX_CHANGES_TIMEOUT)
+
+        current, changes = self.topology_api_app.wait_changes(int(revision),
+                                                              timeout)
+        if changes is None:
+            return Response(status=410)
+        body = json.dumps({'revision': current,
+                           'changes': [_change_to_dict(rev, ev)
+                                       for rev, ev in changes]})
+        return Response(content_type='application/json', body=body)
+
 
 class TopologyAPI(app_manager.RyuApp):
     _CONTEXTS = {
@@ -69,6 +132,11 @@ class TopologyAPI(app_manager.RyuApp):
 
     def __init__(self, *args, **kwargs):
         super(TopologyAPI, self).__init__(*args, **kwargs)
+        # (revision, body) of the last GET /v1.0/topology
+        self._topology = None
+        # set and replaced on each change of the topology
+        self._changed = hub.Event()
+
         wsgi = kwargs['wsgi']
         mapper = wsgi.mapper
 
@@ -97,3 +165,53 @@ class TopologyAPI(app_manager.RyuApp):
         s = mapper.submapper(controller=controller, requirements=requirements)
         s.connect(route_name, uri, action='list_links',
                   conditions=dict(method=['GET']))
+
+        uri = '/v1.0/topology'
+        mapper.connect(route_name, uri, controller=controller,
+                       action='get_topology',
+                       conditions=dict(method=['GET']))
+
+        uri = '/v1.0/topology/changes/{revision}'
+        requirements = {'revision': r'\d+'}
+        s = mapper.submapper(controller=controller, requirements=requirements)
+        s.connect(route_name, uri, action='list_changes',
+                  conditions=dict(method=['GET']))
+
+    @set_ev_cls([event.EventSwitchEnter, event.EventSwitchLeave,
+                 event.EventPortAdd, event.EventPortDelete,
+                 event.EventPortModify,
+                 event.EventLinkAdd, event.EventLinkDelete])
+    def _topology_changed_handler(self, ev):
+        changed = self._changed
+        self._changed = hub.Event()
+        changed.set()
+
+    def get_topology_body(self):
+        # serialized again only if the topology has changed
+        if self._topology is not None:
+            revision, body = self._topology
+            _current, changes = get_topology_changes(self, revision)
+            if changes == []:
+                return body
+
+        revision, switches, links = get_topology(self)
+        body = json.dumps({'revision': revision,
+                           'switches': [switch.to_dict()
+                                        for switch in switches],
+                           'links': [link.to_dict() for link in links]})
+        self._topology = (revision, body)
+        return body
+
+    def wait_changes(self, revision, timeout):
+        """
+        Returns get_topology_changes(self, revision), waiting for a
+        change up to timeout seconds if there is none yet.
+        """
+        deadline = time.time() + timeout
+        while True:
+            changed = self._changed
+            current, changes = get_topology_changes(self, revision)
+            remaining = deadline - time.time()
+            if changes != [] or remaining <= 0:
+                return current, changes
+            changed.wait(timeout=remaining)
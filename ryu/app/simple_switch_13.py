@@ -14,6 +14,7 @@
 # limitations under the License.
 
 from ryu.base import app_manager
+from ryu.base import event_queue
 from ryu.controller import ofp_event
 from ryu.controller.handler import CONFIG_DISPATCHER, MAIN_DISPATCHER
 from ryu.controller.handler import set_ev_cls
@@ -24,6 +25,11 @@ from ryu.lib.packet import ethernet
 
 class SimpleSwitch13(app_manager.RyuApp):
     OFP_VERSIONS = [ofproto_v1_3.OFP_VERSION]
+    # shed PacketIn rather than stalling the datapaths when overloaded.
+    _EVENT_POLICIES = {
+        ofp_event.EventOFPPacketIn: event_queue.EventPolicy(
+            priority=-1, overload=event_queue.DROP_OLDEST),
+    }
 
     def __init__(self, *args, **kwargs):
         super(SimpleSwitch13, self).__init__(*args, **kwargs)
@@ -21,6 +21,9 @@ import sys
 
 from ryu import cfg
 from ryu import utils
+from ryu.base import event_queue
+from ryu.base import profiler
+from ryu.base import sharding
 from ryu.controller.handler import register_instance, get_dependent_services
 from ryu.controller.controller import Datapath
 from ryu.controller import event
@@ -110,6 +113,31 @@ class RyuApp(object):
     a different python module from the RyuApp subclass is.
     """
 
+    _GLOBAL_EVENTS = []
+    """
+    A list of event classes which this RyuApp subclass would generate and
+    which carry global state, i.e. not per-datapath state.
+    When ryu-manager runs with multiple worker processes (--workers),
+    these events are also delivered to the observers in the other
+    workers.  They must be picklable.
+    The other events are delivered only within the worker which owns
+    the datapath.
+    """
+
+    _EVENT_QUEUE_SIZE = 128
+    """
+    The capacity of the event queue of this RyuApp.
+    """
+
+    _EVENT_POLICIES = {}
+    """
+    A dictionary of event class and ryu.base.event_queue.EventPolicy,
+    which describes the priority and the overload policy of events this
+    RyuApp receives.  By default, events have the same priority and the
+    sender blocks while the event queue is full.
+    The counters of the event queue are available as self.events.stats.
+    """
+
     OFP_VERSIONS = None
     """
     A list of supported OpenFlow versions for this RyuApp.
@@ -136,8 +164,14 @@ class RyuApp(object):
         self.name = self.__class__.__name__
         self.event_handlers = {}        # ev_cls -> handlers:list
         self.observers = {}     # ev_cls -> observer-name -> states:set
+        # caches of get_handlers and get_observers.
+        # invalidated when the handlers or observers are changed.
+        self._handlers_cache = {}   # (ev_cls, state) -> handlers:tuple
+        self._observers_cache = {}  # (ev_cls, state) -> observer-names:tuple
         self.threads = []
-        self.events = hub.Queue(128)
+        self.events = event_queue.EventQueue(self._EVENT_QUEUE_SIZE,
+                                             self._EVENT_POLICIES,
+                                             profiler.is_enabled())
         if hasattr(self.__class__, 'LOGGER_NAME'):
             self.logger = logging.getLogger(self.__class__.LOGGER_NAME)
         else:
@@ -165,25 +199,30 @@ class RyuApp(object):
         assert callable(handler)
         self.event_handlers.setdefault(ev_cls, [])
         self.event_handlers[ev_cls].append(handler)
+        self._handlers_cache.clear()
 
     def unregister_handler(self, ev_cls, handler):
         assert callable(handler)
         self.event_handlers[ev_cls].remove(handler)
-        if not event_handlers[ev_cls]:
-            del event_handlers[ev_cls]
+        if not self.event_handlers[ev_cls]:
+            del self.event_handlers[ev_cls]
+        self._handlers_cache.clear()
 
     def register_observer(self, ev_cls, name, states=None):
         states = states or set()
         ev_cls_observers = self.observers.setdefault(ev_cls, {})
         ev_cls_observers.setdefault(name, set()).update(states)
+        self._observers_cache.clear()
 
     def unregister_observer(self, ev_cls, name):
         observers = self.observers.get(ev_cls, {})
         observers.pop(name)
+        self._observers_cache.clear()
 
     def unregister_observer_all_event(self, name):
         for observers in self.observers.values():
             observers.pop(name, None)
+        self._observers_cache.clear()
 
     def observe_event(self, ev_cls, states=None):
         brick = _lookup_service_brick_by_ev_cls(ev_cls)
@@ -206,9 +245,12 @@ class RyuApp(object):
                       The default is None.
         """
         ev_cls = ev.__class__
-        handlers = self.event_handlers.get(ev_cls, [])
         if state is None:
-            return handlers
+            return self.event_handlers.get(ev_cls, [])
+        try:
+            return self._handlers_cache[(ev_cls, state)]
+        except KeyError:
+            pass
 
         def test(h):
             if not ev_cls in h.callers:
@@ -220,14 +262,24 @@ class RyuApp(object):
                 return True
             return state in states
 
-        return filter(test, handlers)
+        handlers = tuple(filter(test, self.event_handlers.get(ev_cls, [])))
+        self._handlers_cache[(ev_cls, state)] = handlers
+        return handlers
 
     def get_observers(self, ev, state):
+        ev_cls = ev.__class__
+        try:
+            return self._observers_cache[(ev_cls, state)]
+        except KeyError:
+            pass
+
         observers = []
-        for k, v in self.observers.get(ev.__class__, {}).iteritems():
+        for k, v in self.observers.get(ev_cls, {}).iteritems():
             if not state or not v or state in v:
                 observers.append(k)
 
+        observers = tuple(observers)
+        self._observers_cache[(ev_cls, state)] = observers
         return observers
 
     def send_request(self, req):
@@ -252,6 +304,10 @@ class RyuApp(object):
             if ev == self._event_stop:
                 continue
             handlers = self.get_handlers(ev, state)
+            if profiler.is_enabled():
+                profiler.call_handlers(self.name, ev, handlers,
+                                       self.events.last_put_time)
+                continue
             for handler in handlers:
                 handler(ev)
 
@@ -280,6 +336,8 @@ class RyuApp(object):
 
         for observer in self.get_observers(ev, state):
             self.send_event(observer, ev, state)
+        if ev.__class__ in self._GLOBAL_EVENTS:
+            sharding.forward_event(self.name, ev, state)
 
     def reply_to_request(self, req, rep):
         """
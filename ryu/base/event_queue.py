@@ -0,0 +1,279 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Bounded and prioritized event queue of RyuApp
+
+Each RyuApp has an EventQueue with a limited capacity.  How an event is
+queued is described by the EventPolicy of its event class, which is
+declared in RyuApp._EVENT_POLICIES of the receiving application.
+
+Example::
+
+    class MyApp(app_manager.RyuApp):
+        _EVENT_QUEUE_SIZE = 1024
+        _EVENT_POLICIES = {
+            ofp_event.EventOFPPacketIn: event_queue.EventPolicy(
+                priority=-1, overload=event_queue.DROP_OLDEST),
+            ofp_event.EventOFPPortStatus: event_queue.EventPolicy(
+                priority=1),
+        }
+
+An event of higher priority is dequeued before the events of lower
+priority.  The events of the same priority are dequeued in FIFO order.
+When the queue is full, a new event is handled by the overload policy
+of its class.
+
+============= ===========================================================
+Policy        Description
+============= ===========================================================
+BLOCK         The sender blocks until the queue has room.  This is the
+              default and the behaviour of the old fixed size queue.
+DROP_NEWEST   The new event is dropped.
+DROP_OLDEST   The oldest queued event of the same class is dropped to make
+              room.  If there is none, the new event is dropped.
+COALESCE      A queued event of the same class and key is replaced with
+              the new event.  If there is none, the sender blocks.
+============= ===========================================================
+
+Events sent with BLOCK or COALESCE are never dropped.
+"""
+
+import collections
+import time
+
+from ryu.lib import hub
+
+
+BLOCK = 'block'
+DROP_NEWEST = 'drop-newest'
+DROP_OLDEST = 'drop-oldest'
+COALESCE = 'coalesce'
+
+_POLICIES = (BLOCK, DROP_NEWEST, DROP_OLDEST, COALESCE)
+
+
+class EventPolicy(object):
+    """
+    How events of a class are queued.
+
+    ========= ============================================================
+    Argument  Description
+    ========= ============================================================
+    priority  Higher is dequeued earlier.  The default is 0.
+    overload  One of BLOCK, DROP_NEWEST, DROP_OLDEST and COALESCE.
+              The default is BLOCK.
+    key       A function which returns the key of an event.  Required
+              for COALESCE.  e.g. lambda ev: ev.msg.datapath.id
+    ========= ============================================================
+    """
+
+    def __init__(self, priority=0, overload=BLOCK, key=None):
+        super(EventPolicy, self).__init__()
+        assert overload in _POLICIES
+        assert overload != COALESCE or callable(key)
+        self.priority = priority
+        self.overload = overload
+        self.key = key
+
+
+DEFAULT_POLICY = EventPolicy()
+
+
+class EventQueueStats(object):
+    """
+    Counters of an EventQueue.
+
+    ============ ==========================================================
+    Attribute    Description
+    ============ ==========================================================
+    high_water   The max number of queued events
+    enqueued     {event class name: number of queued events}
+    dropped      {event class name: number of dropped events}
+    coalesced    {event class name: number of replaced events}
+    blocked      {event class name: number of times the sender blocked}
+    ============ ==========================================================
+    """
+
+    def __init__(self):
+        super(EventQueueStats, self).__init__()
+        self.high_water = 0
+        self.enqueued = collections.defaultdict(int)
+        self.dropped = collections.defaultdict(int)
+        self.coalesced = collections.defaultdict(int)
+        self.blocked = collections.defaultdict(int)
+
+    def to_dict(self):
+        return {'high_water': self.high_water,
+                'enqueued': dict(self.enqueued),
+                'dropped': dict(self.dropped),
+                'coalesced': dict(self.coalesced),
+                'blocked': dict(self.blocked)}
+
+
+class EventQueue(object):
+    """
+    A queue of (event, state) pairs.
+
+    ========= ============================================================
+    Argument  Description
+    ========= ============================================================
+    maxsize   The capacity of the queue
+    policies  {event class: EventPolicy}.  DEFAULT_POLICY is used for the
+              classes not in it.
+    timestamp If True, the time when an event is queued is recorded and
+              get() sets it to last_put_time.
+    ========= ============================================================
+    """
+
+    def __init__(self, maxsize, policies=None, timestamp=False):
+        super(EventQueue, self).__init__()
+        assert maxsize > 0
+        self.maxsize = maxsize
+        self.policies = policies or {}
+        self.stats = EventQueueStats()
+        self.timestamp = timestamp
+        self.last_put_time = None
+        self._size = 0
+        # an entry is [ev, state, queued, put time].
+        # a dropped entry stays in _prio_queues with queued False
+        # until it's popped or _compact() is called.
+        self._dropped = 0
+        self._prio_queues = {}  # priority -> deque of entries
+        self._priorities = []   # descending
+        self._cls_queues = {}   # ev_cls -> deque of queued entries
+        self._keys = {}         # (ev_cls, key) -> entry
+        self._not_empty = hub.Event()
+        self._not_full = hub.Event()
+        self._not_full.set()
+
+    def qsize(self):
+        return self._size
+
+    def empty(self):
+        return self._size == 0
+
+    def full(self):
+        return self._size >= self.maxsize
+
+    def _policy(self, ev_cls):
+        return self.policies.get(ev_cls, DEFAULT_POLICY)
+
+    def _append(self, ev, state, policy):
+        ev_cls = ev.__class__
+        entry = [ev, state, True, time.time() if self.timestamp else None]
+        prio_queue = self._prio_queues.get(policy.priority)
+        if prio_queue is None:
+            prio_queue = self._prio_queues[policy.priority] = \
+                collections.deque()
+            self._priorities = sorted(self._prio_queues, reverse=True)
+        prio_queue.append(entry)
+        self._cls_queues.setdefault(ev_cls, collections.deque()).append(entry)
+        if policy.overload == COALESCE:
+            self._keys[(ev_cls, policy.key(ev))] = entry
+
+        self._size += 1
+        self.stats.enqueued[ev_cls.__name__] += 1
+        if self._size > self.stats.high_water:
+            self.stats.high_water = self._size
+        if self._size >= self.maxsize:
+            self._not_full.clear()
+        self._not_empty.set()
+
+    def _unlink(self, entry, policy):
+        ev_cls = entry[0].__class__
+        entry[2] = False
+        self._size -= 1
+        if policy.overload == COALESCE:
+            key = (ev_cls, policy.key(entry[0]))
+            if self._keys.get(key) is entry:
+                del self._keys[key]
+        if self._size < self.maxsize:
+            self._not_full.set()
+        if self._size == 0:
+            self._not_empty.clear()
+
+    def put(self, item):
+        """
+        Queue item, an (event, state) pair, according to the policy of
+        the event class.  Returns False if an event is dropped.
+        """
+        ev, state = item
+        ev_cls = ev.__class__
+        policy = self._policy(ev_cls)
+        name = ev_cls.__name__
+
+        if policy.overload == COALESCE:
+            entry = self._keys.get((ev_cls, policy.key(ev)))
+            if entry is not None and self._size >= self.maxsize:
+                entry[0] = ev
+                entry[1] = state
+                self.stats.coalesced[name] += 1
+                return True
+
+        if self._size < self.maxsize:
+            self._append(ev, state, policy)
+            return True
+
+        if policy.overload == DROP_NEWEST:
+            self.stats.dropped[name] += 1
+            return False
+
+        if policy.overload == DROP_OLDEST:
+            cls_queue = self._cls_queues.get(ev_cls)
+            self.stats.dropped[name] += 1
+            if not cls_queue:
+                return False
+            self._unlink(cls_queue.popleft(), policy)
+            self._dropped += 1
+            if self._dropped > self.maxsize:
+                self._compact()
+            self._append(ev, state, policy)
+            return False
+
+        # BLOCK or COALESCE without the same key
+        self.stats.blocked[name] += 1
+        while self._size >= self.maxsize:
+            self._not_full.wait()
+        self._append(ev, state, policy)
+        return True
+
+    def _compact(self):
+        for priority, prio_queue in self._prio_queues.items():
+            self._prio_queues[priority] = collections.deque(
+                entry for entry in prio_queue if entry[2])
+        self._dropped = 0
+
+    def get(self):
+        """
+        Remove and return the (event, state) pair of the highest priority.
+        Blocks while the queue is empty.
+        """
+        while self._size == 0:
+            self._not_empty.wait()
+
+        for priority in self._priorities:
+            prio_queue = self._prio_queues[priority]
+            while prio_queue:
+                entry = prio_queue.popleft()
+                if not entry[2]:
+                    self._dropped -= 1
+                    continue
+                ev_cls = entry[0].__class__
+                self._cls_queues[ev_cls].popleft()
+                self._unlink(entry, self._policy(ev_cls))
+                self.last_put_time = entry[3]
+                return entry[0], entry[1]
+        assert False, 'queue size mismatch'
@@ -0,0 +1,206 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Event handler profiler
+
+When enabled with --event-profile, the following are recorded.
+
+============= ===========================================================
+Statistics    Description
+============= ===========================================================
+handler       Latency of each event handler per application and event
+              class.  Handlers called directly by the datapath receive
+              loop are recorded as well.
+queue_wait    Time which events of a class waited in the event queue of
+              an application.
+hub_block     How late a greenthread sleeping for a fixed interval is
+              woken up, i.e. how long the other greenthreads held the
+              eventlet hub without yielding.
+============= ===========================================================
+
+Latencies are kept in histograms with buckets of powers of two
+microseconds.  The statistics are available through get_stats(), the
+REST API of ryu.app.rest_profiler, and the log, which is dumped every
+--event-profile-interval seconds.
+"""
+
+import json
+import logging
+import time
+
+from ryu import cfg
+from ryu.lib import hub
+
+
+LOG = logging.getLogger('ryu.base.profiler')
+
+CONF = cfg.CONF
+CONF.register_cli_opts([
+    cfg.BoolOpt('event-profile', default=False,
+                help='record latencies of event handlers'),
+    cfg.IntOpt('event-profile-interval', default=60,
+               help='interval in seconds to dump the event profile to '
+                    'the log (0 to disable)')
+])
+
+_HUB_BLOCK_INTERVAL = 0.1
+_NUM_BUCKETS = 28   # up to 2 ** 27 usec, i.e. about 134 sec
+
+_enabled = False
+
+
+class Histogram(object):
+    """
+    A histogram of latencies.
+    The bucket i counts latencies less than 2 ** i microseconds.
+    """
+
+    def __init__(self):
+        super(Histogram, self).__init__()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * _NUM_BUCKETS
+
+    def add(self, latency):
+        self.count += 1
+        self.total += latency
+        if latency > self.max:
+            self.max = latency
+        i = int(latency * 1000000).bit_length()
+        if i >= _NUM_BUCKETS:
+            i = _NUM_BUCKETS - 1
+        self.buckets[i] += 1
+
+    def to_dict(self):
+        """
+        Returns a dict of count, total and max in seconds, and buckets,
+        a list of [upper bound in usec, count] of non-empty buckets.
+        """
+        return {'count': self.count,
+                'total': self.total,
+                'max': self.max,
+                'buckets': [[1 << i, n] for i, n in enumerate(self.buckets)
+                            if n]}
+
+
+class _EventStats(object):
+    def __init__(self):
+        super(_EventStats, self).__init__()
+        self.queue_wait = Histogram()
+        self.handlers = {}  # handler -> Histogram
+
+    def to_dict(self):
+        return {'queue_wait': self.queue_wait.to_dict(),
+                'handlers': dict((handler.__name__, h.to_dict()) for
+                                 handler, h in self.handlers.iteritems())}
+
+
+_events = {}    # (app name, event class) -> _EventStats
+_hub_block = Histogram()
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable():
+    """
+    Enable the profiler.  Must be called before applications are
+    instantiated to record queue_wait.
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    """
+    Clear all statistics.
+    """
+    global _hub_block
+    _events.clear()
+    _hub_block = Histogram()
+
+
+def call_handlers(app_name, ev, handlers, put_time=None):
+    """
+    Call handlers with ev, recording their latencies.
+    put_time is the time when ev was queued, if any.
+    """
+    key = (app_name, ev.__class__)
+    try:
+        stats = _events[key]
+    except KeyError:
+        stats = _events[key] = _EventStats()
+    now = time.time()
+    if put_time:
+        stats.queue_wait.add(now - put_time)
+    for handler in handlers:
+        handler(ev)
+        end = time.time()
+        try:
+            stats.handlers[handler].add(end - now)
+        except KeyError:
+            stats.handlers[handler] = Histogram()
+            stats.handlers[handler].add(end - now)
+        now = end
+
+
+def get_stats():
+    """
+    Returns the statistics as a dict::
+
+        {'apps': {app name: {event class name: {'queue_wait': histogram,
+                                                'handlers': {handler name:
+                                                             histogram}}}},
+         'hub_block': histogram}
+
+    A histogram is a dict described in Histogram.to_dict.
+    """
+    apps = {}
+    for (app_name, ev_cls), stats in _events.items():
+        apps.setdefault(app_name, {})[ev_cls.__name__] = stats.to_dict()
+    return {'apps': apps, 'hub_block': _hub_block.to_dict()}
+
+
+def dump_log():
+    LOG.info('event profile: %s', json.dumps(get_stats(), sort_keys=True))
+
+
+def monitor_loop(interval=None):
+    """
+    Measure hub_block and dump the statistics to the log every interval
+    seconds.  The default interval is --event-profile-interval.
+    Run this in a greenthread.
+    """
+    if interval is None:
+        interval = CONF.event_profile_interval
+    last_dump = time.time()
+    while True:
+        start = time.time()
+        hub.sleep(_HUB_BLOCK_INTERVAL)
+        now = time.time()
+        if not _enabled:
+            continue
+        _hub_block.add(max(now - start - _HUB_BLOCK_INTERVAL, 0))
+        if interval and now - last_dump >= interval:
+            dump_log()
+            last_dump = now
@@ -0,0 +1,225 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Multi-process sharding of ryu-manager
+
+With --workers N, ryu-manager forks N worker processes.  Every worker
+runs the same applications and listens on the same OpenFlow port with
+SO_REUSEPORT, so the kernel distributes datapath connections among
+the workers and each worker owns a subset of datapaths.
+
+The state of an application is per-datapath by default, i.e. a worker
+only sees the events of its own datapaths.  Events which carry global
+state should be listed in RyuApp._GLOBAL_EVENTS of the application
+which generates them.  Such events are delivered to the local observers
+as usual and also forwarded to the observers in the other workers over
+unix domain datagram sockets.  They must be picklable.
+
+Worker 0 is the process which ran ryu-manager.  Only it runs the WSGI
+server.
+"""
+
+import cPickle as pickle
+import logging
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+
+from ryu import cfg
+from ryu.lib import hub
+
+
+LOG = logging.getLogger('ryu.base.sharding')
+
+CONF = cfg.CONF
+CONF.register_cli_opts([
+    cfg.IntOpt('workers', default=1,
+               help='number of worker processes which share datapaths')
+])
+
+_MAX_DGRAM_SIZE = 0x10000
+_SNDBUF_SIZE = 4 * 1024 * 1024
+
+_worker = None
+_children = []
+_tmpdir = None
+
+
+def _open_socket(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _SNDBUF_SIZE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _SNDBUF_SIZE)
+    except socket.error:
+        pass
+    sock.bind(path)
+    return sock
+
+
+class Worker(object):
+    """
+    An endpoint of the event forwarding among worker processes.
+
+    ========= ============================================================
+    Argument  Description
+    ========= ============================================================
+    index     The index of this worker
+    paths     The list of the socket paths of all workers
+    sock      (Optional) The socket bound to paths[index]
+    ========= ============================================================
+    """
+
+    def __init__(self, index, paths, sock=None):
+        super(Worker, self).__init__()
+        self.index = index
+        self.paths = paths
+        if sock is None:
+            sock = _open_socket(paths[index])
+        self.sock = sock
+        self.is_active = True
+
+    def forward(self, src, ev, state):
+        """
+        Forward the event generated by the application named src to the
+        other workers.
+        """
+        try:
+            data = pickle.dumps((src, ev, state), pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError), e:
+            LOG.error('can not forward %s: %s', ev.__class__.__name__, e)
+            return
+        if len(data) > _MAX_DGRAM_SIZE:
+            LOG.error('can not forward %s: too large %d bytes',
+                      ev.__class__.__name__, len(data))
+            return
+        for i, path in enumerate(self.paths):
+            if i == self.index:
+                continue
+            try:
+                self.sock.sendto(data, path)
+            except socket.error, e:
+                LOG.error('failed to forward %s to worker %d: %s',
+                          ev.__class__.__name__, i, e)
+
+    def deliver(self, data):
+        """
+        Deliver the forwarded event to the local observers.
+        """
+        # To suppress cyclic import
+        from ryu.base import app_manager
+
+        src, ev, state = pickle.loads(data)
+        brick = app_manager.lookup_service_brick(src)
+        if brick is None:
+            LOG.debug('EVENT LOST from worker %s %s', src,
+                      ev.__class__.__name__)
+            return
+        # don't use send_event_to_observers() not to forward it again.
+        for observer in brick.get_observers(ev, state):
+            brick.send_event(observer, ev, state)
+
+    def recv_loop(self):
+        while self.is_active:
+            try:
+                data = self.sock.recv(_MAX_DGRAM_SIZE)
+            except socket.error:
+                break
+            try:
+                self.deliver(data)
+            except Exception:
+                LOG.exception('failed to deliver forwarded event')
+
+    def close(self):
+        self.is_active = False
+        self.sock.close()
+
+
+def get_worker():
+    """
+    Returns the Worker of this process, or None if not sharded.
+    """
+    return _worker
+
+
+def forward_event(src, ev, state):
+    if _worker is not None:
+        _worker.forward(src, ev, state)
+
+
+def _sigterm(signum, frame):
+    raise SystemExit(1)
+
+
+def start_workers(n):
+    """
+    Fork n - 1 worker processes.  Returns the Worker of this process.
+    Must be called before any socket is opened.
+
+    Raises RuntimeError if n > 1 and SO_REUSEPORT, which the workers
+    share the OpenFlow port with, isn't supported on this platform.
+    """
+    global _worker
+    global _tmpdir
+
+    assert _worker is None
+    if n > 1 and getattr(hub, 'SO_REUSEPORT', None) is None:
+        raise RuntimeError('%d workers need SO_REUSEPORT, which is not '
+                           'supported on %s' % (n, sys.platform))
+    _tmpdir = tempfile.mkdtemp(prefix='ryu-workers-')
+    paths = [os.path.join(_tmpdir, str(i)) for i in range(n)]
+    # bind all sockets before fork so that no event is lost while
+    # the workers are starting.
+    socks = [_open_socket(path) for path in paths]
+    index = 0
+    for i in range(1, n):
+        pid = os.fork()
+        if pid == 0:
+            del _children[:]
+            index = i
+            break
+        _children.append(pid)
+
+    if index == 0 and _children:
+        # make sure that stop_workers() runs and kills the children.
+        signal.signal(signal.SIGTERM, _sigterm)
+
+    for i, sock in enumerate(socks):
+        if i != index:
+            sock.close()
+    _worker = Worker(index, paths, socks[index])
+    LOG.info('worker %d/%d started pid %d', index, n, os.getpid())
+    return _worker
+
+
+def stop_workers():
+    global _worker
+
+    if _worker is None:
+        return
+    _worker.close()
+    if _worker.index == 0:
+        for pid in _children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+        del _children[:]
+        shutil.rmtree(_tmpdir, ignore_errors=True)
+    _worker = None
@@ -39,6 +39,8 @@ from ryu import flags
 from ryu import version
 from ryu.app import wsgi
 from ryu.base.app_manager import AppManager
+from ryu.base import profiler
+from ryu.base import sharding
 from ryu.controller import controller
 from ryu.topology import switches
 
@@ -63,26 +65,40 @@ def main(args=None, prog=None):
 
     log.init_log()
 
+    if CONF.workers > 1:
+        worker = sharding.start_workers(CONF.workers)
+    else:
+        worker = None
+
     app_lists = CONF.app_lists + CONF.app
     # keep old behaivor, run ofp if no application is specified.
     if not app_lists:
         app_lists = ['ryu.controller.ofp_handler']
 
+    services = []
+    if CONF.event_profile:
+        profiler.enable()
+        services.append(hub.spawn(profiler.monitor_loop))
+
     app_mgr = AppManager.get_instance()
     app_mgr.load_apps(app_lists)
     contexts = app_mgr.create_contexts()
-    services = []
     services.extend(app_mgr.instantiate_apps(**contexts))
 
-    webapp = wsgi.start_service(app_mgr)
-    if webapp:
-        thr = hub.spawn(webapp)
-        services.append(thr)
+    if worker is not None:
+        services.append(hub.spawn(worker.recv_loop))
+
+    if worker is None or worker.index == 0:
+        webapp = wsgi.start_service(app_mgr)
+        if webapp:
+            thr = hub.spawn(webapp)
+            services.append(thr)
 
     try:
         hub.joinall(services)
     finally:
         app_mgr.close()
+        sharding.stop_workers()
 
 
 if __name__ == "__main__":
@@ -22,9 +22,12 @@ from ryu.lib.hub import StreamServer
 import traceback
 import random
 import ssl
+import time
 from socket import IPPROTO_TCP, TCP_NODELAY
 
 import ryu.base.app_manager
+from ryu.base import profiler
+from ryu.base import sharding
 
 from ryu.ofproto import ofproto_common
 from ryu.ofproto import ofproto_parser
@@ -48,13 +51,26 @@ CONF.register_cli_opts([
                help='openflow ssl listen port'),
     cfg.StrOpt('ctl-privkey', default=None, help='controller private key'),
     cfg.StrOpt('ctl-cert', default=None, help='controller certificate'),
-    cfg.StrOpt('ca-certs', default=None, help='CA certificates')
+    cfg.StrOpt('ca-certs', default=None, help='CA certificates'),
+    cfg.IntOpt('ofp-send-high-water', default=256 * 1024,
+               help='the number of bytes queued for a datapath '
+                    'above which senders are blocked'),
+    cfg.BoolOpt('ofp-lazy-parse', default=False,
+                help='decode match and body of received messages '
+                     'on the first access')
 ])
 
+# The size of the per-datapath receive buffer.  It must be larger than
+# the maximum OpenFlow message length, 0xffff, so that moving a partial
+# message to its front always makes room.  The margin lets a few of the
+# usual small messages follow a partial maximum-size one.
+_RECV_BUF_SIZE = 0x10000 + 0x1000
+
 
 class OpenFlowController(object):
     def __init__(self):
         super(OpenFlowController, self).__init__()
+        ofproto_parser.set_lazy_parse(CONF.ofp_lazy_parse)
 
     # entry point
     def __call__(self):
@@ -62,6 +78,8 @@ class OpenFlowController(object):
         self.server_loop()
 
     def server_loop(self):
+        # with multiple workers, every worker listens on the same port.
+        reuse_port = sharding.get_worker() is not None
         if CONF.ctl_privkey is not None and CONF.ctl_cert is not None:
             if CONF.ca_certs is not None:
                 server = StreamServer((CONF.ofp_listen_host,
@@ -71,23 +89,56 @@ class OpenFlowController(object):
                                       certfile=CONF.ctl_cert,
                                       cert_reqs=ssl.CERT_REQUIRED,
                                       ca_certs=CONF.ca_certs,
-                                      ssl_version=ssl.PROTOCOL_TLSv1)
+                                      ssl_version=ssl.PROTOCOL_TLSv1,
+                                      reuse_port=reuse_port)
             else:
                 server = StreamServer((CONF.ofp_listen_host,
                                        CONF.ofp_ssl_listen_port),
                                       datapath_connection_factory,
                                       keyfile=CONF.ctl_privkey,
                                       certfile=CONF.ctl_cert,
-                                      ssl_version=ssl.PROTOCOL_TLSv1)
+                                      ssl_version=ssl.PROTOCOL_TLSv1,
+                                      reuse_port=reuse_port)
         else:
             server = StreamServer((CONF.ofp_listen_host,
                                    CONF.ofp_tcp_listen_port),
-                                  datapath_connection_factory)
+                                  datapath_connection_factory,
+                                  reuse_port=reuse_port)
 
         #LOG.debug('loop')
         server.serve_forever()
 
 
+class SendQueueStats(object):
+    """
+    Counters of the send queue of a datapath.
+
+    ================ =================================================
+    Attribute        Description
+    ================ =================================================
+    queued_msgs      The number of messages currently queued
+    queued_bytes     The number of bytes currently queued
+    max_queued_bytes The maximum of queued_bytes so far
+    flushes          The number of writes to the socket
+    flushed_msgs     The number of messages written to the socket
+    flushed_bytes    The number of bytes written to the socket
+    stalls           The number of sends blocked by the high-water mark
+    stall_time       The total time in seconds senders were blocked
+    ================ =================================================
+    """
+
+    def __init__(self):
+        super(SendQueueStats, self).__init__()
+        self.queued_msgs = 0
+        self.queued_bytes = 0
+        self.max_queued_bytes = 0
+        self.flushes = 0
+        self.flushed_msgs = 0
+        self.flushed_bytes = 0
+        self.stalls = 0
+        self.stall_time = 0.0
+
+
 def _deactivate(method):
     def deactivate(self):
         try:
@@ -106,9 +157,14 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         self.address = address
         self.is_active = True
 
-        # The limit is arbitrary. We need to limit queue size to
-        # prevent it from eating memory up
-        self.send_q = hub.Queue(16)
+        # Serialized messages waiting for _send_loop.  The queue is
+        # limited by the number of bytes to prevent it from eating
+        # memory up.  None after _send_loop exited.
+        self.send_bufs = []
+        self.send_high_water = CONF.ofp_send_high_water
+        self.send_stats = SendQueueStats()
+        self._send_ready = hub.Event()
+        self._send_room = hub.Event()
 
         self.xid = random.randint(0, self.ofproto.MAX_XID)
         self.id = None  # datapath_id is unknown yet
@@ -129,38 +185,56 @@ class Datapath(ofproto_protocol.ProtocolDesc):
     # Low level socket handling layer
     @_deactivate
     def _recv_loop(self):
-        buf = bytearray()
-        required_len = ofproto_common.OFP_HEADER_SIZE
+        buf = bytearray(_RECV_BUF_SIZE)
+        view = memoryview(buf)
+        # buf[head:tail] holds the received bytes which are not parsed yet.
+        head = 0
+        tail = 0
 
         count = 0
         while self.is_active:
-            ret = self.socket.recv(required_len)
-            if len(ret) == 0:
+            if tail == len(buf):
+                # no room left.  move the partial message to the front.
+                # as buf is larger than any OpenFlow message, this always
+                # makes room for more bytes.
+                buf[:tail - head] = buf[head:tail]
+                tail -= head
+                head = 0
+            ret = self.socket.recv_into(view[tail:])
+            if ret == 0:
                 self.is_active = False
                 break
-            buf += ret
-            while len(buf) >= required_len:
-                (version, msg_type, msg_len, xid) = ofproto_parser.header(buf)
-                required_len = msg_len
-                if len(buf) < required_len:
+            tail += ret
+            while tail - head >= ofproto_common.OFP_HEADER_SIZE:
+                (version, msg_type, msg_len, xid) = ofproto_parser.header(
+                    buf, head)
+                if msg_len < ofproto_common.OFP_HEADER_SIZE:
+                    LOG.error('malformed message length %d from %s',
+                              msg_len, self.address)
+                    self.is_active = False
+                    return
+                if tail - head < msg_len:
                     break
 
+                # hand the parser its own copy of exactly this message
+                # as buf is overwritten by the following recv.
                 msg = ofproto_parser.msg(self,
-                                         version, msg_type, msg_len, xid, buf)
+                                         version, msg_type, msg_len, xid,
+                                         buf[head:head + msg_len])
                 #LOG.debug('queue msg %s cls %s', msg, msg.__class__)
                 if msg:
                     ev = ofp_event.ofp_msg_to_ev(msg)
                     self.ofp_brick.send_event_to_observers(ev, self.state)
 
-                    dispatchers = lambda x: x.callers[ev.__class__].dispatchers
-                    handlers = [handler for handler in
-                                self.ofp_brick.get_handlers(ev) if
-                                self.state in dispatchers(handler)]
-                    for handler in handlers:
-                        handler(ev)
+                    handlers = self.ofp_brick.get_handlers(ev, self.state)
+                    if profiler.is_enabled():
+                        profiler.call_handlers(self.ofp_brick.name, ev,
+                                               handlers)
+                    else:
+                        for handler in handlers:
+                            handler(ev)
 
-                buf = buf[required_len:]
-                required_len = ofproto_common.OFP_HEADER_SIZE
+                head += msg_len
 
                 # We need to schedule other greenlets. Otherwise, ryu
                 # can't accept new switches or handle the existing
@@ -171,34 +245,75 @@ class Datapath(ofproto_protocol.ProtocolDesc):
                     count = 0
                     hub.sleep(0)
 
+            if head == tail:
+                head = 0
+                tail = 0
+
     @_deactivate
     def _send_loop(self):
+        stats = self.send_stats
         try:
             while self.is_active:
-                buf = self.send_q.get()
+                self._send_ready.wait()
+                self._send_ready.clear()
+                bufs = self.send_bufs
+                if not bufs:
+                    continue
+                self.send_bufs = []
+                stats.queued_msgs = 0
+                stats.queued_bytes = 0
+                self._send_room.set()
+
+                # write every pending message at once
+                if len(bufs) == 1:
+                    buf = bufs[0]
+                else:
+                    buf = bytearray()
+                    for b in bufs:
+                        buf += b
                 self.socket.sendall(buf)
+                stats.flushes += 1
+                stats.flushed_msgs += len(bufs)
+                stats.flushed_bytes += len(buf)
         finally:
-            q = self.send_q
-            # first, clear self.send_q to prevent new references.
-            self.send_q = None
-            # there might be threads currently blocking in send_q.put().
-            # unblock them by draining the queue.
-            try:
-                while q.get(block=False):
-                    pass
-            except hub.QueueEmpty:
-                pass
+            # prevent new messages from being queued and
+            # unblock the threads currently waiting for room.
+            self.send_bufs = None
+            self._send_room.set()
 
     def send(self, buf):
-        if self.send_q:
-            self.send_q.put(buf)
-
-    def set_xid(self, msg):
+        stats = self.send_stats
+        if (self.send_bufs is not None and
+                stats.queued_bytes >= self.send_high_water):
+            start = time.time()
+            while (self.send_bufs is not None and
+                   stats.queued_bytes >= self.send_high_water):
+                self._send_room.clear()
+                self._send_room.wait()
+            stats.stalls += 1
+            stats.stall_time += time.time() - start
+        if self.send_bufs is None:
+            return
+        self.send_bufs.append(buf)
+        stats.queued_msgs += 1
+        stats.queued_bytes += len(buf)
+        stats.max_queued_bytes = max(stats.max_queued_bytes,
+                                     stats.queued_bytes)
+        self._send_ready.set()
+
+    def next_xid(self):
+        """
+        Allocates a new xid for a message to send and returns it.
+        """
         self.xid += 1
         self.xid &= self.ofproto.MAX_XID
-        msg.set_xid(self.xid)
         return self.xid
 
+    def set_xid(self, msg):
+        xid = self.next_xid()
+        msg.set_xid(xid)
+        return xid
+
     def send_msg(self, msg):
         assert isinstance(msg, self.ofproto_parser.MsgBase)
         if msg.xid is None:
@@ -0,0 +1,572 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+In-controller mirror of the flow tables of datapaths.
+
+FlowMirror keeps a copy of the flow table of each datapath, built from
+the FlowMods the applications send through it, the FlowRemoved messages
+and reconciliation against the flow stats of the datapath.  The flow
+entries are indexed by table_id, cookie, priority and match fields, so
+reading them needs no round trip to the datapath.
+
+The mirror applies FlowMods approximately: a non-strict FlowMod affects
+the entries having all of its match fields with the same values, and
+the failures of FlowMods are not tracked.  Reconciliation corrects such
+drifts.  The counters of the entries are the ones of the last
+reconciliation.
+
+Example::
+
+    class App(app_manager.RyuApp):
+        _CONTEXTS = {'flow_mirror': flow_mirror.FlowMirror}
+
+        def __init__(self, *args, **kwargs):
+            super(App, self).__init__(*args, **kwargs)
+            self.mirror = kwargs['flow_mirror']
+            self.mirror.start_reconciliation(60)
+
+        def install(self, dp, mod):
+            self.mirror.send_flow_mod(dp, mod)
+
+        def rules(self, dp):
+            return self.mirror.get_flows(dp.id, table_id=0,
+                                         match={'in_port': 1})
+"""
+
+import logging
+
+from ryu.controller import handler
+from ryu.controller import ofp_event
+from ryu.controller import stats_collector
+from ryu.controller.handler import set_ev_cls
+from ryu.lib import addrconv
+from ryu.lib.dpid import dpid_to_str
+from ryu.ofproto import ofproto_v1_0
+
+
+LOG = logging.getLogger('ryu.controller.flow_mirror')
+
+# the match fields of OpenFlow 1.0 and the wildcard bits of them
+_OF10_FIELDS = [
+    ('in_port', ofproto_v1_0.OFPFW_IN_PORT),
+    ('dl_vlan', ofproto_v1_0.OFPFW_DL_VLAN),
+    ('dl_src', ofproto_v1_0.OFPFW_DL_SRC),
+    ('dl_dst', ofproto_v1_0.OFPFW_DL_DST),
+    ('dl_type', ofproto_v1_0.OFPFW_DL_TYPE),
+    ('nw_proto', ofproto_v1_0.OFPFW_NW_PROTO),
+    ('tp_src', ofproto_v1_0.OFPFW_TP_SRC),
+    ('tp_dst', ofproto_v1_0.OFPFW_TP_DST),
+    ('dl_vlan_pcp', ofproto_v1_0.OFPFW_DL_VLAN_PCP),
+    ('nw_tos', ofproto_v1_0.OFPFW_NW_TOS),
+]
+
+_OF10_NW_ADDRS = [
+    ('nw_src', ofproto_v1_0.OFPFW_NW_SRC_MASK,
+     ofproto_v1_0.OFPFW_NW_SRC_SHIFT),
+    ('nw_dst', ofproto_v1_0.OFPFW_NW_DST_MASK,
+     ofproto_v1_0.OFPFW_NW_DST_SHIFT),
+]
+
+
+def _of10_match_fields(match):
+    fields = {}
+    for name, bit in _OF10_FIELDS:
+        if not match.wildcards & bit:
+            value = getattr(match, name)
+            if name in ('dl_src', 'dl_dst'):
+                value = addrconv.mac.bin_to_text(value)
+            fields[name] = value
+    for name, mask, shift in _OF10_NW_ADDRS:
+        prefix = 32 - ((match.wildcards & mask) >> shift)
+        if prefix > 0:
+            addr = getattr(match, name) & (0xffffffff << (32 - prefix))
+            fields[name] = (addr, prefix)
+    return fields
+
+
+def match_fields(match):
+    """
+    Returns the fields of the OFPMatch *match* of any OpenFlow version
+    as a dict.  The wildcarded fields are omitted.
+    """
+    if not hasattr(match, '_fields2'):
+        return _of10_match_fields(match)
+    if match._composed_with_old_api():
+        # serialize and parse to fill OFPMatch._fields2
+        buf = bytearray()
+        match.serialize(buf, 0)
+        match = match.parser(str(buf), 0)
+    return dict(match._fields2)
+
+
+def _serialize_list(objs):
+    # a canonical form of the actions or the instructions
+    buf = bytearray()
+    for obj in objs or []:
+        obj.serialize(buf, len(buf))
+    return str(buf)
+
+
+class FlowEntry(object):
+    """
+    A flow entry in the mirror.
+
+    ============= ======================================================
+    Attribute     Description
+    ============= ======================================================
+    table_id      Table ID (always 0 for OpenFlow 1.0)
+    priority      Priority
+    match         The match fields as a dict
+    cookie        Cookie
+    idle_timeout  Idle timeout
+    hard_timeout  Hard timeout
+    flags         Flags
+    actions       The list of the actions for OpenFlow 1.0, otherwise
+                  the list of the instructions
+    packet_count  Packet counter of the last reconciliation, or None
+    byte_count    Byte counter of the last reconciliation, or None
+    ============= ======================================================
+    """
+
+    def __init__(self, table_id, priority, match, cookie=0,
+                 idle_timeout=0, hard_timeout=0, flags=0, actions=None,
+                 packet_count=None, byte_count=None):
+        super(FlowEntry, self).__init__()
+        self.table_id = table_id
+        self.priority = priority
+        self.match = match
+        self.cookie = cookie
+        self.idle_timeout = idle_timeout
+        self.hard_timeout = hard_timeout
+        self.flags = flags
+        self.actions = actions or []
+        self.packet_count = packet_count
+        self.byte_count = byte_count
+        self.key = (table_id, priority, tuple(sorted(match.items())))
+        self._actions_key = None
+
+    @property
+    def actions_key(self):
+        if self._actions_key is None:
+            self._actions_key = _serialize_list(self.actions)
+        return self._actions_key
+
+    def same_as(self, other):
+        """
+        Returns True if the entry has the same key, cookie and actions
+        as *other*.
+        """
+        return (self.key == other.key and self.cookie == other.cookie and
+                self.actions_key == other.actions_key)
+
+    def __repr__(self):
+        return 'FlowEntry<table_id=%d priority=%d match=%s cookie=%d>' % (
+            self.table_id, self.priority, self.match, self.cookie)
+
+
+class FlowDiff(object):
+    """
+    The difference between the mirror and the flow table of a datapath.
+
+    ========== =========================================================
+    Attribute  Description
+    ========== =========================================================
+    added      The entries the datapath has but the mirror doesn't
+    removed    The entries the mirror has but the datapath doesn't
+    modified   The list of (mirror, datapath) pairs of the entries with
+               the same table_id, priority and match but different
+               cookie or actions
+    ========== =========================================================
+    """
+
+    def __init__(self, added, removed, modified):
+        super(FlowDiff, self).__init__()
+        self.added = added
+        self.removed = removed
+        self.modified = modified
+
+    def __nonzero__(self):
+        return bool(self.added or self.removed or self.modified)
+
+    def __repr__(self):
+        return 'FlowDiff<added=%d removed=%d modified=%d>' % (
+            len(self.added), len(self.removed), len(self.modified))
+
+
+class FlowTable(object):
+    """
+    The mirror of the flow table of a datapath.
+    """
+
+    def __init__(self, ofproto, ofproto_parser):
+        super(FlowTable, self).__init__()
+        self.ofproto = ofproto
+        self.ofproto_parser = ofproto_parser
+        self.is_of10 = ofproto.OFP_VERSION == ofproto_v1_0.OFP_VERSION
+        self.synced = False
+        self.entries = {}       # key -> FlowEntry
+        self.by_table = {}      # table_id -> set of keys
+        self.by_cookie = {}     # cookie -> set of keys
+        self.by_priority = {}   # priority -> set of keys
+        self.by_field = {}      # (name, value) -> set of keys
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _indexes(self, entry):
+        yield self.by_table, entry.table_id
+        yield self.by_cookie, entry.cookie
+        yield self.by_priority, entry.priority
+        for item in entry.match.items():
+            yield self.by_field, item
+
+    def add(self, entry):
+        self.remove(entry.key)
+        self.entries[entry.key] = entry
+        for index, value in self._indexes(entry):
+            index.setdefault(value, set()).add(entry.key)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        for index, value in self._indexes(entry):
+            keys = index[value]
+            keys.discard(key)
+            if not keys:
+                del index[value]
+        return entry
+
+    def clear(self):
+        self.entries.clear()
+        self.by_table.clear()
+        self.by_cookie.clear()
+        self.by_priority.clear()
+        self.by_field.clear()
+
+    def to_fields(self, match):
+        if match is None:
+            return {}
+        if isinstance(match, dict):
+            if self.is_of10:
+                match = self.ofproto_parser.OFPMatch(**match)
+                return _of10_match_fields(match)
+            match = self.ofproto_parser.OFPMatch(**match)
+        return match_fields(match)
+
+    def key(self, table_id, priority, match):
+        return (table_id, priority, tuple(sorted(match.items())))
+
+    def find(self, table_id=None, cookie=None, cookie_mask=0,
+             priority=None, match=None, strict=False, out_port=None,
+             out_group=None):
+        """
+        Returns the list of the entries which satisfy all of the given
+        conditions.  *match* is a dict of the match fields.  Unless
+        *strict* is True, an entry matches if it has all of the fields
+        of *match* with the same values.
+        """
+        ofp = self.ofproto
+        match = match or {}
+        if table_id == getattr(ofp, 'OFPTT_ALL', None):
+            table_id = None
+        match_key = tuple(sorted(match.items()))
+
+        if strict and table_id is not None and priority is not None:
+            key = (table_id, priority, match_key)
+            candidates = [key] if key in self.entries else []
+        else:
+            # the smallest of the index sets
+            sets = []
+            if table_id is not None:
+                sets.append(self.by_table.get(table_id, ()))
+            if cookie is not None and cookie_mask == 0xffffffffffffffff:
+                sets.append(self.by_cookie.get(cookie, ()))
+            if priority is not None:
+                sets.append(self.by_priority.get(priority, ()))
+            for item in match_key:
+                sets.append(self.by_field.get(item, ()))
+            if sets:
+                candidates = min(sets, key=len)
+            else:
+                candidates = self.entries.keys()
+
+        entries = []
+        for key in candidates:
+            entry = self.entries[key]
+            if table_id is not None and entry.table_id != table_id:
+                continue
+            if priority is not None and entry.priority != priority:
+                continue
+            if cookie is not None and cookie_mask and \
+                    (entry.cookie ^ cookie) & cookie_mask:
+                continue
+            if strict:
+                if key[2] != match_key:
+                    continue
+            elif any(entry.match.get(name, self) != value
+                     for name, value in match_key):
+                continue
+            if not self._has_output(entry, out_port, out_group):
+                continue
+            entries.append(entry)
+        return sorted(entries, key=lambda e: (e.table_id, -e.priority))
+
+    def _has_output(self, entry, out_port, out_group):
+        ofp = self.ofproto
+        if out_port in (None, getattr(ofp, 'OFPP_ANY', None),
+                        getattr(ofp, 'OFPP_NONE', None)):
+            out_port = None
+        if out_group in (None, getattr(ofp, 'OFPG_ANY', None)):
+            out_group = None
+        if out_port is None and out_group is None:
+            return True
+        actions = []
+        for obj in entry.actions:
+            actions.extend(getattr(obj, 'actions', None) or [obj])
+        for action in actions:
+            if out_port is not None and \
+                    getattr(action, 'port', None) == out_port:
+                return True
+            if out_group is not None and \
+                    getattr(action, 'group_id', None) == out_group:
+                return True
+        return False
+
+    def entry_from_stats(self, stats):
+        if self.is_of10:
+            table_id = 0
+            actions = stats.actions
+            flags = 0
+        else:
+            table_id = stats.table_id
+            actions = stats.instructions
+            flags = getattr(stats, 'flags', 0)
+        return FlowEntry(table_id, stats.priority, match_fields(stats.match),
+                         stats.cookie, stats.idle_timeout,
+                         stats.hard_timeout, flags, actions,
+                         stats.packet_count, stats.byte_count)
+
+    def entry_from_flow_mod(self, mod):
+        if self.is_of10:
+            table_id = 0
+            actions = mod.actions
+        else:
+            table_id = mod.table_id
+            actions = mod.instructions
+        return FlowEntry(table_id, mod.priority, match_fields(mod.match),
+                         mod.cookie, mod.idle_timeout, mod.hard_timeout,
+                         mod.flags, actions)
+
+    def apply_flow_mod(self, mod):
+        ofp = self.ofproto
+        command = mod.command
+        if command == ofp.OFPFC_ADD:
+            self.add(self.entry_from_flow_mod(mod))
+            return
+
+        entry = self.entry_from_flow_mod(mod)
+        strict = command in (ofp.OFPFC_MODIFY_STRICT,
+                             ofp.OFPFC_DELETE_STRICT)
+        cookie_mask = getattr(mod, 'cookie_mask', 0)
+        if command in (ofp.OFPFC_DELETE, ofp.OFPFC_DELETE_STRICT):
+            found = self.find(
+                entry.table_id, mod.cookie, cookie_mask,
+                entry.priority if strict else None, entry.match, strict,
+                mod.out_port, getattr(mod, 'out_group', None))
+            for e in found:
+                self.remove(e.key)
+        elif command in (ofp.OFPFC_MODIFY, ofp.OFPFC_MODIFY_STRICT):
+            found = self.find(entry.table_id, mod.cookie, cookie_mask,
+                              entry.priority if strict else None,
+                              entry.match, strict)
+            for e in found:
+                e.actions = entry.actions
+                e._actions_key = None
+            if not found and self.is_of10:
+                # OpenFlow 1.0 adds the entry if nothing matches
+                self.add(entry)
+
+    def diff(self, stats):
+        """
+        Returns a FlowDiff between the mirror and the flow stats
+        entries *stats* of the datapath.
+        """
+        return self._diff(stats)[0]
+
+    def _diff(self, stats):
+        current = {}
+        for s in stats:
+            entry = self.entry_from_stats(s)
+            current[entry.key] = entry
+        added = []
+        modified = []
+        for key, entry in current.items():
+            mine = self.entries.get(key)
+            if mine is None:
+                added.append(entry)
+            elif not mine.same_as(entry):
+                modified.append((mine, entry))
+        removed = [entry for key, entry in self.entries.items()
+                   if key not in current]
+        return FlowDiff(added, removed, modified), current
+
+    def reconcile(self, stats):
+        """
+        Replaces the entries with the flow stats entries *stats* of the
+        datapath and returns the FlowDiff.
+        """
+        diff, current = self._diff(stats)
+        for entry in diff.removed:
+            self.remove(entry.key)
+        for entry in current.values():
+            self.add(entry)
+        self.synced = True
+        return diff
+
+
+class FlowMirror(stats_collector.StatsCollector):
+    """
+    A service to keep the mirrors of the flow tables of datapaths.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(FlowMirror, self).__init__(*args, **kwargs)
+        self.name = 'flow_mirror'
+        self.tables = {}        # dpid -> FlowTable
+        self._reconciler = None
+
+    def get_table(self, dpid):
+        """
+        Returns the FlowTable of the datapath, or None if it isn't
+        connected.
+        """
+        return self.tables.get(dpid)
+
+    def get_flows(self, dpid, table_id=None, cookie=None, cookie_mask=0,
+                  priority=None, match=None, strict=False):
+        """
+        Returns the list of the FlowEntrys of the datapath which satisfy
+        all of the given conditions without a round trip to it.
+
+        *match* is a dict of the match fields in the form of the
+        keyword arguments of OFPMatch, or an OFPMatch.  Unless *strict*
+        is True, an entry matches if it has all of the fields of
+        *match* with the same values.
+        """
+        table = self.tables.get(dpid)
+        if table is None:
+            return []
+        return table.find(table_id, cookie, cookie_mask, priority,
+                          table.to_fields(match), strict)
+
+    def record_flow_mod(self, dp, mod):
+        """
+        Applies the FlowMod *mod* sent to the datapath *dp* to the
+        mirror.
+        """
+        table = self.tables.get(dp.id)
+        if table is not None:
+            table.apply_flow_mod(mod)
+
+    def send_flow_mod(self, dp, mod):
+        """
+        Sends the FlowMod *mod* to the datapath *dp* and applies it to
+        the mirror.
+        """
+        self.record_flow_mod(dp, mod)
+        dp.send_msg(mod)
+
+    def diff(self, dp, timeout=None):
+        """
+        Fetches the flow stats of the datapath *dp* and returns the
+        FlowDiff between them and the mirror without changing it, or
+        None if the stats can't be fetched.
+        """
+        table = self.tables.get(dp.id)
+        if table is None:
+            return None
+        result = self.request(dp, self._flow_stats_request(dp), timeout)
+        if result.status != stats_collector.STATUS_OK:
+            return None
+        return table.diff(self._flow_stats(result))
+
+    def reconcile(self, dp, timeout=None):
+        """
+        Fetches the flow stats of the datapath *dp*, updates the mirror
+        with them and returns the FlowDiff, or None if the stats can't
+        be fetched.
+        """
+        result = self.request(dp, self._flow_stats_request(dp), timeout)
+        return self._reconcile_result(result)
+
+    def start_reconciliation(self, interval, timeout=None):
+        """
+        Starts reconciling the mirrors of all of the connected
+        datapaths every *interval* seconds.
+        """
+        self.stop_reconciliation()
+        self._reconciler = self.poll(self._flow_stats_request, interval,
+                                     self._reconcile_result, timeout)
+
+    def stop_reconciliation(self):
+        if self._reconciler is not None:
+            self._reconciler.stop()
+            self._reconciler = None
+
+    def _flow_stats_request(self, dp):
+        ofp = dp.ofproto
+        parser = dp.ofproto_parser
+        if ofp.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
+            return parser.OFPFlowStatsRequest(dp, 0, parser.OFPMatch(),
+                                              0xff, ofp.OFPP_NONE)
+        return parser.OFPFlowStatsRequest(dp)
+
+    def _flow_stats(self, result):
+        stats = []
+        for msg in result.msgs:
+            stats.extend(msg.body)
+        return stats
+
+    def _reconcile_result(self, result):
+        table = self.tables.get(result.dpid)
+        if table is None or result.status != stats_collector.STATUS_OK:
+            return None
+        diff = table.reconcile(self._flow_stats(result))
+        if diff:
+            LOG.debug('flow mirror of %s reconciled: %s',
+                      dpid_to_str(result.dpid), diff)
+        return diff
+
+    @set_ev_cls(ofp_event.EventOFPFlowRemoved, handler.MAIN_DISPATCHER)
+    def _flow_removed_handler(self, ev):
+        msg = ev.msg
+        table = self.tables.get(msg.datapath.id)
+        if table is None:
+            return
+        table_id = 0 if table.is_of10 else msg.table_id
+        table.remove(table.key(table_id, msg.priority,
+                               match_fields(msg.match)))
+
+    @set_ev_cls(ofp_event.EventOFPStateChange,
+                [handler.MAIN_DISPATCHER, handler.DEAD_DISPATCHER])
+    def _state_change_handler(self, ev):
+        dp = ev.datapath
+        if ev.state == handler.MAIN_DISPATCHER:
+            self.tables[dp.id] = FlowTable(dp.ofproto, dp.ofproto_parser)
+        elif dp.id is not None and self.dps.get(dp.id) is dp:
+            del self.tables[dp.id]
+        super(FlowMirror, self)._state_change_handler(ev)
@@ -0,0 +1,326 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Concurrent stats collection from many datapaths.
+
+StatsCollector sends stats requests to many datapaths at once instead
+of one after another, keeping up to a number of requests outstanding
+per datapath, and returns the results of all of them with their status
+when they complete or their deadlines pass.  It can also poll the
+datapaths periodically, spreading the requests over the interval.
+
+Example::
+
+    class App(app_manager.RyuApp):
+        _CONTEXTS = {'stats_collector': stats_collector.StatsCollector}
+
+        def __init__(self, *args, **kwargs):
+            super(App, self).__init__(*args, **kwargs)
+            self.collector = kwargs['stats_collector']
+
+        def port_stats(self):
+            def build(dp):
+                return dp.ofproto_parser.OFPPortStatsRequest(
+                    dp, 0, dp.ofproto.OFPP_ANY)
+            results = self.collector.collect(build)
+            for dpid, result in results.items():
+                if result.status != stats_collector.STATUS_OK:
+                    continue
+                for msg in result.msgs:
+                    ...
+"""
+
+import collections
+import logging
+import time
+
+from ryu.base import app_manager
+from ryu.controller import handler
+from ryu.controller import ofp_event
+from ryu.controller.handler import set_ev_cls
+from ryu.lib import hub
+from ryu.lib.dpid import dpid_to_str
+
+
+LOG = logging.getLogger('ryu.controller.stats_collector')
+
+DEFAULT_TIMEOUT = 1.0
+# the number of outstanding requests per datapath
+DEFAULT_MAX_OUTSTANDING = 4
+
+# the status of StatsResult
+STATUS_OK = 'ok'
+STATUS_TIMEOUT = 'timeout'
+STATUS_ERROR = 'error'
+STATUS_DISCONNECTED = 'disconnected'
+
+# OFPSF_REPLY_MORE of OpenFlow 1.0 and 1.2 and OFPMPF_REPLY_MORE of
+# OpenFlow 1.3 and later
+_REPLY_MORE = 1
+
+_REPLY_EVENTS = sorted(
+    [ev_cls for name, ev_cls in ofp_event._OFP_MSG_EVENTS.items()
+     if name.endswith('StatsReply') or name.endswith('MultipartReply')],
+    key=lambda ev_cls: ev_cls.__name__)
+
+
+class StatsResult(object):
+    """
+    The result of a stats request to a datapath.
+
+    ========== =========================================================
+    Attribute  Description
+    ========== =========================================================
+    dpid       Datapath ID
+    status     STATUS_OK, STATUS_TIMEOUT, STATUS_ERROR or
+               STATUS_DISCONNECTED
+    msgs       The list of the parts of the reply which have arrived.
+               Some parts can be missing unless status is STATUS_OK.
+    error      The OFPErrorMsg for the request if status is
+               STATUS_ERROR, otherwise None
+    elapsed    Seconds from the request to the completion
+    ========== =========================================================
+    """
+
+    def __init__(self, dpid, status, msgs, error=None, elapsed=None):
+        super(StatsResult, self).__init__()
+        self.dpid = dpid
+        self.status = status
+        self.msgs = msgs
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return 'StatsResult<dpid=%s status=%s msgs=%d>' % (
+            self.dpid, self.status, len(self.msgs))
+
+
+class _Request(object):
+    def __init__(self, dp, msg, timeout, callback):
+        super(_Request, self).__init__()
+        self.dp = dp
+        self.msg = msg
+        self.callback = callback
+        self.start = time.time()
+        self.deadline = self.start + timeout
+        self.msgs = []
+        self.timer = None
+        self.done = False
+
+
+class _Poller(object):
+    def __init__(self, collector, build, interval, callback, timeout):
+        super(_Poller, self).__init__()
+        self.collector = collector
+        self.build = build
+        self.interval = interval
+        self.callback = callback
+        self.timeout = timeout
+        self.thread = None
+
+    def _loop(self):
+        while True:
+            dps = [dp for _dpid, dp in sorted(self.collector.dps.items())]
+            if not dps:
+                hub.sleep(self.interval)
+                continue
+            # spread the requests over the interval
+            step = float(self.interval) / len(dps)
+            for dp in dps:
+                if dp.id in self.collector.dps:
+                    self.collector.send_request(dp, self.build(dp),
+                                                self.timeout, self.callback)
+                hub.sleep(step)
+
+    def stop(self):
+        """
+        Stops polling.  The results of the outstanding requests are
+        still passed to the callback.
+        """
+        if self.thread is not None:
+            hub.kill(self.thread)
+            self.thread = None
+
+
+class StatsCollector(app_manager.RyuApp):
+    """
+    A service to send stats requests to many datapaths concurrently.
+
+    The results are passed to the callback of send_request() or
+    returned by request() and collect().  Each request completes when
+    the last part of the reply or an error for it arrives, when its
+    deadline passes or when the datapath disconnects.  At most
+    max_outstanding requests are sent to a datapath at once and the
+    others wait in order for them to complete.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(StatsCollector, self).__init__(*args, **kwargs)
+        self.name = 'stats_collector'
+        self.max_outstanding = DEFAULT_MAX_OUTSTANDING
+        self.dps = {}           # dpid -> Datapath
+        self._outstanding = {}  # dpid -> {xid: _Request}
+        self._pending = {}      # dpid -> deque of _Request
+
+    def send_request(self, dp, msg, timeout=None, callback=None):
+        """
+        Sends a stats request *msg* to the datapath *dp* without
+        blocking and calls callback(result) with a StatsResult when it
+        completes.  *timeout* is the deadline in seconds from now,
+        including the time waiting for the other outstanding requests
+        to the datapath.
+        """
+        if timeout is None:
+            timeout = DEFAULT_TIMEOUT
+        req = _Request(dp, msg, timeout, callback)
+        if dp.id not in self.dps:
+            self._complete(req, STATUS_DISCONNECTED)
+            return
+        req.timer = hub.spawn_after(timeout, self._expire, req)
+        outstanding = self._outstanding.setdefault(dp.id, {})
+        if len(outstanding) < self.max_outstanding:
+            self._send(req)
+        else:
+            self._pending.setdefault(dp.id, collections.deque()).append(req)
+
+    def request(self, dp, msg, timeout=None):
+        """
+        Sends a stats request *msg* to the datapath *dp* and returns a
+        StatsResult when it completes.
+        """
+        return self.collect(lambda dp: msg, [dp], timeout)[dp.id]
+
+    def collect(self, build, dps=None, timeout=None):
+        """
+        Sends stats requests to the datapaths *dps* at once and returns
+        a dict of their StatsResults keyed by datapath ID when all of
+        them complete.
+
+        *build* is a function which takes a datapath and returns the
+        stats request for it.  *dps* is a list of datapaths, the default
+        is all of the connected ones.  Each datapath is requested once
+        even if it appears more than once in *dps*.
+        """
+        if dps is None:
+            dps = self.dps.values()
+        # the results are keyed by datapath ID, so a datapath given twice
+        # is requested only once.
+        dps = dict((dp.id, dp) for dp in dps).values()
+        results = {}
+        if not dps:
+            return results
+        done = hub.Event()
+
+        def _callback(result):
+            results[result.dpid] = result
+            if len(results) == len(dps):
+                done.set()
+
+        for dp in dps:
+            self.send_request(dp, build(dp), timeout, _callback)
+        while len(results) < len(dps):
+            done.wait()
+        return results
+
+    def poll(self, build, interval, callback, timeout=None):
+        """
+        Starts polling all of the connected datapaths every *interval*
+        seconds.  The requests are spread over the interval rather than
+        sent at once.  *build* is the same as collect() and callback is
+        called with each StatsResult.
+
+        Returns an object whose stop() method stops polling.
+        """
+        if timeout is None:
+            timeout = min(DEFAULT_TIMEOUT, interval)
+        poller = _Poller(self, build, interval, callback, timeout)
+        poller.thread = hub.spawn(poller._loop)
+        return poller
+
+    def _send(self, req):
+        dp = req.dp
+        dp.set_xid(req.msg)
+        self._outstanding[dp.id][req.msg.xid] = req
+        dp.send_msg(req.msg)
+
+    def _complete(self, req, status, error=None):
+        if req.done:
+            return
+        req.done = True
+        if req.timer is not None:
+            hub.kill(req.timer)
+            req.timer = None
+        dpid = req.dp.id
+        outstanding = self._outstanding.get(dpid, {})
+        if req.msg.xid is not None and outstanding.get(req.msg.xid) is req:
+            del outstanding[req.msg.xid]
+        pending = self._pending.get(dpid)
+        if pending:
+            try:
+                pending.remove(req)
+            except ValueError:
+                pass
+        if (status != STATUS_DISCONNECTED and pending and
+                len(outstanding) < self.max_outstanding):
+            self._send(pending.popleft())
+
+        result = StatsResult(dpid, status, req.msgs, error,
+                             time.time() - req.start)
+        if status != STATUS_OK:
+            LOG.debug('stats request to %s: %s', dpid_to_str(dpid), status)
+        if req.callback is not None:
+            try:
+                req.callback(result)
+            except Exception:
+                LOG.exception('stats collector: callback failed')
+
+    def _expire(self, req):
+        req.timer = None
+        self._complete(req, STATUS_TIMEOUT)
+
+    def _get_request(self, msg):
+        return self._outstanding.get(msg.datapath.id, {}).get(msg.xid)
+
+    @set_ev_cls(_REPLY_EVENTS, handler.MAIN_DISPATCHER)
+    def _stats_reply_handler(self, ev):
+        req = self._get_request(ev.msg)
+        if req is None:
+            return
+        req.msgs.append(ev.msg)
+        if not ev.msg.flags & _REPLY_MORE:
+            self._complete(req, STATUS_OK)
+
+    @set_ev_cls(ofp_event.EventOFPErrorMsg, handler.MAIN_DISPATCHER)
+    def _error_msg_handler(self, ev):
+        req = self._get_request(ev.msg)
+        if req is None:
+            return
+        self._complete(req, STATUS_ERROR, ev.msg)
+
+    @set_ev_cls(ofp_event.EventOFPStateChange,
+                [handler.MAIN_DISPATCHER, handler.DEAD_DISPATCHER])
+    def _state_change_handler(self, ev):
+        dp = ev.datapath
+        if ev.state == handler.MAIN_DISPATCHER:
+            self.dps[dp.id] = dp
+            return
+        if dp.id is None or self.dps.get(dp.id) is not dp:
+            return
+        del self.dps[dp.id]
+        reqs = (self._outstanding.pop(dp.id, {}).values() +
+                list(self._pending.pop(dp.id, [])))
+        for req in reqs:
+            self._complete(req, STATUS_DISCONNECTED)
@@ -14,27 +14,177 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import binascii
+import socket
+
 import netaddr
 
 
+# the number of entries of each generation of the conversion caches
+CACHE_SIZE = 1024
+
+
+class _Cache(object):
+    """
+    A bounded cache which approximates LRU with two generations.
+    A hit in the old generation is promoted to the new one.  When the new
+    generation is full, it becomes the old one and the old one is
+    discarded.
+    """
+
+    def __init__(self, size):
+        super(_Cache, self).__init__()
+        self.size = size
+        self.new = {}
+        self.old = {}
+
+    def get(self, key):
+        value = self.new.get(key)
+        if value is None:
+            value = self.old.get(key)
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        if len(self.new) >= self.size:
+            self.old = self.new
+            self.new = {}
+        self.new[key] = value
+
+    def clear(self):
+        self.new = {}
+        self.old = {}
+
+
 class AddressConverter(object):
-    def __init__(self, addr, strat, **kwargs):
+    def __init__(self, addr, strat, fast_text_to_bin=None,
+                 fast_bin_to_text=None, **kwargs):
         self._addr = addr
         self._strat = strat
         self._addr_kwargs = kwargs
+        # the fast converters handle the common representations and
+        # raise an exception for the others, which are handed to netaddr
+        # so that the results and the errors are the same as netaddr's.
+        self._fast_text_to_bin = fast_text_to_bin
+        self._fast_bin_to_text = fast_bin_to_text
+        self._text_to_bin_cache = _Cache(CACHE_SIZE)
+        self._bin_to_text_cache = _Cache(CACHE_SIZE)
 
-    def text_to_bin(self, text):
+    def _text_to_bin(self, text):
+        if self._fast_text_to_bin is not None:
+            try:
+                return self._fast_text_to_bin(text)
+            except Exception:
+                pass
         return self._addr(text, **self._addr_kwargs).packed
 
-    def bin_to_text(self, bin):
+    def _bin_to_text(self, bin):
+        if self._fast_bin_to_text is not None:
+            try:
+                return self._fast_bin_to_text(bin)
+            except Exception:
+                pass
         return str(self._addr(self._strat.packed_to_int(bin),
                               **self._addr_kwargs))
 
-ipv4 = AddressConverter(netaddr.IPAddress, netaddr.strategy.ipv4, version=4)
-ipv6 = AddressConverter(netaddr.IPAddress, netaddr.strategy.ipv6, version=6)
+    def text_to_bin(self, text):
+        cache = self._text_to_bin_cache
+        try:
+            bin = cache.get(text)
+        except TypeError:
+            # unhashable
+            return self._text_to_bin(text)
+        if bin is None:
+            bin = self._text_to_bin(text)
+            cache.put(text, bin)
+        return bin
+
+    def bin_to_text(self, bin):
+        cache = self._bin_to_text_cache
+        try:
+            text = cache.get(bin)
+        except TypeError:
+            # unhashable, e.g. bytearray
+            return self._bin_to_text(bin)
+        if text is None:
+            text = self._bin_to_text(bin)
+            cache.put(bin, text)
+        return text
+
+    def text_to_bin_list(self, texts):
+        """
+        Convert a sequence of addresses in text to a list of binaries.
+        """
+        text_to_bin = self.text_to_bin
+        return [text_to_bin(text) for text in texts]
+
+    def bin_to_text_list(self, bins):
+        """
+        Convert a sequence of addresses in binary to a list of texts.
+        """
+        bin_to_text = self.bin_to_text
+        return [bin_to_text(bin) for bin in bins]
+
+
+def _check_str(value, length=None):
+    if type(value) is not str:
+        raise TypeError('not str')
+    if length is not None and len(value) != length:
+        raise ValueError('invalid length')
+
+
+# netaddr converts IPv4 text with inet_aton and IPv6 with inet_pton and
+# inet_ntop.  see netaddr.strategy.ipv4 and ipv6.
+def _ipv4_text_to_bin(text):
+    _check_str(text)
+    if '/' in text:
+        raise ValueError('prefix')
+    return socket.inet_aton(text)
+
+
+def _ipv4_bin_to_text(bin):
+    _check_str(bin, 4)
+    return socket.inet_ntoa(bin)
+
+
+def _ipv6_text_to_bin(text):
+    _check_str(text)
+    if '/' in text:
+        raise ValueError('prefix')
+    return socket.inet_pton(socket.AF_INET6, text)
+
+
+def _ipv6_bin_to_text(bin):
+    _check_str(bin, 16)
+    return socket.inet_ntop(socket.AF_INET6, bin)
+
+
+_MAC_TEXT_LEN = 17
+_HEX = ['%02x' % i for i in range(256)]
+
+
+def _mac_text_to_bin(text):
+    # only 'xx:xx:xx:xx:xx:xx'
+    _check_str(text, _MAC_TEXT_LEN)
+    if text[2::3] != ':::::':
+        raise ValueError('not colon separated')
+    return binascii.unhexlify(text.replace(':', ''))
+
+
+def _mac_bin_to_text(bin):
+    _check_str(bin, 6)
+    return ':'.join([_HEX[ord(c)] for c in bin])
+
+
+ipv4 = AddressConverter(netaddr.IPAddress, netaddr.strategy.ipv4,
+                        _ipv4_text_to_bin, _ipv4_bin_to_text, version=4)
+ipv6 = AddressConverter(netaddr.IPAddress, netaddr.strategy.ipv6,
+                        _ipv6_text_to_bin, _ipv6_bin_to_text, version=6)
 
 
 class mac_mydialect(netaddr.mac_unix):
     word_fmt = '%.2x'
-mac = AddressConverter(netaddr.EUI, netaddr.strategy.eui48, version=48,
+mac = AddressConverter(netaddr.EUI, netaddr.strategy.eui48,
+                       _mac_text_to_bin, _mac_bin_to_text, version=48,
                        dialect=mac_mydialect)
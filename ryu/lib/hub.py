@@ -16,6 +16,7 @@
 
 import logging
 import os
+import sys
 
 
 # we don't bother to use cfg.py because monkey patch needs to be
@@ -28,6 +29,7 @@ LOG = logging.getLogger('ryu.lib.hub')
 if HUB_TYPE == 'eventlet':
     import eventlet
     import eventlet.event
+    import eventlet.green.socket
     import eventlet.queue
     import eventlet.timeout
     import eventlet.wsgi
@@ -91,17 +93,39 @@ if HUB_TYPE == 'eventlet':
     Queue = eventlet.queue.Queue
     QueueEmpty = eventlet.queue.Empty
 
+    # SO_REUSEPORT lets multiple processes listen on the same port
+    # and the kernel distributes incoming connections among them.
+    # python2 socket module doesn't define it.  15 is the value on Linux,
+    # it's None on the other platforms where the value isn't known.
+    SO_REUSEPORT = getattr(socket, 'SO_REUSEPORT', None)
+    if SO_REUSEPORT is None and sys.platform.startswith('linux'):
+        SO_REUSEPORT = 15
+
+    def _listen_reuse_port(listen_info, family):
+        if SO_REUSEPORT is None:
+            raise RuntimeError('SO_REUSEPORT is not supported on %s' %
+                               sys.platform)
+        sock = eventlet.green.socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, SO_REUSEPORT, 1)
+        sock.bind(listen_info)
+        sock.listen(50)
+        return sock
+
     class StreamServer(object):
         def __init__(self, listen_info, handle=None, backlog=None,
-                     spawn='default', **ssl_args):
+                     spawn='default', reuse_port=False, **ssl_args):
             assert backlog is None
             assert spawn == 'default'
 
             if ':' in listen_info[0]:
-                self.server = eventlet.listen(listen_info,
-                                              family=socket.AF_INET6)
+                family = socket.AF_INET6
+            else:
+                family = socket.AF_INET
+            if reuse_port:
+                self.server = _listen_reuse_port(listen_info, family)
             else:
-                self.server = eventlet.listen(listen_info)
+                self.server = eventlet.listen(listen_info, family=family)
             if ssl_args:
                 def wrap_and_handle(sock, addr):
                     ssl_args.setdefault('server_side', True)
@@ -0,0 +1,137 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Helpers shared by the ofctl_v1_* modules.
+
+send_msgs_with_barrier() sends many messages, e.g. FlowMods, in batches
+each followed by one OFPBarrierRequest, and reports the errors for each
+message by its xid.  Like the stats requests of the ofctl_v1_* modules,
+it waits for the replies through *waiters*, so the application must
+pass the OFPBarrierReply and OFPErrorMsg events to barrier_reply_handler()
+and error_msg_handler()::
+
+    @set_ev_cls(ofp_event.EventOFPBarrierReply, MAIN_DISPATCHER)
+    def barrier_reply_handler(self, ev):
+        ofctl_utils.barrier_reply_handler(self.waiters, ev.msg)
+
+    @set_ev_cls(ofp_event.EventOFPErrorMsg, MAIN_DISPATCHER)
+    def error_msg_handler(self, ev):
+        ofctl_utils.error_msg_handler(self.waiters, ev.msg)
+"""
+
+import logging
+import time
+
+from ryu.lib import hub
+
+
+LOG = logging.getLogger('ryu.lib.ofctl_utils')
+
+DEFAULT_TIMEOUT = 1.0
+DEFAULT_BATCH_SIZE = 500
+
+# the result of a message whose barrier reply didn't arrive in time
+TIMEOUT = 'timeout'
+
+
+def send_msgs_with_barrier(dp, msgs, waiters, batch_size=DEFAULT_BATCH_SIZE,
+                           timeout=DEFAULT_TIMEOUT):
+    """
+    Sends the messages *msgs* to the datapath *dp* in batches of
+    *batch_size* messages, each followed by an OFPBarrierRequest.
+
+    All of the batches are sent before waiting for the barrier replies,
+    so the time taken is bound by the throughput rather than by the
+    round trips.  *timeout* is the time to wait for all of the barrier
+    replies, however many batches there are.
+
+    Returns a list with an element for each message in order: None if
+    the datapath processed it without an error, the OFPErrorMsg for it,
+    or TIMEOUT if the barrier reply for its batch didn't arrive.
+    """
+    deadline = time.time() + timeout
+    waiters_per_dp = waiters.setdefault(dp.id, {})
+    batches = []
+    for start in range(0, len(msgs), batch_size):
+        errors = []
+        for msg in msgs[start:start + batch_size]:
+            dp.set_xid(msg)
+            errs = []
+            errors.append(errs)
+            # no event; error_msg_handler() only records the errors
+            waiters_per_dp[msg.xid] = (None, errs)
+            dp.send_msg(msg)
+        barrier = dp.ofproto_parser.OFPBarrierRequest(dp)
+        dp.set_xid(barrier)
+        event = hub.Event()
+        waiters_per_dp[barrier.xid] = (event, [])
+        dp.send_msg(barrier)
+        batches.append((start, barrier.xid, event, errors))
+
+    results = []
+    for start, xid, event, errors in batches:
+        event.wait(timeout=max(deadline - time.time(), 0))
+        replied = xid not in waiters_per_dp
+        waiters_per_dp.pop(xid, None)
+        for msg, errs in zip(msgs[start:start + len(errors)], errors):
+            waiters_per_dp.pop(msg.xid, None)
+            if errs:
+                results.append(errs[0])
+            elif replied:
+                results.append(None)
+            else:
+                results.append(TIMEOUT)
+    return results
+
+
+def barrier_reply_handler(waiters, msg):
+    """
+    Wakes up send_msgs_with_barrier() waiting for the OFPBarrierReply
+    *msg*.
+    """
+    waiters_per_dp = waiters.get(msg.datapath.id)
+    if not waiters_per_dp or msg.xid not in waiters_per_dp:
+        return
+    event, msgs = waiters_per_dp[msg.xid]
+    if event is None:
+        return
+    msgs.append(msg)
+    del waiters_per_dp[msg.xid]
+    event.set()
+
+
+def error_msg_handler(waiters, msg):
+    """
+    Records the OFPErrorMsg *msg* for the message sent by
+    send_msgs_with_barrier().
+    """
+    waiters_per_dp = waiters.get(msg.datapath.id)
+    if not waiters_per_dp or msg.xid not in waiters_per_dp:
+        return
+    event, errs = waiters_per_dp[msg.xid]
+    if event is None:
+        errs.append(msg)
+
+
+def error_to_str(error):
+    """
+    Returns a description of an element of the list returned by
+    send_msgs_with_barrier() which isn't None.
+    """
+    if error == TIMEOUT:
+        return 'no barrier reply'
+    return 'OFPErrorMsg received. type=0x%02x code=0x%02x' % (error.type,
+                                                              error.code)
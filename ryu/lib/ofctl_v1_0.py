@@ -224,13 +224,23 @@ def get_desc_stats(dp, waiters):
 
 
 def get_flow_stats(dp, waiters):
+    stats = to_flow_stats_request(dp)
+    msgs = []
+    send_stats_request(dp, stats, waiters, msgs)
+
+    flows = flow_stats_to_str(msgs)
+    flows = {str(dp.id): flows}
+    return flows
+
+
+def to_flow_stats_request(dp):
     match = dp.ofproto_parser.OFPMatch(
         dp.ofproto.OFPFW_ALL, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
-    stats = dp.ofproto_parser.OFPFlowStatsRequest(
+    return dp.ofproto_parser.OFPFlowStatsRequest(
         dp, 0, match, 0xff, dp.ofproto.OFPP_NONE)
-    msgs = []
-    send_stats_request(dp, stats, waiters, msgs)
 
+
+def flow_stats_to_str(msgs):
     flows = []
     for msg in msgs:
         for stats in msg.body:
@@ -249,7 +259,6 @@ def get_flow_stats(dp, waiters):
                  'packet_count': stats.packet_count,
                  'table_id': stats.table_id}
             flows.append(s)
-    flows = {str(dp.id): flows}
     return flows
 
 
@@ -280,7 +289,7 @@ def get_port_stats(dp, waiters):
     return ports
 
 
-def mod_flow_entry(dp, flow, cmd):
+def to_flow_mod(dp, flow, cmd):
     cookie = int(flow.get('cookie', 0))
     priority = int(flow.get('priority',
                             dp.ofproto.OFP_DEFAULT_PRIORITY))
@@ -296,7 +305,11 @@ def mod_flow_entry(dp, flow, cmd):
         hard_timeout=hard_timeout, priority=priority, flags=flags,
         actions=actions)
 
-    dp.send_msg(flow_mod)
+    return flow_mod
+
+
+def mod_flow_entry(dp, flow, cmd):
+    dp.send_msg(to_flow_mod(dp, flow, cmd))
 
 
 def delete_flow_entry(dp):
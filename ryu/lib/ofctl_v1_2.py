@@ -527,6 +527,18 @@ def get_queue_stats(dp, waiters):
 
 
 def get_flow_stats(dp, waiters):
+    stats = to_flow_stats_request(dp)
+
+    msgs = []
+    send_stats_request(dp, stats, waiters, msgs)
+
+    flows = flow_stats_to_str(msgs)
+    flows = {str(dp.id): flows}
+
+    return flows
+
+
+def to_flow_stats_request(dp):
     table_id = dp.ofproto.OFPTT_ALL
     out_port = dp.ofproto.OFPP_ANY
     out_group = dp.ofproto.OFPG_ANY
@@ -534,12 +546,11 @@ def get_flow_stats(dp, waiters):
     cookie_mask = 0
     match = dp.ofproto_parser.OFPMatch()
 
-    stats = dp.ofproto_parser.OFPFlowStatsRequest(
+    return dp.ofproto_parser.OFPFlowStatsRequest(
         dp, table_id, out_port, out_group, cookie, cookie_mask, match)
 
-    msgs = []
-    send_stats_request(dp, stats, waiters, msgs)
 
+def flow_stats_to_str(msgs):
     flows = []
     for msg in msgs:
         for stats in msg.body:
@@ -557,8 +568,6 @@ def get_flow_stats(dp, waiters):
                  'packet_count': stats.packet_count,
                  'table_id': stats.table_id}
             flows.append(s)
-    flows = {str(dp.id): flows}
-
     return flows
 
 
@@ -705,7 +714,7 @@ def get_group_desc(dp, waiters):
     return descs
 
 
-def mod_flow_entry(dp, flow, cmd):
+def to_flow_mod(dp, flow, cmd):
     cookie = int(flow.get('cookie', 0))
     cookie_mask = int(flow.get('cookie_mask', 0))
     table_id = int(flow.get('table_id', 0))
@@ -724,7 +733,11 @@ def mod_flow_entry(dp, flow, cmd):
         hard_timeout, priority, buffer_id, out_port, out_group,
         flags, match, inst)
 
-    dp.send_msg(flow_mod)
+    return flow_mod
+
+
+def mod_flow_entry(dp, flow, cmd):
+    dp.send_msg(to_flow_mod(dp, flow, cmd))
 
 
 def mod_group_entry(dp, group, cmd):
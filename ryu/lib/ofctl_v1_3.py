@@ -538,6 +538,47 @@ def send_stats_request(dp, stats, waiters, msgs):
         del waiters_per_dp[stats.xid]
 
 
+class _ReplyQueue(object):
+    # used in place of the list of the replies in waiters.
+    # the handler of the replies appends each part of them.
+    def __init__(self):
+        self.queue = hub.Queue()
+
+    def append(self, msg):
+        self.queue.put(msg)
+
+
+def send_stats_request_iter(dp, stats, waiters, timeout=DEFAULT_TIMEOUT):
+    """
+    Sends a stats request and yields each part of the multipart reply
+    as soon as it arrives, instead of waiting for all of them.
+
+    The waiters are the same as send_stats_request().  It stops when
+    the last part arrives or no part arrives within *timeout* seconds.
+    """
+    dp.set_xid(stats)
+    waiters_per_dp = waiters.setdefault(dp.id, {})
+    replies = _ReplyQueue()
+    waiters_per_dp[stats.xid] = (hub.Event(), replies)
+    dp.send_msg(stats)
+
+    try:
+        while True:
+            try:
+                msg = replies.queue.get(timeout=timeout)
+            except hub.QueueEmpty:
+                LOG.debug('stats reply timeout: dpid %s xid %s',
+                          dp.id, stats.xid)
+                break
+            yield msg
+            if not msg.flags & dp.ofproto.OFPMPF_REPLY_MORE:
+                break
+    finally:
+        # the handler removes it on the last part, otherwise on the
+        # timeout or when the caller stops the iteration.
+        waiters_per_dp.pop(stats.xid, None)
+
+
 def get_desc_stats(dp, waiters):
     stats = dp.ofproto_parser.OFPDescStatsRequest(dp, 0)
     msgs = []
@@ -576,22 +617,65 @@ def get_queue_stats(dp, waiters):
     return desc
 
 
-def get_flow_stats(dp, waiters):
-    table_id = dp.ofproto.OFPTT_ALL
-    flags = 0
-    out_port = dp.ofproto.OFPP_ANY
-    out_group = dp.ofproto.OFPG_ANY
-    cookie = 0
-    cookie_mask = 0
-    match = dp.ofproto_parser.OFPMatch()
-
-    stats = dp.ofproto_parser.OFPFlowStatsRequest(
+def get_flow_stats_iter(dp, waiters, flow=None):
+    """
+    Returns an iterator which yields the flow entries of the switch as
+    dicts while the parts of the reply arrive.
+
+    *flow* is a dict to filter the entries with.  The filtering is done
+    by the switch, so the entries filtered out are never sent to the
+    controller.
+
+    =========== ========================================================
+    Key         Description
+    =========== ========================================================
+    table_id    Table ID (default: all tables)
+    out_port    Require matching entries to include this as an output
+                port (default: any)
+    out_group   Require matching entries to include this as an output
+                group (default: any)
+    cookie      Require matching entries to contain this cookie value
+    cookie_mask Mask used to restrict the cookie bits that must match
+    match       Fields to match in the same format as mod_flow_entry().
+                Only the entries whose match includes them are yielded.
+    =========== ========================================================
+
+    *flow* is parsed before this returns, so that ValueError is raised
+    for an invalid one before any of the entries is requested.
+    """
+    stats = to_flow_stats_request(dp, flow)
+    return _flow_stats_iter(dp, stats, waiters)
+
+
+def to_flow_stats_request(dp, flow=None):
+    if flow is None:
+        flow = {}
+    if not isinstance(flow, dict):
+        raise ValueError('flow must be a dict: %r' % (flow,))
+    try:
+        table_id = int(flow.get('table_id', dp.ofproto.OFPTT_ALL))
+        flags = 0
+        out_port = int(flow.get('out_port', dp.ofproto.OFPP_ANY))
+        out_group = int(flow.get('out_group', dp.ofproto.OFPG_ANY))
+        cookie = int(flow.get('cookie', 0))
+        cookie_mask = int(flow.get('cookie_mask', 0))
+        match = to_match(dp, flow.get('match', {}))
+    except (TypeError, AttributeError, struct.error, socket.error,
+            netaddr.AddrFormatError) as e:
+        raise ValueError('invalid flow: %s' % e)
+
+    return dp.ofproto_parser.OFPFlowStatsRequest(
         dp, flags, table_id, out_port, out_group, cookie, cookie_mask,
         match)
 
-    msgs = []
-    send_stats_request(dp, stats, waiters, msgs)
 
+def _flow_stats_iter(dp, stats, waiters):
+    for msg in send_stats_request_iter(dp, stats, waiters):
+        for s in flow_stats_to_str([msg]):
+            yield s
+
+
+def flow_stats_to_str(msgs):
     flows = []
     for msg in msgs:
         for stats in msg.body:
@@ -610,6 +694,11 @@ def get_flow_stats(dp, waiters):
                  'packet_count': stats.packet_count,
                  'table_id': stats.table_id}
             flows.append(s)
+    return flows
+
+
+def get_flow_stats(dp, waiters, flow=None):
+    flows = list(get_flow_stats_iter(dp, waiters, flow))
     flows = {str(dp.id): flows}
 
     return flows
@@ -853,7 +942,7 @@ def get_group_desc(dp, waiters):
     return descs
 
 
-def mod_flow_entry(dp, flow, cmd):
+def to_flow_mod(dp, flow, cmd):
     cookie = int(flow.get('cookie', 0))
     cookie_mask = int(flow.get('cookie_mask', 0))
     table_id = int(flow.get('table_id', 0))
@@ -872,7 +961,11 @@ def mod_flow_entry(dp, flow, cmd):
         hard_timeout, priority, buffer_id, out_port, out_group,
         flags, match, inst)
 
-    dp.send_msg(flow_mod)
+    return flow_mod
+
+
+def mod_flow_entry(dp, flow, cmd):
+    dp.send_msg(to_flow_mod(dp, flow, cmd))
 
 
 def mod_meter_entry(dp, flow, cmd):
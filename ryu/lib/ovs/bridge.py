@@ -95,7 +95,8 @@ class OVSBridge(object):
                  exception=None):
         super(OVSBridge, self).__init__()
         self.datapath_id = datapath_id
-        self.vsctl = ovs_vsctl.VSCtl(ovsdb_addr)
+        # one monitored session for all of the commands of this bridge
+        self.vsctl = ovs_vsctl.VSCtlSession(ovsdb_addr)
         self.timeout = timeout or CONF.ovsdb_timeout
         self.exception = exception
 
@@ -104,6 +105,9 @@ class OVSBridge(object):
     def run_command(self, commands):
         self.vsctl.run_command(commands, self.timeout, self.exception)
 
+    def close(self):
+        self.vsctl.close()
+
     def init(self):
         if self.br_name is None:
             self.br_name = self._get_bridge_name()
@@ -173,8 +177,8 @@ class OVSBridge(object):
         self.run_command([command])
         return command.result
 
-    def add_tunnel_port(self, name, tunnel_type, local_ip, remote_ip,
-                        key=None):
+    def _tunnel_port_commands(self, name, tunnel_type, local_ip, remote_ip,
+                              key=None):
         options = 'local_ip=%(local_ip)s,remote_ip=%(remote_ip)s' % locals()
         if key:
             options += ',key=%(key)s' % locals()
@@ -183,7 +187,23 @@ class OVSBridge(object):
         command_set = ovs_vsctl.VSCtlCommand(
             'set', ('Interface', name,
                     'type=%s' % tunnel_type, 'options=%s' % options))
-        self.run_command([command_add, command_set])
+        return [command_add, command_set]
+
+    def add_tunnel_port(self, name, tunnel_type, local_ip, remote_ip,
+                        key=None):
+        self.run_command(self._tunnel_port_commands(name, tunnel_type,
+                                                    local_ip, remote_ip, key))
+
+    def add_tunnel_ports(self, tunnel_ports):
+        """
+        adds the tunnel ports in one transaction.
+        'tunnel_ports' is a list of the tuples of the arguments of
+        add_tunnel_port(): (name, tunnel_type, local_ip, remote_ip[, key])
+        """
+        commands = []
+        for args in tunnel_ports:
+            commands.extend(self._tunnel_port_commands(*args))
+        self.run_command(commands)
 
     def add_gre_port(self, name, local_ip, remote_ip, key=None):
         self.add_tunnel_port(name, 'gre', local_ip, remote_ip, key=key)
@@ -192,6 +212,12 @@ class OVSBridge(object):
         command = ovs_vsctl.VSCtlCommand('del-port', (self.br_name, port_name))
         self.run_command([command])
 
+    def del_ports(self, port_names):
+        """ deletes the ports in one transaction """
+        commands = [ovs_vsctl.VSCtlCommand('del-port', (self.br_name, name))
+                    for name in port_names]
+        self.run_command(commands)
+
     def _get_ports(self, get_port):
         ports = []
         port_names = self.get_port_name_list()
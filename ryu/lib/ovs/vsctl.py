@@ -306,8 +306,11 @@ class VSCtlContext(object):
 
     @staticmethod
     def port_is_fake_bridge(ovsrec_port):
-        return (ovsrec_port.fake_bridge and
-                ovsrec_port.tag >= 0 and ovsrec_port.tab <= 4095)
+        # not written yet if the port is inserted by this transaction
+        fake_bridge = getattr(ovsrec_port,
+                              vswitch_idl.OVSREC_PORT_COL_FAKE_BRIDGE, False)
+        return (fake_bridge and
+                ovsrec_port.tag >= 0 and ovsrec_port.tag <= 4095)
 
     def _populate_cache(self, ovsrec_bridges):
         if self.cache_valid:
@@ -385,7 +388,10 @@ class VSCtlContext(object):
                                 ovsrec_iface.name)
                         continue
                     self.add_iface_to_cache(vsctl_port, ovsrec_iface)
-                ovsrec_qos = ovsrec_port.qos
+                # not written yet if the port is inserted by this
+                # transaction
+                ovsrec_qos = getattr(ovsrec_port,
+                                     vswitch_idl.OVSREC_PORT_COL_QOS, [])
                 vsctl_qos = self.add_qos_to_cache(vsctl_port, ovsrec_qos)
                 if len(ovsrec_qos):
                     for ovsrec_queue in ovsrec_qos[0].queues:
@@ -1866,6 +1872,153 @@ class VSCtl(object):
         self._clear(ctx, table_name, record_id, column)
 
 
+class _VSCtlRequest(object):
+
+    def __init__(self, commands):
+        super(_VSCtlRequest, self).__init__()
+        self.commands = commands
+        self.event = hub.Event()
+        self.done = False
+        self.error = None
+
+
+class VSCtlSession(VSCtl):
+    """
+    VSCtl keeping one monitored connection to the OVSDB server.
+
+    The IDL is connected and fully synchronized only on the first
+    run_command(), and later commands run against its replica, which the
+    update notifications of the server keep up to date.  So commands that
+    only read, e.g. 'get' and 'find', need no round trip.
+
+    The commands of run_command() called while a transaction is in
+    progress are queued and run in the next transaction together.  The
+    IDL allows only one transaction in progress.  If such a transaction
+    fails, the commands of each caller are run again separately so that
+    a failure affects only its caller.
+
+    The connection isn't run while no command is running, so the server
+    may drop it after its inactivity probe.  Then the IDL reconnects and
+    synchronizes again on the next command.
+    """
+
+    def __init__(self, remote):
+        super(VSCtlSession, self).__init__(remote)
+        self.idl = None
+        self._queue = []
+        self._running = False
+
+    def close(self):
+        if self.idl is not None:
+            self.idl.close()
+            self.idl = None
+
+    def _connect(self):
+        self._init_schema_helper()
+        self.schema_helper.register_all()
+        self.idl = idl.Idl(self.remote, self.schema_helper)
+
+    def _do_main(self, commands):
+        """
+        :type commands: list of VSCtlCommand
+        """
+        if self.idl is None:
+            self._connect()
+        idl_ = self.idl
+
+        self._reset()
+        self._init_schema_helper()
+        # All of the columns are already monitored.  This only checks
+        # the commands.
+        self._run_prerequisites(commands)
+
+        if idl_.has_ever_connected():
+            # Apply the updates received since the last command.
+            while idl_.run():
+                pass
+        else:
+            self._idl_wait(idl_, idl_.change_seqno)
+
+        seqno = idl_.change_seqno
+        try:
+            while not self._do_vsctl(idl_, commands):
+                self._abort_txn()
+                self._idl_wait(idl_, seqno)
+                seqno = idl_.change_seqno
+        finally:
+            # e.g. a command failed.  The IDL allows the next transaction
+            # only after this one is done.
+            self._abort_txn()
+
+    def _abort_txn(self):
+        if self.txn:
+            self.txn.abort()
+            self.txn = None
+
+    def run_command(self, commands, timeout_sec=None, exception=None):
+        if timeout_sec is None:
+            self._run_queued(commands)
+        else:
+            with hub.Timeout(timeout_sec, exception):
+                self._run_queued(commands)
+
+    def _run_queued(self, commands):
+        request = _VSCtlRequest(commands)
+        self._queue.append(request)
+        try:
+            while not request.done:
+                if self._running:
+                    request.event.wait()
+                    request.event.clear()
+                else:
+                    self._run_requests()
+        finally:
+            if request in self._queue:
+                self._queue.remove(request)
+
+        if request.error is not None:
+            raise request.error
+
+    def _run_requests(self):
+        self._running = True
+        requests = []
+        try:
+            while self._queue:
+                requests = self._queue
+                self._queue = []
+                self._run_txn(requests)
+        finally:
+            self._running = False
+            # Interrupted, e.g. by the timeout of the caller.  The rest
+            # of the requests are queued again to be run by another.
+            self._abort_txn()
+            self._queue[:0] = [request for request in requests
+                               if not request.done]
+            for request in self._queue:
+                request.event.set()
+
+    def _run_txn(self, requests):
+        try:
+            self._run_command([command for request in requests
+                               for command in request.commands])
+        except Exception as e:
+            if len(requests) == 1:
+                requests[0].error = e
+            else:
+                for request in requests:
+                    try:
+                        self._run_command(request.commands)
+                    except Exception as e:
+                        request.error = e
+                    request.done = True
+                    request.event.set()
+                return
+
+        for request in requests:
+            request.done = True
+            request.event.set()
+
+
 #
 # Create constants from ovs db schema
 #
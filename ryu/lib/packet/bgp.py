@@ -540,10 +540,10 @@ class _AddrPrefix(StringifyMixin):
     @classmethod
     def parser(cls, buf):
         (length, ) = struct.unpack_from(cls._PACK_STR, buffer(buf))
-        rest = buf[struct.calcsize(cls._PACK_STR):]
+        offset = struct.calcsize(cls._PACK_STR)
         byte_length = (length + 7) / 8
-        addr = cls._from_bin(rest[:byte_length])
-        rest = rest[byte_length:]
+        addr = cls._from_bin(buf[offset:offset + byte_length])
+        rest = buffer(buf, offset + byte_length)
         return cls(length=length, addr=addr), rest
 
     def serialize(self):
@@ -1171,15 +1171,15 @@ class _PathAttribute(StringifyMixin, _TypeDisp, _Value):
     @classmethod
     def parser(cls, buf):
         (flags, type_) = struct.unpack_from(cls._PACK_STR, buffer(buf))
-        rest = buf[struct.calcsize(cls._PACK_STR):]
+        offset = struct.calcsize(cls._PACK_STR)
         if (flags & BGP_ATTR_FLAG_EXTENDED_LENGTH) != 0:
             len_pack_str = cls._PACK_STR_EXT_LEN
         else:
             len_pack_str = cls._PACK_STR_LEN
-        (length,) = struct.unpack_from(len_pack_str, buffer(rest))
-        rest = rest[struct.calcsize(len_pack_str):]
-        value = bytes(rest[:length])
-        rest = rest[length:]
+        (length,) = struct.unpack_from(len_pack_str, buffer(buf), offset)
+        offset += struct.calcsize(len_pack_str)
+        value = bytes(buf[offset:offset + length])
+        rest = buffer(buf, offset + length)
         subcls = cls._lookup_type(type_)
         return subcls(flags=flags, type_=type_, length=length,
                       **subcls.parse_value(value)), rest
@@ -1794,18 +1794,27 @@ class BGPMessage(packet_base.PacketBase, _TypeDisp):
         self.type = type_
 
     @classmethod
-    def parser(cls, buf):
-        if len(buf) < cls._HDR_LEN:
+    def parser(cls, buf, offset=0):
+        """Parses the message at *offset* in *buf*.
+
+        Returns the message and the bytes following it in *buf*.  The body
+        of the message is passed to the parser of its type as a buffer
+        object without copying, so a caller which frames the messages in
+        a large *buf* can give the end of the message as the end of *buf*.
+        """
+        buflen = len(buf) - offset
+        if buflen < cls._HDR_LEN:
             raise stream_parser.StreamParser.TooSmallException(
-                '%d < %d' % (len(buf), cls._HDR_LEN))
+                '%d < %d' % (buflen, cls._HDR_LEN))
         (marker, len_, type_) = struct.unpack_from(cls._HDR_PACK_STR,
-                                                   buffer(buf))
+                                                   buffer(buf), offset)
         msglen = len_
-        if len(buf) < msglen:
+        if buflen < msglen:
             raise stream_parser.StreamParser.TooSmallException(
-                '%d < %d' % (len(buf), msglen))
-        binmsg = buf[cls._HDR_LEN:msglen]
-        rest = buf[msglen:]
+                '%d < %d' % (buflen, msglen))
+        binmsg = buffer(buf, offset + cls._HDR_LEN,
+                        max(msglen - cls._HDR_LEN, 0))
+        rest = buf[offset + msglen:]
         subcls = cls._lookup_type(type_)
         kwargs = subcls.parser(binmsg)
         return subcls(marker=marker, len_=len_, type_=type_, **kwargs), rest
@@ -1974,14 +1983,12 @@ class BGPUpdate(BGPMessage):
     def parser(cls, buf):
         offset = 0
         (withdrawn_routes_len,) = struct.unpack_from('!H', buffer(buf), offset)
-        binroutes = buffer(buf[offset + 2:
-                               offset + 2 + withdrawn_routes_len])
+        binroutes = buffer(buf, offset + 2, withdrawn_routes_len)
         offset += 2 + withdrawn_routes_len
         (total_path_attribute_len,) = struct.unpack_from('!H', buffer(buf),
                                                          offset)
-        binpathattrs = buffer(buf[offset + 2:
-                                  offset + 2 + total_path_attribute_len])
-        binnlri = buffer(buf[offset + 2 + total_path_attribute_len:])
+        binpathattrs = buffer(buf, offset + 2, total_path_attribute_len)
+        binnlri = buffer(buf, offset + 2 + total_path_attribute_len)
         withdrawn_routes = []
         while binroutes:
             r, binroutes = BGPWithdrawnRoute.parser(binroutes)
@@ -163,6 +163,7 @@ VERSION_1_LENGTH = 0
 class bpdu(packet_base.PacketBase):
     """Bridge Protocol Data Unit(BPDU) header encoder/decoder base class.
     """
+    _SERIALIZE_VIEW = True
     _PACK_STR = '!HBB'
     _PACK_LEN = struct.calcsize(_PACK_STR)
     _BPDU_TYPES = {}
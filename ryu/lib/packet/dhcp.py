@@ -133,6 +133,7 @@ class dhcp(packet_base.PacketBase):
                     every DHCP message).
     ============== ====================
     """
+    _SERIALIZE_VIEW = True
     _HLEN_UNPACK_STR = '!BBB'
     _HLEN_UNPACK_LEN = struct.calcsize(_HLEN_UNPACK_STR)
     _DHCP_UNPACK_STR = '!BIHH4s4s4s4s%ds%ds64s128s'
@@ -37,6 +37,8 @@ class ethernet(packet_base.PacketBase):
     ============== ==================== =====================
     """
 
+    _SERIALIZE_VIEW = True
+    _SERIALIZE_INTO = True
     _PACK_STR = '!6s6sH'
     _MIN_LEN = struct.calcsize(_PACK_STR)
     _TYPE = {
@@ -66,6 +68,12 @@ class ethernet(packet_base.PacketBase):
                            addrconv.mac.text_to_bin(self.src),
                            self.ethertype)
 
+    def serialize_into(self, buf, offset, prev):
+        struct.pack_into(ethernet._PACK_STR, buf, offset,
+                         addrconv.mac.text_to_bin(self.dst),
+                         addrconv.mac.text_to_bin(self.src),
+                         self.ethertype)
+
     @classmethod
     def get_packet_type(cls, type_):
         """Override method for the ethernet IEEE802.3 Length/Type
@@ -0,0 +1,188 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Fast header extractor
+
+extract() pulls the commonly used L2-L4 header fields out of a packet
+in a single pass, without creating protocol objects like Packet does.
+It's intended for the classification of PacketIn.
+
+Example::
+
+    headers = fast_parser.extract(msg.data)
+    if headers.eth_type == ether.ETH_TYPE_IP and headers.dst_port == 80:
+        pkt = headers.packet()    # full decoding only when needed
+"""
+
+import struct
+
+from ryu.lib import addrconv
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+from . import packet
+
+
+_ETH = struct.Struct('!6s6sH')
+_VLAN = struct.Struct('!HH')
+_IPV4 = struct.Struct('!BxxxxxHxBxx4s4s')
+_IPV6 = struct.Struct('!6xBx16s16s')
+_IPV6_EXT = struct.Struct('!BB')
+_IPV6_FRAG = struct.Struct('!BxH')
+_PORTS = struct.Struct('!HH')
+
+_VLAN_TYPES = (ether.ETH_TYPE_8021Q, ether.ETH_TYPE_8021AD)
+_L4_PROTOS = (inet.IPPROTO_TCP, inet.IPPROTO_UDP, inet.IPPROTO_SCTP)
+_IPV6_EXT_HEADERS = (inet.IPPROTO_HOPOPTS, inet.IPPROTO_ROUTING,
+                     inet.IPPROTO_DSTOPTS)
+_IPV4_OFFSET_MASK = 0x1fff
+_IPV6_OFFSET_MASK = 0xfff8
+_VID_MASK = 0xfff
+
+
+class Headers(object):
+    """
+    Header fields extracted from a packet.
+    A field is None if the packet doesn't have the header.
+
+    =============== ======================================================
+    Attribute       Description
+    =============== ======================================================
+    data            The packet
+    eth_dst_bin     Destination MAC address in binary
+    eth_src_bin     Source MAC address in binary
+    eth_type        Ethernet type after VLAN tags
+    vlan_vid        VLAN ID of the outermost VLAN tag
+    ip_proto        IP protocol number (IPv6 next header after
+                    hop-by-hop, routing and destination options headers)
+    ip_src_bin      IPv4/IPv6 source address in binary
+    ip_dst_bin      IPv4/IPv6 destination address in binary
+    src_port        TCP/UDP/SCTP source port
+    dst_port        TCP/UDP/SCTP destination port
+    =============== ======================================================
+
+    The properties eth_dst, eth_src, ip_src and ip_dst return the
+    addresses in text representation as the corresponding protocol
+    classes do.
+    """
+
+    __slots__ = ['data', 'eth_dst_bin', 'eth_src_bin', 'eth_type',
+                 'vlan_vid', 'ip_proto', 'ip_src_bin', 'ip_dst_bin',
+                 'src_port', 'dst_port', '_packet']
+
+    def __init__(self, data):
+        self.data = data
+        self.eth_dst_bin = None
+        self.eth_src_bin = None
+        self.eth_type = None
+        self.vlan_vid = None
+        self.ip_proto = None
+        self.ip_src_bin = None
+        self.ip_dst_bin = None
+        self.src_port = None
+        self.dst_port = None
+        self._packet = None
+
+    @property
+    def eth_dst(self):
+        if self.eth_dst_bin is None:
+            return None
+        return addrconv.mac.bin_to_text(self.eth_dst_bin)
+
+    @property
+    def eth_src(self):
+        if self.eth_src_bin is None:
+            return None
+        return addrconv.mac.bin_to_text(self.eth_src_bin)
+
+    def _ip_to_text(self, addr):
+        if addr is None:
+            return None
+        if len(addr) == 4:
+            return addrconv.ipv4.bin_to_text(addr)
+        return addrconv.ipv6.bin_to_text(addr)
+
+    @property
+    def ip_src(self):
+        return self._ip_to_text(self.ip_src_bin)
+
+    @property
+    def ip_dst(self):
+        return self._ip_to_text(self.ip_dst_bin)
+
+    def packet(self):
+        """
+        Returns a Packet fully decoded from data.
+        It's decoded only once.
+        """
+        if self._packet is None:
+            self._packet = packet.Packet(self.data)
+        return self._packet
+
+    def __repr__(self):
+        return ('Headers(eth_dst=%s, eth_src=%s, eth_type=%s, vlan_vid=%s, '
+                'ip_proto=%s, ip_src=%s, ip_dst=%s, src_port=%s, '
+                'dst_port=%s)' %
+                (self.eth_dst, self.eth_src, self.eth_type, self.vlan_vid,
+                 self.ip_proto, self.ip_src, self.ip_dst, self.src_port,
+                 self.dst_port))
+
+
+def extract(data):
+    """
+    Extract the header fields from data, an ethernet frame, and returns
+    a Headers.  The fields of truncated headers are left None.
+    """
+    h = Headers(data)
+    try:
+        h.eth_dst_bin, h.eth_src_bin, eth_type = _ETH.unpack_from(data)
+        offset = _ETH.size
+        while eth_type in _VLAN_TYPES:
+            tci, eth_type = _VLAN.unpack_from(data, offset)
+            if h.vlan_vid is None:
+                h.vlan_vid = tci & _VID_MASK
+            offset += _VLAN.size
+        h.eth_type = eth_type
+
+        if eth_type == ether.ETH_TYPE_IP:
+            (ver_ihl, frag, proto, h.ip_src_bin,
+             h.ip_dst_bin) = _IPV4.unpack_from(data, offset)
+            h.ip_proto = proto
+            if frag & _IPV4_OFFSET_MASK:
+                # non-first fragment
+                return h
+            offset += (ver_ihl & 0xf) * 4
+        elif eth_type == ether.ETH_TYPE_IPV6:
+            (proto, h.ip_src_bin,
+             h.ip_dst_bin) = _IPV6.unpack_from(data, offset)
+            offset += _IPV6.size
+            while proto in _IPV6_EXT_HEADERS:
+                proto, length = _IPV6_EXT.unpack_from(data, offset)
+                offset += (length + 1) * 8
+            if proto == inet.IPPROTO_FRAGMENT:
+                proto, frag_offset = _IPV6_FRAG.unpack_from(data, offset)
+                h.ip_proto = proto
+                if frag_offset & _IPV6_OFFSET_MASK:
+                    return h
+                offset += 8
+            h.ip_proto = proto
+        else:
+            return h
+
+        if h.ip_proto in _L4_PROTOS:
+            h.src_port, h.dst_port = _PORTS.unpack_from(data, offset)
+    except struct.error:
+        pass
+    return h
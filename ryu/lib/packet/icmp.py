@@ -65,6 +65,8 @@ class icmp(packet_base.PacketBase):
     ============== ====================
     """
 
+    _SERIALIZE_VIEW = True
+    _SERIALIZE_INTO = True
     _PACK_STR = '!BBH'
     _MIN_LEN = struct.calcsize(_PACK_STR)
     _ICMP_TYPES = {}
@@ -118,7 +120,26 @@ class icmp(packet_base.PacketBase):
 
         return hdr
 
+    def serialize_into(self, buf, offset, prev):
+        if self.data is None:
+            self.data = echo()
+
+        start = offset + icmp._MIN_LEN
+        if self.type in icmp._ICMP_TYPES:
+            self.data.serialize_into(buf, start)
+        else:
+            buf[start:start + len(self.data)] = self.data
+        struct.pack_into(icmp._PACK_STR, buf, offset, self.type,
+                         self.code, self.csum)
+
+        if self.csum == 0:
+            end = start + len(self.data)
+            self.csum = packet_utils.checksum(memoryview(buf)[offset:end])
+            struct.pack_into('!H', buf, offset + 2, self.csum)
+
     def __len__(self):
+        if self.data is None:
+            return self._MIN_LEN + echo._MIN_LEN
         return self._MIN_LEN + len(self.data)
 
 
@@ -173,6 +194,13 @@ class echo(stringify.StringifyMixin):
 
         return hdr
 
+    def serialize_into(self, buf, offset):
+        struct.pack_into(echo._PACK_STR, buf, offset, self.id, self.seq)
+
+        if self.data is not None:
+            offset += echo._MIN_LEN
+            buf[offset:offset + len(self.data)] = self.data
+
     def __len__(self):
         length = self._MIN_LEN
         if self.data is not None:
@@ -239,6 +267,14 @@ class dest_unreach(stringify.StringifyMixin):
 
         return hdr
 
+    def serialize_into(self, buf, offset):
+        struct.pack_into(dest_unreach._PACK_STR, buf, offset,
+                         self.data_len, self.mtu)
+
+        if self.data is not None:
+            offset += dest_unreach._MIN_LEN
+            buf[offset:offset + len(self.data)] = self.data
+
     def __len__(self):
         length = self._MIN_LEN
         if self.data is not None:
@@ -295,6 +331,13 @@ class TimeExceeded(stringify.StringifyMixin):
 
         return hdr
 
+    def serialize_into(self, buf, offset):
+        struct.pack_into(TimeExceeded._PACK_STR, buf, offset, self.data_len)
+
+        if self.data is not None:
+            offset += TimeExceeded._MIN_LEN
+            buf[offset:offset + len(self.data)] = self.data
+
     def __len__(self):
         length = self._MIN_LEN
         if self.data is not None:
@@ -172,6 +172,7 @@ class igmp(packet_base.PacketBase):
     address         a group address value.
     =============== ====================================================
     """
+    _SERIALIZE_VIEW = True
     _PACK_STR = '!BBH4s'
     _MIN_LEN = struct.calcsize(_PACK_STR)
     _TYPE = {
@@ -68,6 +68,8 @@ class ipv4(packet_base.PacketBase):
     ============== ======================================== ==================
     """
 
+    _SERIALIZE_VIEW = True
+    _SERIALIZE_INTO = True
     _PACK_STR = '!BBHHHBBH4s4s'
     _MIN_LEN = struct.calcsize(_PACK_STR)
     _TYPE = {
@@ -141,6 +143,29 @@ class ipv4(packet_base.PacketBase):
         struct.pack_into('!H', hdr, 10, self.csum)
         return hdr
 
+    def serialize_into(self, buf, offset, prev):
+        length = len(self)
+        version = self.version << 4 | self.header_length
+        flags = self.flags << 13 | self.offset
+        if self.total_length == 0:
+            self.total_length = len(buf) - offset
+        struct.pack_into(ipv4._PACK_STR, buf, offset, version, self.tos,
+                         self.total_length, self.identification, flags,
+                         self.ttl, self.proto, 0,
+                         addrconv.ipv4.text_to_bin(self.src),
+                         addrconv.ipv4.text_to_bin(self.dst))
+
+        start = offset + ipv4._MIN_LEN
+        end = offset + length
+        if self.option:
+            assert (length - ipv4._MIN_LEN) >= len(self.option)
+            buf[start:start + len(self.option)] = self.option
+            start += len(self.option)
+        buf[start:end] = bytearray(end - start)
+
+        self.csum = packet_utils.checksum(memoryview(buf)[offset:end])
+        struct.pack_into('!H', buf, offset + 10, self.csum)
+
 ipv4.register_packet_type(icmp.icmp, inet.IPPROTO_ICMP)
 ipv4.register_packet_type(igmp.igmp, inet.IPPROTO_IGMP)
 ipv4.register_packet_type(tcp.tcp, inet.IPPROTO_TCP)
@@ -58,6 +58,7 @@ class ipv6(packet_base.PacketBase):
     ============== ======================================== ==================
     """
 
+    _SERIALIZE_VIEW = True
     _PACK_STR = '!IHBB16s16s'
     _MIN_LEN = struct.calcsize(_PACK_STR)
     _IPV6_EXT_HEADER_TYPE = {}
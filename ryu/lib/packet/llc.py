@@ -122,6 +122,7 @@ class llc(packet_base.PacketBase):
     =============== ===============================================
     """
 
+    _SERIALIZE_VIEW = True
     _PACK_STR = '!BB'
     _PACK_LEN = struct.calcsize(_PACK_STR)
     _CTR_TYPES = {}
@@ -104,8 +104,14 @@ class LLDPBasicTLV(stringify.StringifyMixin):
     def _len_valid(self):
         return self._LEN_MIN <= self.len and self.len <= self._LEN_MAX
 
+    def serialize_into(self, buf, offset):
+        # writes LLDP_TLV_SIZE + self.len bytes of the TLV at offset.
+        buf[offset:offset + LLDP_TLV_SIZE + self.len] = self.serialize()
+
 
 class lldp(packet_base.PacketBase):
+    _SERIALIZE_VIEW = True
+    _SERIALIZE_INTO = True
     _tlv_parsers = {}
 
     def __init__(self, tlvs):
@@ -151,6 +157,11 @@ class lldp(packet_base.PacketBase):
 
         return data
 
+    def serialize_into(self, buf, offset, prev):
+        for tlv in self.tlvs:
+            tlv.serialize_into(buf, offset)
+            offset += LLDP_TLV_SIZE + tlv.len
+
     @classmethod
     def set_type(cls, tlv_cls):
         cls._tlv_parsers[tlv_cls.tlv_type] = tlv_cls
@@ -184,6 +195,9 @@ class End(LLDPBasicTLV):
     def serialize(self):
         return struct.pack('!H', self.typelen)
 
+    def serialize_into(self, buf, offset):
+        struct.pack_into('!H', buf, offset, self.typelen)
+
 
 @lldp.set_tlv_type(LLDP_TLV_CHASSIS_ID)
 class ChassisID(LLDPBasicTLV):
@@ -218,6 +232,11 @@ class ChassisID(LLDPBasicTLV):
     def serialize(self):
         return struct.pack('!HB', self.typelen, self.subtype) + self.chassis_id
 
+    def serialize_into(self, buf, offset):
+        struct.pack_into('!HB', buf, offset, self.typelen, self.subtype)
+        offset += LLDP_TLV_SIZE + self._PACK_SIZE
+        buf[offset:offset + len(self.chassis_id)] = self.chassis_id
+
 
 @lldp.set_tlv_type(LLDP_TLV_PORT_ID)
 class PortID(LLDPBasicTLV):
@@ -253,6 +272,11 @@ class PortID(LLDPBasicTLV):
     def serialize(self):
         return struct.pack('!HB', self.typelen, self.subtype) + self.port_id
 
+    def serialize_into(self, buf, offset):
+        struct.pack_into('!HB', buf, offset, self.typelen, self.subtype)
+        offset += LLDP_TLV_SIZE + self._PACK_SIZE
+        buf[offset:offset + len(self.port_id)] = self.port_id
+
 
 @lldp.set_tlv_type(LLDP_TLV_TTL)
 class TTL(LLDPBasicTLV):
@@ -275,6 +299,9 @@ class TTL(LLDPBasicTLV):
     def serialize(self):
         return struct.pack('!HH', self.typelen, self.ttl)
 
+    def serialize_into(self, buf, offset):
+        struct.pack_into('!HH', buf, offset, self.typelen, self.ttl)
+
 
 @lldp.set_tlv_type(LLDP_TLV_PORT_DESCRIPTION)
 class PortDescription(LLDPBasicTLV):
@@ -472,6 +499,7 @@ class OrganizationallySpecific(LLDPBasicTLV):
         if buf:
             (self.oui, self.subtype) = struct.unpack(
                 self._PACK_STR, self.tlv_info[:self._PACK_SIZE])
+            self.info = self.tlv_info[self._PACK_SIZE:]
         else:
             self.oui = kwargs['oui']
             self.subtype = kwargs['subtype']
@@ -481,7 +509,8 @@ class OrganizationallySpecific(LLDPBasicTLV):
             self.typelen = (self.tlv_type << LLDP_TLV_TYPE_SHIFT) | self.len
 
     def serialize(self):
-        return struct.pack('!H3sB', self.typelen, self.oui, self.subtype)
+        return (struct.pack('!H3sB', self.typelen, self.oui, self.subtype) +
+                self.info)
 
 
 lldp.set_classes(lldp._tlv_parsers)
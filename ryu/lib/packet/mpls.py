@@ -41,6 +41,7 @@ class mpls(packet_base.PacketBase):
     ============== ====================
     """
 
+    _SERIALIZE_VIEW = True
     _PACK_STR = '!I'
     _MIN_LEN = struct.calcsize(_PACK_STR)
 
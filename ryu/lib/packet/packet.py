@@ -20,6 +20,10 @@ from . import packet_base
 from . import ethernet
 
 
+# the room reserved for headers when a packet is serialized
+_HEADROOM = 128
+
+
 class Packet(object):
     """A packet decoder/encoder class.
 
@@ -62,18 +66,55 @@ class Packet(object):
         This method is legal only when encoding a packet.
         """
 
-        self.data = bytearray()
+        # the packet is built backward from the end of a single buffer,
+        # which is sized for the payloads and the headers written in place
+        # with serialize_into().  the headers of the layers which don't
+        # support it are returned by serialize() and copied into the
+        # headroom reserved for them, which is grown when they exceed it.
         r = self.protocols[::-1]
-        for i, p in enumerate(r):
+        layers = []
+        size = 0
+        headroom = 0
+        for p, prev in zip(r, r[1:] + [None]):
             if isinstance(p, packet_base.PacketBase):
-                if i == len(r) - 1:
-                    prev = None
+                if p._SERIALIZE_INTO:
+                    length = len(p)
+                    size += length
+                else:
+                    length = None
+                    headroom = _HEADROOM
+                layers.append((p, prev, length, None))
+            else:
+                if not isinstance(p, bytearray):
+                    p = str(p)
+                size += len(p)
+                layers.append((p, prev, len(p), p))
+        size += headroom
+        buf = bytearray(size)
+        view = None
+        start = size
+        for p, prev, length, data in layers:
+            if length is None:
+                if p._SERIALIZE_VIEW:
+                    if view is None:
+                        view = memoryview(buf)
+                    data = p.serialize(view[start:], prev)
                 else:
-                    prev = r[i + 1]
-                data = p.serialize(self.data, prev)
+                    data = p.serialize(buf[start:], prev)
+                length = len(data)
+            if length > start:
+                headroom = max(length, _HEADROOM)
+                buf = bytearray(headroom) + buf
+                view = None
+                start += headroom
+            start -= length
+            if data is None:
+                p.serialize_into(buf, start, prev)
             else:
-                data = str(p)
-            self.data = data + self.data
+                buf[start:start + length] = data
+        view = None
+        del buf[:start]
+        self.data = buf
 
     def add_protocol(self, proto):
         """Register a protocol *proto* for this packet.
@@ -23,6 +23,21 @@ class PacketBase(stringify.StringifyMixin):
     """A base class for a protocol (ethernet, ipv4, ...) header."""
     _TYPES = {}
 
+    _SERIALIZE_VIEW = False
+    """
+    If True, serialize() can take the payload as a memoryview of the
+    buffer Packet.serialize builds the packet in.  Otherwise, a copy of
+    the payload is made for serialize().  Either way, serialize() returns
+    the header, which Packet.serialize copies into the buffer.
+    """
+
+    _SERIALIZE_INTO = False
+    """
+    If True, Packet.serialize encodes the header in place with
+    serialize_into() instead of serialize().  len() of the header must
+    be the number of bytes serialize_into() writes.
+    """
+
     @classmethod
     def get_packet_type(cls, type_):
         """Per-protocol dict-like get method.
@@ -79,10 +94,25 @@ class PacketBase(stringify.StringifyMixin):
         Returns a bytearray which contains the header.
 
         *payload* is the rest of the packet which will immediately follow
-        this header.
+        this header.  It's a memoryview if _SERIALIZE_VIEW is True,
+        otherwise a bytearray.
 
         *prev* is a packet_base.PacketBase subclass for the outer protocol
         header.  *prev* is None if the current header is the outer-most.
         For example, *prev* is ipv4 or ipv6 for tcp.serialize.
         """
         pass
+
+    def serialize_into(self, buf, offset, prev):
+        """Encode a protocol header in place.
+
+        This method is used only when encoding a packet, instead of
+        serialize() if _SERIALIZE_INTO is True.
+
+        Writes len(self) bytes of the header into bytearray *buf* at
+        *offset*.  The rest of the packet is already in *buf* from the
+        end of the header to the end of *buf*.
+
+        *prev* is the same as serialize().
+        """
+        raise NotImplementedError()
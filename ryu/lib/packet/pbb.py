@@ -35,6 +35,7 @@ class itag(packet_base.PacketBase):
     ============== ====================
     """
 
+    _SERIALIZE_VIEW = True
     _PACK_STR = "!I"
     _MIN_LEN = struct.calcsize(_PACK_STR)
 
@@ -53,6 +53,7 @@ class slow(packet_base.PacketBase):
     | 11 - 255      | Unused - Illegal values                          |
     +---------------+--------------------------------------------------+
     """
+    _SERIALIZE_VIEW = True
     _PACK_STR = '!B'
 
     @classmethod
@@ -375,6 +376,7 @@ class lacp(packet_base.PacketBase):
     # information when using Long Timeouts (3 x Slow_Periodic_Time).
     LONG_TIMEOUT_TIME = 3 * SLOW_PERIODIC_TIME
 
+    _SERIALIZE_VIEW = True
     _HLEN_PACK_STR = '!BB'
     _HLEN_PACK_LEN = struct.calcsize(_HLEN_PACK_STR)
     _ACTPRT_INFO_PACK_STR = '!BBH6sHHHB3x'
@@ -45,6 +45,8 @@ class tcp(packet_base.PacketBase):
     ============== ====================
     """
 
+    _SERIALIZE_VIEW = True
+    _SERIALIZE_INTO = True
     _PACK_STR = '!HHIIBBHHH'
     _MIN_LEN = struct.calcsize(_PACK_STR)
 
@@ -63,7 +65,14 @@ class tcp(packet_base.PacketBase):
         self.option = option
 
     def __len__(self):
-        return self.offset * 4
+        length = tcp._MIN_LEN
+        if self.option:
+            length += len(self.option)
+            mod = len(self.option) % 4
+            if mod:
+                length += 4 - mod
+            length = max(length, self.offset * 4)
+        return length
 
     @classmethod
     def parser(cls, buf):
@@ -106,6 +115,24 @@ class tcp(packet_base.PacketBase):
         if self.csum == 0:
             total_length = len(h) + len(payload)
             self.csum = packet_utils.checksum_ip(prev, total_length,
-                                                 h + payload)
+                                                 h, payload)
             struct.pack_into('!H', h, 16, self.csum)
         return str(h)
+
+    def serialize_into(self, buf, offset, prev):
+        length = len(self)
+        if 0 == self.offset:
+            self.offset = length >> 2
+        struct.pack_into(tcp._PACK_STR, buf, offset, self.src_port,
+                         self.dst_port, self.seq, self.ack, self.offset << 4,
+                         self.bits, self.window_size, self.csum, self.urgent)
+
+        if self.option:
+            start = offset + tcp._MIN_LEN + len(self.option)
+            buf[offset + tcp._MIN_LEN:start] = self.option
+            buf[start:offset + length] = bytearray(offset + length - start)
+
+        if self.csum == 0:
+            self.csum = packet_utils.checksum_ip(prev, len(buf) - offset,
+                                                 memoryview(buf)[offset:])
+            struct.pack_into('!H', buf, offset + 16, self.csum)
@@ -38,6 +38,8 @@ class udp(packet_base.PacketBase):
     ============== ====================
     """
 
+    _SERIALIZE_VIEW = True
+    _SERIALIZE_INTO = True
     _PACK_STR = '!HHHH'
     _MIN_LEN = struct.calcsize(_PACK_STR)
 
@@ -62,7 +64,17 @@ class udp(packet_base.PacketBase):
                         self.total_length, self.csum)
         if self.csum == 0:
             self.csum = packet_utils.checksum_ip(
-                prev, self.total_length, h + payload)
+                prev, self.total_length, h, payload)
             h = struct.pack(udp._PACK_STR, self.src_port, self.dst_port,
                             self.total_length, self.csum)
         return h
+
+    def serialize_into(self, buf, offset, prev):
+        if self.total_length == 0:
+            self.total_length = len(buf) - offset
+        struct.pack_into(udp._PACK_STR, buf, offset, self.src_port,
+                         self.dst_port, self.total_length, self.csum)
+        if self.csum == 0:
+            self.csum = packet_utils.checksum_ip(
+                prev, self.total_length, memoryview(buf)[offset:])
+            struct.pack_into('!H', buf, offset + 6, self.csum)
@@ -29,6 +29,8 @@ from ryu.ofproto import ether
 
 @six.add_metaclass(abc.ABCMeta)
 class _vlan(packet_base.PacketBase):
+    _SERIALIZE_VIEW = True
+    _SERIALIZE_INTO = True
     _PACK_STR = "!HH"
     _MIN_LEN = struct.calcsize(_PACK_STR)
 
@@ -53,6 +55,10 @@ class _vlan(packet_base.PacketBase):
         tci = self.pcp << 13 | self.cfi << 12 | self.vid
         return struct.pack(vlan._PACK_STR, tci, self.ethertype)
 
+    def serialize_into(self, buf, offset, prev):
+        tci = self.pcp << 13 | self.cfi << 12 | self.vid
+        struct.pack_into(vlan._PACK_STR, buf, offset, tci, self.ethertype)
+
 
 class vlan(_vlan):
     """VLAN (IEEE 802.1Q) header encoder/decoder class.
@@ -209,6 +209,7 @@ class vrrp(packet_base.PacketBase):
     ============== ====================
     """
 
+    _SERIALIZE_VIEW = True
     _VERSION_PACK_STR = '!B'
     _IPV4_ADDRESS_PACK_STR_RAW = '4s'
     _IPV4_ADDRESS_PACK_STR = '!' + _IPV4_ADDRESS_PACK_STR_RAW
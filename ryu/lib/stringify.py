@@ -38,7 +38,7 @@ import inspect
 # 'len', 'property', 'set', 'type'
 # A bit more generic way is adopted
 import __builtin__
-_RESERVED_KEYWORD = dir(__builtin__)
+_RESERVED_KEYWORD = frozenset(dir(__builtin__))
 
 
 _mapdict = lambda f, d: dict([(k, f(v)) for k, v in d.items()])
@@ -46,6 +46,10 @@ _mapdict_key = lambda f, d: dict([(f(k), v) for k, v in d.items()])
 _mapdict_kv = lambda f, d: dict([(k, f(k, v)) for k, v in d.items()])
 
 
+# the types of values which are encoded as they are
+_SCALAR_TYPES = frozenset([int, long, float, bool, type(None)])
+
+
 class TypeDescr(object):
     pass
 
@@ -76,6 +80,91 @@ _types = {
 }
 
 
+class _Codec(object):
+    """
+    The conversions of a StringifyMixin subclass for JSON style dicts,
+    i.e. the types of the attributes in _TYPE and the default encoder
+    and decoder.  They are computed on the first use of the class and
+    reused.
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.types = {}
+        for t, attrs in getattr(cls, '_TYPE', {}).iteritems():
+            for k in attrs:
+                self.types.setdefault(k, _types[t])
+        # to_jsondict and from_jsondict look up self.types directly
+        # unless a subclass overrides _encode_value or _decode_value.
+        self.default_encode_value = (cls._encode_value.im_func is
+                                     StringifyMixin._encode_value.im_func)
+        self.default_decode_value = (cls._decode_value.im_func is
+                                     StringifyMixin._decode_value.im_func)
+        # attrs() can look up the attributes of the objects in __dict__
+        # unless the class has its own way to enumerate them.
+        self.default_attrs = (cls.stringify_attrs.im_func is
+                              StringifyMixin.stringify_attrs.im_func and
+                              not hasattr(cls, '_fields') and
+                              not hasattr(cls, '__dir__'))
+        # attribute name -> name in JSON, or None if it's not stringified
+        self._names = {}
+        self._encoder = None
+        self._decoder = None
+
+    def _name(self, obj, k):
+        # the checks of obj_python_attrs() and obj_attrs() which only
+        # depend on the class.  _base_attributes is set by the first
+        # instance of the class.
+        if k.startswith('_'):
+            return None
+        if k in getattr(obj, '_base_attributes', []):
+            return None
+        if hasattr(self.cls, k):
+            return None
+        if k.endswith('_') and k[:-1] in _RESERVED_KEYWORD:
+            return k[:-1]
+        return k
+
+    def attrs(self, obj):
+        """
+        Returns a list of the attributes of obj as obj_attrs() yields.
+        """
+        if not self.default_attrs:
+            return list(obj_attrs(obj))
+        try:
+            items = obj.__dict__.items()
+        except AttributeError:
+            return list(obj_attrs(obj))
+        items.sort()
+        names = self._names
+        attrs = []
+        for k, v in items:
+            try:
+                name = names[k]
+            except KeyError:
+                name = names[k] = self._name(obj, k)
+            if name is None or callable(v):
+                continue
+            attrs.append((name, v))
+        return attrs
+
+    def default_encoder(self, encode_string):
+        # only the encoder for the default encode_string is cached
+        # as the others are often given as one-off functions.
+        if encode_string is not base64.b64encode:
+            return self.cls._get_default_encoder(encode_string)
+        if self._encoder is None:
+            self._encoder = self.cls._get_default_encoder(encode_string)
+        return self._encoder
+
+    def default_decoder(self, decode_string):
+        if decode_string is not base64.b64decode:
+            return self.cls._get_default_decoder(decode_string)
+        if self._decoder is None:
+            self._decoder = self.cls._get_default_decoder(decode_string)
+        return self._decoder
+
+
 class StringifyMixin(object):
 
     _TYPE = {}
@@ -135,20 +224,26 @@ class StringifyMixin(object):
                 return True
         return False
 
+    @classmethod
+    def _get_codec(cls):
+        # cls.__dict__ as the codec of a super class doesn't apply
+        codec = cls.__dict__.get('_codec')
+        if codec is None:
+            codec = _Codec(cls)
+            cls._codec = codec
+        return codec
+
     @classmethod
     def _get_type(cls, k):
-        if hasattr(cls, '_TYPE'):
-            for t, attrs in cls._TYPE.iteritems():
-                if k in attrs:
-                    return _types[t]
-        return None
+        return cls._get_codec().types.get(k)
 
     @classmethod
     def _get_encoder(cls, k, encode_string):
-        t = cls._get_type(k)
+        codec = cls._get_codec()
+        t = codec.types.get(k)
         if t:
             return t.encode
-        return cls._get_default_encoder(encode_string)
+        return codec.default_encoder(encode_string)
 
     @classmethod
     def _encode_value(cls, k, v, encode_string=base64.b64encode):
@@ -157,7 +252,10 @@ class StringifyMixin(object):
     @classmethod
     def _get_default_encoder(cls, encode_string):
         def _encode(v):
-            if isinstance(v, (bytes, unicode)):
+            if type(v) in _SCALAR_TYPES:
+                # the most common case.  avoid the exception below.
+                json_value = v
+            elif isinstance(v, (bytes, unicode)):
                 json_value = encode_string(v)
             elif isinstance(v, list):
                 json_value = map(_encode, v)
@@ -203,9 +301,19 @@ class StringifyMixin(object):
         =============  =====================================================
         """
         dict_ = {}
-        encode = lambda k, x: self._encode_value(k, x, encode_string)
-        for k, v in obj_attrs(self):
-            dict_[k] = encode(k, v)
+        codec = self._get_codec()
+        if codec.default_encode_value:
+            types = codec.types
+            default = codec.default_encoder(encode_string)
+            for k, v in codec.attrs(self):
+                t = types.get(k)
+                if t:
+                    dict_[k] = t.encode(v)
+                else:
+                    dict_[k] = default(v)
+        else:
+            for k, v in obj_attrs(self):
+                dict_[k] = self._encode_value(k, v, encode_string)
         return {self.__class__.__name__: dict_}
 
     @classmethod
@@ -224,10 +332,11 @@ class StringifyMixin(object):
 
     @classmethod
     def _get_decoder(cls, k, decode_string):
-        t = cls._get_type(k)
+        codec = cls._get_codec()
+        t = codec.types.get(k)
         if t:
             return t.decode
-        return cls._get_default_decoder(decode_string)
+        return codec.default_decoder(decode_string)
 
     @classmethod
     def _decode_value(cls, k, json_value, decode_string=base64.b64decode,
@@ -260,11 +369,12 @@ class StringifyMixin(object):
 
     @staticmethod
     def _restore_args(dict_):
-        def restore(k):
+        kwargs = {}
+        for k, v in dict_.iteritems():
             if k in _RESERVED_KEYWORD:
-                return k + '_'
-            return k
-        return _mapdict_key(restore, dict_)
+                k += '_'
+            kwargs[k] = v
+        return kwargs
 
     @classmethod
     def from_jsondict(cls, dict_, decode_string=base64.b64decode,
@@ -288,9 +398,22 @@ class StringifyMixin(object):
         additional_args (Optional) Additional kwargs for constructor.
         =============== =====================================================
         """
-        decode = lambda k, x: cls._decode_value(k, x, decode_string,
-                                                **additional_args)
-        kwargs = cls._restore_args(_mapdict_kv(decode, dict_))
+        codec = cls._get_codec()
+        decoded = {}
+        if codec.default_decode_value:
+            types = codec.types
+            default = codec.default_decoder(decode_string)
+            for k, v in dict_.iteritems():
+                t = types.get(k)
+                if t:
+                    decoded[k] = t.decode(v)
+                else:
+                    decoded[k] = default(v)
+        else:
+            for k, v in dict_.iteritems():
+                decoded[k] = cls._decode_value(k, v, decode_string,
+                                               **additional_args)
+        kwargs = cls._restore_args(decoded)
         try:
             return cls(**dict(kwargs, **additional_args))
         except TypeError:
@@ -317,7 +440,16 @@ def obj_python_attrs(msg_):
             yield(k, getattr(msg_, k))
         return
     base = getattr(msg_, '_base_attributes', [])
-    for k, v in inspect.getmembers(msg_):
+    # as attributes of the class are skipped below, only the ones in
+    # __dict__ of the object can be yielded.  avoid inspect.getmembers,
+    # which is slow as it gets all the attributes including methods.
+    try:
+        members = sorted(vars(msg_).items())
+    except TypeError:
+        members = None
+    if members is None or hasattr(msg_, '__dir__'):
+        members = inspect.getmembers(msg_)
+    for k, v in members:
         if k.startswith('_'):
             continue
         if callable(v):
@@ -30,14 +30,35 @@ from . import ofproto_common
 LOG = logging.getLogger('ryu.ofproto.ofproto_parser')
 
 
-def header(buf):
-    assert len(buf) >= ofproto_common.OFP_HEADER_SIZE
+def header(buf, offset=0):
+    assert len(buf) - offset >= ofproto_common.OFP_HEADER_SIZE
     #LOG.debug('len %d bufsize %d', len(buf), ofproto.OFP_HEADER_SIZE)
-    return struct.unpack_from(ofproto_common.OFP_HEADER_PACK_STR, buffer(buf))
+    return struct.unpack_from(ofproto_common.OFP_HEADER_PACK_STR, buffer(buf),
+                              offset)
 
 
 _MSG_PARSERS = {}
 
+# If True, parsers defer decoding of the expensive parts of received
+# messages until they are accessed.  See MsgBase.set_lazy_attr.
+_lazy_parse = False
+
+
+def set_lazy_parse(enable):
+    """
+    Enable or disable lazy parsing of received messages.
+
+    When enabled, attributes like match of OFPPacketIn or body of
+    OFPFlowStatsReply are decoded on the first access.  Applications
+    which only look at e.g. data or buffer_id of a message never pay
+    for decoding the rest of it.  Note that errors in the deferred part
+    of a malformed message are raised on the access rather than logged
+    by msg().
+    """
+    global _lazy_parse
+
+    _lazy_parse = enable
+
 
 def register_msg_parser(version):
     def register(msg_parser):
@@ -162,6 +183,41 @@ class MsgBase(StringifyMixin):
     def set_buf(self, buf):
         self.buf = buffer(buf)
 
+    def set_lazy_attr(self, name, decode, *args):
+        """
+        Set the attribute specified by name to decode(*args).
+
+        If lazy parsing is enabled, decode is not called until the
+        attribute is accessed for the first time.
+        """
+        if not _lazy_parse:
+            setattr(self, name, decode(*args))
+            return
+        # remove the default value set by __init__ so that the access
+        # falls back to __getattr__.
+        self.__dict__.pop(name, None)
+        self.__dict__.setdefault('_lazy_attrs', {})[name] = (decode, args)
+
+    def __getattr__(self, name):
+        # only called when the ordinary attribute lookup failed.
+        lazy_attrs = self.__dict__.get('_lazy_attrs')
+        if not lazy_attrs or name not in lazy_attrs:
+            raise AttributeError("'%s' object has no attribute '%s'" %
+                                 (self.__class__.__name__, name))
+        decode, args = lazy_attrs[name]
+        # keep the entry until decode succeeds, so that a parse error is
+        # raised again by the following accesses.
+        value = decode(*args)
+        del lazy_attrs[name]
+        setattr(self, name, value)
+        return value
+
+    def stringify_attrs(self):
+        # decode the lazy attributes first to make them visible.
+        for name in self.__dict__.get('_lazy_attrs', {}).keys():
+            getattr(self, name)
+        return super(MsgBase, self).stringify_attrs()
+
     def __str__(self):
         buf = 'version: 0x%x msg_type 0x%x xid 0x%x ' % (self.version,
                                                          self.msg_type,
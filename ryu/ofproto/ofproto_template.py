@@ -0,0 +1,183 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Pre-compiled OpenFlow message templates
+
+A template is compiled once from a function which builds a message,
+e.g. OFPFlowMod, from a set of placeholder values.  The compiler
+serializes the message with probe values to find where each placeholder
+is placed in the wire encoding.  After that, a message is made by
+copying the encoding and patching the placeholders in place, without
+composing and serializing message objects.
+
+Example::
+
+    def build(in_port, eth_dst, out_port, buffer_id):
+        match = parser.OFPMatch(in_port=in_port, eth_dst=eth_dst)
+        actions = [parser.OFPActionOutput(out_port)]
+        inst = [parser.OFPInstructionActions(ofproto.OFPIT_APPLY_ACTIONS,
+                                             actions)]
+        return parser.OFPFlowMod(datapath=datapath, priority=1,
+                                 buffer_id=buffer_id, match=match,
+                                 instructions=inst)
+
+    template = ofproto_template.MsgTemplate(
+        build,
+        in_port=ofproto_template.UINT32,
+        eth_dst=ofproto_template.MAC,
+        out_port=ofproto_template.UINT32,
+        buffer_id=ofproto_template.UINT32)
+
+    template.send(datapath, in_port=1, eth_dst='00:00:00:00:00:01',
+                  out_port=2, buffer_id=ofproto.OFP_NO_BUFFER)
+
+A placeholder must be encoded verbatim in the message, i.e. its wire
+encoding must not depend on the other values nor change the length of
+the message.  Otherwise, the compiler raises ValueError.
+"""
+
+import struct
+
+from ryu.lib import addrconv
+
+
+class FieldType(object):
+    """
+    Describe how a placeholder value is encoded.
+
+    ========= ============================================================
+    Attribute Description
+    ========= ============================================================
+    struct    struct.Struct of the encoded value
+    probes    A pair of values whose encodings differ in every byte
+    to_wire   A function which converts a value to the argument of
+              struct.pack, or None for the identity
+    ========= ============================================================
+    """
+
+    def __init__(self, fmt, probes, to_wire=None):
+        super(FieldType, self).__init__()
+        self.struct = struct.Struct(fmt)
+        self.size = self.struct.size
+        self.probes = probes
+        self.to_wire = to_wire
+
+    def pack(self, value):
+        if self.to_wire is not None:
+            value = self.to_wire(value)
+        return self.struct.pack(value)
+
+
+UINT8 = FieldType('!B', (0x5a, 0xa5))
+UINT16 = FieldType('!H', (0x5a5a, 0xa5a5))
+UINT32 = FieldType('!I', (0x5a5a5a5a, 0xa5a5a5a5))
+UINT64 = FieldType('!Q', (0x5a5a5a5a5a5a5a5a, 0xa5a5a5a5a5a5a5a5))
+MAC = FieldType('!6s', ('5a:5a:5a:5a:5a:5a', 'a5:a5:a5:a5:a5:a5'),
+                addrconv.mac.text_to_bin)
+IPV4 = FieldType('!4s', ('90.90.90.90', '165.165.165.165'),
+                 addrconv.ipv4.text_to_bin)
+
+_XID_OFFSET = 4
+_XID = struct.Struct('!I')
+
+
+class MsgTemplate(object):
+    """
+    A compiled message template.
+
+    ========= ============================================================
+    Argument  Description
+    ========= ============================================================
+    build     A function which takes the placeholder values as keyword
+              arguments and returns a message.  It's called only during
+              compilation.
+    fields    The placeholder names and their FieldType
+    ========= ============================================================
+
+    The template can be used for every datapath which speaks the
+    same OpenFlow version as the message built by build.
+    """
+
+    def __init__(self, build, **fields):
+        super(MsgTemplate, self).__init__()
+        self.fields = fields
+        base = dict((name, t.probes[0]) for name, t in fields.iteritems())
+        msg = build(**base)
+        self.buf = self._serialize(msg)
+        self.version = msg.version
+
+        # [(name, FieldType, [offset, ...]), ...]
+        self._patches = []
+        for name, t in fields.iteritems():
+            values = dict(base)
+            values[name] = t.probes[1]
+            offsets = self._compile_field(name, t,
+                                          self._serialize(build(**values)))
+            self._patches.append((name, t, offsets))
+
+    @staticmethod
+    def _serialize(msg):
+        msg.serialize()
+        return str(msg.buf)
+
+    def _compile_field(self, name, t, buf):
+        if len(buf) != len(self.buf):
+            raise ValueError('placeholder %s changes the message length' %
+                             name)
+        diffs = [i for i in xrange(len(buf)) if buf[i] != self.buf[i]]
+        if not diffs:
+            raise ValueError('placeholder %s is not used' % name)
+
+        expected = [t.pack(p) for p in t.probes]
+        offsets = []
+        while diffs:
+            offset = diffs[0]
+            if (diffs[:t.size] != range(offset, offset + t.size) or
+                    self.buf[offset:offset + t.size] != expected[0] or
+                    buf[offset:offset + t.size] != expected[1]):
+                raise ValueError('placeholder %s is not encoded verbatim' %
+                                 name)
+            offsets.append(offset)
+            del diffs[:t.size]
+        return offsets
+
+    def to_buf(self, **values):
+        """
+        Returns the wire encoding of the message with the given
+        placeholder values as a bytearray.
+        All placeholder values must be given.  The xid is zero.
+        """
+        buf = bytearray(self.buf)
+        for name, t, offsets in self._patches:
+            value = values[name]
+            if t.to_wire is not None:
+                value = t.to_wire(value)
+            for offset in offsets:
+                t.struct.pack_into(buf, offset, value)
+        return buf
+
+    def send(self, datapath, **values):
+        """
+        Send the message with the given placeholder values to datapath.
+        A new xid is assigned as Datapath.send_msg does.
+        Returns the xid.
+        """
+        assert datapath.ofproto.OFP_VERSION == self.version
+        buf = self.to_buf(**values)
+        xid = datapath.next_xid()
+        _XID.pack_into(buf, _XID_OFFSET, xid)
+        datapath.send(buf)
+        return xid
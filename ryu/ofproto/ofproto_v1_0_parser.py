@@ -1774,7 +1774,8 @@ class OFPFlowRemoved(MsgBase):
         msg = super(OFPFlowRemoved, cls).parser(datapath, version, msg_type,
                                                 msg_len, xid, buf)
 
-        msg.match = OFPMatch.parse(msg.buf, ofproto.OFP_HEADER_SIZE)
+        msg.set_lazy_attr('match', OFPMatch.parse, msg.buf,
+                          ofproto.OFP_HEADER_SIZE)
 
         (msg.cookie,
          msg.priority,
@@ -1864,8 +1865,8 @@ class OFPStatsReply(MsgBase):
         # call MsgBase::parser, not OFPStatsReply::parser
         msg = MsgBase.parser.__func__(
             cls, datapath, version, msg_type, msg_len, xid, buf)
-        msg.body = msg.parser_stats_body(msg.buf, msg.msg_len,
-                                         ofproto.OFP_STATS_MSG_SIZE)
+        msg.set_lazy_attr('body', msg.parser_stats_body, msg.buf,
+                          msg.msg_len, ofproto.OFP_STATS_MSG_SIZE)
         return msg
 
     @classmethod
@@ -2003,7 +2004,8 @@ class NXStatsReply(OFPStatsReply):
                      buf, offset):
         msg = MsgBase.parser.__func__(
             cls, datapath, version, msg_type, msg_len, xid, buf)
-        msg.body = msg.parser_stats_body(msg.buf, msg.msg_len, offset)
+        msg.set_lazy_attr('body', msg.parser_stats_body, msg.buf,
+                          msg.msg_len, offset)
 
         return msg
 
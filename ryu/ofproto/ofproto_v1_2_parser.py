@@ -600,12 +600,14 @@ class OFPPacketIn(MsgBase):
             ofproto.OFP_PACKET_IN_PACK_STR,
             msg.buf, ofproto.OFP_HEADER_SIZE)
 
-        msg.match = OFPMatch.parser(msg.buf, ofproto.OFP_PACKET_IN_SIZE -
-                                    ofproto.OFP_MATCH_SIZE)
+        match_offset = ofproto.OFP_PACKET_IN_SIZE - ofproto.OFP_MATCH_SIZE
+        msg.set_lazy_attr('match', OFPMatch.parser, msg.buf, match_offset)
 
-        match_len = utils.round_up(msg.match.length, 8)
-        msg.data = msg.buf[(ofproto.OFP_PACKET_IN_SIZE -
-                            ofproto.OFP_MATCH_SIZE + match_len + 2):]
+        # read the length of the match without decoding it.
+        (_type, match_len) = struct.unpack_from('!HH', msg.buf,
+                                                 match_offset)
+        match_len = utils.round_up(match_len, 8)
+        msg.data = msg.buf[match_offset + match_len + 2:]
 
         if msg.total_len < len(msg.data):
             # discard padding for 8-byte alignment of OFP packet
@@ -705,7 +707,7 @@ class OFPFlowRemoved(MsgBase):
         offset = (ofproto.OFP_FLOW_REMOVED_SIZE -
                   ofproto.OFP_MATCH_SIZE)
 
-        msg.match = OFPMatch.parser(msg.buf, offset)
+        msg.set_lazy_attr('match', OFPMatch.parser, msg.buf, offset)
 
         return msg
 
@@ -1870,20 +1872,22 @@ class OFPStatsReply(MsgBase):
             ofproto.OFP_STATS_REPLY_PACK_STR, msg.buf,
             ofproto.OFP_HEADER_SIZE)
         stats_type_cls = cls._STATS_TYPES.get(msg.type)
+        msg.set_lazy_attr('body', cls._parser_body, stats_type_cls,
+                          msg.buf, msg_len)
+        return msg
 
+    @staticmethod
+    def _parser_body(stats_type_cls, buf, msg_len):
         offset = ofproto.OFP_STATS_REPLY_SIZE
         body = []
         while offset < msg_len:
-            r = stats_type_cls.parser(msg.buf, offset)
+            r = stats_type_cls.parser(buf, offset)
             body.append(r)
             offset += r.length
 
         if stats_type_cls.cls_body_single_struct:
-            msg.body = body[0]
-        else:
-            msg.body = body
-
-        return msg
+            return body[0]
+        return body
 
 
 @_set_msg_type(ofproto.OFPT_STATS_REQUEST)
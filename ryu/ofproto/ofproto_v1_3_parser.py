@@ -40,6 +40,7 @@ The following extensions are not implemented yet.
     - EXT-192-v Vacancy events Extension
 """
 
+import copy
 import struct
 import itertools
 
@@ -1444,6 +1445,169 @@ class OFPMatch(StringifyMixin):
         self._flow.ipv6_exthdr = hdr
 
 
+class OFPFrozenMatch(object):
+    """
+    Immutable flow match structure with cached wire encoding
+
+    This class is composed with the same keyword arguments as ``OFPMatch``
+    (the old set_* API is not available) and can be used in place of it
+    in messages sent to switches, e.g. ``OFPFlowMod``.
+    The wire encoding is computed once when the object is created and
+    serialize() just copies it.
+
+    Two objects are equal if and only if their wire encodings are equal.
+    They are hashable, so they can be used as dict keys, e.g. to dedupe
+    flow entries or to share pre-encoded matches among datapaths.
+
+    ================ ======================================================
+    Attribute        Description
+    ================ ======================================================
+    buf              The wire encoding including the trailing padding
+    ================ ======================================================
+
+    Example::
+
+        >>> match = parser.OFPFrozenMatch(in_port=1, eth_dst=dst)
+        >>> flows[match] = actions
+        >>> if 'in_port' in match:
+        ...     print match['in_port']
+        ...
+        1
+    """
+
+    __slots__ = ['buf', '_fields2', '_fields']
+
+    def __init__(self, _ordered_fields=None, **kwargs):
+        match = OFPMatch(_ordered_fields=_ordered_fields, **kwargs)
+        buf = bytearray()
+        match.serialize(buf, 0)
+        object.__setattr__(self, 'buf', str(buf))
+        object.__setattr__(self, '_fields2', tuple(match._fields2))
+
+    @classmethod
+    def from_match(cls, match):
+        """
+        Returns an object which has the same fields as the given OFPMatch.
+        """
+        if match._composed_with_old_api():
+            # serialize a copy as serialize_old is destructive
+            buf = bytearray()
+            copy.deepcopy(match).serialize(buf, 0)
+            return cls.parser(str(buf), 0)
+        return cls(_ordered_fields=match._fields2)
+
+    @classmethod
+    def parser(cls, buf, offset):
+        """
+        Returns an object which is generated from a buffer including the
+        expression of the wire protocol of the flow match.
+        """
+        match = OFPMatch.parser(buf, offset)
+        return cls(_ordered_fields=match._fields2)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('%s is immutable' % self.__class__.__name__)
+
+    def __delattr__(self, name):
+        raise AttributeError('%s is immutable' % self.__class__.__name__)
+
+    # immutable, so a copy is the object itself.
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # a bound classmethod can't be pickled with Python 2.
+        return (_frozen_match_parser, (self.buf,))
+
+    def __eq__(self, other):
+        return isinstance(other, OFPFrozenMatch) and self.buf == other.buf
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.buf)
+
+    @property
+    def type(self):
+        return ofproto.OFPMT_OXM
+
+    @property
+    def length(self):
+        # excluding the padding
+        return struct.unpack_from('!HH', self.buf)[1]
+
+    def _fields_dict(self):
+        # built on the first lookup and reused, as the fields never change.
+        try:
+            return self._fields
+        except AttributeError:
+            fields = dict(self._fields2)
+            object.__setattr__(self, '_fields', fields)
+            return fields
+
+    def __getitem__(self, key):
+        return self._fields_dict()[key]
+
+    def __contains__(self, key):
+        return key in self._fields_dict()
+
+    def iteritems(self):
+        return self._fields_dict().iteritems()
+
+    def get(self, key, default=None):
+        return self._fields_dict().get(key, default)
+
+    def serialize(self, buf, offset):
+        """
+        Outputs the expression of the wire protocol of the flow match into
+        the buf.
+        Returns the output length.
+        """
+        if len(buf) == offset:
+            buf += self.buf
+        else:
+            msg_pack_into('!%ds' % len(self.buf), buf, offset, self.buf)
+        return len(self.buf)
+
+    def to_jsondict(self):
+        """
+        Returns a dict expressing the flow match.
+
+        The dict is the same as the one of the equivalent OFPMatch.
+        """
+        body = {"oxm_fields": [ofproto.oxm_to_jsondict(k, uv) for k, uv
+                               in self._fields2],
+                "length": self.length,
+                "type": self.type}
+        return {"OFPMatch": body}
+
+    @classmethod
+    def from_jsondict(cls, dict_):
+        """
+        Returns an object which is generated from a dict.
+
+        Exception raises:
+        KeyError -- Unknown match field is defined in dict
+        """
+        fields = [ofproto.oxm_from_jsondict(f) for f
+                  in dict_['oxm_fields']]
+        return cls(_ordered_fields=fields)
+
+    def __str__(self):
+        return '%s(oxm_fields=%r)' % (self.__class__.__name__,
+                                      self._fields_dict())
+
+    __repr__ = __str__
+
+
+def _frozen_match_parser(buf):
+    return OFPFrozenMatch.parser(buf, 0)
+
+
 class OFPMatchField(StringifyMixin):
     _FIELDS_HEADERS = {}
 
@@ -2069,12 +2233,14 @@ class OFPPacketIn(MsgBase):
             ofproto.OFP_PACKET_IN_PACK_STR,
             msg.buf, ofproto.OFP_HEADER_SIZE)
 
-        msg.match = OFPMatch.parser(msg.buf, ofproto.OFP_PACKET_IN_SIZE -
-                                    ofproto.OFP_MATCH_SIZE)
+        match_offset = ofproto.OFP_PACKET_IN_SIZE - ofproto.OFP_MATCH_SIZE
+        msg.set_lazy_attr('match', OFPMatch.parser, msg.buf, match_offset)
 
-        match_len = utils.round_up(msg.match.length, 8)
-        msg.data = msg.buf[(ofproto.OFP_PACKET_IN_SIZE -
-                            ofproto.OFP_MATCH_SIZE + match_len + 2):]
+        # read the length of the match without decoding it.
+        (_type, match_len) = struct.unpack_from('!HH', msg.buf,
+                                                 match_offset)
+        match_len = utils.round_up(match_len, 8)
+        msg.data = msg.buf[match_offset + match_len + 2:]
 
         if msg.total_len < len(msg.data):
             # discard padding for 8-byte alignment of OFP packet
@@ -2173,7 +2339,7 @@ class OFPFlowRemoved(MsgBase):
         offset = (ofproto.OFP_FLOW_REMOVED_SIZE -
                   ofproto.OFP_MATCH_SIZE)
 
-        msg.match = OFPMatch.parser(msg.buf, offset)
+        msg.set_lazy_attr('match', OFPMatch.parser, msg.buf, offset)
 
         return msg
 
@@ -2402,7 +2568,7 @@ class OFPFlowMod(MsgBase):
         self.flags = flags
         if match is None:
             match = OFPMatch()
-        assert isinstance(match, OFPMatch)
+        assert isinstance(match, (OFPMatch, OFPFrozenMatch))
         self.match = match
         for i in instructions:
             assert isinstance(i, OFPInstruction)
@@ -3506,8 +3672,8 @@ class OFPMultipartReply(MsgBase):
     def parser_stats(cls, datapath, version, msg_type, msg_len, xid, buf):
         msg = MsgBase.parser.__func__(
             cls, datapath, version, msg_type, msg_len, xid, buf)
-        msg.body = msg.parser_stats_body(msg.buf, msg.msg_len,
-                                         ofproto.OFP_MULTIPART_REPLY_SIZE)
+        msg.set_lazy_attr('body', msg.parser_stats_body, msg.buf,
+                          msg.msg_len, ofproto.OFP_MULTIPART_REPLY_SIZE)
         return msg
 
     @classmethod
@@ -3520,19 +3686,22 @@ class OFPMultipartReply(MsgBase):
             datapath, version, msg_type, msg_len, xid, buf)
         msg.type = type_
         msg.flags = flags
+        msg.set_lazy_attr('body', cls._parser_body, stats_type_cls,
+                          msg.buf, msg_len)
+        return msg
 
+    @staticmethod
+    def _parser_body(stats_type_cls, buf, msg_len):
         offset = ofproto.OFP_MULTIPART_REPLY_SIZE
         body = []
         while offset < msg_len:
-            b = stats_type_cls.cls_stats_body_cls.parser(msg.buf, offset)
+            b = stats_type_cls.cls_stats_body_cls.parser(buf, offset)
             body.append(b)
             offset += b.length if hasattr(b, 'length') else b.len
 
         if stats_type_cls.cls_body_single_struct:
-            msg.body = body[0]
-        else:
-            msg.body = body
-        return msg
+            return body[0]
+        return body
 
 
 class OFPDescStats(ofproto_parser.namedtuple('OFPDescStats', (
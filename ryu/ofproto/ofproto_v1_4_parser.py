@@ -1635,12 +1635,14 @@ class OFPPacketIn(MsgBase):
             ofproto.OFP_PACKET_IN_PACK_STR,
             msg.buf, ofproto.OFP_HEADER_SIZE)
 
-        msg.match = OFPMatch.parser(msg.buf, ofproto.OFP_PACKET_IN_SIZE -
-                                    ofproto.OFP_MATCH_SIZE)
+        match_offset = ofproto.OFP_PACKET_IN_SIZE - ofproto.OFP_MATCH_SIZE
+        msg.set_lazy_attr('match', OFPMatch.parser, msg.buf, match_offset)
 
-        match_len = utils.round_up(msg.match.length, 8)
-        msg.data = msg.buf[(ofproto.OFP_PACKET_IN_SIZE -
-                            ofproto.OFP_MATCH_SIZE + match_len + 2):]
+        # read the length of the match without decoding it.
+        (_type, match_len) = struct.unpack_from('!HH', msg.buf,
+                                                 match_offset)
+        match_len = utils.round_up(match_len, 8)
+        msg.data = msg.buf[match_offset + match_len + 2:]
 
         if msg.total_len < len(msg.data):
             # discard padding for 8-byte alignment of OFP packet
@@ -1740,7 +1742,7 @@ class OFPFlowRemoved(MsgBase):
 
         offset = (ofproto.OFP_FLOW_REMOVED_SIZE - ofproto.OFP_MATCH_SIZE)
 
-        msg.match = OFPMatch.parser(msg.buf, offset)
+        msg.set_lazy_attr('match', OFPMatch.parser, msg.buf, offset)
 
         return msg
 
@@ -1982,8 +1984,8 @@ class OFPMultipartReply(MsgBase):
     def parser_stats(cls, datapath, version, msg_type, msg_len, xid, buf):
         msg = MsgBase.parser.__func__(
             cls, datapath, version, msg_type, msg_len, xid, buf)
-        msg.body = msg.parser_stats_body(msg.buf, msg.msg_len,
-                                         ofproto.OFP_MULTIPART_REPLY_SIZE)
+        msg.set_lazy_attr('body', msg.parser_stats_body, msg.buf,
+                          msg.msg_len, ofproto.OFP_MULTIPART_REPLY_SIZE)
         return msg
 
     @classmethod
@@ -1996,19 +1998,22 @@ class OFPMultipartReply(MsgBase):
             datapath, version, msg_type, msg_len, xid, buf)
         msg.type = type_
         msg.flags = flags
+        msg.set_lazy_attr('body', cls._parser_body, stats_type_cls,
+                          msg.buf, msg_len)
+        return msg
 
+    @staticmethod
+    def _parser_body(stats_type_cls, buf, msg_len):
         offset = ofproto.OFP_MULTIPART_REPLY_SIZE
         body = []
         while offset < msg_len:
-            b = stats_type_cls.cls_stats_body_cls.parser(msg.buf, offset)
+            b = stats_type_cls.cls_stats_body_cls.parser(buf, offset)
             body.append(b)
             offset += b.length if hasattr(b, 'length') else b.len
 
         if stats_type_cls.cls_body_single_struct:
-            msg.body = body[0]
-        else:
-            msg.body = body
-        return msg
+            return body[0]
+        return body
 
 
 class OFPDescStats(ofproto_parser.namedtuple('OFPDescStats', (
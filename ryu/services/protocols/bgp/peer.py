@@ -33,6 +33,7 @@ from ryu.services.protocols.bgp.net_ctrl import NET_CONTROLLER
 from ryu.services.protocols.bgp.rtconf.neighbors import NeighborConfListener
 from ryu.services.protocols.bgp.signals.emit import BgpSignalBus
 from ryu.services.protocols.bgp.speaker import BgpProtocol
+from ryu.services.protocols.bgp.speaker import BGP_MAX_MSG_LEN
 from ryu.services.protocols.bgp.utils import bgp as bgp_utils
 from ryu.services.protocols.bgp.utils.evtlet import EventletIOFactory
 from ryu.services.protocols.bgp.utils import stats
@@ -72,6 +73,10 @@ from ryu.lib.packet.bgp import BGP_ATTR_TYPE_EXTENDED_COMMUNITIES
 
 LOG = logging.getLogger('bgpspeaker.peer')
 
+# Time in seconds an outgoing route waits at most to be packed with the
+# following routes into an UPDATE message.
+UPDATE_PACK_DELAY = 0.05
+
 
 def is_valid_state(state):
     """Returns True if given state is a valid bgp finite state machine state.
@@ -114,6 +119,107 @@ PeerCounterNames = namedtuple(
 )
 
 
+class UpdatePacker(object):
+    """Packs the UPDATE messages constructed for single outgoing routes into
+    fewer UPDATE messages.
+
+    `add` merges the prefix of each message into a pending message with
+    identical path attributes; the prefixes are carried in NLRI or withdrawn
+    routes, or in MP_REACH_NLRI or MP_UNREACH_NLRI for the other route
+    families.  A pending message is returned as ready once another prefix
+    does not fit in `max_len` octets.  If a prefix is added while it is
+    still pending, all pending messages are returned first, so the updates
+    of a prefix are sent in order.  The caller sends the remaining pending
+    messages returned by `flush`.
+    """
+
+    # Slack for the extended length of a growing MP_(UN)REACH_NLRI attribute.
+    _MP_ATTR_SLACK = 1
+
+    def __init__(self, max_len=BGP_MAX_MSG_LEN):
+        self.max_len = max_len
+        # Group key -> [update, its list of prefixes, estimated length,
+        # [route, ...]], in the order the groups are created.
+        self._pending = OrderedDict()
+        # (afi, safi, binary prefix) of the pending routes.
+        self._prefixes = set()
+
+    def __len__(self):
+        """Returns the number of pending routes."""
+        return len(self._prefixes)
+
+    @staticmethod
+    def _split(update):
+        # Returns the group key, the list holding the single prefix of
+        # `update`, its (afi, safi) and the slack needed to grow the list.
+        if update.withdrawn_routes:
+            return (('withdrawn',), update.withdrawn_routes,
+                    (RF_IPv4_UC.afi, RF_IPv4_UC.safi), 0)
+
+        key = []
+        prefixes = None
+        for attr in update.path_attributes:
+            if isinstance(attr, BGPPathAttributeMpReachNLRI):
+                key.append(('mp_reach', attr.afi, attr.safi, attr.next_hop))
+                prefixes, rf, slack = attr.nlri, (attr.afi, attr.safi), \
+                    UpdatePacker._MP_ATTR_SLACK
+            elif isinstance(attr, BGPPathAttributeMpUnreachNLRI):
+                key.append(('mp_unreach', attr.afi, attr.safi))
+                prefixes, rf, slack = attr.withdrawn_routes, \
+                    (attr.afi, attr.safi), UpdatePacker._MP_ATTR_SLACK
+            else:
+                key.append(str(attr.serialize()))
+        if prefixes is None:
+            prefixes, rf, slack = update.nlri, \
+                (RF_IPv4_UC.afi, RF_IPv4_UC.safi), 0
+        return tuple(key), prefixes, rf, slack
+
+    def add(self, update, route=None):
+        """Adds `update` constructed for the outgoing route `route`.
+
+        `update` must carry a single prefix.  Returns the list of
+        (update, [route, ...]) of the messages which are ready to send.
+        """
+        ready = []
+        key, prefixes, rf, slack = self._split(update)
+        assert len(prefixes) == 1, 'Update to pack has not a single prefix.'
+        bin_prefix = prefixes[0].serialize()
+        prefix_key = rf + (str(bin_prefix),)
+        if prefix_key in self._prefixes:
+            ready = self.flush()
+
+        group = self._pending.get(key)
+        if group is not None:
+            length = group[2] + len(bin_prefix)
+            if length + slack <= self.max_len:
+                group[1].append(prefixes[0])
+                group[2] = length
+                group[3].append(route)
+                self._prefixes.add(prefix_key)
+                return ready
+            del self._pending[key]
+            ready.append((group[0], group[3]))
+
+        self._pending[key] = [update, prefixes, len(update.serialize()),
+                              [route]]
+        self._prefixes.add(prefix_key)
+        return ready
+
+    def flush(self):
+        """Returns the list of (update, [route, ...]) of all of the pending
+        messages, and clears them.
+        """
+        ready = [(update, routes) for update, _prefixes, _length, routes
+                 in self._pending.itervalues()]
+        self.clear()
+        return ready
+
+    def clear(self):
+        """Drops all of the pending messages."""
+        self._pending.clear()
+        self._prefixes.clear()
+
+
 class PeerState(object):
     """A BGP neighbor state. Think of this class as of information and stats
     container for Peer.
@@ -306,6 +412,11 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
         # Bound protocol instance
         self._protocol = None
 
+        # Packs the outgoing routes into UPDATE messages until the time
+        # _update_flush_time.
+        self._update_packer = UpdatePacker()
+        self._update_flush_time = 0
+
         # Setting this event starts the connect_loop loop again
         # Clearing this event will stop the connect_loop loop
         self._connect_retry_event = EventletIOFactory.create_custom_event()
@@ -472,40 +583,65 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             LOG.debug('Enhanced RR max. EOR timer set.')
 
     def _send_outgoing_route(self, outgoing_route):
-        """Constructs `Update` message from given `outgoing_route` and sends
-        it to peer.
+        """Constructs `Update` message from given `outgoing_route` and packs
+        it with the other pending outgoing routes of identical path
+        attributes.
 
-        Also, checks if any policies prevent sending this message.
-        Populates Adj-RIB-out with corresponding `SentRoute`.
+        The packed messages are sent to peer when full, or by
+        `_flush_outgoing_routes`.
         """
-        # TODO(PH): optimized by sending several prefixes per update.
-        # Construct and send update message.
         update_msg = self._construct_update(outgoing_route)
+        if not self._update_packer:
+            self._update_flush_time = time.time() + UPDATE_PACK_DELAY
+        for update_msg, outgoing_routes in self._update_packer.add(
+                update_msg, outgoing_route):
+            self._send_packed_update(update_msg, outgoing_routes)
+
+    def _flush_outgoing_routes(self):
+        """Sends the pending packed `Update` messages to peer."""
+        for update_msg, outgoing_routes in self._update_packer.flush():
+            self._send_packed_update(update_msg, outgoing_routes)
+
+    def _send_packed_update(self, update_msg, outgoing_routes):
+        """Sends `update_msg` packed from `outgoing_routes` to peer.
+
+        Populates Adj-RIB-out with corresponding `SentRoute`s.
+        """
         self._protocol.send(update_msg)
         # Collect update statistics.
         self.state.incr(PeerCounterNames.SENT_UPDATES)
 
         # We have to create sent_route for every OutgoingRoute which is
         # not a withdraw or was for route-refresh msg.
-        if (not outgoing_route.path.is_withdraw and
-                not outgoing_route.for_route_refresh):
-            # Update the destination with new sent route.
-            sent_route = SentRoute(outgoing_route.path, self)
-            tm = self._core_service.table_manager
-            tm.remember_sent_route(sent_route)
+        tm = self._core_service.table_manager
+        for outgoing_route in outgoing_routes:
+            if (not outgoing_route.path.is_withdraw and
+                    not outgoing_route.for_route_refresh):
+                # Update the destination with new sent route.
+                sent_route = SentRoute(outgoing_route.path, self)
+                tm.remember_sent_route(sent_route)
 
     def _process_outgoing_msg_list(self):
         while True:
             outgoing_msg = None
 
             if self._protocol is not None:
+                if (self._update_packer and
+                        time.time() >= self._update_flush_time):
+                    self._flush_outgoing_routes()
+                    continue
                 # We pick the first outgoing msg. available and send it.
                 outgoing_msg = self.outgoing_msg_list.pop_first()
 
-            # If we do not have any outgoing route, we wait.
+            # If we do not have any outgoing route, we wait, for the pending
+            # packed routes at most until they are flushed.
             if outgoing_msg is None:
                 self.outgoing_msg_event.clear()
-                self.outgoing_msg_event.wait()
+                if self._protocol is not None and self._update_packer:
+                    self.outgoing_msg_event.wait(
+                        max(self._update_flush_time - time.time(), 0))
+                else:
+                    self.outgoing_msg_event.wait()
                 continue
 
             # Check currently supported out-going msgs.
@@ -516,10 +652,14 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
                 % outgoing_msg)
 
             # Send msg. to peer.
+            if isinstance(outgoing_msg, OutgoingRoute):
+                self._send_outgoing_route(outgoing_msg)
+                continue
+
+            # Other msgs. must follow the routes enqueued before them.
+            self._flush_outgoing_routes()
             if isinstance(outgoing_msg, BGPRouteRefresh):
                 self._send_outgoing_route_refresh_msg(outgoing_msg)
-            elif isinstance(outgoing_msg, OutgoingRoute):
-                self._send_outgoing_route(outgoing_msg)
 
             # EOR are enqueued as plain Update messages.
             elif isinstance(outgoing_msg, BGPUpdate):
@@ -615,6 +755,8 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
                     path.route_family.afi, path.route_family.safi, [path.nlri]
                 )
                 new_pathattr.append(mpunreach_attr)
+                update = BGPUpdate(path_attributes=new_pathattr)
+                return update
         else:
             # Supported and un-supported/unknown attributes.
             origin_attr = None
@@ -1702,6 +1844,7 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             self._sent_init_non_rtc_update = False
             # Clear sink.
             self.clear_outgoing_msg_list()
+            self._update_packer.clear()
             # Un-schedule timers
             self._unschedule_sending_init_updates()
 
@@ -56,6 +56,11 @@ LOG = logging.getLogger('bgpspeaker.speaker')
 BGP_MIN_MSG_LEN = 19
 BGP_MAX_MSG_LEN = 4096
 
+# Size of the buffer into which the bytes are received from peer.  As it is
+# larger than any bgp message, moving a partial message to its front always
+# makes room for more bytes.
+BGP_RECV_BUFF_LEN = BGP_MAX_MSG_LEN * 16
+
 # Keep-alive singleton.
 _KEEP_ALIVE = BGPKeepAlive()
 
@@ -98,7 +103,12 @@ class BgpProtocol(Protocol, Activity):
         Activity.__init__(self, name=activity_name)
         # Intialize instance variables.
         self._peer = None
-        self._recv_buff = ''
+        # self._recv_buff[_recv_head:_recv_tail] holds the bytes received
+        # from peer which are not parsed yet.
+        self._recv_buff = bytearray(BGP_RECV_BUFF_LEN)
+        self._recv_view = memoryview(self._recv_buff)
+        self._recv_head = 0
+        self._recv_tail = 0
         self._socket = socket
         self._signal_bus = signal_bus
         self._holdtime = None
@@ -260,8 +270,36 @@ class BgpProtocol(Protocol, Activity):
         self._recv_loop()
 
     def data_received(self, next_bytes):
+        """Handles `next_bytes` received from peer.
+
+        `_recv_loop` receives the bytes into the buffer directly.
+        """
+        offset = 0
+        while offset < len(next_bytes):
+            room = self._recv_room()
+            nbytes = min(len(room), len(next_bytes) - offset)
+            room[:nbytes] = next_bytes[offset:offset + nbytes]
+            offset += nbytes
+            self._bytes_received(nbytes)
+
+    def _recv_room(self):
+        """Returns a memoryview of the free room of the receive buffer."""
+        if self._recv_tail == len(self._recv_buff):
+            # No room left.  Move the partial message to the front.
+            head = self._recv_head
+            tail = self._recv_tail
+            self._recv_buff[:tail - head] = self._recv_buff[head:tail]
+            self._recv_tail = tail - head
+            self._recv_head = 0
+        return self._recv_view[self._recv_tail:]
+
+    def _bytes_received(self, nbytes):
+        """Handles `nbytes` bytes received into the free room of the receive
+        buffer.
+        """
+        self._recv_tail += nbytes
         try:
-            self._data_received(next_bytes)
+            self._data_received()
         except bgp.BgpExc as exc:
             LOG.error(
                 "BGPExc Exception while receiving data: "
@@ -275,35 +313,30 @@ class BgpProtocol(Protocol, Activity):
             raise exc
 
     @staticmethod
-    def parse_msg_header(buff):
-        """Parses given `buff` into bgp message header format.
+    def parse_msg_header(buff, offset=0):
+        """Parses the bgp message header at `offset` in given `buff`.
 
         Returns a tuple of marker, length, type of bgp message.
         """
-        return struct.unpack('!16sHB', buff)
+        return struct.unpack_from('!16sHB', buffer(buff), offset)
 
-    def _data_received(self, next_bytes):
-        """Maintains buffer of bytes received from peer and extracts bgp
-        message from this buffer if enough data is received.
+    def _data_received(self):
+        """Extracts bgp messages from the buffer of bytes received from peer
+        if enough data is received.
 
         Validates bgp message marker, length, type and data and constructs
         appropriate bgp message instance and calls handler.
-
-        :Parameters:
-            - `next_bytes`: next set of bytes received from peer.
         """
-        # Append buffer with received bytes.
-        self._recv_buff += next_bytes
-
         while True:
+            head = self._recv_head
             # If current buffer size is less then minimum bgp message size, we
             # return as we do not have a complete bgp message to work with.
-            if len(self._recv_buff) < BGP_MIN_MSG_LEN:
-                return
+            if self._recv_tail - head < BGP_MIN_MSG_LEN:
+                break
 
             # Parse message header into elements.
             auth, length, ptype = BgpProtocol.parse_msg_header(
-                self._recv_buff[:BGP_MIN_MSG_LEN])
+                self._recv_buff, head)
 
             # Check if we have valid bgp message marker.
             # We should get default marker since we are not supporting any
@@ -335,14 +368,20 @@ class BgpProtocol(Protocol, Activity):
                 raise bgp.BadLen(ptype, length)
 
             # If we have partial message we wait for rest of the message.
-            if len(self._recv_buff) < length:
-                return
-            msg, rest = BGPMessage.parser(self._recv_buff)
-            self._recv_buff = rest
+            if self._recv_tail - head < length:
+                break
+            # The buffer given to the parser ends at the message, so the
+            # bytes following it are not copied.
+            msg, _rest = BGPMessage.parser(
+                buffer(self._recv_buff, 0, head + length), head)
+            self._recv_head = head + length
 
             # If we have a valid bgp message we call message handler.
             self._handle_msg(msg)
 
+        if self._recv_head == self._recv_tail:
+            self._recv_head = self._recv_tail = 0
+
     def send_notification(self, code, subcode):
         """Utility to send notification message.
 
@@ -534,15 +573,14 @@ class BgpProtocol(Protocol, Activity):
         """Sits in tight loop collecting data received from peer and
         processing it.
         """
-        required_len = BGP_MIN_MSG_LEN
         conn_lost_reason = "Connection lost as protocol is no longer active"
         try:
             while True:
-                next_bytes = self._socket.recv(required_len)
-                if len(next_bytes) == 0:
+                nbytes = self._socket.recv_into(self._recv_room())
+                if nbytes == 0:
                     conn_lost_reason = 'Peer closed connection'
                     break
-                self.data_received(next_bytes)
+                self._bytes_received(nbytes)
         except socket.error as err:
             conn_lost_reason = 'Connection to peer lost: %s.' % err
         except bgp.BgpExc as ex:
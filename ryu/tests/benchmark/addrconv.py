@@ -0,0 +1,153 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of ryu.lib.addrconv.
+
+Measures the address conversions and the throughput of Packet parsing,
+both with the legacy netaddr based converters and with the current
+ones.
+
+Usage::
+
+    python -m ryu.tests.benchmark.addrconv [-n PACKETS]
+"""
+
+import argparse
+import time
+
+import netaddr
+
+from ryu.lib import addrconv
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+
+
+class _LegacyAddressConverter(object):
+    def __init__(self, addr, strat, **kwargs):
+        self._addr = addr
+        self._strat = strat
+        self._addr_kwargs = kwargs
+
+    def text_to_bin(self, text):
+        return self._addr(text, **self._addr_kwargs).packed
+
+    def bin_to_text(self, bin):
+        return str(self._addr(self._strat.packed_to_int(bin),
+                              **self._addr_kwargs))
+
+
+_LEGACY = {
+    'ipv4': _LegacyAddressConverter(netaddr.IPAddress, netaddr.strategy.ipv4,
+                                    version=4),
+    'ipv6': _LegacyAddressConverter(netaddr.IPAddress, netaddr.strategy.ipv6,
+                                    version=6),
+    'mac': _LegacyAddressConverter(netaddr.EUI, netaddr.strategy.eui48,
+                                   version=48,
+                                   dialect=addrconv.mac_mydialect),
+}
+_CURRENT = {
+    'ipv4': addrconv.ipv4,
+    'ipv6': addrconv.ipv6,
+    'mac': addrconv.mac,
+}
+
+
+def _install(converters):
+    for name, conv in converters.items():
+        setattr(addrconv, name, conv)
+
+
+def _build(*protocols):
+    pkt = packet.Packet()
+    for p in protocols:
+        pkt.add_protocol(p)
+    pkt.serialize()
+    return str(pkt.data)
+
+
+def _packets(n):
+    # n hosts talking to a server
+    data = []
+    for i in xrange(n):
+        mac = '00:00:00:00:%02x:%02x' % ((i >> 8) & 0xff, i & 0xff)
+        ip = '10.0.%d.%d' % ((i >> 8) & 0xff, i & 0xff)
+        eth = ethernet.ethernet('00:00:00:00:ff:ff', mac)
+        data.append(_build(eth, ipv4.ipv4(proto=inet.IPPROTO_TCP, src=ip,
+                                          dst='10.1.0.1'),
+                           tcp.tcp(src_port=1234, dst_port=80)))
+        eth = ethernet.ethernet('ff:ff:ff:ff:ff:ff', mac, ether.ETH_TYPE_ARP)
+        data.append(_build(eth, arp.arp_ip(arp.ARP_REQUEST, mac, ip,
+                                           '00:00:00:00:00:00',
+                                           '10.1.0.1')))
+        eth = ethernet.ethernet('00:00:00:00:ff:ff', mac,
+                                ether.ETH_TYPE_IPV6)
+        data.append(_build(eth, ipv6.ipv6(nxt=inet.IPPROTO_UDP,
+                                          src='2001:db8::%x' % (i + 1),
+                                          dst='2001:db8::ffff'),
+                           udp.udp(src_port=1234, dst_port=53)))
+    return data
+
+
+def _bench(name, n, func):
+    start = time.time()
+    func()
+    elapsed = time.time() - start
+    print('%-24s %8d %8.3f sec %10.0f /sec' % (name, n, elapsed,
+                                               n / elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-n', '--packets', type=int, default=30000,
+                        help='number of packets to parse')
+    parser.add_argument('--hosts', type=int, default=256,
+                        help='number of distinct hosts in the packets')
+    args = parser.parse_args()
+
+    samples = _packets(args.hosts)
+    nsamples = len(samples)
+    mac_bin = '\xf2\x0b\xa4\x01\x0a\x23'
+    ipv4_bin = '\x0a\x00\x00\x01'
+    ipv6_bin = '\x20\x01\x0d\xb8' + '\x00' * 11 + '\x01'
+
+    for name, converters in [('legacy', _LEGACY), ('current', _CURRENT)]:
+        _install(converters)
+        n = args.packets
+
+        def conv():
+            for _i in xrange(n):
+                addrconv.mac.text_to_bin(addrconv.mac.bin_to_text(mac_bin))
+                addrconv.ipv4.text_to_bin(addrconv.ipv4.bin_to_text(ipv4_bin))
+                addrconv.ipv6.text_to_bin(addrconv.ipv6.bin_to_text(ipv6_bin))
+
+        def parse():
+            for i in xrange(n):
+                packet.Packet(samples[i % nsamples])
+
+        _bench('%s conversions' % name, n * 6, conv)
+        _bench('%s packet parse' % name, n, parse)
+    _install(_CURRENT)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of BgpProtocol stream framing.
+
+Replays a stream of the captured messages in ryu/tests/packet_data/bgp4
+to BgpProtocol, both with the legacy framing which received a header
+sized chunk at a time, appended it to a string and sliced the string for
+each message, and with the current framing which receives as many bytes
+as its reusable buffer holds.  The stream is the OPEN capture followed
+by the KEEPALIVE capture and full-sized UPDATE messages, as a peer sends
+a full table.  The UPDATE capture is not replayed, as the parser doesn't
+support its 4-octet AS_PATH.  --keepalives replays only the KEEPALIVE
+capture after the OPEN one, so the framing is measured rather than the
+parser.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bgp_framing [-n MESSAGES] [--keepalives]
+"""
+
+import argparse
+import os
+import socket
+import struct
+import time
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import speaker
+
+
+_PACKET_DATA_DIR = os.path.join(os.path.dirname(__file__), '..',
+                                'packet_data', 'bgp4')
+
+
+class _LegacyFraming(object):
+    # received bytes at a time by the legacy _recv_loop()
+    CHUNK_LEN = speaker.BGP_MIN_MSG_LEN
+
+    def __init__(self, socket):
+        self._recv_buff = ''
+        self.msgs = 0
+
+    def data_received(self, next_bytes):
+        self._recv_buff += next_bytes
+        while True:
+            if len(self._recv_buff) < speaker.BGP_MIN_MSG_LEN:
+                return
+            auth, length, ptype = struct.unpack(
+                '!16sHB', self._recv_buff[:speaker.BGP_MIN_MSG_LEN])
+            if auth != speaker.BgpProtocol.MESSAGE_MARKER:
+                raise bgp.NotSync()
+            check = lambda: length < speaker.BGP_MIN_MSG_LEN\
+                or length > speaker.BGP_MAX_MSG_LEN
+            check2 = lambda: ptype == bgp.BGP_MSG_OPEN\
+                and length < bgp.BGPOpen._MIN_LEN
+            check3 = lambda: ptype == bgp.BGP_MSG_KEEPALIVE\
+                and length != bgp.BGPKeepAlive._MIN_LEN
+            check4 = lambda: ptype == bgp.BGP_MSG_UPDATE\
+                and length < bgp.BGPUpdate._MIN_LEN
+            if check() or check2() or check3() or check4():
+                raise bgp.BadLen(ptype, length)
+            if len(self._recv_buff) < length:
+                return
+            _msg, rest = bgp.BGPMessage.parser(self._recv_buff)
+            self._recv_buff = rest
+            self.msgs += 1
+
+
+class _BgpProtocol(speaker.BgpProtocol):
+    CHUNK_LEN = speaker.BGP_RECV_BUFF_LEN
+
+    def __init__(self, socket):
+        super(_BgpProtocol, self).__init__(socket, None)
+        self.msgs = 0
+
+    def _handle_msg(self, msg):
+        self.msgs += 1
+
+
+def _full_update():
+    # 1000 /24 prefixes fill an UPDATE message up to BGP_MAX_MSG_LEN.
+    nlri = [bgp.BGPNLRI(length=24, addr='10.%d.%d.0' % (i // 256, i % 256))
+            for i in range(1000)]
+    path_attributes = [bgp.BGPPathAttributeOrigin(0),
+                       bgp.BGPPathAttributeAsPath([[65001, 65002]]),
+                       bgp.BGPPathAttributeNextHop('192.0.2.1')]
+    return str(bgp.BGPUpdate(path_attributes=path_attributes,
+                             nlri=nlri).serialize())
+
+
+def _stream(n, keepalives):
+    def read(name):
+        with open(os.path.join(_PACKET_DATA_DIR, name)) as f:
+            return f.read()
+
+    keepalive = read('bgp4-keepalive')
+    update = keepalive if keepalives else _full_update()
+    msgs = [read('bgp4-open')]
+    msgs.extend(keepalive if i % 16 == 0 else update for i in xrange(n - 1))
+    return ''.join(msgs)
+
+
+def _replay(protocol_cls, data):
+    sock, peer_sock = socket.socketpair()
+    protocol = protocol_cls(sock)
+    chunk_len = protocol.CHUNK_LEN
+    for i in xrange(0, len(data), chunk_len):
+        protocol.data_received(data[i:i + chunk_len])
+    sock.close()
+    peer_sock.close()
+    return protocol.msgs
+
+
+def _bench(name, n, func):
+    start = time.time()
+    result = func()
+    elapsed = time.time() - start
+    print('%-20s %8d ops %8.3f sec %12.0f ops/sec' %
+          (name, n, elapsed, n / elapsed))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-n', '--messages', type=int, default=5000,
+                        help='number of messages')
+    parser.add_argument('--keepalives', action='store_true',
+                        help='replay KEEPALIVE messages only')
+    args = parser.parse_args()
+
+    data = _stream(args.messages, args.keepalives)
+    print('%-20s %8d bytes' % ('stream', len(data)))
+    for name, protocol_cls in (('legacy', _LegacyFraming),
+                               ('current', _BgpProtocol)):
+        msgs = _bench(name, args.messages,
+                      lambda: _replay(protocol_cls, data))
+        assert msgs == args.messages
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of BGP UPDATE packing.
+
+Sends a full table of routes over a socket, both as one UPDATE message
+per route as Peer did and packed by UpdatePacker, and measures the time
+until the receiver has parsed all of the routes.  The routes share a
+few sets of path attributes, as the routes of a full table do.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bgp_update_packer [-n ROUTES] [-a ATTRS]
+        [--vpn]
+"""
+
+import argparse
+import socket
+import struct
+import threading
+import time
+
+from ryu.lib.packet import bgp
+from ryu.lib.packet.bgp import RF_IPv4_VPN
+from ryu.services.protocols.bgp.peer import UpdatePacker
+
+
+def _prefix(i):
+    return '%d.%d.%d.0' % (1 + i // 65536 % 223, i // 256 % 256, i % 256)
+
+
+def _update(i, attrs, vpn):
+    # as Peer._construct_update() does for each route
+    attrs = attrs[i % len(attrs)]
+    path_attributes = [bgp.BGPPathAttributeOrigin(0),
+                       bgp.BGPPathAttributeAsPath([list(attrs)])]
+    if vpn:
+        nlri = bgp.LabelledVPNIPAddrPrefix(24, _prefix(i), route_dist=100,
+                                           labels=[100])
+        path_attributes.insert(0, bgp.BGPPathAttributeMpReachNLRI(
+            RF_IPv4_VPN.afi, RF_IPv4_VPN.safi, '192.0.2.1', [nlri]))
+        return bgp.BGPUpdate(path_attributes=path_attributes)
+    path_attributes.insert(0, bgp.BGPPathAttributeNextHop('192.0.2.1'))
+    return bgp.BGPUpdate(path_attributes=path_attributes,
+                         nlri=[bgp.BGPNLRI(length=24, addr=_prefix(i))])
+
+
+def _receive(sock, n, result):
+    hdr_len = bgp.BGPMessage._HDR_LEN
+    buf = ''
+    routes = 0
+    msgs = 0
+    while routes < n:
+        data = sock.recv(65536)
+        if not data:
+            break
+        buf += data
+        while len(buf) >= hdr_len:
+            (length,) = struct.unpack_from('!H', buf, 16)
+            if len(buf) < length:
+                break
+            msg, _rest = bgp.BGPMessage.parser(buf[:length])
+            buf = buf[length:]
+            msgs += 1
+            routes += len(msg.nlri)
+            for attr in msg.path_attributes:
+                if isinstance(attr, bgp.BGPPathAttributeMpReachNLRI):
+                    routes += len(attr.nlri)
+    result.extend((msgs, routes))
+
+
+def _send(n, attrs, vpn, packer):
+    sender, receiver = socket.socketpair()
+    result = []
+    thread = threading.Thread(target=_receive, args=(receiver, n, result))
+    thread.start()
+    for i in xrange(n):
+        update = _update(i, attrs, vpn)
+        if packer is None:
+            sender.sendall(update.serialize())
+            continue
+        for update, _routes in packer.add(update, i):
+            sender.sendall(update.serialize())
+    if packer is not None:
+        for update, _routes in packer.flush():
+            sender.sendall(update.serialize())
+    thread.join()
+    sender.close()
+    receiver.close()
+    return result
+
+
+def _bench(name, n, func):
+    start = time.time()
+    result = func()
+    elapsed = time.time() - start
+    print('%-20s %8d ops %8.3f sec %12.0f ops/sec' %
+          (name, n, elapsed, n / elapsed))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-n', '--routes', type=int, default=100000,
+                        help='number of routes')
+    parser.add_argument('-a', '--attrs', type=int, default=100,
+                        help='number of distinct sets of path attributes')
+    parser.add_argument('--vpn', action='store_true',
+                        help='send VPNv4 routes in MP_REACH_NLRI')
+    args = parser.parse_args()
+
+    attrs = [(65001, 65002 + i) for i in range(args.attrs)]
+    for name, packer in (('one per route', None),
+                         ('packed', UpdatePacker())):
+        msgs, routes = _bench(name, args.routes,
+                              lambda: _send(args.routes, attrs, args.vpn,
+                                            packer))
+        assert routes == args.routes
+        print('%-20s %8d msgs' % ('', msgs))
+
+
+if __name__ == '__main__':
+    main()
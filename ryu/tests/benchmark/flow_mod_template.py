@@ -0,0 +1,109 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of FlowMod generation with ofproto_template.
+
+Generates the FlowMods simple_switch_13 installs for learnt MAC
+addresses, both with OFPFlowMod and Datapath.send_msg and with a
+pre-compiled MsgTemplate, and reports the number of FlowMods per second.
+
+Usage::
+
+    python -m ryu.tests.benchmark.flow_mod_template [-n FLOW_MODS]
+"""
+
+import argparse
+import time
+
+from ryu.base import app_manager  # To suppress cyclic import
+from ryu.controller import controller
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_template
+from ryu.ofproto import ofproto_v1_3
+
+
+class _Datapath(ofproto_protocol.ProtocolDesc):
+    set_xid = controller.Datapath.set_xid.__func__
+    send_msg = controller.Datapath.send_msg.__func__
+
+    def __init__(self):
+        super(_Datapath, self).__init__(ofproto_v1_3.OFP_VERSION)
+        self.xid = 0
+        self.count = 0
+
+    def send(self, buf):
+        self.count += 1
+
+
+def _flow_mod(datapath, in_port, eth_dst, out_port, buffer_id):
+    ofproto = datapath.ofproto
+    parser = datapath.ofproto_parser
+    match = parser.OFPMatch(in_port=in_port, eth_dst=eth_dst)
+    actions = [parser.OFPActionOutput(out_port)]
+    inst = [parser.OFPInstructionActions(ofproto.OFPIT_APPLY_ACTIONS,
+                                         actions)]
+    return parser.OFPFlowMod(datapath=datapath, priority=1,
+                             buffer_id=buffer_id, match=match,
+                             instructions=inst)
+
+
+def _macs(n):
+    return ['00:00:%02x:%02x:%02x:%02x' % ((i >> 24) & 0xff,
+                                            (i >> 16) & 0xff,
+                                            (i >> 8) & 0xff, i & 0xff)
+            for i in xrange(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-n', '--flow-mods', type=int, default=1000000,
+                        help='number of FlowMods to generate')
+    args = parser.parse_args()
+
+    datapath = _Datapath()
+    no_buffer = datapath.ofproto.OFP_NO_BUFFER
+    # a limited set of addresses to keep memory usage reasonable
+    macs = _macs(min(args.flow_mods, 4096))
+    nmacs = len(macs)
+
+    def send_msg(i):
+        datapath.send_msg(_flow_mod(datapath, i & 0xff, macs[i % nmacs],
+                                    2, no_buffer))
+
+    template = ofproto_template.MsgTemplate(
+        lambda **kwargs: _flow_mod(datapath, **kwargs),
+        in_port=ofproto_template.UINT32,
+        eth_dst=ofproto_template.MAC,
+        out_port=ofproto_template.UINT32,
+        buffer_id=ofproto_template.UINT32)
+
+    def send_template(i):
+        template.send(datapath, in_port=i & 0xff, eth_dst=macs[i % nmacs],
+                      out_port=2, buffer_id=no_buffer)
+
+    for name, send in [('send_msg', send_msg),
+                       ('template', send_template)]:
+        datapath.count = 0
+        start = time.time()
+        for i in xrange(args.flow_mods):
+            send(i)
+        elapsed = time.time() - start
+        print('%-10s %8d flow_mods %8.3f sec %10.0f flow_mods/sec' %
+              (name, datapath.count, elapsed, datapath.count / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of PacketIn data classification.
+
+Extracts the ethernet addresses and the 5-tuple from the packets of the
+PacketIn messages in ryu/tests/packet_data and from a set of typical
+packets, both with Packet and with fast_parser.extract, and reports the
+number of packets per second.
+
+Usage::
+
+    python -m ryu.tests.benchmark.packet_parse [-n PACKETS]
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import fast_parser
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.lib.packet import vlan
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+
+
+_PACKET_DATA_DIR = os.path.join(os.path.dirname(__file__), '..',
+                                'packet_data')
+
+
+def _packet_in_data():
+    data = []
+    for path in sorted(glob.glob(os.path.join(_PACKET_DATA_DIR, 'of*',
+                                              '*ofp_packet_in.packet'))):
+        buf = open(path, 'rb').read()
+        version, msg_type, msg_len, xid = ofproto_parser.header(buf)
+        dp = ofproto_protocol.ProtocolDesc(version)
+        msg = ofproto_parser.msg(dp, version, msg_type, msg_len, xid, buf)
+        if msg.data:
+            data.append(str(msg.data))
+    return data
+
+
+def _build(*protocols):
+    pkt = packet.Packet()
+    for p in protocols:
+        pkt.add_protocol(p)
+    pkt.serialize()
+    return str(pkt.data)
+
+
+def _typical_data():
+    eth = ethernet.ethernet('00:00:00:00:00:02', '00:00:00:00:00:01')
+    eth_vlan = ethernet.ethernet('00:00:00:00:00:02', '00:00:00:00:00:01',
+                                 ether.ETH_TYPE_8021Q)
+    eth6 = ethernet.ethernet('00:00:00:00:00:02', '00:00:00:00:00:01',
+                             ether.ETH_TYPE_IPV6)
+    return [
+        _build(eth, ipv4.ipv4(proto=inet.IPPROTO_TCP, src='192.0.2.1',
+                              dst='192.0.2.2'),
+               tcp.tcp(src_port=1234, dst_port=80), 'x' * 64),
+        _build(eth_vlan, vlan.vlan(vid=10),
+               ipv4.ipv4(proto=inet.IPPROTO_UDP, src='192.0.2.1',
+                         dst='192.0.2.2'),
+               udp.udp(src_port=1234, dst_port=53), 'x' * 64),
+        _build(eth6, ipv6.ipv6(nxt=inet.IPPROTO_TCP, src='2001:db8::1',
+                               dst='2001:db8::2'),
+               tcp.tcp(src_port=1234, dst_port=443), 'x' * 64),
+    ]
+
+
+def _classify_packet(data):
+    pkt = packet.Packet(data)
+    eth = pkt.get_protocol(ethernet.ethernet)
+    ip = pkt.get_protocol(ipv4.ipv4) or pkt.get_protocol(ipv6.ipv6)
+    l4 = pkt.get_protocol(tcp.tcp) or pkt.get_protocol(udp.udp)
+    return (eth.dst, eth.src,
+            ip and ip.src, ip and ip.dst,
+            l4 and l4.src_port, l4 and l4.dst_port)
+
+
+def _classify_fast(data):
+    h = fast_parser.extract(data)
+    return (h.eth_dst_bin, h.eth_src_bin, h.ip_src_bin, h.ip_dst_bin,
+            h.src_port, h.dst_port)
+
+
+def _classify_fast_text(data):
+    h = fast_parser.extract(data)
+    return (h.eth_dst, h.eth_src, h.ip_src, h.ip_dst,
+            h.src_port, h.dst_port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-n', '--packets', type=int, default=100000,
+                        help='number of packets to classify')
+    args = parser.parse_args()
+
+    for sample, samples in [('packet_data', _packet_in_data()),
+                            ('typical', _typical_data())]:
+        nsamples = len(samples)
+        for name, classify in [('Packet', _classify_packet),
+                               ('fast', _classify_fast),
+                               ('fast_text', _classify_fast_text)]:
+            start = time.time()
+            for i in xrange(args.packets):
+                classify(samples[i % nsamples])
+            elapsed = time.time() - start
+            print('%-12s %-10s %8d packets %8.3f sec %10.0f packets/sec' %
+                  (sample, name, args.packets, elapsed,
+                   args.packets / elapsed))
+
+
+if __name__ == '__main__':
+    main()
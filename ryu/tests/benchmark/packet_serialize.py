@@ -0,0 +1,145 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of Packet.serialize.
+
+Serializes the packets applications typically generate, i.e. ARP
+replies, ICMP echo replies, LLDP and TCP segments with large payloads,
+both with the legacy Packet.serialize, which concatenates the headers
+one by one, and with the current one, and reports the number of packets
+per second of the best of the repeats.
+
+Usage::
+
+    python -m ryu.tests.benchmark.packet_serialize [-n PACKETS] [-r REPEAT]
+"""
+
+import argparse
+import time
+
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import icmp
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import lldp
+from ryu.lib.packet import packet
+from ryu.lib.packet import packet_base
+from ryu.lib.packet import packet_utils
+from ryu.lib.packet import tcp
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+
+
+_checksum_ip = packet_utils.checksum_ip
+
+
+def _legacy_checksum_ip(ipvx, length, *payload):
+    # the legacy callers concatenate the header and the payload
+    return _checksum_ip(ipvx, length, ''.join(str(p) for p in payload))
+
+
+def _legacy_serialize(self):
+    self.data = bytearray()
+    r = self.protocols[::-1]
+    for i, p in enumerate(r):
+        if isinstance(p, packet_base.PacketBase):
+            if i == len(r) - 1:
+                prev = None
+            else:
+                prev = r[i + 1]
+            data = p.serialize(self.data, prev)
+        else:
+            data = str(p)
+        self.data = data + self.data
+
+
+_MAC1 = '00:00:00:00:00:01'
+_MAC2 = '00:00:00:00:00:02'
+_IP1 = '10.0.0.1'
+_IP2 = '10.0.0.2'
+
+
+def _arp():
+    return [ethernet.ethernet(_MAC2, _MAC1, ether.ETH_TYPE_ARP),
+            arp.arp_ip(arp.ARP_REPLY, _MAC1, _IP1, _MAC2, _IP2)]
+
+
+def _icmp():
+    return [ethernet.ethernet(_MAC2, _MAC1, ether.ETH_TYPE_IP),
+            ipv4.ipv4(proto=inet.IPPROTO_ICMP, src=_IP1, dst=_IP2),
+            icmp.icmp(icmp.ICMP_ECHO_REPLY,
+                      data=icmp.echo(1, 1, 'x' * 56))]
+
+
+def _lldp():
+    tlvs = [lldp.ChassisID(subtype=lldp.ChassisID.SUB_LOCALLY_ASSIGNED,
+                           chassis_id='dpid:0000000000000001'),
+            lldp.PortID(subtype=lldp.PortID.SUB_PORT_COMPONENT,
+                        port_id='\x00\x00\x00\x01'),
+            lldp.TTL(ttl=120),
+            lldp.End()]
+    return [ethernet.ethernet(lldp.LLDP_MAC_NEAREST_BRIDGE, _MAC1,
+                              ether.ETH_TYPE_LLDP),
+            lldp.lldp(tlvs)]
+
+
+def _tcp(size):
+    def build():
+        return [ethernet.ethernet(_MAC2, _MAC1, ether.ETH_TYPE_IP),
+                ipv4.ipv4(proto=inet.IPPROTO_TCP, src=_IP1, dst=_IP2),
+                tcp.tcp(src_port=80, dst_port=1234),
+                'x' * size]
+    return build
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-n', '--packets', type=int, default=20000,
+                        help='number of packets to serialize')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='number of repeats')
+    args = parser.parse_args()
+
+    current = (packet.Packet.serialize, packet_utils.checksum_ip)
+    legacy = (_legacy_serialize, _legacy_checksum_ip)
+    for sample, build in [('arp', _arp), ('icmp', _icmp), ('lldp', _lldp),
+                          ('tcp_1400', _tcp(1400)), ('tcp_9000', _tcp(9000))]:
+        for name, (serialize, checksum_ip) in [('legacy', legacy),
+                                               ('current', current)]:
+            packet.Packet.serialize = serialize
+            packet_utils.checksum_ip = checksum_ip
+            elapsed = None
+            for _r in xrange(args.repeat):
+                pkts = []
+                for _i in xrange(args.packets):
+                    pkt = packet.Packet()
+                    for p in build():
+                        pkt.add_protocol(p)
+                    pkts.append(pkt)
+                start = time.time()
+                for pkt in pkts:
+                    pkt.serialize()
+                t = time.time() - start
+                if elapsed is None or t < elapsed:
+                    elapsed = t
+            print('%-10s %-8s %8d packets %8.3f sec %10.0f packets/sec' %
+                  (sample, name, args.packets, elapsed,
+                   args.packets / elapsed))
+    packet.Packet.serialize, packet_utils.checksum_ip = current
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Micro benchmark of Datapath._recv_loop.
+
+Replays the captured OpenFlow 1.3 messages in tests/packet_data/of13
+through Datapath._recv_loop and reports the number of messages
+processed per second.  The old implementation, which slices the
+receive buffer for every message, is measured for comparison.
+
+Usage::
+
+    python -m ryu.tests.benchmark.recv_loop [-n MESSAGES] [-c CHUNK_SIZE]
+                                            [--framing-only]
+
+With --framing-only, message parsing is skipped so that only the cost of
+the framing itself is measured.
+"""
+
+import argparse
+import os
+import time
+
+import mock
+
+from ryu.base import app_manager  # To suppress cyclic import
+from ryu.controller import controller
+from ryu.controller import ofp_event
+from ryu.ofproto import ofproto_common
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+PACKET_DATA_DIR = os.path.join(os.path.dirname(__file__),
+                               '..', 'packet_data', 'of13')
+MSGS = [
+    '4-4-ofp_packet_in.packet',
+    '4-59-ofp_packet_in.packet',
+    '4-40-ofp_flow_removed.packet',
+    '4-39-ofp_port_status.packet',
+    '4-13-ofp_echo_request.packet',
+]
+
+
+class _Socket(object):
+    def __init__(self, data, chunk_size):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.offset = 0
+
+    def setsockopt(self, *args):
+        pass
+
+    def _next(self, size):
+        size = min(size, self.chunk_size, len(self.data) - self.offset)
+        self.offset += size
+        return size
+
+    def recv(self, size):
+        offset = self.offset
+        return self.data[offset:offset + self._next(size)]
+
+    def recv_into(self, buf):
+        offset = self.offset
+        size = self._next(len(buf))
+        buf[:size] = self.data[offset:offset + size]
+        return size
+
+
+class _Brick(object):
+    def __init__(self):
+        self.count = 0
+
+    def send_event_to_observers(self, ev, state=None):
+        self.count += 1
+
+    def get_handlers(self, ev, state=None):
+        return []
+
+
+def _legacy_recv_loop(self):
+    # the implementation before the receive buffer was introduced
+    buf = bytearray()
+    required_len = ofproto_common.OFP_HEADER_SIZE
+    while self.is_active:
+        ret = self.socket.recv(required_len)
+        if len(ret) == 0:
+            self.is_active = False
+            break
+        buf += ret
+        while len(buf) >= required_len:
+            (version, msg_type, msg_len, xid) = ofproto_parser.header(buf)
+            required_len = msg_len
+            if len(buf) < required_len:
+                break
+            msg = ofproto_parser.msg(self,
+                                     version, msg_type, msg_len, xid, buf)
+            if msg:
+                ev = ofp_event.ofp_msg_to_ev(msg)
+                self.ofp_brick.send_event_to_observers(ev, self.state)
+
+                dispatchers = lambda x: x.callers[ev.__class__].dispatchers
+                handlers = [handler for handler in
+                            self.ofp_brick.get_handlers(ev) if
+                            self.state in dispatchers(handler)]
+                for handler in handlers:
+                    handler(ev)
+            buf = buf[required_len:]
+            required_len = ofproto_common.OFP_HEADER_SIZE
+
+
+def _run(recv_loop, data, chunk_size):
+    brick = _Brick()
+    with mock.patch('ryu.base.app_manager.lookup_service_brick',
+                    return_value=brick):
+        dp = controller.Datapath(_Socket(data, chunk_size), ('bench', 0))
+    dp.set_version(ofproto_v1_3.OFP_VERSION)
+    brick.count = 0
+    start = time.time()
+    recv_loop(dp)
+    return brick.count, time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-n', '--messages', type=int, default=100000,
+                        help='number of messages to replay')
+    parser.add_argument('-c', '--chunk-size', type=int, default=0x10000,
+                        help='maximum number of bytes returned by a recv')
+    parser.add_argument('--framing-only', action='store_true',
+                        help='skip parsing of messages')
+    args = parser.parse_args()
+
+    wire_msgs = [open(os.path.join(PACKET_DATA_DIR, f), 'rb').read()
+                 for f in MSGS]
+    count = args.messages // len(wire_msgs)
+    data = ''.join(wire_msgs) * count
+
+    if args.framing_only:
+        echo = ofproto_v1_3_parser.OFPEchoRequest(None)
+        msg = lambda *args: echo
+    else:
+        msg = ofproto_parser.msg
+
+    for name, recv_loop in [('legacy', _legacy_recv_loop),
+                            ('recv_into', controller.Datapath._recv_loop)]:
+        with mock.patch('ryu.ofproto.ofproto_parser.msg', msg):
+            msgs, elapsed = _run(recv_loop, data, args.chunk_size)
+        print('%-10s %8d msgs %8.3f sec %10.0f msgs/sec' %
+              (name, msgs, elapsed, msgs / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of rest_router RoutingTable.
+
+Fills a RoutingTable with many routes of random prefixes and looks up
+random destinations and deletes routes, both with the legacy linear
+scans and with the current prefix trie and indexes.  The legacy lookups
+are much slower, so fewer of them are measured.
+
+Usage::
+
+    python -m ryu.tests.benchmark.rest_router [-n ROUTES] [-l LOOKUPS]
+"""
+
+import argparse
+import random
+import time
+
+from ryu.app import rest_router
+
+
+def _legacy_get_data(self, gw_mac=None, dst_ip=None):
+    if gw_mac is not None:
+        for route in self.values():
+            if gw_mac == route.gateway_mac:
+                return route
+        return None
+
+    elif dst_ip is not None:
+        get_route = None
+        mask = 0
+        for route in self.values():
+            if rest_router.ipv4_apply_mask(dst_ip, route.netmask) == \
+                    route.dst_ip:
+                # For longest match
+                if mask < route.netmask:
+                    get_route = route
+                    mask = route.netmask
+
+        if get_route is None:
+            get_route = self.get(rest_router.DEFAULT_ROUTE, None)
+        return get_route
+    else:
+        return None
+
+
+def _legacy_delete(self, route_id):
+    for key, value in self.items():
+        if value.route_id == route_id:
+            del self[key]
+            return
+
+
+def _bench(name, n, func):
+    start = time.time()
+    result = func()
+    elapsed = time.time() - start
+    print('%-20s %8d ops %8.3f sec %12.0f ops/sec' %
+          (name, n, elapsed, n / elapsed))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-n', '--routes', type=int, default=100000,
+                        help='number of routes')
+    parser.add_argument('-l', '--lookups', type=int, default=100000,
+                        help='number of lookups of the current table')
+    parser.add_argument('--legacy-lookups', type=int, default=20,
+                        help='number of lookups of the legacy table')
+    args = parser.parse_args()
+
+    rand = random.Random(1)
+    prefixes = set()
+    while len(prefixes) < args.routes:
+        length = rand.randint(8, 32)
+        addr = rand.getrandbits(32) & ((0xffffffff << (32 - length)) &
+                                       0xffffffff)
+        prefixes.add('%s/%d' % (rest_router.ipv4_int_to_text(addr), length))
+    prefixes = sorted(prefixes)
+    addrs = [rest_router.ipv4_int_to_text(rand.getrandbits(32))
+             for _i in xrange(args.lookups)]
+
+    table = rest_router.RoutingTable()
+
+    def add():
+        for prefix in prefixes:
+            table.add(prefix, '192.168.0.1')
+
+    _bench('current add', args.routes, add)
+
+    def lookup(n, get_data):
+        return [get_data(table, dst_ip=addr) for addr in addrs[:n]]
+
+    n = min(args.legacy_lookups, args.lookups)
+    expected = _bench('legacy lookup', n,
+                      lambda: lookup(n, _legacy_get_data))
+    results = _bench('current lookup', args.lookups,
+                     lambda: lookup(args.lookups,
+                                    rest_router.RoutingTable.get_data))
+    assert [r is e for r, e in zip(results, expected)] == [True] * n
+
+    route_ids = [route.route_id for route in table.values()]
+    rand.shuffle(route_ids)
+    n = min(args.legacy_lookups, len(route_ids))
+    _bench('legacy delete', n,
+           lambda: [_legacy_delete(table, i) for i in route_ids[:n]])
+    _bench('current delete', len(route_ids) - n,
+           lambda: [table.delete(i) for i in route_ids[n:]])
+    assert not table
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of StringifyMixin JSON conversion.
+
+Converts an OpenFlow 1.3 flow stats reply with many entries to a JSON
+style dict and back, both with the legacy StringifyMixin conversions,
+which find the attributes with inspect and the types and the encoders
+for each value, and with the current ones using the per-class codecs.
+
+Usage::
+
+    python -m ryu.tests.benchmark.stringify [-n FLOWS]
+"""
+
+import argparse
+import base64
+import inspect
+import time
+
+from ryu.lib import stringify
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser as parser
+
+
+def _legacy_obj_python_attrs(msg_):
+    if hasattr(msg_, '_fields'):
+        for k in msg_._fields:
+            yield(k, getattr(msg_, k))
+        return
+    base = getattr(msg_, '_base_attributes', [])
+    for k, v in inspect.getmembers(msg_):
+        if k.startswith('_'):
+            continue
+        if callable(v):
+            continue
+        if k in base:
+            continue
+        if hasattr(msg_.__class__, k):
+            continue
+        yield (k, v)
+
+
+@classmethod
+def _legacy_get_type(cls, k):
+    if hasattr(cls, '_TYPE'):
+        for t, attrs in cls._TYPE.iteritems():
+            if k in attrs:
+                return stringify._types[t]
+    return None
+
+
+@classmethod
+def _legacy_get_encoder(cls, k, encode_string):
+    t = cls._get_type(k)
+    if t:
+        return t.encode
+    return cls._get_default_encoder(encode_string)
+
+
+def _legacy_to_jsondict(self, encode_string=base64.b64encode):
+    dict_ = {}
+    encode = lambda k, x: self._encode_value(k, x, encode_string)
+    for k, v in stringify.obj_attrs(self):
+        dict_[k] = encode(k, v)
+    return {self.__class__.__name__: dict_}
+
+
+@classmethod
+def _legacy_get_decoder(cls, k, decode_string):
+    t = cls._get_type(k)
+    if t:
+        return t.decode
+    return cls._get_default_decoder(decode_string)
+
+
+@classmethod
+def _legacy_from_jsondict(cls, dict_, decode_string=base64.b64decode,
+                          **additional_args):
+    decode = lambda k, x: cls._decode_value(k, x, decode_string,
+                                            **additional_args)
+    kwargs = cls._restore_args(stringify._mapdict_kv(decode, dict_))
+    return cls(**dict(kwargs, **additional_args))
+
+
+_NAMES = ['obj_python_attrs', '_get_type', '_get_encoder', 'to_jsondict',
+          '_get_decoder', 'from_jsondict']
+
+
+def _save():
+    m = stringify.StringifyMixin
+    return dict([('obj_python_attrs', stringify.obj_python_attrs)] +
+                [(name, m.__dict__[name]) for name in _NAMES[1:]])
+
+
+def _install(impl):
+    stringify.obj_python_attrs = impl['obj_python_attrs']
+    for name in _NAMES[1:]:
+        setattr(stringify.StringifyMixin, name, impl[name])
+
+
+_LEGACY = {
+    'obj_python_attrs': _legacy_obj_python_attrs,
+    '_get_type': _legacy_get_type,
+    '_get_encoder': _legacy_get_encoder,
+    'to_jsondict': _legacy_to_jsondict,
+    '_get_decoder': _legacy_get_decoder,
+    'from_jsondict': _legacy_from_jsondict,
+}
+
+
+def _flow_stats_reply(dp, n):
+    body = []
+    for i in xrange(n):
+        match = parser.OFPMatch(in_port=i % 48 + 1, eth_type=0x0800,
+                                ipv4_dst=('10.%d.%d.0' % (i >> 8 & 0xff,
+                                                          i & 0xff),
+                                          '255.255.255.0'))
+        actions = [parser.OFPActionSetField(eth_dst='00:00:00:00:00:01'),
+                   parser.OFPActionOutput(i % 48 + 1)]
+        inst = [parser.OFPInstructionActions(
+            ofproto_v1_3.OFPIT_APPLY_ACTIONS, actions)]
+        body.append(parser.OFPFlowStats(
+            table_id=0, duration_sec=i, duration_nsec=0, priority=100,
+            idle_timeout=0, hard_timeout=0, flags=0, cookie=i,
+            packet_count=i * 10, byte_count=i * 1000, match=match,
+            instructions=inst))
+    msg = parser.OFPFlowStatsReply(dp, body=body)
+    msg.type = ofproto_v1_3.OFPMP_FLOW
+    msg.flags = 0
+    return msg
+
+
+def _bench(name, n, func):
+    start = time.time()
+    result = func()
+    elapsed = time.time() - start
+    print('%-24s %8d flows %8.3f sec %10.0f flows/sec' %
+          (name, n, elapsed, n / elapsed))
+    return result
+
+
+def main():
+    parser_ = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser_.add_argument('-n', '--flows', type=int, default=50000,
+                         help='number of flow stats entries')
+    args = parser_.parse_args()
+
+    dp = ofproto_protocol.ProtocolDesc(ofproto_v1_3.OFP_VERSION)
+    msg = _flow_stats_reply(dp, args.flows)
+    current = _save()
+    results = []
+    for name, impl in [('legacy', _LEGACY), ('current', current)]:
+        _install(impl)
+        jsondict = _bench('%s to_jsondict' % name, args.flows,
+                          msg.to_jsondict)
+        _bench('%s from_jsondict' % name, args.flows,
+               lambda: ofproto_parser.ofp_msg_from_jsondict(dp, jsondict))
+        results.append(jsondict)
+    _install(current)
+    assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    main()
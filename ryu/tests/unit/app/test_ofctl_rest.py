@@ -0,0 +1,110 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import json
+import unittest
+import logging
+from nose.tools import eq_, ok_
+from webob.request import Request
+
+from ryu.app import ofctl_rest
+from ryu.lib import ofctl_v1_3
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_0
+from ryu.ofproto import ofproto_v1_3
+
+LOG = logging.getLogger('test_ofctl_rest')
+
+
+class _DPSet(object):
+    def __init__(self, dp):
+        self.dp = dp
+
+    def get(self, dpid):
+        if dpid == self.dp.id:
+            return self.dp
+        return None
+
+
+class Test_ofctl_rest(unittest.TestCase):
+
+    """ Test case for ofctl_rest
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        ofctl_rest.STREAM_CHUNK_SIZE = 64 * 1024
+
+    def _controller(self, version):
+        dp = ofproto_protocol.ProtocolDesc(version)
+        dp.id = 1
+        data = {'dpset': _DPSet(dp), 'waiters': {}}
+        return ofctl_rest.StatsController(None, None, data)
+
+    def test_stream_json_list(self):
+        items = [{'a': i, 'b': [i, 'x' * i]} for i in range(100)]
+        for size in [1, 100, 64 * 1024]:
+            ofctl_rest.STREAM_CHUNK_SIZE = size
+            chunks = list(ofctl_rest._stream_json_list('1', iter(items)))
+            eq_(''.join(chunks), json.dumps({'1': items}))
+        eq_(''.join(ofctl_rest._stream_json_list('1', iter([]))),
+            json.dumps({'1': []}))
+        ofctl_rest.STREAM_CHUNK_SIZE = 100
+        ok_(len(list(ofctl_rest._stream_json_list('1', iter(items)))) > 1)
+
+    def test_get_flow_stats_stream(self):
+        flows = [{'cookie': 1}, {'cookie': 2}]
+        filters = []
+
+        def get_flow_stats_iter(dp, waiters, flow=None):
+            filters.append(flow)
+            return iter(flows)
+
+        orig = ofctl_v1_3.get_flow_stats_iter
+        ofctl_v1_3.get_flow_stats_iter = get_flow_stats_iter
+        try:
+            controller = self._controller(ofproto_v1_3.OFP_VERSION)
+            req = Request.blank('/stats/flow/1', method='POST',
+                                body='{"table_id": 1}')
+            res = controller.get_flow_stats(req, '1')
+            eq_(res.content_type, 'application/json')
+            eq_(''.join(res.app_iter), json.dumps({'1': flows}))
+            eq_(filters, [{'table_id': 1}])
+        finally:
+            ofctl_v1_3.get_flow_stats_iter = orig
+
+    def test_get_flow_stats_invalid(self):
+        controller = self._controller(ofproto_v1_3.OFP_VERSION)
+        req = Request.blank('/stats/flow/1', method='POST', body='{')
+        eq_(controller.get_flow_stats(req, '1').status_int, 400)
+        req = Request.blank('/stats/flow/2')
+        eq_(controller.get_flow_stats(req, '2').status_int, 404)
+
+    def test_get_flow_stats_invalid_filter(self):
+        controller = self._controller(ofproto_v1_3.OFP_VERSION)
+        for body in ['[]', '{"table_id": "abc"}',
+                     '{"match": {"nw_src": "abc"}}']:
+            req = Request.blank('/stats/flow/1', method='POST', body=body)
+            eq_(controller.get_flow_stats(req, '1').status_int, 400)
+
+    def test_get_flow_stats_filter_unsupported(self):
+        controller = self._controller(ofproto_v1_0.OFP_VERSION)
+        req = Request.blank('/stats/flow/1', method='POST',
+                            body='{"table_id": 1}')
+        eq_(controller.get_flow_stats(req, '1').status_int, 501)
@@ -0,0 +1,317 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import json
+import unittest
+import logging
+from nose.tools import eq_, ok_
+from webob.request import Request
+
+from ryu.app import rest_firewall
+from ryu.controller import handler
+from ryu.controller import ofp_event
+from ryu.controller import stats_collector
+from ryu.lib import hub
+from ryu.lib import ofctl_utils
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_protocol
+
+LOG = logging.getLogger('test_rest_firewall')
+
+
+class _Datapath(ofproto_protocol.ProtocolDesc):
+    # keeps the flows and replies as RestFirewallAPI passing the events to
+    # ofctl_utils and *collector* does.  The FlowMods whose cookie is in
+    # *errors* fail, and so do the stats requests if *stats_error* is set.
+    def __init__(self, waiters, dpid=1, collector=None):
+        super(_Datapath, self).__init__(version=ofproto_v1_3.OFP_VERSION)
+        self.id = dpid
+        self.xid = 0
+        self.waiters = waiters
+        self.collector = collector
+        self.errors = set()
+        self.stats_error = False
+        self.flows = {}
+        self.sent = []
+
+    def set_xid(self, msg):
+        self.xid += 1
+        msg.set_xid(self.xid)
+
+    def send_msg(self, msg):
+        if msg.xid is None:
+            self.set_xid(msg)
+        self.sent.append(msg)
+        parser = self.ofproto_parser
+        if isinstance(msg, parser.OFPFlowMod):
+            if msg.cookie in self.errors:
+                err = parser.OFPErrorMsg(
+                    self, type_=self.ofproto.OFPET_FLOW_MOD_FAILED,
+                    code=self.ofproto.OFPFMFC_TABLE_FULL)
+                err.xid = msg.xid
+                hub.spawn(ofctl_utils.error_msg_handler, self.waiters, err)
+                return
+            key = (msg.cookie, msg.priority)
+            if msg.command == self.ofproto.OFPFC_ADD:
+                self.flows[key] = parser.OFPFlowStats(
+                    cookie=msg.cookie, priority=msg.priority,
+                    match=msg.match, instructions=msg.instructions)
+            else:
+                self.flows.pop(key, None)
+        elif isinstance(msg, parser.OFPBarrierRequest):
+            reply = parser.OFPBarrierReply(self)
+            reply.xid = msg.xid
+            hub.spawn(ofctl_utils.barrier_reply_handler, self.waiters, reply)
+        elif isinstance(msg, parser.OFPFlowStatsRequest):
+            if msg.xid not in self.waiters.get(self.id, {}):
+                hub.spawn(self._collector_reply, msg.xid)
+                return
+            reply = parser.OFPFlowStatsReply(self, body=self.flows.values())
+            reply.flags = 0
+            event, msgs = self.waiters[self.id].pop(msg.xid)
+            msgs.append(reply)
+            event.set()
+
+    def _collector_reply(self, xid):
+        parser = self.ofproto_parser
+        if self.stats_error:
+            msg = parser.OFPErrorMsg(
+                self, type_=self.ofproto.OFPET_BAD_REQUEST,
+                code=self.ofproto.OFPBRC_BAD_MULTIPART, data='')
+            msg.xid = xid
+            self.collector._error_msg_handler(ofp_event.ofp_msg_to_ev(msg))
+            return
+        msg = parser.OFPFlowStatsReply(self, body=self.flows.values())
+        msg.xid = xid
+        msg.flags = 0
+        self.collector._stats_reply_handler(ofp_event.ofp_msg_to_ev(msg))
+
+
+def _results(msgs):
+    return [msg['result'] for msg in msgs]
+
+
+class Test_Firewall(unittest.TestCase):
+
+    """ Test case for rest_firewall.Firewall
+    """
+
+    def setUp(self):
+        self.waiters = {}
+        self.dp = _Datapath(self.waiters)
+        self.firewall = rest_firewall.Firewall(self.dp)
+
+    def tearDown(self):
+        pass
+
+    def _count(self, msg_type):
+        return len([msg for msg in self.dp.sent
+                    if isinstance(msg, msg_type)])
+
+    def _set_rules(self, rules):
+        result = self.firewall.set_rules(rules, self.waiters,
+                                         rest_firewall.VLANID_NONE)
+        return result[rest_firewall.REST_COMMAND_RESULT]
+
+    def _delete_rules(self, rules):
+        result = self.firewall.delete_rules(rules, self.waiters,
+                                            rest_firewall.VLANID_NONE)
+        return result[rest_firewall.REST_COMMAND_RESULT]
+
+    def test_set_rules(self):
+        rules = [{'nw_src': '10.0.0.1', 'actions': 'ALLOW'},
+                 {'nw_src': '10.0.0.2', 'priority': 70000},
+                 {'nw_src': '10.0.0.3', 'actions': 'DENY'}]
+        msgs = self._set_rules(rules)
+        eq_([_results(rule_msgs) for rule_msgs in msgs],
+            [['success'], ['failure'], ['success']])
+        eq_(msgs[0][0]['details'], 'Rule added. : rule_id=1')
+        ok_('Invalid priority' in msgs[1][0]['details'])
+        # the cookie of the invalid rule is not reused
+        eq_(msgs[2][0]['details'], 'Rule added. : rule_id=3')
+        eq_(sorted(self.dp.flows.keys()), [(1, 1), (3, 1)])
+        # all of the FlowMods in one batch
+        parser = self.dp.ofproto_parser
+        eq_(self._count(parser.OFPFlowMod), 2)
+        eq_(self._count(parser.OFPBarrierRequest), 1)
+        ok_(isinstance(self.dp.sent[-1], parser.OFPBarrierRequest))
+        eq_(self.waiters[self.dp.id], {})
+
+    def test_set_rules_error(self):
+        # the FlowMod of the second rule fails
+        self.dp.errors.add(2)
+        rules = [{'nw_src': '10.0.0.%d' % i} for i in range(1, 4)]
+        msgs = self._set_rules(rules)
+        eq_([_results(rule_msgs) for rule_msgs in msgs],
+            [['success'], ['failure'], ['success']])
+        details = msgs[1][0]['details']
+        ok_(details.startswith('Rule not added. : '), details)
+        ok_('OFPErrorMsg' in details, details)
+        eq_(sorted(self.dp.flows.keys()), [(1, 1), (3, 1)])
+
+    def test_delete_rules(self):
+        self._set_rules([{'nw_src': '10.0.0.%d' % i} for i in range(1, 5)])
+        del self.dp.sent[:]
+
+        # a flow is deleted by the first of the rules which matches it,
+        # specific or all.
+        rules = [{'rule_id': '3'},
+                 {'rule_id': 'all'},
+                 {'rule_id': '1'},
+                 {'rule_id': '5'}]
+        msgs = self._delete_rules(rules)
+        eq_(msgs[0], [{'result': 'success',
+                       'details': 'Rule deleted. : ruleID=3'}])
+        eq_(len(msgs[1]), 1)
+        eq_(msgs[1][0]['result'], 'success')
+        eq_(sorted(msgs[1][0]['details'].split('=')[1].split(',')),
+            ['1', '2', '4'])
+        eq_(msgs[2], {'result': 'failure',
+                      'details': 'Rule is not exist. : ruleID=1'})
+        eq_(msgs[3], {'result': 'failure',
+                      'details': 'Rule is not exist. : ruleID=5'})
+        eq_(self.dp.flows, {})
+        # the flows are got only once
+        parser = self.dp.ofproto_parser
+        eq_(self._count(parser.OFPFlowStatsRequest), 1)
+        eq_(self._count(parser.OFPFlowMod), 4)
+        eq_(self._count(parser.OFPBarrierRequest), 1)
+
+    def test_delete_rules_error(self):
+        self._set_rules([{'nw_src': '10.0.0.%d' % i} for i in range(1, 5)])
+        # the errors are told to the rules by the FlowMods they sent
+        self.dp.errors.update([1, 4])
+        rules = [{'rule_id': '2'},
+                 {'rule_id': '4'},
+                 {'rule_id': 'all'}]
+        msgs = self._delete_rules(rules)
+        eq_(msgs[0], [{'result': 'success',
+                       'details': 'Rule deleted. : ruleID=2'}])
+        eq_(_results(msgs[1]), ['failure'])
+        ok_(msgs[1][0]['details'].startswith(
+            'Rule not deleted. : ruleID=4 : OFPErrorMsg'))
+        eq_(sorted(_results(msgs[2])), ['failure', 'success'])
+        for msg in msgs[2]:
+            if msg['result'] == 'success':
+                eq_(msg['details'], 'Rule deleted. : ruleID=3')
+            else:
+                ok_(msg['details'].startswith(
+                    'Rule not deleted. : ruleID=1 : '))
+        eq_(sorted(self.dp.flows.keys()), [(1, 1), (4, 1)])
+
+
+class Test_FirewallController(unittest.TestCase):
+
+    """ Test case for rest_firewall.FirewallController
+    """
+
+    def setUp(self):
+        self.waiters = {}
+        self.collector = stats_collector.StatsCollector()
+        self.dp = self._connect(1)
+        self.logger = rest_firewall.FirewallController._LOGGER
+        rest_firewall.FirewallController._LOGGER = LOG
+        data = {'dpset': None, 'waiters': self.waiters,
+                'collector': self.collector}
+        self.controller = rest_firewall.FirewallController(None, None, data)
+
+    def _connect(self, dpid, connected=True):
+        dp = _Datapath(self.waiters, dpid, self.collector)
+        rest_firewall.FirewallController._OFS_LIST[dp.id] = \
+            rest_firewall.Firewall(dp)
+        if connected:
+            ev = ofp_event.EventOFPStateChange(dp)
+            ev.state = handler.MAIN_DISPATCHER
+            self.collector._state_change_handler(ev)
+        return dp
+
+    def tearDown(self):
+        rest_firewall.FirewallController._LOGGER = self.logger
+        rest_firewall.FirewallController._OFS_LIST.clear()
+
+    def _set_rules(self, body, switchid='all'):
+        req = Request.blank('/firewall/rules/%s/bulk' % switchid,
+                            method='POST', body=body)
+        return self.controller.set_rules(req, switchid)
+
+    def test_set_rules(self):
+        res = self._set_rules(json.dumps([{'nw_src': '10.0.0.1'},
+                                          {'nw_src': '10.0.0.2'}]))
+        eq_(res.status_int, 200)
+        msgs = json.loads(res.body)
+        eq_(len(msgs), 1)
+        eq_([_results(rule_msgs)
+             for rule_msgs in msgs[0][rest_firewall.REST_COMMAND_RESULT]],
+            [['success'], ['success']])
+
+    def test_set_rules_invalid(self):
+        for body in ['[{', "[{'nw_src': '10.0.0.1'}]", '__import__("os")',
+                     '{"nw_src": "10.0.0.1"}', '[1]']:
+            eq_(self._set_rules(body).status_int, 400)
+        eq_(self.dp.sent, [])
+
+    def _get(self, func, *args):
+        req = Request.blank('/firewall')
+        res = getattr(self.controller, func)(req, *args)
+        eq_(res.status_int, 200)
+        return dict((msg[rest_firewall.REST_SWITCHID], msg)
+                    for msg in json.loads(res.body))
+
+    def test_get_rules(self):
+        dp2 = self._connect(2)
+        self._set_rules(json.dumps([{'nw_src': '10.0.0.1'}]),
+                        '0000000000000001')
+        del self.dp.sent[:]
+        del dp2.sent[:]
+
+        msgs = self._get('get_rules', 'all')
+        eq_(sorted(msgs.keys()), ['0000000000000001', '0000000000000002'])
+        acl = msgs['0000000000000001'][rest_firewall.REST_ACL]
+        eq_(len(acl), 1)
+        eq_([rule[rest_firewall.REST_RULE_ID]
+             for rule in acl[0][rest_firewall.REST_RULES]], [1])
+        eq_(msgs['0000000000000002'][rest_firewall.REST_ACL], [])
+        # the stats are requested through the collector, one per switch
+        for dp in [self.dp, dp2]:
+            eq_(len(dp.sent), 1)
+            ok_(isinstance(dp.sent[0],
+                           dp.ofproto_parser.OFPFlowStatsRequest))
+        eq_(self.waiters.get(self.dp.id, {}), {})
+
+        msgs = self._get('get_rules', '0000000000000002')
+        eq_(msgs.keys(), ['0000000000000002'])
+
+    def test_get_status(self):
+        self._connect(2).stats_error = True
+        self._connect(3, connected=False)
+
+        for func, key, status in [
+                ('get_status', rest_firewall.REST_STATUS,
+                 rest_firewall.REST_STATUS_ENABLE),
+                ('get_log_status', rest_firewall.REST_LOG_STATUS,
+                 rest_firewall.REST_STATUS_DISABLE)]:
+            msgs = self._get(func)
+            eq_(msgs['0000000000000001'][key], status)
+            # the switches which fail to reply have their own status
+            result = msgs['0000000000000002'][
+                rest_firewall.REST_COMMAND_RESULT]
+            eq_(result['result'], 'failure')
+            ok_(result['details'].startswith(
+                'Flows not got. : error : OFPErrorMsg'), result['details'])
+            eq_(msgs['0000000000000003'][rest_firewall.REST_COMMAND_RESULT],
+                {'result': 'failure',
+                 'details': 'Flows not got. : disconnected'})
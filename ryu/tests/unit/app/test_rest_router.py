@@ -0,0 +1,339 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import random
+import unittest
+import logging
+from nose.tools import eq_, ok_, raises
+
+from ryu.app import rest_router
+from ryu.lib import hub
+from ryu.lib import ofctl_utils
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_protocol
+
+LOG = logging.getLogger('test_rest_router')
+
+
+def _linear_get_data(table, dst_ip):
+    # the linear scan RoutingTable.get_data used to do
+    get_route = None
+    mask = 0
+    for route in table.values():
+        if rest_router.ipv4_apply_mask(dst_ip, route.netmask) == \
+                route.dst_ip:
+            if mask < route.netmask:
+                get_route = route
+                mask = route.netmask
+    if get_route is None:
+        get_route = table.get(rest_router.DEFAULT_ROUTE, None)
+    return get_route
+
+
+class _Port(object):
+    def __init__(self, port_no, hw_addr):
+        self.port_no = port_no
+        self.hw_addr = hw_addr
+
+
+class _Datapath(ofproto_protocol.ProtocolDesc):
+    # keeps the flows and replies as RestRouterAPI passing the events to
+    # ofctl_utils does.  The FlowMods whose cookie is in *errors* fail.
+    def __init__(self, waiters):
+        super(_Datapath, self).__init__(version=ofproto_v1_3.OFP_VERSION)
+        self.id = 1
+        self.xid = 0
+        self.ports = {1: _Port(1, '00:00:00:00:00:01'),
+                      2: _Port(2, '00:00:00:00:00:02')}
+        self.waiters = waiters
+        self.errors = set()
+        self.flows = {}
+        self.sent = []
+
+    def set_xid(self, msg):
+        self.xid += 1
+        msg.set_xid(self.xid)
+
+    def send_msg(self, msg):
+        if msg.xid is None:
+            self.set_xid(msg)
+        self.sent.append(msg)
+        parser = self.ofproto_parser
+        if isinstance(msg, parser.OFPFlowMod):
+            if msg.cookie in self.errors:
+                err = parser.OFPErrorMsg(
+                    self, type_=self.ofproto.OFPET_FLOW_MOD_FAILED,
+                    code=self.ofproto.OFPFMFC_TABLE_FULL)
+                err.xid = msg.xid
+                hub.spawn(ofctl_utils.error_msg_handler, self.waiters, err)
+                return
+            if msg.command == self.ofproto.OFPFC_ADD:
+                key = (msg.cookie, msg.priority)
+                self.flows[key] = parser.OFPFlowStats(
+                    cookie=msg.cookie, priority=msg.priority,
+                    match=msg.match)
+            else:
+                # rest_router deletes the flows by the cookie
+                for key in self.flows.keys():
+                    if key[0] == msg.cookie:
+                        del self.flows[key]
+        elif isinstance(msg, parser.OFPBarrierRequest):
+            reply = parser.OFPBarrierReply(self)
+            reply.xid = msg.xid
+            hub.spawn(ofctl_utils.barrier_reply_handler, self.waiters, reply)
+        elif isinstance(msg, parser.OFPFlowStatsRequest):
+            reply = parser.OFPFlowStatsReply(self, body=self.flows.values())
+            reply.flags = 0
+            event, msgs = self.waiters[self.id].pop(msg.xid)
+            msgs.append(reply)
+            event.set()
+
+
+class Test_RoutingTable(unittest.TestCase):
+
+    """ Test case for rest_router.RoutingTable
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def _random_ip(self, rand):
+        return rest_router.ipv4_int_to_text(rand.getrandbits(32))
+
+    def test_get_data(self):
+        table = rest_router.RoutingTable()
+        table.add('10.0.0.0/8', '192.168.0.1')
+        table.add('10.1.0.0/16', '192.168.0.2')
+        table.add('10.1.2.0/24', '192.168.0.3')
+        table.add('10.1.2.3/32', '192.168.0.4')
+        eq_(table.get_data(dst_ip='10.1.2.3').route_id, 4)
+        eq_(table.get_data(dst_ip='10.1.2.4').route_id, 3)
+        eq_(table.get_data(dst_ip='10.1.3.1').route_id, 2)
+        eq_(table.get_data(dst_ip='10.2.0.1').route_id, 1)
+        eq_(table.get_data(dst_ip='11.0.0.1'), None)
+        table.add(rest_router.DEFAULT_ROUTE, '192.168.0.5')
+        eq_(table.get_data(dst_ip='11.0.0.1').route_id, 5)
+        eq_(table.get_data(), None)
+
+    def test_compare_linear(self):
+        rand = random.Random(1)
+        table = rest_router.RoutingTable()
+        for _i in range(500):
+            prefix = '%s/%d' % (self._random_ip(rand), rand.randint(1, 32))
+            try:
+                table.add(prefix, '192.168.0.1')
+            except rest_router.CommandFailure:
+                pass
+        # addresses within the routes and random ones
+        addrs = [rest_router.ipv4_int_to_text(
+            rest_router.ipv4_text_to_int(r.dst_ip) | rand.getrandbits(4))
+            for r in table.values()]
+        addrs += [self._random_ip(rand) for _i in range(500)]
+        for addr in addrs:
+            ok_(table.get_data(dst_ip=addr) is _linear_get_data(table, addr))
+        # delete half of them
+        for route_id in range(1, 501, 2):
+            table.delete(route_id)
+        ok_(all(r.route_id % 2 == 0 for r in table.values()))
+        for addr in addrs:
+            ok_(table.get_data(dst_ip=addr) is _linear_get_data(table, addr))
+        for route in table.values():
+            table.delete(route.route_id)
+        eq_(len(table), 0)
+        eq_(len(table._trie), 0)
+        eq_(table._trie._root.children, [None, None])
+
+    @raises(rest_router.CommandFailure)
+    def test_add_overlap(self):
+        table = rest_router.RoutingTable()
+        table.add('10.0.0.0/8', '192.168.0.1')
+        table.add('10.0.0.0/8', '192.168.0.2')
+
+    def test_delete(self):
+        table = rest_router.RoutingTable()
+        table.add('10.0.0.0/8', '192.168.0.1')
+        table.add('10.0.0.0/16', '192.168.0.2')
+        table.delete(2)
+        eq_(table.keys(), ['10.0.0.0/8'])
+        eq_(table.get_data(dst_ip='10.0.0.1').route_id, 1)
+        # unknown route_id
+        table.delete(3)
+        eq_(len(table), 1)
+
+    def test_gateway_mac(self):
+        table = rest_router.RoutingTable()
+        table.add('10.0.0.0/8', '192.168.0.1')
+        table.add('11.0.0.0/8', '192.168.0.2')
+        mac = '00:00:00:00:00:01'
+        eq_(table.get_data(gw_mac=mac), None)
+        table.set_gateway_mac('10.0.0.0/8', mac)
+        eq_(table.get_data(gw_mac=mac).route_id, 1)
+        table.set_gateway_mac('10.0.0.0/8', '00:00:00:00:00:02')
+        eq_(table.get_data(gw_mac=mac), None)
+        table.set_gateway_mac('11.0.0.0/8', mac)
+        eq_(table.get_data(gw_mac=mac).route_id, 2)
+        table.delete(2)
+        eq_(table.get_data(gw_mac=mac), None)
+
+
+class Test_PrefixTrie(unittest.TestCase):
+
+    """ Test case for rest_router.PrefixTrie
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_insert_delete(self):
+        trie = rest_router.PrefixTrie()
+        trie.insert(0x0a000000, 8, 'a')
+        trie.insert(0x0a010000, 16, 'b')
+        trie.insert(0x0a800000, 9, 'c')
+        trie.insert(0, 0, 'default')
+        eq_(len(trie), 4)
+        eq_(trie.lookup(0x0a010101), 'b')
+        eq_(trie.lookup(0x0a800001), 'c')
+        eq_(trie.lookup(0x0a020000), 'a')
+        eq_(trie.lookup(0x0b000000), 'default')
+        # replace
+        trie.insert(0x0a010000, 16, 'b2')
+        eq_(len(trie), 4)
+        eq_(trie.lookup(0x0a010101), 'b2')
+        eq_(trie.delete(0x0a000000, 8), 'a')
+        eq_(trie.delete(0x0a000000, 8), None)
+        eq_(trie.delete(0x0a000000, 7), None)
+        eq_(trie.lookup(0x0a020000), 'default')
+        eq_(trie.lookup(0x0a010101), 'b2')
+        eq_(trie.delete(0, 0), 'default')
+        eq_(trie.lookup(0x0a020000), None)
+        eq_(len(trie), 2)
+
+
+class Test_VlanRouter(unittest.TestCase):
+
+    """ Test case for rest_router.VlanRouter
+    """
+
+    def setUp(self):
+        self.waiters = {}
+        self.dp = _Datapath(self.waiters)
+        self.logger = logging.getLogger('test_rest_router')
+        port_data = rest_router.PortData(self.dp.ports)
+        self.router = rest_router.VlanRouter(rest_router.VLANID_NONE,
+                                             self.dp, port_data, self.logger)
+
+    def tearDown(self):
+        pass
+
+    def _count(self, msg_type):
+        return len([msg for msg in self.dp.sent
+                    if isinstance(msg, msg_type)])
+
+    def test_set_bulk_data(self):
+        data = [{'address': '10.0.0.1/24'},
+                {'address': '192.168.0.1/24'},
+                {'destination': '172.16.0.0/16', 'gateway': '10.0.0.2'},
+                {'destination': '172.17.0.0/16', 'gateway': '10.0.1.2'},
+                {'invalid': 0}]
+        msgs = self.router.set_bulk_data(data, self.waiters)
+        eq_([msg[rest_router.REST_RESULT] for msg in msgs],
+            [rest_router.REST_OK, rest_router.REST_OK, rest_router.REST_OK,
+             rest_router.REST_NG, rest_router.REST_NG])
+        eq_(len(self.router.address_data), 2)
+        eq_(len(self.router.routing_tbl), 1)
+        # all of the messages in one batch
+        parser = self.dp.ofproto_parser
+        eq_(self._count(parser.OFPBarrierRequest), 1)
+        ok_(isinstance(self.dp.sent[-1], parser.OFPBarrierRequest))
+        # 1 default route + 3 flows for each address + 1 route
+        eq_(len(self.dp.flows), 8)
+        eq_(self.waiters[self.dp.id], {})
+
+    def test_set_bulk_data_error(self):
+        # the cookie of the second address
+        self.dp.errors.add(2)
+        data = [{'address': '10.0.0.1/24'},
+                {'address': '192.168.0.1/24'}]
+        msgs = self.router.set_bulk_data(data, self.waiters)
+        eq_(msgs[0][rest_router.REST_RESULT], rest_router.REST_OK)
+        eq_(msgs[1][rest_router.REST_RESULT], rest_router.REST_NG)
+        ok_('OFPErrorMsg' in msgs[1][rest_router.REST_DETAILS])
+        # the failed address is not kept, so that it can be set again
+        eq_([a.address_id for a in self.router.address_data.values()], [1])
+        self.dp.errors.clear()
+        msgs = self.router.set_bulk_data(data[1:], self.waiters)
+        eq_(msgs[0][rest_router.REST_RESULT], rest_router.REST_OK)
+        eq_(len(self.router.address_data), 2)
+
+    def test_set_bulk_data_route_error(self):
+        # the cookie of the first route
+        self.dp.errors.add(1 << rest_router.COOKIE_SHIFT_ROUTEID)
+        data = [{'address': '10.0.0.1/24'},
+                {'destination': '172.16.0.0/16', 'gateway': '10.0.0.2'},
+                {'destination': '172.17.0.0/16', 'gateway': '10.0.0.3'}]
+        msgs = self.router.set_bulk_data(data, self.waiters)
+        eq_([msg[rest_router.REST_RESULT] for msg in msgs],
+            [rest_router.REST_OK, rest_router.REST_NG, rest_router.REST_OK])
+        eq_(self.router.routing_tbl.keys(), ['172.17.0.0/16'])
+        eq_(self.router.routing_tbl.get_data(dst_ip='172.16.0.1'), None)
+        # the default route + 3 flows of the address + 1 route
+        eq_(len(self.dp.flows), 5)
+        eq_(self.waiters[self.dp.id], {})
+
+    def test_set_bulk_data_address_error(self):
+        # the routes through a failed address are removed too
+        self.dp.errors.add(1)
+        data = [{'address': '10.0.0.1/24'},
+                {'destination': '172.16.0.0/16', 'gateway': '10.0.0.2'}]
+        msgs = self.router.set_bulk_data(data, self.waiters)
+        eq_([msg[rest_router.REST_RESULT] for msg in msgs],
+            [rest_router.REST_NG, rest_router.REST_NG])
+        ok_('address_id=1 is not added' in msgs[1][rest_router.REST_DETAILS])
+        eq_(len(self.router.address_data), 0)
+        eq_(len(self.router.routing_tbl), 0)
+        # the default route only
+        eq_(len(self.dp.flows), 1)
+
+    def test_delete_bulk_data(self):
+        data = [{'address': '10.0.0.1/24'},
+                {'address': '192.168.0.1/24'},
+                {'destination': '172.16.0.0/16', 'gateway': '10.0.0.2'}]
+        self.router.set_bulk_data(data, self.waiters)
+        del self.dp.sent[:]
+
+        data = [{'route_id': 1},
+                {'address_id': 'all'},
+                {'route_id': 2},
+                {'invalid': 0}]
+        msgs = self.router.delete_bulk_data(data, self.waiters)
+        eq_([msg[rest_router.REST_RESULT] for msg in msgs],
+            [rest_router.REST_OK, rest_router.REST_OK, rest_router.REST_NG,
+             rest_router.REST_NG])
+        eq_(len(self.router.address_data), 0)
+        eq_(len(self.router.routing_tbl), 0)
+        # the default route only
+        eq_(len(self.dp.flows), 1)
+        # the flows are got only once
+        parser = self.dp.ofproto_parser
+        eq_(self._count(parser.OFPFlowStatsRequest), 1)
+        eq_(self._count(parser.OFPBarrierRequest), 1)
@@ -0,0 +1,140 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import json
+import unittest
+import logging
+from nose.tools import eq_, ok_
+from webob.request import Request
+
+from ryu.app import rest_topology
+from ryu.app.wsgi import WSGIApplication
+from ryu.lib import hub
+from ryu.topology import event
+
+LOG = logging.getLogger('test_rest_topology')
+
+
+class _Switch(object):
+    def __init__(self, dpid):
+        self.dpid = dpid
+
+    def to_dict(self):
+        return {'dpid': self.dpid, 'ports': []}
+
+
+class _Topology(object):
+    # stands for the switches app
+    def __init__(self):
+        self.switches = []
+        self.changes = []
+        self.topology_calls = 0
+
+    def change(self, ev):
+        self.changes.append(ev)
+        if isinstance(ev, event.EventSwitchEnter):
+            self.switches.append(ev.switch)
+
+    def get_topology(self, app):
+        self.topology_calls += 1
+        return len(self.changes), self.switches, []
+
+    def get_topology_changes(self, app, revision):
+        if revision > len(self.changes):
+            return len(self.changes), None
+        return len(self.changes), [(i + 1, ev) for i, ev
+                                   in enumerate(self.changes)][revision:]
+
+
+class Test_rest_topology(unittest.TestCase):
+
+    """ Test case for rest_topology
+    """
+
+    def setUp(self):
+        # test_manager reloads ryu.base.app_manager, which makes
+        # TopologyAPI a subclass of the stale RyuApp.
+        reload(rest_topology)
+        self.topology = _Topology()
+        rest_topology.get_topology = self.topology.get_topology
+        rest_topology.get_topology_changes = \
+            self.topology.get_topology_changes
+        self.wsgi = WSGIApplication()
+        self.app = rest_topology.TopologyAPI(wsgi=self.wsgi)
+
+    def tearDown(self):
+        reload(rest_topology)
+
+    def _change(self, ev):
+        self.topology.change(ev)
+        self.app._topology_changed_handler(ev)
+
+    def _get(self, uri):
+        res = Request.blank(uri).get_response(self.wsgi)
+        if res.status_int != 200:
+            return res.status_int, None
+        return res.status_int, json.loads(res.body)
+
+    def test_topology(self):
+        self._change(event.EventSwitchEnter(_Switch(1)))
+        eq_(self._get('/v1.0/topology'),
+            (200, {'revision': 1, 'switches': [{'dpid': 1, 'ports': []}],
+                   'links': []}))
+        # serialized only once until the topology changes
+        self._get('/v1.0/topology')
+        eq_(self.topology.topology_calls, 1)
+
+        self._change(event.EventSwitchEnter(_Switch(2)))
+        status, body = self._get('/v1.0/topology')
+        eq_(body['revision'], 2)
+        eq_(len(body['switches']), 2)
+        eq_(self.topology.topology_calls, 2)
+
+    def test_changes(self):
+        self._change(event.EventSwitchEnter(_Switch(1)))
+        self._change(event.EventSwitchLeave(_Switch(1)))
+        eq_(self._get('/v1.0/topology/changes/0'),
+            (200, {'revision': 2, 'changes': [
+                {'revision': 1, 'type': 'switch_enter',
+                 'switch': {'dpid': 1, 'ports': []}},
+                {'revision': 2, 'type': 'switch_leave',
+                 'switch': {'dpid': 1, 'ports': []}}]}))
+        eq_(self._get('/v1.0/topology/changes/1')[1]['changes'][0]['type'],
+            'switch_leave')
+        eq_(self._get('/v1.0/topology/changes/2'),
+            (200, {'revision': 2, 'changes': []}))
+        # the changes are not kept
+        eq_(self._get('/v1.0/topology/changes/3'), (410, None))
+        eq_(self._get('/v1.0/topology/changes/2?timeout=x'), (400, None))
+        for timeout in ['nan', 'inf', '-inf', '-1']:
+            eq_(self._get('/v1.0/topology/changes/2?timeout=' + timeout),
+                (400, None))
+
+    def test_long_poll(self):
+        def change():
+            hub.sleep(0.05)
+            self._change(event.EventSwitchEnter(_Switch(1)))
+
+        thread = hub.spawn(change)
+        status, body = self._get('/v1.0/topology/changes/0?timeout=10')
+        hub.joinall([thread])
+        eq_(body['revision'], 1)
+        eq_(len(body['changes']), 1)
+
+    def test_long_poll_timeout(self):
+        eq_(self._get('/v1.0/topology/changes/0?timeout=0.05'),
+            (200, {'revision': 0, 'changes': []}))
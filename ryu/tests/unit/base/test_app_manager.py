@@ -0,0 +1,110 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+from nose.tools import eq_
+
+from ryu.base import app_manager
+from ryu.controller import event
+from ryu.controller.handler import set_ev_cls
+from ryu.controller.handler import CONFIG_DISPATCHER, MAIN_DISPATCHER
+
+LOG = logging.getLogger('test_app_manager')
+
+
+class _EventA(event.EventBase):
+    pass
+
+
+class _EventB(event.EventBase):
+    pass
+
+
+class _App(app_manager.RyuApp):
+    @set_ev_cls(_EventA, MAIN_DISPATCHER)
+    def main_handler(self, ev):
+        pass
+
+    @set_ev_cls(_EventA, [CONFIG_DISPATCHER, MAIN_DISPATCHER])
+    def config_main_handler(self, ev):
+        pass
+
+    @set_ev_cls(_EventA)
+    def any_handler(self, ev):
+        pass
+
+
+class Test_RyuApp(unittest.TestCase):
+
+    """ Test case for RyuApp
+    """
+
+    def setUp(self):
+        self.app = _App()
+        self.app.register_handler(_EventA, self.app.main_handler)
+        self.app.register_handler(_EventA, self.app.config_main_handler)
+        self.app.register_handler(_EventA, self.app.any_handler)
+
+    def tearDown(self):
+        pass
+
+    def test_get_handlers(self):
+        app = self.app
+        eq_((app.main_handler, app.config_main_handler, app.any_handler),
+            app.get_handlers(_EventA(), MAIN_DISPATCHER))
+        eq_((app.config_main_handler, app.any_handler),
+            app.get_handlers(_EventA(), CONFIG_DISPATCHER))
+        eq_(3, len(app.get_handlers(_EventA())))
+        eq_((), app.get_handlers(_EventB(), MAIN_DISPATCHER))
+
+    def test_get_handlers_invalidate(self):
+        app = self.app
+        eq_(2, len(app.get_handlers(_EventA(), CONFIG_DISPATCHER)))
+
+        app.unregister_handler(_EventA, app.any_handler)
+        eq_((app.config_main_handler,),
+            app.get_handlers(_EventA(), CONFIG_DISPATCHER))
+
+        app.register_handler(_EventB, app.any_handler)
+        eq_((app.config_main_handler,),
+            app.get_handlers(_EventA(), CONFIG_DISPATCHER))
+        eq_((), app.get_handlers(_EventB(), CONFIG_DISPATCHER))
+
+        app.unregister_handler(_EventA, app.main_handler)
+        app.unregister_handler(_EventA, app.config_main_handler)
+        eq_((), app.get_handlers(_EventA(), CONFIG_DISPATCHER))
+        eq_([], app.get_handlers(_EventA()))
+
+    def test_get_observers(self):
+        app = self.app
+        eq_((), app.get_observers(_EventA(), MAIN_DISPATCHER))
+
+        app.register_observer(_EventA, 'main', [MAIN_DISPATCHER])
+        app.register_observer(_EventA, 'any')
+        eq_(['any', 'main'],
+            sorted(app.get_observers(_EventA(), MAIN_DISPATCHER)))
+        eq_(('any',), app.get_observers(_EventA(), CONFIG_DISPATCHER))
+        eq_(['any', 'main'], sorted(app.get_observers(_EventA(), None)))
+
+        app.unregister_observer(_EventA, 'any')
+        eq_(('main',), app.get_observers(_EventA(), MAIN_DISPATCHER))
+
+        app.register_observer(_EventB, 'main')
+        app.unregister_observer_all_event('main')
+        eq_((), app.get_observers(_EventA(), MAIN_DISPATCHER))
+        eq_((), app.get_observers(_EventB(), MAIN_DISPATCHER))
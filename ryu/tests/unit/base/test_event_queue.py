@@ -0,0 +1,195 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+from nose.tools import eq_, ok_
+
+from ryu.base import app_manager
+from ryu.base import event_queue
+from ryu.base.event_queue import EventPolicy, EventQueue
+from ryu.controller import event
+from ryu.lib import hub
+
+LOG = logging.getLogger('test_event_queue')
+
+
+class _Event(event.EventBase):
+    def __init__(self, value, key=None):
+        super(_Event, self).__init__()
+        self.value = value
+        self.key = key
+
+
+class _EventHigh(_Event):
+    pass
+
+
+class _EventLow(_Event):
+    pass
+
+
+class _EventCoalesce(_Event):
+    pass
+
+
+_POLICIES = {
+    _EventHigh: EventPolicy(priority=1),
+    _EventLow: EventPolicy(priority=-1, overload=event_queue.DROP_OLDEST),
+    _EventCoalesce: EventPolicy(overload=event_queue.COALESCE,
+                                key=lambda ev: ev.key),
+}
+
+
+class Test_EventQueue(unittest.TestCase):
+
+    """ Test case for EventQueue
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def _get_values(self, q):
+        values = []
+        while not q.empty():
+            ev, _state = q.get()
+            values.append(ev.value)
+        return values
+
+    def test_fifo(self):
+        q = EventQueue(4)
+        for i in range(3):
+            q.put((_Event(i), 'state%d' % i))
+        eq_(q.qsize(), 3)
+        ev, state = q.get()
+        eq_(ev.value, 0)
+        eq_(state, 'state0')
+        eq_(self._get_values(q), [1, 2])
+
+    def test_priority(self):
+        q = EventQueue(8, _POLICIES)
+        q.put((_EventLow(0), None))
+        q.put((_Event(1), None))
+        q.put((_EventHigh(2), None))
+        q.put((_Event(3), None))
+        q.put((_EventHigh(4), None))
+        eq_(self._get_values(q), [2, 4, 1, 3, 0])
+
+    def test_drop_newest(self):
+        policies = {_Event: EventPolicy(overload=event_queue.DROP_NEWEST)}
+        q = EventQueue(2, policies)
+        ok_(q.put((_Event(0), None)))
+        ok_(q.put((_Event(1), None)))
+        ok_(not q.put((_Event(2), None)))
+        eq_(self._get_values(q), [0, 1])
+        eq_(q.stats.dropped['_Event'], 1)
+        eq_(q.stats.high_water, 2)
+
+    def test_drop_oldest(self):
+        q = EventQueue(3, _POLICIES)
+        q.put((_EventLow(0), None))
+        q.put((_Event(1), None))
+        q.put((_EventLow(2), None))
+        ok_(not q.put((_EventLow(3), None)))
+        eq_(q.qsize(), 3)
+        eq_(self._get_values(q), [1, 2, 3])
+        eq_(q.stats.dropped['_EventLow'], 1)
+
+    def test_drop_oldest_no_same_class(self):
+        q = EventQueue(2, _POLICIES)
+        q.put((_Event(0), None))
+        q.put((_Event(1), None))
+        # other classes are never dropped to make room.
+        ok_(not q.put((_EventLow(2), None)))
+        eq_(self._get_values(q), [0, 1])
+
+    def test_drop_oldest_compact(self):
+        q = EventQueue(2, _POLICIES)
+        for i in range(100):
+            q.put((_EventLow(i), None))
+        eq_(q.stats.dropped['_EventLow'], 98)
+        ok_(len(q._prio_queues[-1]) <= 2 * q.maxsize + 1)
+        eq_(self._get_values(q), [98, 99])
+
+    def test_coalesce(self):
+        q = EventQueue(2, _POLICIES)
+        q.put((_EventCoalesce(0, key='a'), None))
+        q.put((_EventCoalesce(1, key='b'), None))
+        ok_(q.put((_EventCoalesce(2, key='a'), None)))
+        eq_(q.qsize(), 2)
+        eq_(q.stats.coalesced['_EventCoalesce'], 1)
+        eq_(self._get_values(q), [2, 1])
+
+    def test_coalesce_not_full(self):
+        q = EventQueue(4, _POLICIES)
+        q.put((_EventCoalesce(0, key='a'), None))
+        q.put((_EventCoalesce(1, key='a'), None))
+        eq_(self._get_values(q), [0, 1])
+
+    def test_block(self):
+        q = EventQueue(1)
+        q.put((_Event(0), None))
+        done = []
+
+        def _put():
+            q.put((_Event(1), None))
+            done.append(True)
+
+        thr = hub.spawn(_put)
+        hub.sleep(0)
+        eq_(done, [])
+        eq_(q.stats.blocked['_Event'], 1)
+        eq_(self._get_values(q), [0])
+        hub.joinall([thr])
+        eq_(done, [True])
+        eq_(self._get_values(q), [1])
+
+    def test_get_block(self):
+        q = EventQueue(1)
+        thr = hub.spawn(q.get)
+        hub.sleep(0)
+        q.put((_Event(0), None))
+        with hub.Timeout(1):
+            hub.joinall([thr])
+        ok_(q.empty())
+
+
+class _App(app_manager.RyuApp):
+    _EVENT_QUEUE_SIZE = 16
+    _EVENT_POLICIES = _POLICIES
+
+
+class Test_RyuApp_events(unittest.TestCase):
+
+    """ Test case for the event queue of RyuApp
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_queue(self):
+        app = _App()
+        eq_(app.events.maxsize, 16)
+        ok_(app.events.policies is _POLICIES)
+        app._send_event(_EventHigh(0), None)
+        eq_(app.events.stats.to_dict()['enqueued'], {'_EventHigh': 1})
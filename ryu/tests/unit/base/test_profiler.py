@@ -0,0 +1,133 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+import json
+from nose.tools import eq_, ok_
+
+from ryu.app import rest_profiler
+from ryu.app.wsgi import WSGIApplication
+from ryu.base import app_manager
+from ryu.base import profiler
+from ryu.controller import event
+from ryu.controller.handler import set_ev_cls
+from ryu.lib import hub
+
+LOG = logging.getLogger('test_profiler')
+
+
+class _Event(event.EventBase):
+    pass
+
+
+class _App(app_manager.RyuApp):
+    def __init__(self, *args, **kwargs):
+        super(_App, self).__init__(*args, **kwargs)
+        self.received = []
+
+    @set_ev_cls(_Event)
+    def event_handler(self, ev):
+        self.received.append(ev)
+
+
+class Test_Histogram(unittest.TestCase):
+
+    """ Test case for profiler.Histogram
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_add(self):
+        h = profiler.Histogram()
+        h.add(0)
+        h.add(0.000003)
+        h.add(0.0001)
+        h.add(1000000)
+        d = h.to_dict()
+        eq_(d['count'], 4)
+        eq_(d['max'], 1000000)
+        eq_(d['buckets'], [[1, 1], [4, 1], [128, 1],
+                           [1 << (profiler._NUM_BUCKETS - 1), 1]])
+
+
+class Test_profiler(unittest.TestCase):
+
+    """ Test case for ryu.base.profiler
+    """
+
+    def setUp(self):
+        profiler.reset()
+        profiler.enable()
+
+    def tearDown(self):
+        profiler.disable()
+        profiler.reset()
+
+    def test_call_handlers(self):
+        received = []
+
+        def handler_a(ev):
+            received.append(ev)
+
+        def handler_b(ev):
+            received.append(ev)
+
+        ev = _Event()
+        profiler.call_handlers('app', ev, [handler_a, handler_b], 1)
+        eq_(received, [ev, ev])
+
+        stats = profiler.get_stats()['apps']['app']['_Event']
+        eq_(stats['queue_wait']['count'], 1)
+        eq_(sorted(stats['handlers'].keys()), ['handler_a', 'handler_b'])
+        eq_(stats['handlers']['handler_a']['count'], 1)
+
+        profiler.reset()
+        eq_(profiler.get_stats()['apps'], {})
+
+    def test_event_loop(self):
+        app = _App()
+        app.register_handler(_Event, app.event_handler)
+        ok_(app.events.timestamp)
+        app.start()
+        app._send_event(_Event(), None)
+        hub.sleep(0)
+        app.stop()
+        eq_(len(app.received), 1)
+
+        stats = profiler.get_stats()['apps'][app.name]['_Event']
+        eq_(stats['queue_wait']['count'], 1)
+        eq_(stats['handlers']['event_handler']['count'], 1)
+
+    def test_rest(self):
+        wsgi = WSGIApplication()
+        rest_profiler.ProfilerAPI(wsgi=wsgi)
+        profiler.call_handlers('app', _Event(), [])
+
+        r = wsgi({'REQUEST_METHOD': 'GET', 'PATH_INFO': '/v1.0/profile'},
+                 lambda s, _: eq_(s, '200 OK'))
+        stats = json.loads(''.join(r))
+        ok_(stats['enabled'])
+        ok_('app' in stats['apps'])
+
+        wsgi({'REQUEST_METHOD': 'DELETE', 'PATH_INFO': '/v1.0/profile'},
+             lambda s, _: eq_(s, '200 OK'))
+        eq_(profiler.get_stats()['apps'], {})
@@ -0,0 +1,140 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import mock
+from nose.tools import eq_, ok_
+
+from ryu.base import app_manager
+from ryu.base import sharding
+from ryu.controller import event
+from ryu.controller.handler import set_ev_cls
+
+LOG = logging.getLogger('test_sharding')
+
+
+class _EventGlobal(event.EventBase):
+    def __init__(self, value):
+        super(_EventGlobal, self).__init__()
+        self.value = value
+
+
+class _EventLocal(event.EventBase):
+    pass
+
+
+class _Source(app_manager.RyuApp):
+    _GLOBAL_EVENTS = [_EventGlobal]
+
+
+class _Observer(app_manager.RyuApp):
+    @set_ev_cls(_EventGlobal)
+    def global_handler(self, ev):
+        pass
+
+
+class Test_Worker(unittest.TestCase):
+
+    """ Test case for sharding.Worker
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        paths = [os.path.join(self.tmpdir, str(i)) for i in range(2)]
+        self.workers = [sharding.Worker(i, paths) for i in range(2)]
+        for w in self.workers:
+            w.sock.settimeout(1)
+
+    def tearDown(self):
+        for w in self.workers:
+            w.close()
+        shutil.rmtree(self.tmpdir)
+
+    def _recv(self, worker):
+        return worker.sock.recv(sharding._MAX_DGRAM_SIZE)
+
+    def test_forward_and_deliver(self):
+        src = _Source()
+        src.register_observer(_EventGlobal, 'observer')
+        sent = []
+        src.send_event = lambda name, ev, state: sent.append((name, ev,
+                                                              state))
+
+        self.workers[0].forward(src.name, _EventGlobal(3), 'state')
+        data = self._recv(self.workers[1])
+        with mock.patch('ryu.base.app_manager.lookup_service_brick',
+                        return_value=src):
+            self.workers[1].deliver(data)
+
+        eq_(len(sent), 1)
+        name, ev, state = sent[0]
+        eq_(name, 'observer')
+        ok_(isinstance(ev, _EventGlobal))
+        eq_(ev.value, 3)
+        eq_(state, 'state')
+
+    def test_forward_not_to_self(self):
+        self.workers[1].forward('src', _EventGlobal(1), None)
+        self.workers[1].sock.settimeout(0)
+        self.assertRaises(socket.error, self._recv, self.workers[1])
+
+    def test_send_event_to_observers(self):
+        src = _Source()
+        src.send_event = lambda name, ev, state: None
+        with mock.patch('ryu.base.sharding._worker', self.workers[0]):
+            src.send_event_to_observers(_EventGlobal(5))
+            src.send_event_to_observers(_EventLocal())
+
+        data = self._recv(self.workers[1])
+        name, ev, state = sharding.pickle.loads(data)
+        eq_(name, src.name)
+        eq_(ev.value, 5)
+        # _EventLocal is not forwarded.
+        self.workers[1].sock.settimeout(0)
+        self.assertRaises(socket.error, self._recv, self.workers[1])
+
+    def test_deliver_unknown_app(self):
+        self.workers[0].forward('unknown', _EventGlobal(1), None)
+        data = self._recv(self.workers[1])
+        with mock.patch('ryu.base.app_manager.lookup_service_brick',
+                        return_value=None):
+            self.workers[1].deliver(data)
+
+
+class Test_start_workers(unittest.TestCase):
+
+    """ Test case for sharding.start_workers
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_reuse_port_unsupported(self):
+        # the workers can't share the port without SO_REUSEPORT
+        with mock.patch('ryu.lib.hub.SO_REUSEPORT', None):
+            with mock.patch('os.fork') as fork:
+                self.assertRaises(RuntimeError, sharding.start_workers, 2)
+        eq_(fork.call_count, 0)
+        eq_(sharding.get_worker(), None)
@@ -0,0 +1,184 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+import mock
+from nose.tools import eq_, ok_
+
+from ryu.base import app_manager  # To suppress cyclic import
+from ryu.controller import controller
+from ryu.lib import hub
+from ryu.ofproto import ofproto_v1_3
+
+LOG = logging.getLogger('test_controller')
+
+_PACKET_DATA_DIR = '../packet_data/of13/'
+_MSGS = [
+    '4-4-ofp_packet_in.packet',
+    '4-40-ofp_flow_removed.packet',
+    '4-13-ofp_echo_request.packet',
+    '4-39-ofp_port_status.packet',
+    '4-59-ofp_packet_in.packet',
+]
+
+
+class _Socket(object):
+    """socket-like object which returns the given data in chunks"""
+
+    def __init__(self, data='', chunk_size=0):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.sent = []
+
+    def setsockopt(self, *args):
+        pass
+
+    def recv_into(self, buf):
+        size = min(len(buf), self.chunk_size, len(self.data) - self.offset)
+        buf[:size] = self.data[self.offset:self.offset + size]
+        self.offset += size
+        return size
+
+    def sendall(self, buf):
+        self.sent.append(str(buf))
+
+
+class _Brick(object):
+    def __init__(self):
+        self.msgs = []
+
+    def send_event_to_observers(self, ev, state=None):
+        if hasattr(ev, 'msg'):
+            self.msgs.append(ev.msg)
+
+    def get_handlers(self, ev, state=None):
+        return []
+
+
+class Test_Datapath(unittest.TestCase):
+
+    """ Test case for Datapath
+    """
+
+    def setUp(self):
+        self.wire_msgs = [open(_PACKET_DATA_DIR + f, 'rb').read()
+                          for f in _MSGS]
+
+    def tearDown(self):
+        pass
+
+    def _datapath(self, sock, brick):
+        with mock.patch('ryu.base.app_manager.lookup_service_brick',
+                        return_value=brick):
+            dp = controller.Datapath(sock, ('addr', 0))
+        dp.set_version(ofproto_v1_3.OFP_VERSION)
+        return dp
+
+    def _recv(self, data, chunk_size):
+        brick = _Brick()
+        dp = self._datapath(_Socket(data, chunk_size), brick)
+        dp._recv_loop()
+        ok_(not dp.is_active)
+        return brick.msgs
+
+    def _test_recv_loop(self, chunk_size, count=1):
+        data = ''.join(self.wire_msgs) * count
+        msgs = self._recv(data, chunk_size)
+        eq_(len(self.wire_msgs) * count, len(msgs))
+        for wire_msg, msg in zip(self.wire_msgs * count, msgs):
+            eq_(wire_msg, str(msg.buf))
+
+    def test_recv_loop(self):
+        self._test_recv_loop(0x10000)
+
+    def test_recv_loop_byte_by_byte(self):
+        self._test_recv_loop(1)
+
+    def test_recv_loop_split(self):
+        for chunk_size in [3, 7, 8, 9, 100]:
+            self._test_recv_loop(chunk_size)
+
+    def test_recv_loop_compaction(self):
+        # more than the receive buffer size to wrap around
+        count = controller._RECV_BUF_SIZE / len(''.join(self.wire_msgs)) + 2
+        self._test_recv_loop(1000, count)
+
+    def test_recv_loop_malformed_length(self):
+        malformed = '\x04\x02\x00\x00\x00\x00\x00\x00'
+        msgs = self._recv(self.wire_msgs[0] + malformed + self.wire_msgs[1],
+                          0x10000)
+        eq_(1, len(msgs))
+
+    def test_send_loop_coalesce(self):
+        sock = _Socket()
+        dp = self._datapath(sock, _Brick())
+        for buf in self.wire_msgs:
+            dp.send(buf)
+        eq_(len(self.wire_msgs), dp.send_stats.queued_msgs)
+
+        thr = hub.spawn(dp._send_loop)
+        hub.sleep(0)
+        eq_([''.join(self.wire_msgs)], sock.sent)
+        eq_(0, dp.send_stats.queued_msgs)
+        eq_(0, dp.send_stats.queued_bytes)
+        eq_(1, dp.send_stats.flushes)
+        eq_(len(self.wire_msgs), dp.send_stats.flushed_msgs)
+        eq_(len(''.join(self.wire_msgs)), dp.send_stats.flushed_bytes)
+
+        dp.send(self.wire_msgs[0])
+        hub.sleep(0)
+        eq_(self.wire_msgs[0], sock.sent[-1])
+        eq_(2, dp.send_stats.flushes)
+
+        hub.kill(thr)
+        hub.joinall([thr])
+        eq_(None, dp.send_bufs)
+        dp.send(self.wire_msgs[0])
+        eq_(2, len(sock.sent))
+
+    def test_send_high_water(self):
+        sock = _Socket()
+        dp = self._datapath(sock, _Brick())
+        dp.send_high_water = 1
+        dp.send(self.wire_msgs[0])
+
+        # blocked until the send loop drains the queue
+        sender = hub.spawn(dp.send, self.wire_msgs[1])
+        hub.sleep(0)
+        eq_(1, dp.send_stats.queued_msgs)
+
+        thr = hub.spawn(dp._send_loop)
+        hub.joinall([sender])
+        eq_(1, dp.send_stats.stalls)
+        hub.sleep(0)
+        eq_(self.wire_msgs[:2], sock.sent)
+        eq_(len(self.wire_msgs[0]), dp.send_stats.max_queued_bytes)
+        hub.kill(thr)
+        hub.joinall([thr])
+
+    def test_send_unblock_on_close(self):
+        dp = self._datapath(_Socket(), _Brick())
+        dp.send_high_water = 1
+        dp.send(self.wire_msgs[0])
+        sender = hub.spawn(dp.send, self.wire_msgs[1])
+        thr = hub.spawn(dp._send_loop)
+        hub.sleep(0)
+        hub.kill(thr)
+        hub.joinall([thr, sender])
+        eq_(None, dp.send_bufs)
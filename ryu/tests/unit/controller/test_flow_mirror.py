@@ -0,0 +1,273 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+from nose.tools import eq_, ok_
+
+from ryu.controller import flow_mirror
+from ryu.controller import handler
+from ryu.controller import ofp_event
+from ryu.lib import hub
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_0
+from ryu.ofproto import ofproto_v1_3
+
+LOG = logging.getLogger('test_flow_mirror')
+
+
+class _Datapath(ofproto_protocol.ProtocolDesc):
+    # replies to flow stats requests with the given entries
+    def __init__(self, mirror, version=ofproto_v1_3.OFP_VERSION):
+        super(_Datapath, self).__init__(version=version)
+        self.mirror = mirror
+        self.id = 1
+        self.xid = 0
+        self.sent = []
+        self.flows = []
+
+    def set_xid(self, msg):
+        self.xid += 1
+        msg.set_xid(self.xid)
+
+    def send_msg(self, msg):
+        self.sent.append(msg)
+        if isinstance(msg, self.ofproto_parser.OFPFlowStatsRequest):
+            hub.spawn(self._reply, msg.xid)
+
+    def _reply(self, xid):
+        msg = self.ofproto_parser.OFPFlowStatsReply(self, body=self.flows)
+        msg.xid = xid
+        msg.flags = 0
+        self.mirror._stats_reply_handler(ofp_event.ofp_msg_to_ev(msg))
+
+
+class Test_flow_mirror(unittest.TestCase):
+
+    """ Test case for flow_mirror
+    """
+
+    def setUp(self):
+        # test_manager reloads ryu.base.app_manager, which makes
+        # FlowMirror a subclass of the stale RyuApp.
+        reload(flow_mirror.stats_collector)
+        reload(flow_mirror)
+        self.mirror = flow_mirror.FlowMirror()
+        self.dp = self._connect(ofproto_v1_3.OFP_VERSION)
+
+    def tearDown(self):
+        pass
+
+    def _connect(self, version):
+        dp = _Datapath(self.mirror, version)
+        ev = ofp_event.EventOFPStateChange(dp)
+        ev.state = handler.MAIN_DISPATCHER
+        self.mirror._state_change_handler(ev)
+        return dp
+
+    def _flow_mod(self, command=ofproto_v1_3.OFPFC_ADD, table_id=0,
+                  priority=100, match=None, cookie=0, cookie_mask=0,
+                  out_port=ofproto_v1_3.OFPP_ANY, port=1):
+        parser = self.dp.ofproto_parser
+        actions = [parser.OFPActionOutput(port)]
+        inst = [parser.OFPInstructionActions(
+            ofproto_v1_3.OFPIT_APPLY_ACTIONS, actions)]
+        return parser.OFPFlowMod(
+            self.dp, cookie=cookie, cookie_mask=cookie_mask,
+            table_id=table_id, command=command, priority=priority,
+            out_port=out_port, out_group=ofproto_v1_3.OFPG_ANY,
+            match=parser.OFPMatch(**(match or {})), instructions=inst)
+
+    def _flow_stats(self, mod):
+        return self.dp.ofproto_parser.OFPFlowStats(
+            table_id=mod.table_id, duration_sec=0, duration_nsec=0,
+            priority=mod.priority, idle_timeout=0, hard_timeout=0, flags=0,
+            cookie=mod.cookie, packet_count=10, byte_count=1000,
+            match=mod.match, instructions=mod.instructions)
+
+    def _install(self):
+        mods = [
+            self._flow_mod(match={'in_port': 1, 'eth_type': 0x800},
+                           cookie=1),
+            self._flow_mod(match={'in_port': 1, 'eth_type': 0x806},
+                           cookie=2, port=2),
+            self._flow_mod(match={'in_port': 2}, priority=10, cookie=0x101),
+            self._flow_mod(table_id=1, match={'in_port': 1}, cookie=3),
+        ]
+        for mod in mods:
+            self.mirror.send_flow_mod(self.dp, mod)
+        return mods
+
+    def _cookies(self, entries):
+        return sorted(e.cookie for e in entries)
+
+    def test_add(self):
+        mods = self._install()
+        eq_(len(self.dp.sent), len(mods))
+        eq_(len(self.mirror.get_table(1)), 4)
+        get_flows = self.mirror.get_flows
+        eq_(self._cookies(get_flows(1)), [1, 2, 3, 0x101])
+        eq_(self._cookies(get_flows(1, table_id=0)), [1, 2, 0x101])
+        eq_(self._cookies(get_flows(1, match={'in_port': 1})), [1, 2, 3])
+        eq_(self._cookies(get_flows(1, table_id=0, priority=100,
+                                    match={'in_port': 1})), [1, 2])
+        eq_(self._cookies(get_flows(1, table_id=0, priority=100, strict=True,
+                                    match={'in_port': 1,
+                                           'eth_type': 0x806})), [2])
+        eq_(self._cookies(get_flows(1, cookie=0x100, cookie_mask=0xf00)),
+            [0x101])
+        eq_(get_flows(2), [])
+        # the same table_id, priority and match replaces the entry
+        self.mirror.send_flow_mod(self.dp, self._flow_mod(
+            match={'in_port': 1, 'eth_type': 0x800}, cookie=4))
+        eq_(self._cookies(get_flows(1, table_id=0)), [2, 4, 0x101])
+
+    def test_delete(self):
+        self._install()
+        ofp = self.dp.ofproto
+        self.mirror.send_flow_mod(self.dp, self._flow_mod(
+            ofp.OFPFC_DELETE, table_id=ofp.OFPTT_ALL, match={'in_port': 1}))
+        eq_(self._cookies(self.mirror.get_flows(1)), [0x101])
+        # the indexes are updated
+        eq_(self.mirror.get_flows(1, match={'in_port': 1}), [])
+        eq_(self.mirror.get_table(1).by_cookie.keys(), [0x101])
+
+    def test_delete_strict(self):
+        self._install()
+        ofp = self.dp.ofproto
+        self.mirror.send_flow_mod(self.dp, self._flow_mod(
+            ofp.OFPFC_DELETE_STRICT, match={'in_port': 1}))
+        eq_(len(self.mirror.get_table(1)), 4)
+        self.mirror.send_flow_mod(self.dp, self._flow_mod(
+            ofp.OFPFC_DELETE_STRICT, priority=10, match={'in_port': 2}))
+        eq_(self._cookies(self.mirror.get_flows(1)), [1, 2, 3])
+
+    def test_delete_cookie_out_port(self):
+        self._install()
+        ofp = self.dp.ofproto
+        self.mirror.send_flow_mod(self.dp, self._flow_mod(
+            ofp.OFPFC_DELETE, table_id=ofp.OFPTT_ALL, cookie=0x100,
+            cookie_mask=0xf00))
+        eq_(self._cookies(self.mirror.get_flows(1)), [1, 2, 3])
+        self.mirror.send_flow_mod(self.dp, self._flow_mod(
+            ofp.OFPFC_DELETE, table_id=ofp.OFPTT_ALL, out_port=2))
+        eq_(self._cookies(self.mirror.get_flows(1)), [1, 3])
+
+    def test_modify(self):
+        self._install()
+        ofp = self.dp.ofproto
+        self.mirror.send_flow_mod(self.dp, self._flow_mod(
+            ofp.OFPFC_MODIFY, match={'in_port': 1}, port=5))
+        for entry in self.mirror.get_flows(1, table_id=0,
+                                           match={'in_port': 1}):
+            eq_(entry.actions[0].actions[0].port, 5)
+        eq_(self.mirror.get_flows(1, table_id=1)[0].actions[0].actions[0]
+            .port, 1)
+        # OpenFlow 1.3 doesn't add the entry if nothing matches
+        self.mirror.send_flow_mod(self.dp, self._flow_mod(
+            ofp.OFPFC_MODIFY, match={'in_port': 9}))
+        eq_(len(self.mirror.get_table(1)), 4)
+
+    def test_flow_removed(self):
+        mods = self._install()
+        msg = self.dp.ofproto_parser.OFPFlowRemoved(
+            self.dp, cookie=2, priority=100, table_id=0, match=mods[1].match)
+        self.mirror._flow_removed_handler(ofp_event.ofp_msg_to_ev(msg))
+        eq_(self._cookies(self.mirror.get_flows(1)), [1, 3, 0x101])
+
+    def test_reconcile(self):
+        mods = self._install()
+        # the datapath lost mods[0], modified mods[1] and has an
+        # unknown entry
+        unknown = self._flow_mod(match={'in_port': 3}, cookie=5)
+        modified = self._flow_mod(match={'in_port': 1, 'eth_type': 0x806},
+                                  cookie=2, port=3)
+        self.dp.flows = [self._flow_stats(m)
+                         for m in [modified, mods[2], mods[3], unknown]]
+
+        diff = self.mirror.diff(self.dp)
+        eq_(self._cookies(diff.added), [5])
+        eq_(self._cookies(diff.removed), [1])
+        eq_([(m.cookie, d.cookie) for m, d in diff.modified], [(2, 2)])
+        # diff() doesn't change the mirror
+        eq_(self._cookies(self.mirror.get_flows(1)), [1, 2, 3, 0x101])
+
+        diff = self.mirror.reconcile(self.dp)
+        eq_(repr(diff), 'FlowDiff<added=1 removed=1 modified=1>')
+        ok_(self.mirror.get_table(1).synced)
+        entries = self.mirror.get_flows(1)
+        eq_(self._cookies(entries), [2, 3, 5, 0x101])
+        eq_([e.packet_count for e in entries], [10] * 4)
+        eq_(self.mirror.get_flows(1, cookie=2, cookie_mask=0xffffffffffffffff)
+            [0].actions[0].actions[0].port, 3)
+        ok_(not self.mirror.reconcile(self.dp))
+
+    def test_start_reconciliation(self):
+        mods = self._install()
+        self.dp.flows = [self._flow_stats(mods[0])]
+        self.mirror.start_reconciliation(0.05)
+        hub.sleep(0.1)
+        self.mirror.stop_reconciliation()
+        eq_(self._cookies(self.mirror.get_flows(1)), [1])
+
+    def test_disconnect(self):
+        self._install()
+        ev = ofp_event.EventOFPStateChange(self.dp)
+        ev.state = handler.DEAD_DISPATCHER
+        self.mirror._state_change_handler(ev)
+        eq_(self.mirror.get_table(1), None)
+        eq_(self.mirror.get_flows(1), [])
+
+    def test_of10(self):
+        dp = self._connect(ofproto_v1_0.OFP_VERSION)
+        ofp = dp.ofproto
+        parser = dp.ofproto_parser
+
+        def flow_mod(command, match, priority=100):
+            return parser.OFPFlowMod(
+                dp, match=parser.OFPMatch(**match), cookie=0,
+                command=command, priority=priority,
+                actions=[parser.OFPActionOutput(1)])
+
+        self.mirror.send_flow_mod(dp, flow_mod(
+            ofp.OFPFC_ADD, {'in_port': 1, 'dl_type': 0x800,
+                            'nw_src': 0x0a000001, 'nw_src_mask': 24}))
+        self.mirror.send_flow_mod(dp, flow_mod(ofp.OFPFC_ADD,
+                                               {'in_port': 2}))
+        # OpenFlow 1.0 adds the entry if nothing matches
+        self.mirror.send_flow_mod(dp, flow_mod(ofp.OFPFC_MODIFY,
+                                               {'in_port': 3}))
+        table = self.mirror.get_table(1)
+        eq_(len(table), 3)
+        entry = self.mirror.get_flows(1, match={'in_port': 1})[0]
+        eq_(entry.match, {'in_port': 1, 'dl_type': 0x800,
+                          'nw_src': (0x0a000000, 24)})
+        self.mirror.send_flow_mod(dp, flow_mod(ofp.OFPFC_DELETE,
+                                               {'in_port': 2}))
+        eq_(sorted(e.match['in_port'] for e in self.mirror.get_flows(1)),
+            [1, 3])
+
+    def test_match_fields(self):
+        parser = self.dp.ofproto_parser
+        match = parser.OFPMatch(in_port=1, eth_dst='00:00:00:00:00:01')
+        fields = flow_mirror.match_fields(match)
+        eq_(fields, {'in_port': 1, 'eth_dst': '00:00:00:00:00:01'})
+        # old API
+        old = parser.OFPMatch()
+        old.set_in_port(1)
+        old.set_dl_dst('\x00\x00\x00\x00\x00\x01')
+        eq_(flow_mirror.match_fields(old), fields)
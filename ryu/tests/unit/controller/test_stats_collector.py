@@ -0,0 +1,211 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+from nose.tools import eq_, ok_
+
+from ryu.controller import handler
+from ryu.controller import ofp_event
+from ryu.controller import stats_collector
+from ryu.lib import hub
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_0
+from ryu.ofproto import ofproto_v1_3
+
+LOG = logging.getLogger('test_stats_collector')
+
+
+class _Datapath(ofproto_protocol.ProtocolDesc):
+    # replies to stats requests through the handlers of the collector
+    # with the given number of parts, an error or nothing.
+    def __init__(self, collector, dpid, parts=1, mode='reply', delay=0,
+                 version=ofproto_v1_3.OFP_VERSION):
+        super(_Datapath, self).__init__(version=version)
+        self.collector = collector
+        self.id = dpid
+        self.parts = parts
+        self.mode = mode
+        self.delay = delay
+        self.xid = 0
+        self.sent = []
+        self.outstanding = 0
+        self.max_outstanding = 0
+
+    def set_xid(self, msg):
+        self.xid += 1
+        msg.set_xid(self.xid)
+
+    def send_msg(self, msg):
+        self.sent.append(msg)
+        self.outstanding += 1
+        self.max_outstanding = max(self.max_outstanding, self.outstanding)
+        if self.mode != 'silent':
+            hub.spawn(self._reply, msg.xid)
+
+    def _reply(self, xid):
+        hub.sleep(self.delay)
+        self.outstanding -= 1
+        if self.mode == 'error':
+            msg = self.ofproto_parser.OFPErrorMsg(
+                self, type_=self.ofproto.OFPET_BAD_REQUEST,
+                code=self.ofproto.OFPBRC_BAD_MULTIPART, data='')
+            msg.xid = xid
+            self.collector._error_msg_handler(ofp_event.ofp_msg_to_ev(msg))
+            return
+        for i in range(self.parts):
+            if self.ofproto.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
+                msg = self.ofproto_parser.OFPFlowStatsReply(self)
+                more = self.ofproto.OFPSF_REPLY_MORE
+            else:
+                msg = self.ofproto_parser.OFPFlowStatsReply(self, body=[])
+                more = self.ofproto.OFPMPF_REPLY_MORE
+            msg.xid = xid
+            msg.flags = more if i < self.parts - 1 else 0
+            self.collector._stats_reply_handler(ofp_event.ofp_msg_to_ev(msg))
+            hub.sleep(0)
+
+
+def _build(dp):
+    if dp.ofproto.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
+        return dp.ofproto_parser.OFPFlowStatsRequest(
+            dp, 0, dp.ofproto_parser.OFPMatch(), 0xff, dp.ofproto.OFPP_NONE)
+    return dp.ofproto_parser.OFPFlowStatsRequest(dp)
+
+
+class Test_stats_collector(unittest.TestCase):
+
+    """ Test case for stats_collector
+    """
+
+    def setUp(self):
+        # test_manager reloads ryu.base.app_manager, which makes
+        # StatsCollector a subclass of the stale RyuApp.
+        reload(stats_collector)
+
+    def tearDown(self):
+        pass
+
+    def _collector(self):
+        return stats_collector.StatsCollector()
+
+    def _connect(self, collector, dpid, **kwargs):
+        dp = _Datapath(collector, dpid, **kwargs)
+        ev = ofp_event.EventOFPStateChange(dp)
+        ev.state = handler.MAIN_DISPATCHER
+        collector._state_change_handler(ev)
+        return dp
+
+    def test_collect(self):
+        collector = self._collector()
+        dps = [self._connect(collector, dpid, parts=dpid)
+               for dpid in range(1, 11)]
+        results = collector.collect(_build, timeout=5)
+        eq_(sorted(results.keys()), range(1, 11))
+        for dp in dps:
+            result = results[dp.id]
+            eq_(result.status, stats_collector.STATUS_OK)
+            eq_(len(result.msgs), dp.id)
+            eq_(result.error, None)
+
+    def test_collect_duplicate(self):
+        collector = self._collector()
+        dp = self._connect(collector, 1)
+        results = collector.collect(_build, [dp, dp], timeout=5)
+        eq_(results.keys(), [dp.id])
+        eq_(results[dp.id].status, stats_collector.STATUS_OK)
+        eq_(len(dp.sent), 1)
+
+    def test_collect_of10(self):
+        collector = self._collector()
+        dp = self._connect(collector, 1, parts=3,
+                           version=ofproto_v1_0.OFP_VERSION)
+        result = collector.request(dp, _build(dp), timeout=5)
+        eq_(result.status, stats_collector.STATUS_OK)
+        eq_(len(result.msgs), 3)
+
+    def test_collect_partial(self):
+        collector = self._collector()
+        ok = self._connect(collector, 1)
+        silent = self._connect(collector, 2, mode='silent')
+        error = self._connect(collector, 3, mode='error')
+        results = collector.collect(_build, timeout=0.1)
+        eq_(results[ok.id].status, stats_collector.STATUS_OK)
+        eq_(results[silent.id].status, stats_collector.STATUS_TIMEOUT)
+        eq_(results[silent.id].msgs, [])
+        eq_(results[error.id].status, stats_collector.STATUS_ERROR)
+        eq_(results[error.id].error.code, error.ofproto.OFPBRC_BAD_MULTIPART)
+        # the replies for the expired requests are ignored
+        eq_(collector._outstanding[silent.id], {})
+
+    def test_collect_concurrent(self):
+        collector = self._collector()
+        for dpid in range(1, 21):
+            self._connect(collector, dpid, delay=0.1)
+        results = collector.collect(_build, timeout=5)
+        eq_(len(results), 20)
+        elapsed = max(r.elapsed for r in results.values())
+        ok_(elapsed < 1.0, elapsed)
+
+    def test_pipeline(self):
+        collector = self._collector()
+        collector.max_outstanding = 3
+        dp = self._connect(collector, 1, delay=0.01)
+        results = []
+        for _i in range(10):
+            collector.send_request(dp, _build(dp), 5, results.append)
+        while len(results) < 10:
+            hub.sleep(0.01)
+        eq_(dp.max_outstanding, 3)
+        eq_(len(dp.sent), 10)
+        eq_([r.status for r in results], [stats_collector.STATUS_OK] * 10)
+        # the requests are sent in order
+        eq_([m.xid for m in dp.sent], range(1, 11))
+
+    def test_disconnect(self):
+        collector = self._collector()
+        collector.max_outstanding = 1
+        dp = self._connect(collector, 1, mode='silent')
+        results = []
+        for _i in range(3):
+            collector.send_request(dp, _build(dp), 5, results.append)
+        eq_(len(dp.sent), 1)
+        ev = ofp_event.EventOFPStateChange(dp)
+        ev.state = handler.DEAD_DISPATCHER
+        collector._state_change_handler(ev)
+        eq_([r.status for r in results],
+            [stats_collector.STATUS_DISCONNECTED] * 3)
+        eq_(len(dp.sent), 1)
+        # not connected
+        collector.send_request(dp, _build(dp), 5, results.append)
+        eq_(results[-1].status, stats_collector.STATUS_DISCONNECTED)
+
+    def test_poll(self):
+        collector = self._collector()
+        dps = [self._connect(collector, dpid) for dpid in range(1, 5)]
+        results = []
+        poller = collector.poll(_build, 0.2, results.append)
+        hub.sleep(0.1)
+        # the requests are spread over the interval
+        ok_(0 < len(results) < len(dps), len(results))
+        hub.sleep(0.35)
+        poller.stop()
+        n = len(results)
+        ok_(n >= 2 * len(dps), n)
+        hub.sleep(0.1)
+        eq_(len(results), n)
+        eq_(set(r.status for r in results), set([stats_collector.STATUS_OK]))
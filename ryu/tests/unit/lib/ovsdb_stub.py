@@ -0,0 +1,497 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+"""
+A stand-in of ovsdb-server for the tests of ryu.lib.ovs.
+
+It serves a cut down Open_vSwitch database with a bridge 'br0' on a unix
+domain socket, and supports what the python IDL of Open vSwitch uses:
+get_schema, monitor and transact with the insert, update, mutate, delete,
+select, wait and comment operations.  It also acts as ovs-vswitchd, which
+sets cur_cfg to next_cfg and ofport of the new interfaces.
+
+The number of the requests of each method is returned by the 'stats'
+method.
+
+Usage::
+
+    python -m ryu.tests.unit.lib.ovsdb_stub <socket path>
+"""
+
+import copy
+import json
+import os
+import select
+import socket
+import sys
+import uuid
+
+
+def _set(ref_table=None, key='string', min_=0, max_='unlimited'):
+    if ref_table:
+        key = {'type': 'uuid', 'refTable': ref_table}
+    return {'type': {'key': key, 'min': min_, 'max': max_}}
+
+
+def _optional(key='string'):
+    return _set(key=key, max_=1)
+
+
+def _map():
+    return {'type': {'key': 'string', 'value': 'string',
+                     'min': 0, 'max': 'unlimited'}}
+
+
+SCHEMA = {
+    'name': 'Open_vSwitch',
+    'version': '7.3.0',
+    'tables': {
+        'Open_vSwitch': {
+            'isRoot': True,
+            'maxRows': 1,
+            'columns': {
+                'bridges': _set('Bridge'),
+                'next_cfg': {'type': 'integer'},
+                'cur_cfg': {'type': 'integer'},
+                'external_ids': _map(),
+            }},
+        'Bridge': {
+            'columns': {
+                'name': {'type': 'string', 'mutable': False},
+                'datapath_id': _optional(),
+                'ports': _set('Port'),
+                'controller': _set('Controller'),
+                'fail_mode': _optional(),
+                'external_ids': _map(),
+                'other_config': _map(),
+            }},
+        'Port': {
+            'columns': {
+                'name': {'type': 'string', 'mutable': False},
+                'interfaces': _set('Interface', min_=1),
+                'fake_bridge': {'type': 'boolean'},
+                'tag': _optional('integer'),
+                'qos': _set('QoS', max_=1),
+                'bond_fake_iface': {'type': 'boolean'},
+                'external_ids': _map(),
+                'other_config': _map(),
+            }},
+        'Interface': {
+            'columns': {
+                'name': {'type': 'string', 'mutable': False},
+                'type': {'type': 'string'},
+                'options': _map(),
+                'ofport': _optional('integer'),
+                'external_ids': _map(),
+                'other_config': _map(),
+            }},
+        'Controller': {
+            'columns': {
+                'target': {'type': 'string'},
+                'external_ids': _map(),
+            }},
+        'QoS': {
+            'isRoot': True,
+            'columns': {
+                'type': {'type': 'string'},
+                'queues': {'type': {'key': 'integer',
+                                    'value': {'type': 'uuid',
+                                              'refTable': 'Queue'},
+                                    'min': 0, 'max': 'unlimited'}},
+                'other_config': _map(),
+                'external_ids': _map(),
+            }},
+        'Queue': {
+            'isRoot': True,
+            'columns': {
+                'other_config': _map(),
+                'external_ids': _map(),
+            }},
+    },
+}
+
+DATAPATH_ID = '0000000000000001'
+
+
+class TransactError(Exception):
+    pass
+
+
+def _column_type(table, column):
+    type_ = SCHEMA['tables'][table]['columns'][column]['type']
+    if not isinstance(type_, dict):
+        type_ = {'key': type_}
+    return type_
+
+
+def _is_scalar(type_):
+    return ('value' not in type_ and type_.get('min', 1) == 1 and
+            type_.get('max', 1) == 1)
+
+
+def _atom(json_):
+    if isinstance(json_, list):
+        # ["uuid", <uuid>]
+        return (json_[0], json_[1])
+    return json_
+
+
+def _atom_json(atom):
+    if isinstance(atom, tuple):
+        return list(atom)
+    return atom
+
+
+def to_value(type_, json_):
+    # the canonical form to compare the values
+    if 'value' in type_:
+        return tuple(sorted((_atom(k), _atom(v)) for k, v in json_[1]))
+    if _is_scalar(type_):
+        return _atom(json_)
+    if isinstance(json_, list) and json_[0] == 'set':
+        return tuple(sorted(set(_atom(a) for a in json_[1])))
+    return (_atom(json_), )
+
+
+def to_json(type_, value):
+    if 'value' in type_:
+        return ['map', [[_atom_json(k), _atom_json(v)] for k, v in value]]
+    if _is_scalar(type_):
+        return _atom_json(value)
+    return ['set', [_atom_json(a) for a in value]]
+
+
+def default_value(type_):
+    if not _is_scalar(type_):
+        return ()
+    key = type_['key']
+    if isinstance(key, dict):
+        key = key['type']
+    return {'integer': 0, 'real': 0.0, 'boolean': False,
+            'string': ''}[key]
+
+
+def _uuids(value):
+    if isinstance(value, tuple):
+        if len(value) == 2 and value[0] == 'uuid':
+            yield value[1]
+        else:
+            for v in value:
+                for u in _uuids(v):
+                    yield u
+
+
+class Database(object):
+    def __init__(self):
+        super(Database, self).__init__()
+        self.tables = dict((name, {}) for name in SCHEMA['tables'])
+        self.ofport = 0
+
+        iface = self._insert('Interface', {'name': 'br0',
+                                           'type': 'internal'})
+        port = self._insert('Port', {'name': 'br0',
+                                     'interfaces': (('uuid', iface), )})
+        bridge = self._insert('Bridge', {'name': 'br0',
+                                         'datapath_id': (DATAPATH_ID, ),
+                                         'ports': (('uuid', port), )})
+        self._insert('Open_vSwitch', {'bridges': (('uuid', bridge), )})
+        self._vswitchd(self.tables)
+
+    def _insert(self, table, values, uuid_=None):
+        uuid_ = uuid_ or str(uuid.uuid4())
+        row = dict((column, default_value(_column_type(table, column)))
+                   for column in SCHEMA['tables'][table]['columns'])
+        row.update(values)
+        self.tables[table][uuid_] = row
+        return uuid_
+
+    def _vswitchd(self, tables):
+        for row in tables['Open_vSwitch'].values():
+            row['cur_cfg'] = row['next_cfg']
+        for row in tables['Interface'].values():
+            if not row['ofport']:
+                self.ofport += 1
+                row['ofport'] = (self.ofport, )
+
+    def _where(self, tables, table, where):
+        rows = []
+        for uuid_, row in tables[table].items():
+            for column, function, json_ in where:
+                if column == '_uuid':
+                    value = uuid_
+                    expected = _atom(json_)[1]
+                else:
+                    value = row[column]
+                    expected = to_value(_column_type(table, column), json_)
+                if function == '==' and value != expected:
+                    break
+                if function == '!=' and value == expected:
+                    break
+            else:
+                rows.append((uuid_, row))
+        return rows
+
+    def _row_values(self, table, row_json):
+        return dict((column, to_value(_column_type(table, column), json_))
+                    for column, json_ in row_json.items())
+
+    def _gc(self, tables):
+        while True:
+            refs = set()
+            for rows in tables.values():
+                for row in rows.values():
+                    for value in row.values():
+                        refs.update(_uuids(value))
+            garbage = [(table, uuid_) for table, rows in tables.items()
+                       if not SCHEMA['tables'][table].get('isRoot')
+                       for uuid_ in rows if uuid_ not in refs]
+            if not garbage:
+                return
+            for table, uuid_ in garbage:
+                del tables[table][uuid_]
+
+    def transact(self, ops):
+        tables = copy.deepcopy(self.tables)
+
+        # named-uuid can be referred before its insert operation
+        names = {}
+        for op in ops:
+            if op['op'] == 'insert' and 'uuid-name' in op:
+                names[op['uuid-name']] = str(uuid.uuid4())
+
+        def _substitute(json_):
+            if isinstance(json_, list):
+                if len(json_) == 2 and json_[0] == 'named-uuid':
+                    return ['uuid', names[json_[1]]]
+                return [_substitute(j) for j in json_]
+            if isinstance(json_, dict):
+                return dict((k, _substitute(v)) for k, v in json_.items())
+            return json_
+
+        results = []
+        for op in ops:
+            op = _substitute(op)
+            try:
+                results.append(self._op(tables, names, op))
+            except TransactError as e:
+                results.append({'error': str(e)})
+                return results
+
+        self._gc(tables)
+        self._vswitchd(tables)
+        old_tables = self.tables
+        self.tables = tables
+        return results, old_tables
+
+    def _op(self, tables, names, op):
+        name = op['op']
+        table = op.get('table')
+        if name == 'insert':
+            uuid_ = names.get(op.get('uuid-name')) or str(uuid.uuid4())
+            row = self._row_values(table, op.get('row', {}))
+            tables[table][uuid_] = row
+            for column in SCHEMA['tables'][table]['columns']:
+                row.setdefault(column,
+                               default_value(_column_type(table, column)))
+            return {'uuid': ['uuid', uuid_]}
+        elif name == 'update':
+            rows = self._where(tables, table, op['where'])
+            for _uuid, row in rows:
+                row.update(self._row_values(table, op['row']))
+            return {'count': len(rows)}
+        elif name == 'mutate':
+            rows = self._where(tables, table, op['where'])
+            for _uuid, row in rows:
+                for column, mutator, value in op['mutations']:
+                    if mutator == '+=':
+                        row[column] += value
+                    elif mutator == '-=':
+                        row[column] -= value
+                    else:
+                        raise TransactError('not supported')
+            return {'count': len(rows)}
+        elif name == 'delete':
+            rows = self._where(tables, table, op['where'])
+            for uuid_, _row in rows:
+                del tables[table][uuid_]
+            return {'count': len(rows)}
+        elif name == 'select':
+            rows = self._where(tables, table, op['where'])
+            columns = op.get('columns')
+            return {'rows': [
+                dict((column, to_json(_column_type(table, column), value))
+                     for column, value in row.items()
+                     if columns is None or column in columns)
+                for _uuid, row in rows]}
+        elif name == 'wait':
+            rows = self._where(tables, table, op['where'])
+            columns = op['columns']
+            have = sorted(tuple(row[column] for column in columns)
+                          for _uuid, row in rows)
+            want = sorted(tuple(self._row_values(table, row)[column]
+                                for column in columns)
+                          for row in op['rows'])
+            if (have == want) != (op['until'] == '=='):
+                raise TransactError('timed out')
+            return {}
+        elif name == 'comment':
+            return {}
+        elif name == 'abort':
+            raise TransactError('aborted')
+        raise TransactError('unknown operation %s' % name)
+
+
+class Connection(object):
+    def __init__(self, sock):
+        super(Connection, self).__init__()
+        self.sock = sock
+        self.buf = ''
+        self.monitors = {}      # monitor id -> {table: columns}
+
+    def send(self, msg):
+        self.sock.sendall(json.dumps(msg))
+
+    def recv(self):
+        data = self.sock.recv(65536)
+        if not data:
+            return None
+        self.buf += data
+        msgs = []
+        decoder = json.JSONDecoder()
+        while True:
+            self.buf = self.buf.lstrip()
+            if not self.buf:
+                break
+            try:
+                msg, end = decoder.raw_decode(self.buf)
+            except ValueError:
+                break
+            msgs.append(msg)
+            self.buf = self.buf[end:]
+        return msgs
+
+
+class Server(object):
+    def __init__(self, path):
+        super(Server, self).__init__()
+        self.db = Database()
+        self.conns = {}
+        self.stats = {}
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen(16)
+
+    def _table_updates(self, monitor, old_tables, new_tables):
+        updates = {}
+        for table, columns in monitor.items():
+            type_ = lambda column: _column_type(table, column)
+            columns = columns or SCHEMA['tables'][table]['columns'].keys()
+            old_rows = old_tables.get(table, {}) if old_tables else {}
+            new_rows = new_tables[table]
+            for uuid_ in set(old_rows) | set(new_rows):
+                old = old_rows.get(uuid_)
+                new = new_rows.get(uuid_)
+                update = {}
+                if new is not None:
+                    update['new'] = dict(
+                        (c, to_json(type_(c), new[c])) for c in columns)
+                if old is not None:
+                    changed = [c for c in columns
+                               if new is None or old[c] != new[c]]
+                    if not changed:
+                        continue
+                    update['old'] = dict(
+                        (c, to_json(type_(c), old[c])) for c in changed)
+                updates.setdefault(table, {})[uuid_] = update
+        return updates
+
+    def _handle(self, conn, msg):
+        method = msg.get('method')
+        params = msg.get('params')
+        if method is None:
+            # a reply to our request
+            return
+        self.stats[method] = self.stats.get(method, 0) + 1
+        reply = {'id': msg['id'], 'error': None, 'result': None}
+        if method == 'echo':
+            reply['result'] = params
+        elif method == 'stats':
+            reply['result'] = self.stats
+        elif method == 'list_dbs':
+            reply['result'] = [SCHEMA['name']]
+        elif method == 'get_schema':
+            reply['result'] = SCHEMA
+        elif method == 'monitor':
+            monitor = {}
+            for table, requests in params[2].items():
+                if isinstance(requests, dict):
+                    requests = [requests]
+                columns = []
+                for request in requests:
+                    columns.extend(request.get('columns', []))
+                monitor[table] = columns
+            conn.monitors[json.dumps(params[1])] = (params[1], monitor)
+            reply['result'] = self._table_updates(monitor, None,
+                                                  self.db.tables)
+        elif method == 'transact':
+            result = self.db.transact(params[1:])
+            if isinstance(result, tuple):
+                result, old_tables = result
+                # the updates precede the reply as ovsdb-server does
+                for other in self.conns.values():
+                    for monitor_id, monitor in other.monitors.values():
+                        updates = self._table_updates(monitor, old_tables,
+                                                      self.db.tables)
+                        if updates:
+                            other.send({'id': None, 'method': 'update',
+                                        'params': [monitor_id, updates]})
+            reply['result'] = result
+        else:
+            reply['error'] = 'unknown method'
+        conn.send(reply)
+
+    def serve_forever(self):
+        while True:
+            socks = [self.sock] + self.conns.keys()
+            readable, _w, _x = select.select(socks, [], [])
+            for sock in readable:
+                if sock is self.sock:
+                    client, _addr = self.sock.accept()
+                    self.conns[client] = Connection(client)
+                    continue
+                conn = self.conns[sock]
+                try:
+                    msgs = conn.recv()
+                except socket.error:
+                    msgs = None
+                if msgs is None:
+                    del self.conns[sock]
+                    sock.close()
+                    continue
+                for msg in msgs:
+                    self._handle(conn, msg)
+
+
+def main():
+    path = sys.argv[1]
+    if os.path.exists(path):
+        os.unlink(path)
+    Server(path).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -15,7 +15,8 @@
 # limitations under the License.
 
 import unittest
-from nose.tools import eq_
+import netaddr
+from nose.tools import eq_, raises
 
 import addrconv
 
@@ -54,3 +55,38 @@ class Test_addrconv(unittest.TestCase):
     def test_mac(self):
         self._test_conv(addrconv.mac, 'f2:0b:a4:01:0a:23',
                         '\xf2\x0b\xa4\x01\x0a\x23')
+
+    def test_netaddr_formats(self):
+        # representations netaddr accepts besides the canonical ones
+        eq_(addrconv.ipv4.text_to_bin('127.1'), '\x7f\x00\x00\x01')
+        eq_(addrconv.ipv4.text_to_bin(0x7f000001), '\x7f\x00\x00\x01')
+        eq_(addrconv.mac.text_to_bin('F2-0B-A4-01-0A-23'),
+            '\xf2\x0b\xa4\x01\x0a\x23')
+        eq_(addrconv.mac.bin_to_text(bytearray('\xf2\x0b\xa4\x01\x0a\x23')),
+            'f2:0b:a4:01:0a:23')
+
+    @raises(netaddr.AddrFormatError)
+    def test_invalid_ipv4(self):
+        addrconv.ipv4.text_to_bin('256.0.0.1')
+
+    @raises(netaddr.AddrFormatError)
+    def test_invalid_mac(self):
+        addrconv.mac.text_to_bin('f2:0b:a4:01:0a:2g')
+
+    def test_list(self):
+        texts = ['10.0.0.1', '10.0.0.2']
+        bins = ['\x0a\x00\x00\x01', '\x0a\x00\x00\x02']
+        eq_(addrconv.ipv4.text_to_bin_list(texts), bins)
+        eq_(addrconv.ipv4.bin_to_text_list(bins), texts)
+
+    def test_cache(self):
+        cache = addrconv._Cache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.put('c', 3)
+        # 'a' and 'b' are in the old generation.
+        eq_(cache.get('a'), 1)
+        cache.put('d', 4)
+        eq_(cache.get('b'), None)
+        eq_(cache.get('a'), 1)
+        eq_(cache.get('d'), 4)
@@ -16,6 +16,7 @@
 
 import time
 import unittest
+import mock
 from nose.tools import raises
 
 from ryu.lib import hub
@@ -237,3 +238,21 @@ class Test_hub(unittest.TestCase):
         # allow multiple sets unlike eventlet Event
         ev.set()
         ev.set()
+
+    def test_stream_server_reuse_port(self):
+        servers = [hub.StreamServer(('127.0.0.1', 0), None, reuse_port=True)]
+        port = servers[0].server.getsockname()[1]
+        # the second server can listen on the same port.
+        servers.append(hub.StreamServer(('127.0.0.1', port), None,
+                                        reuse_port=True))
+        try:
+            assert servers[1].server.getsockname()[1] == port
+        finally:
+            for s in servers:
+                s.server.close()
+
+    @raises(RuntimeError)
+    def test_stream_server_reuse_port_unsupported(self):
+        # SO_REUSEPORT is unknown on the platform
+        with mock.patch('ryu.lib.hub.SO_REUSEPORT', None):
+            hub.StreamServer(('127.0.0.1', 0), None, reuse_port=True)
@@ -0,0 +1,146 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+import time
+from nose.tools import eq_, ok_
+
+from ryu.lib import hub
+from ryu.lib import ofctl_utils
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_protocol
+
+LOG = logging.getLogger('test_ofctl_utils')
+
+
+class _Datapath(ofproto_protocol.ProtocolDesc):
+    # replies to the barrier requests, and to the FlowMods whose cookie
+    # is in *errors* with an error, as an application passing the events
+    # to ofctl_utils does.
+    def __init__(self, waiters, errors=(), reply=True):
+        super(_Datapath, self).__init__(version=ofproto_v1_3.OFP_VERSION)
+        self.id = 1
+        self.xid = 0
+        self.waiters = waiters
+        self.errors = errors
+        self.reply = reply
+        self.sent = []
+
+    def set_xid(self, msg):
+        self.xid += 1
+        msg.set_xid(self.xid)
+
+    def send_msg(self, msg):
+        self.sent.append(msg)
+        if not self.reply:
+            return
+        if isinstance(msg, self.ofproto_parser.OFPFlowMod):
+            if msg.cookie in self.errors:
+                err = self.ofproto_parser.OFPErrorMsg(
+                    self, type_=self.ofproto.OFPET_FLOW_MOD_FAILED,
+                    code=self.ofproto.OFPFMFC_TABLE_FULL)
+                err.xid = msg.xid
+                hub.spawn(ofctl_utils.error_msg_handler, self.waiters, err)
+        elif isinstance(msg, self.ofproto_parser.OFPBarrierRequest):
+            reply = self.ofproto_parser.OFPBarrierReply(self)
+            reply.xid = msg.xid
+            hub.spawn(ofctl_utils.barrier_reply_handler, self.waiters, reply)
+
+
+class Test_ofctl_utils(unittest.TestCase):
+
+    """ Test case for ofctl_utils
+    """
+
+    def setUp(self):
+        self.waiters = {}
+
+    def tearDown(self):
+        pass
+
+    def _flow_mods(self, dp, n):
+        return [dp.ofproto_parser.OFPFlowMod(dp, cookie=i)
+                for i in range(n)]
+
+    def test_send_msgs_with_barrier(self):
+        dp = _Datapath(self.waiters)
+        msgs = self._flow_mods(dp, 5)
+        results = ofctl_utils.send_msgs_with_barrier(dp, msgs, self.waiters,
+                                                     batch_size=2)
+        eq_(results, [None] * 5)
+        barrier = dp.ofproto_parser.OFPBarrierRequest
+        eq_([isinstance(msg, barrier) for msg in dp.sent],
+            [False, False, True, False, False, True, False, True])
+        eq_(self.waiters[dp.id], {})
+
+    def test_error(self):
+        dp = _Datapath(self.waiters, errors=(1, 3))
+        msgs = self._flow_mods(dp, 4)
+        results = ofctl_utils.send_msgs_with_barrier(dp, msgs, self.waiters,
+                                                     batch_size=3)
+        eq_(results[0], None)
+        eq_(results[1].xid, msgs[1].xid)
+        eq_(results[1].code, dp.ofproto.OFPFMFC_TABLE_FULL)
+        eq_(results[2], None)
+        eq_(results[3].xid, msgs[3].xid)
+        ok_('type=0x05 code=0x01' in ofctl_utils.error_to_str(results[1]))
+        eq_(self.waiters[dp.id], {})
+
+    def test_timeout(self):
+        dp = _Datapath(self.waiters, reply=False)
+        msgs = self._flow_mods(dp, 3)
+        results = ofctl_utils.send_msgs_with_barrier(dp, msgs, self.waiters,
+                                                     timeout=0.01)
+        eq_(results, [ofctl_utils.TIMEOUT] * 3)
+        eq_(ofctl_utils.error_to_str(results[0]), 'no barrier reply')
+        eq_(self.waiters[dp.id], {})
+
+    def test_timeout_batches(self):
+        # the timeout is for all of the batches, not for each of them.
+        dp = _Datapath(self.waiters, reply=False)
+        msgs = self._flow_mods(dp, 10)
+        start = time.time()
+        results = ofctl_utils.send_msgs_with_barrier(dp, msgs, self.waiters,
+                                                     batch_size=1,
+                                                     timeout=0.1)
+        ok_(time.time() - start < 0.5)
+        eq_(results, [ofctl_utils.TIMEOUT] * 10)
+        eq_(self.waiters[dp.id], {})
+
+    def test_empty(self):
+        dp = _Datapath(self.waiters)
+        eq_(ofctl_utils.send_msgs_with_barrier(dp, [], self.waiters), [])
+        eq_(dp.sent, [])
+
+    def test_handlers_ignore_others(self):
+        dp = _Datapath(self.waiters)
+        event = hub.Event()
+        msgs = []
+        # a stats request waiting for its reply
+        self.waiters[dp.id] = {1: (event, msgs)}
+        err = dp.ofproto_parser.OFPErrorMsg(dp)
+        err.xid = 1
+        ofctl_utils.error_msg_handler(self.waiters, err)
+        err.xid = 2
+        ofctl_utils.error_msg_handler(self.waiters, err)
+        reply = dp.ofproto_parser.OFPBarrierReply(dp)
+        reply.xid = 2
+        ofctl_utils.barrier_reply_handler(self.waiters, reply)
+        eq_(msgs, [])
+        ok_(not event.is_set())
+        eq_(self.waiters[dp.id], {1: (event, msgs)})
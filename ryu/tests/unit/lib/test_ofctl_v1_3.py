@@ -19,6 +19,7 @@ import unittest
 import logging
 from nose.tools import *
 
+from ryu.lib import hub
 from ryu.lib import ofctl_v1_3
 from ryu.ofproto import ofproto_v1_3, ofproto_v1_3_parser
 from ryu.ofproto import ofproto_protocol
@@ -27,6 +28,39 @@ from ryu.ofproto.ofproto_v1_3_parser import OFPActionPopMpls
 LOG = logging.getLogger('test_ofctl_v1_3')
 
 
+class _Datapath(ofproto_protocol.ProtocolDesc):
+    # replies to a flow stats request with the given parts as
+    # ofctl_rest.RestStatsApi.stats_reply_handler does.
+    def __init__(self, waiters, parts):
+        super(_Datapath, self).__init__(version=ofproto_v1_3.OFP_VERSION)
+        self.id = 1
+        self.waiters = waiters
+        self.parts = parts
+        self.sent = []
+
+    def set_xid(self, msg):
+        msg.set_xid(1)
+
+    def send_msg(self, msg):
+        self.sent.append(msg)
+        hub.spawn(self._reply, msg.xid)
+
+    def _reply(self, xid):
+        for i, body in enumerate(self.parts):
+            msg = self.ofproto_parser.OFPFlowStatsReply(self, body=body)
+            msg.xid = xid
+            if i < len(self.parts) - 1:
+                msg.flags = self.ofproto.OFPMPF_REPLY_MORE
+            else:
+                msg.flags = 0
+            lock, msgs = self.waiters[self.id][xid]
+            msgs.append(msg)
+            if not msg.flags:
+                del self.waiters[self.id][xid]
+                lock.set()
+            hub.sleep(0)
+
+
 class Test_ofctl_v1_3(unittest.TestCase):
 
     """ Test case for ofctl_v1_3
@@ -52,3 +86,93 @@ class Test_ofctl_v1_3(unittest.TestCase):
         act = insts.actions[0]
         ok_(isinstance(act, OFPActionPopMpls))
         eq_(act.ethertype, 0x0800)
+
+    def _flow_stats(self, dp, cookie):
+        parser = dp.ofproto_parser
+        # as parsed from a reply
+        buf = bytearray()
+        parser.OFPMatch(in_port=1).serialize(buf, 0)
+        match = parser.OFPMatch.parser(str(buf), 0)
+        return parser.OFPFlowStats(
+            table_id=0, duration_sec=0, duration_nsec=0, priority=1,
+            idle_timeout=0, hard_timeout=0, flags=0, cookie=cookie,
+            packet_count=0, byte_count=0, match=match, instructions=[])
+
+    def test_get_flow_stats_iter(self):
+        waiters = {}
+        dp = _Datapath(waiters, [])
+        dp.parts = [[self._flow_stats(dp, 1), self._flow_stats(dp, 2)],
+                    [self._flow_stats(dp, 3)]]
+        flow = {'table_id': 1, 'cookie': 2, 'cookie_mask': 3,
+                'match': {'in_port': 1}}
+        flows = ofctl_v1_3.get_flow_stats_iter(dp, waiters, flow)
+        # nothing is requested until the iteration starts
+        eq_(dp.sent, [])
+        eq_([f['cookie'] for f in flows], [1, 2, 3])
+        req = dp.sent[0]
+        eq_(req.table_id, 1)
+        eq_(req.cookie, 2)
+        eq_(req.cookie_mask, 3)
+        buf = bytearray()
+        req.match.serialize(buf, 0)
+        match = dp.ofproto_parser.OFPMatch.parser(str(buf), 0)
+        eq_(match['in_port'], 1)
+        eq_(waiters[dp.id], {})
+
+    def test_get_flow_stats_iter_invalid(self):
+        waiters = {}
+        dp = _Datapath(waiters, [])
+        for flow in [[], {'table_id': 'abc'}, {'cookie': None},
+                     {'match': {'nw_src': 'abc'}},
+                     {'match': {'dl_src': 'abc'}}, {'match': []}]:
+            assert_raises(ValueError, ofctl_v1_3.get_flow_stats_iter,
+                          dp, waiters, flow)
+        eq_(dp.sent, [])
+        eq_(waiters, {})
+
+    def test_get_flow_stats(self):
+        waiters = {}
+        dp = _Datapath(waiters, [])
+        dp.parts = [[self._flow_stats(dp, 1)]]
+        flows = ofctl_v1_3.get_flow_stats(dp, waiters)
+        eq_(flows.keys(), ['1'])
+        eq_(flows['1'][0]['cookie'], 1)
+        eq_(flows['1'][0]['match'], {'in_port': 1})
+        req = dp.sent[0]
+        eq_(req.table_id, dp.ofproto.OFPTT_ALL)
+        eq_(req.out_port, dp.ofproto.OFPP_ANY)
+
+    def test_flow_stats_to_str(self):
+        # the request and the reply without sending, e.g. for the
+        # stats collector
+        dp = _Datapath({}, [])
+        req = ofctl_v1_3.to_flow_stats_request(dp, {'cookie': 2})
+        ok_(isinstance(req, dp.ofproto_parser.OFPFlowStatsRequest))
+        eq_(req.cookie, 2)
+        eq_(dp.sent, [])
+        msgs = []
+        for stats in [[self._flow_stats(dp, 1), self._flow_stats(dp, 2)],
+                      [self._flow_stats(dp, 3)]]:
+            msgs.append(dp.ofproto_parser.OFPFlowStatsReply(dp, body=stats))
+        flows = ofctl_v1_3.flow_stats_to_str(msgs)
+        eq_([f['cookie'] for f in flows], [1, 2, 3])
+        eq_(flows[0]['match'], {'in_port': 1})
+
+    def test_send_stats_request_iter_timeout(self):
+        waiters = {}
+        dp = _Datapath(waiters, [])
+        dp.send_msg = dp.sent.append
+        stats = dp.ofproto_parser.OFPFlowStatsRequest(dp)
+        eq_(list(ofctl_v1_3.send_stats_request_iter(dp, stats, waiters,
+                                                    timeout=0.01)), [])
+        eq_(waiters[dp.id], {})
+
+    def test_send_stats_request_iter_close(self):
+        waiters = {}
+        dp = _Datapath(waiters, [])
+        dp.parts = [[self._flow_stats(dp, 1)], [self._flow_stats(dp, 2)]]
+        stats = dp.ofproto_parser.OFPFlowStatsRequest(dp)
+        msgs = ofctl_v1_3.send_stats_request_iter(dp, stats, waiters)
+        eq_(msgs.next().body[0].cookie, 1)
+        msgs.close()
+        eq_(waiters[dp.id], {})
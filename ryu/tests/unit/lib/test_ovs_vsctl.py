@@ -0,0 +1,214 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import logging
+from nose.tools import eq_, ok_, raises
+from nose.plugins.skip import SkipTest
+
+import ryu
+from ryu.lib import hub
+
+try:
+    import ovs
+except ImportError:
+    # the python library of Open vSwitch isn't installed
+    ovs = None
+
+if ovs is not None:
+    # an error in importing them fails the tests instead of skipping them.
+    from ryu.lib.ovs import bridge as ovs_bridge
+    from ryu.lib.ovs import vsctl as ovs_vsctl
+
+LOG = logging.getLogger('test_ovs_vsctl')
+
+TIMEOUT = 10
+
+
+class Test_VSCtlSession(unittest.TestCase):
+
+    """ Test case for ryu.lib.ovs.vsctl.VSCtlSession
+    """
+
+    def setUp(self):
+        if ovs is None:
+            raise SkipTest('ovs is not installed')
+
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'db.sock')
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.path.dirname(os.path.dirname(ryu.__file__))
+        self.server = subprocess.Popen(
+            [sys.executable, '-m', 'ryu.tests.unit.lib.ovsdb_stub',
+             self.path], env=env)
+        for _i in range(100):
+            if os.path.exists(self.path):
+                break
+            time.sleep(0.05)
+        self.remote = 'unix:%s' % self.path
+        self.bridge = ovs_bridge.OVSBridge(None, 1, self.remote,
+                                           timeout=TIMEOUT)
+
+    def tearDown(self):
+        if ovs is None:
+            return
+        self.bridge.close()
+        self.server.kill()
+        self.server.wait()
+        shutil.rmtree(self.dir)
+
+    def _stats(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        sock.sendall(json.dumps({'method': 'stats', 'params': [], 'id': 0}))
+        reply = json.loads(sock.recv(65536))
+        sock.close()
+        stats = reply['result']
+        stats.pop('stats')
+        return stats
+
+    def _tunnel_ports(self, n):
+        return [('gre%d' % i, 'gre', '172.16.0.1', '172.16.1.%d' % i)
+                for i in range(n)]
+
+    def test_local_read(self):
+        self.bridge.init()
+        eq_(self.bridge.br_name, 'br0')
+        eq_(self.bridge.get_datapath_id(), ['0000000000000001'])
+        eq_(self.bridge.get_port_name_list(), [])
+        eq_(self.bridge.get_ofport('br0'), 1)
+        # one connection and synchronization, and no transaction
+        stats = self._stats()
+        eq_(stats.get('monitor'), 1)
+        eq_(stats.get('transact'), None)
+
+    def test_add_tunnel_ports(self):
+        self.bridge.init()
+        self.bridge.add_tunnel_ports(self._tunnel_ports(20))
+        eq_(self._stats()['transact'], 1)
+
+        ports = self.bridge.get_tunnel_ports()
+        eq_(len(ports), 20)
+        eq_(sorted(port.ofport for port in ports), range(2, 22))
+        port = self.bridge.get_tunnel_port('gre3')
+        eq_(port.local_ip, '172.16.0.1')
+        eq_(port.remote_ip, '172.16.1.3')
+
+        self.bridge.del_ports(['gre%d' % i for i in range(10)])
+        eq_(len(self.bridge.get_port_name_list()), 10)
+        stats = self._stats()
+        eq_(stats['transact'], 2)
+        eq_(stats['monitor'], 1)
+
+    def test_legacy(self):
+        # the same commands by connecting each time
+        vsctl = ovs_vsctl.VSCtl(self.remote)
+        command = ovs_vsctl.VSCtlCommand('list-ports', ('br0', ))
+        vsctl.run_command([command], TIMEOUT)
+        eq_(command.result, [])
+        self.bridge.init()
+        self.bridge.add_tunnel_port('gre0', 'gre', '172.16.0.1',
+                                    '172.16.1.1')
+        vsctl.run_command([command], TIMEOUT)
+        eq_(command.result, ['gre0'])
+        eq_(self._stats()['monitor'], 3)
+
+    def test_queued_commands(self):
+        self.bridge.init()
+        vsctl = self.bridge.vsctl
+        calls = []
+        released = hub.Event()
+        run_command = vsctl._run_command
+
+        def _run_command(commands):
+            calls.append(len(commands))
+            if len(calls) == 1:
+                # the others are queued meanwhile
+                released.wait()
+            run_command(commands)
+
+        vsctl._run_command = _run_command
+        threads = [hub.spawn(self.bridge.add_tunnel_port, *args)
+                   for args in self._tunnel_ports(4)]
+        hub.sleep(0)
+        released.set()
+        hub.joinall(threads)
+
+        # the first one alone, and the rest together
+        eq_(calls, [2, 6])
+        eq_(len(self.bridge.get_port_name_list()), 4)
+
+    def test_queued_failure(self):
+        self.bridge.init()
+        self.bridge.add_tunnel_port('gre0', 'gre', '172.16.0.1',
+                                    '172.16.1.1')
+        vsctl = self.bridge.vsctl
+        released = hub.Event()
+        run_command = vsctl._run_command
+
+        def _run_command(commands):
+            released.wait()
+            run_command(commands)
+
+        vsctl._run_command = _run_command
+        results = {}
+
+        def _call(name, func, *args):
+            try:
+                func(*args)
+                results[name] = None
+            except Exception as e:
+                results[name] = e
+
+        threads = [
+            hub.spawn(_call, 'first', self.bridge.del_port, 'gre0'),
+            # the port doesn't exist
+            hub.spawn(_call, 'error', self.bridge.run_command,
+                      [ovs_vsctl.VSCtlCommand('del-port', ('br0', 'gre9'),
+                                              ['--must-exist'])]),
+            hub.spawn(_call, 'ok', self.bridge.add_tunnel_port,
+                      'gre1', 'gre', '172.16.0.1', '172.16.1.2')]
+        hub.sleep(0)
+        released.set()
+        hub.joinall(threads)
+
+        eq_(results['first'], None)
+        ok_(results['error'] is not None)
+        eq_(results['ok'], None)
+        eq_(self.bridge.get_port_name_list(), ['gre1'])
+        eq_(vsctl._queue, [])
+
+    @raises(hub.Timeout)
+    def test_timeout(self):
+        self.bridge.init()
+        vsctl = self.bridge.vsctl
+        run_command = vsctl._run_command
+
+        def _run_command(commands):
+            hub.sleep(1)
+            run_command(commands)
+
+        vsctl._run_command = _run_command
+        vsctl.run_command([ovs_vsctl.VSCtlCommand('list-br')], 0.1)
@@ -17,8 +17,9 @@
 # limitations under the License.
 
 import base64
+import inspect
 import unittest
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 
 from ryu.lib import stringify
 
@@ -31,6 +32,14 @@ class C1(stringify.StringifyMixin):
         self.c = c
 
 
+class C2(C1):
+    _TYPE = {
+        'utf-8': [
+            'c',
+        ]
+    }
+
+
 class Test_stringify(unittest.TestCase):
     """ Test case for ryu.lib.stringify
     """
@@ -68,3 +77,28 @@ class Test_stringify(unittest.TestCase):
         eq_(c.__class__, c2.__class__)
         eq_(c.__dict__, c2.__dict__)
         eq_(j, c.to_jsondict(encode_string=my_encode))
+
+    def test_jsondict_type(self):
+        j = {'C2': {'a': 'QUFB', 'c': u'\u3042'}}
+        c = C2(a='AAA', c=u'\u3042'.encode('utf-8'))
+        eq_(j, c.to_jsondict())
+        c2 = C2.from_jsondict(j['C2'])
+        eq_(c.__dict__, c2.__dict__)
+        # the annotation of the subclass doesn't apply to the super class
+        eq_({'C1': {'a': 'QUFB', 'c': 'Q0ND'}},
+            C1(a='AAA', c='CCC').to_jsondict())
+
+    def test_codec_cache(self):
+        codec = C2._get_codec()
+        ok_(codec is C2._get_codec())
+        ok_(codec is not C1._get_codec())
+        eq_(codec.types, {'c': stringify.Utf8StringType})
+        eq_(C1._get_codec().types, {})
+
+    def test_obj_python_attrs(self):
+        c = C1(a='AAA', c=[1, 2])
+        c.d = 1
+        expected = [(k, v) for k, v in inspect.getmembers(c)
+                    if not k.startswith('_') and not callable(v) and
+                    not hasattr(C1, k)]
+        eq_(expected, list(stringify.obj_python_attrs(c)))
@@ -0,0 +1,132 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+from nose.tools import eq_, raises
+
+from ryu.base import app_manager  # To suppress cyclic import
+from ryu.controller import controller
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_template
+from ryu.ofproto import ofproto_v1_0
+from ryu.ofproto import ofproto_v1_3
+
+LOG = logging.getLogger('test_ofproto_template')
+
+
+class _Datapath(ofproto_protocol.ProtocolDesc):
+    def __init__(self, version):
+        super(_Datapath, self).__init__(version)
+        self.xid = 0
+        self.sent = []
+
+    next_xid = controller.Datapath.__dict__['next_xid']
+
+    def send(self, buf):
+        self.sent.append(buf)
+
+
+class Test_MsgTemplate(unittest.TestCase):
+
+    """ Test case for ofproto_template
+    """
+
+    def setUp(self):
+        self.dp = _Datapath(ofproto_v1_3.OFP_VERSION)
+
+    def tearDown(self):
+        pass
+
+    def _flow_mod(self, in_port, eth_dst, out_port, buffer_id):
+        dp = self.dp
+        parser = dp.ofproto_parser
+        match = parser.OFPMatch(in_port=in_port, eth_dst=eth_dst)
+        actions = [parser.OFPActionOutput(out_port)]
+        inst = [parser.OFPInstructionActions(
+            dp.ofproto.OFPIT_APPLY_ACTIONS, actions)]
+        return parser.OFPFlowMod(datapath=dp, priority=1,
+                                 buffer_id=buffer_id, match=match,
+                                 instructions=inst)
+
+    def _template(self, build):
+        return ofproto_template.MsgTemplate(
+            build,
+            in_port=ofproto_template.UINT32,
+            eth_dst=ofproto_template.MAC,
+            out_port=ofproto_template.UINT32,
+            buffer_id=ofproto_template.UINT32)
+
+    def test_flow_mod(self):
+        template = self._template(self._flow_mod)
+        for values in [
+                dict(in_port=1, eth_dst='00:00:00:00:00:01', out_port=2,
+                     buffer_id=0xffffffff),
+                dict(in_port=0xfffffffd, eth_dst='ff:ff:ff:ff:ff:ff',
+                     out_port=0, buffer_id=0)]:
+            msg = self._flow_mod(**values)
+            msg.serialize()
+            eq_(msg.buf, template.to_buf(**values))
+
+    def test_multiple_offsets(self):
+        def build(in_port, eth_dst, buffer_id):
+            # in_port is used twice
+            return self._flow_mod(in_port, eth_dst, in_port, buffer_id)
+        template = ofproto_template.MsgTemplate(
+            build,
+            in_port=ofproto_template.UINT32,
+            eth_dst=ofproto_template.MAC,
+            buffer_id=ofproto_template.UINT32)
+        eq_(2, len(dict((name, offsets) for name, t, offsets
+                        in template._patches)['in_port']))
+        msg = self._flow_mod(3, '00:00:00:00:00:01', 3, 0)
+        msg.serialize()
+        eq_(msg.buf, template.to_buf(in_port=3, eth_dst='00:00:00:00:00:01',
+                                     buffer_id=0))
+
+    def test_send(self):
+        template = self._template(self._flow_mod)
+        values = dict(in_port=1, eth_dst='00:00:00:00:00:01', out_port=2,
+                      buffer_id=0xffffffff)
+        eq_(1, template.send(self.dp, **values))
+        eq_(2, template.send(self.dp, **values))
+        msg = self._flow_mod(**values)
+        msg.set_xid(2)
+        msg.serialize()
+        eq_(msg.buf, self.dp.sent[1])
+
+    @raises(AssertionError)
+    def test_send_version_mismatch(self):
+        template = self._template(self._flow_mod)
+        template.send(_Datapath(ofproto_v1_0.OFP_VERSION), in_port=1,
+                      eth_dst='00:00:00:00:00:01', out_port=2, buffer_id=0)
+
+    @raises(ValueError)
+    def test_unused_placeholder(self):
+        def build(in_port, eth_dst, out_port, buffer_id):
+            return self._flow_mod(in_port, eth_dst, 1, buffer_id)
+        self._template(build)
+
+    @raises(ValueError)
+    def test_length_changed(self):
+        def build(in_port, eth_dst, out_port, buffer_id):
+            if in_port == ofproto_template.UINT32.probes[0]:
+                eth_dst = '00:00:00:00:00:00'
+            else:
+                eth_dst = ('00:00:00:00:00:00', 'ff:ff:ff:ff:ff:00')
+            return self._flow_mod(in_port, eth_dst, out_port, buffer_id)
+        self._template(build)
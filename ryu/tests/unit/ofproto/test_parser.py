@@ -16,9 +16,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import struct
 import sys
 import unittest
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 
 from ryu.ofproto import ofproto_parser
 from ryu.ofproto import ofproto_protocol
@@ -192,6 +193,59 @@ class Test_Parser(unittest.TestCase):
             eq_(wire_msg, msg2.buf)
 
 
+class Test_Parser_Lazy(Test_Parser):
+    """ Test case for ryu.ofproto with lazy parsing enabled
+    """
+
+    def setUp(self):
+        ofproto_parser.set_lazy_parse(True)
+
+    def tearDown(self):
+        ofproto_parser.set_lazy_parse(False)
+
+    def _parse(self, path):
+        wire_msg = open(path, 'rb').read()
+        (version, msg_type, msg_len, xid) = ofproto_parser.header(wire_msg)
+        dp = ofproto_protocol.ProtocolDesc(version=version)
+        return ofproto_parser.msg(dp, version, msg_type, msg_len, xid,
+                                  wire_msg)
+
+    def test_lazy_packet_in(self):
+        msg = self._parse('../packet_data/of13/4-4-ofp_packet_in.packet')
+        ok_('match' not in msg.__dict__)
+        eq_(msg.total_len, len(msg.data))
+
+        match = msg.match
+        ok_('match' in msg.__dict__)
+        ok_(msg.match is match)
+        ofproto_parser.set_lazy_parse(False)
+        msg2 = self._parse('../packet_data/of13/4-4-ofp_packet_in.packet')
+        eq_(msg2.data, msg.data)
+        eq_(msg2.match.to_jsondict(), match.to_jsondict())
+
+    def test_lazy_multipart_reply(self):
+        msg = self._parse(
+            '../packet_data/of13/4-12-ofp_flow_stats_reply.packet')
+        ok_('body' not in msg.__dict__)
+        ok_(msg.body)
+        ok_('body' in msg.__dict__)
+
+    def test_lazy_unknown_attr(self):
+        msg = self._parse('../packet_data/of13/4-4-ofp_packet_in.packet')
+        ok_(not hasattr(msg, 'no_such_attr'))
+
+    def test_lazy_decode_error(self):
+        msg = self._parse('../packet_data/of13/4-4-ofp_packet_in.packet')
+        msg.set_lazy_attr('broken', struct.unpack_from, '!I', '')
+        for _i in range(2):
+            try:
+                msg.broken
+            except struct.error:
+                pass
+            else:
+                ok_(False, 'struct.error not raised')
+
+
 def _add_tests():
     import os
     import fnmatch
@@ -14,6 +14,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
+import pickle
 import sys
 import unittest
 from nose.tools import eq_
@@ -59,6 +61,104 @@ class Test_Parser_OFPMatch(unittest.TestCase):
         for k, v in match2.iteritems():
             ok_(k in d)
             eq_(d[k], v)
+        if hasattr(ofpp, 'OFPFrozenMatch'):
+            self._test_frozen(ofpp, d, b)
+
+    def _test_frozen(self, ofpp, d, b):
+        frozen = ofpp.OFPFrozenMatch(**d)
+        eq_(str(b), frozen.buf)
+        frozen2 = ofpp.OFPFrozenMatch.parser(buffer(b), 0)
+        eq_(frozen, frozen2)
+        eq_(hash(frozen), hash(frozen2))
+        for k, v in d.iteritems():
+            ok_(k in frozen)
+            eq_(frozen[k], v)
+        b2 = bytearray()
+        eq_(len(b), frozen.serialize(b2, 0))
+        eq_(b, b2)
+
+
+
+class Test_Parser_OFPFrozenMatch(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_dict_key(self):
+        ofpp = ofproto_v1_3_parser
+        m1 = ofpp.OFPFrozenMatch(in_port=1, eth_dst='00:00:00:00:00:01')
+        m2 = ofpp.OFPFrozenMatch(eth_dst='00:00:00:00:00:01', in_port=1)
+        m3 = ofpp.OFPFrozenMatch(in_port=2, eth_dst='00:00:00:00:00:01')
+        eq_(m1, m2)
+        ok_(m1 != m3)
+        d = {m1: 1}
+        ok_(m2 in d)
+        ok_(m3 not in d)
+
+    def test_immutable(self):
+        m = ofproto_v1_3_parser.OFPFrozenMatch(in_port=1)
+        self.assertRaises(AttributeError, setattr, m, 'buf', '')
+        self.assertRaises(AttributeError, setattr, m, 'foo', 1)
+        self.assertRaises(AttributeError, delattr, m, 'buf')
+
+    def test_copy(self):
+        m = ofproto_v1_3_parser.OFPFrozenMatch(in_port=1, eth_type=0x800)
+        ok_(copy.copy(m) is m)
+        ok_(copy.deepcopy(m) is m)
+        d = copy.deepcopy({m: [m]})
+        ok_(d.keys()[0] is m)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            m2 = pickle.loads(pickle.dumps(m, protocol))
+            eq_(m2, m)
+            eq_(m2['in_port'], 1)
+
+    def test_lookup(self):
+        m = ofproto_v1_3_parser.OFPFrozenMatch(in_port=1, eth_type=0x800)
+        eq_(m['in_port'], 1)
+        ok_('eth_type' in m)
+        ok_('ipv4_src' not in m)
+        eq_(m.get('ipv4_src', 2), 2)
+        eq_(sorted(m.iteritems()), [('eth_type', 0x800), ('in_port', 1)])
+        # the dict of the fields is built once
+        ok_(m._fields_dict() is m._fields_dict())
+
+    def test_from_match(self):
+        ofpp = ofproto_v1_3_parser
+        m = ofpp.OFPMatch()
+        m.set_in_port(1)
+        m.set_dl_type(0x800)
+        frozen = ofpp.OFPFrozenMatch.from_match(m)
+        eq_(ofpp.OFPFrozenMatch(in_port=1, eth_type=0x800), frozen)
+        m = ofpp.OFPMatch(in_port=1, eth_type=0x800)
+        eq_(ofpp.OFPFrozenMatch.from_match(m), frozen)
+
+    def test_jsondict(self):
+        ofpp = ofproto_v1_3_parser
+        m = ofpp.OFPMatch(in_port=1, ipv4_src=('10.0.0.0', '255.0.0.0'),
+                          eth_type=0x800)
+        frozen = ofpp.OFPFrozenMatch.from_match(m)
+        m.serialize(bytearray(), 0)
+        eq_(m.to_jsondict(), frozen.to_jsondict())
+        eq_(frozen, ofpp.OFPFrozenMatch.from_jsondict(
+            frozen.to_jsondict()['OFPMatch']))
+
+    def test_flow_mod(self):
+        ofpp = ofproto_v1_3_parser
+        from ryu.ofproto import ofproto_protocol
+        dp = ofproto_protocol.ProtocolDesc(version=ofproto_v1_3.OFP_VERSION)
+        inst = [ofpp.OFPInstructionActions(
+            ofproto_v1_3.OFPIT_APPLY_ACTIONS, [ofpp.OFPActionOutput(2)])]
+        m = ofpp.OFPFlowMod(dp, match=ofpp.OFPMatch(in_port=1),
+                            instructions=inst)
+        m.serialize()
+        frozen = ofpp.OFPFlowMod(dp,
+                                 match=ofpp.OFPFrozenMatch(in_port=1),
+                                 instructions=inst)
+        frozen.serialize()
+        eq_(m.buf, frozen.buf)
+        eq_(m.to_jsondict(), frozen.to_jsondict())
 
 
 def _add_tests():
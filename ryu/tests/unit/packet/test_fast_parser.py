@@ -0,0 +1,165 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+from nose.tools import eq_, ok_
+
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import fast_parser
+from ryu.lib.packet import icmp
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet
+from ryu.lib.packet import sctp
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.lib.packet import vlan
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+
+LOG = logging.getLogger('test_fast_parser')
+
+
+class Test_fast_parser(unittest.TestCase):
+
+    """ Test case for fast_parser
+    """
+
+    eth_dst = 'aa:aa:aa:aa:aa:aa'
+    eth_src = 'bb:bb:bb:bb:bb:bb'
+    ipv4_src = '192.0.2.1'
+    ipv4_dst = '192.0.2.2'
+    ipv6_src = '2001:db8::1'
+    ipv6_dst = '2001:db8::2'
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def _build(self, *protocols):
+        pkt = packet.Packet()
+        for p in protocols:
+            pkt.add_protocol(p)
+        pkt.serialize()
+        return str(pkt.data)
+
+    def _eth(self, ethertype):
+        return ethernet.ethernet(self.eth_dst, self.eth_src, ethertype)
+
+    def _check(self, data, eth_type, vlan_vid=None, ip_proto=None,
+               ip_src=None, ip_dst=None, src_port=None, dst_port=None):
+        h = fast_parser.extract(data)
+        eq_(h.eth_dst, self.eth_dst)
+        eq_(h.eth_src, self.eth_src)
+        eq_(h.eth_type, eth_type)
+        eq_(h.vlan_vid, vlan_vid)
+        eq_(h.ip_proto, ip_proto)
+        eq_(h.ip_src, ip_src)
+        eq_(h.ip_dst, ip_dst)
+        eq_(h.src_port, src_port)
+        eq_(h.dst_port, dst_port)
+        return h
+
+    def test_ipv4_tcp(self):
+        data = self._build(self._eth(ether.ETH_TYPE_IP),
+                           ipv4.ipv4(proto=inet.IPPROTO_TCP,
+                                     src=self.ipv4_src, dst=self.ipv4_dst),
+                           tcp.tcp(src_port=1234, dst_port=80))
+        self._check(data, ether.ETH_TYPE_IP, None, inet.IPPROTO_TCP,
+                    self.ipv4_src, self.ipv4_dst, 1234, 80)
+
+    def test_ipv4_option_udp(self):
+        option = '\x01\x01\x01\x00'
+        data = self._build(self._eth(ether.ETH_TYPE_IP),
+                           ipv4.ipv4(header_length=6, proto=inet.IPPROTO_UDP,
+                                     src=self.ipv4_src, dst=self.ipv4_dst,
+                                     option=option),
+                           udp.udp(src_port=68, dst_port=67))
+        self._check(data, ether.ETH_TYPE_IP, None, inet.IPPROTO_UDP,
+                    self.ipv4_src, self.ipv4_dst, 68, 67)
+
+    def test_ipv4_fragment(self):
+        data = self._build(self._eth(ether.ETH_TYPE_IP),
+                           ipv4.ipv4(proto=inet.IPPROTO_UDP, offset=100,
+                                     src=self.ipv4_src, dst=self.ipv4_dst),
+                           udp.udp(src_port=68, dst_port=67))
+        self._check(data, ether.ETH_TYPE_IP, None, inet.IPPROTO_UDP,
+                    self.ipv4_src, self.ipv4_dst)
+
+    def test_ipv4_icmp(self):
+        data = self._build(self._eth(ether.ETH_TYPE_IP),
+                           ipv4.ipv4(proto=inet.IPPROTO_ICMP,
+                                     src=self.ipv4_src, dst=self.ipv4_dst),
+                           icmp.icmp())
+        self._check(data, ether.ETH_TYPE_IP, None, inet.IPPROTO_ICMP,
+                    self.ipv4_src, self.ipv4_dst)
+
+    def test_vlan_qinq_sctp(self):
+        data = self._build(self._eth(ether.ETH_TYPE_8021AD),
+                           vlan.svlan(vid=10,
+                                      ethertype=ether.ETH_TYPE_8021Q),
+                           vlan.vlan(vid=20, ethertype=ether.ETH_TYPE_IP),
+                           ipv4.ipv4(proto=inet.IPPROTO_SCTP,
+                                     src=self.ipv4_src, dst=self.ipv4_dst),
+                           sctp.sctp(src_port=5000, dst_port=5001))
+        self._check(data, ether.ETH_TYPE_IP, 10, inet.IPPROTO_SCTP,
+                    self.ipv4_src, self.ipv4_dst, 5000, 5001)
+
+    def test_ipv6_ext_headers_udp(self):
+        ext_hdrs = [ipv6.hop_opts(nxt=inet.IPPROTO_DSTOPTS),
+                    ipv6.dst_opts(nxt=inet.IPPROTO_FRAGMENT),
+                    ipv6.fragment(nxt=inet.IPPROTO_UDP)]
+        data = self._build(self._eth(ether.ETH_TYPE_IPV6),
+                           ipv6.ipv6(nxt=inet.IPPROTO_HOPOPTS,
+                                     src=self.ipv6_src, dst=self.ipv6_dst,
+                                     ext_hdrs=ext_hdrs),
+                           udp.udp(src_port=546, dst_port=547))
+        self._check(data, ether.ETH_TYPE_IPV6, None, inet.IPPROTO_UDP,
+                    self.ipv6_src, self.ipv6_dst, 546, 547)
+
+    def test_arp(self):
+        data = self._build(self._eth(ether.ETH_TYPE_ARP),
+                           arp.arp_ip(arp.ARP_REQUEST, self.eth_src,
+                                      self.ipv4_src, '00:00:00:00:00:00',
+                                      self.ipv4_dst))
+        h = self._check(data, ether.ETH_TYPE_ARP)
+        ok_(h.packet().get_protocol(arp.arp))
+
+    def test_truncated(self):
+        data = self._build(self._eth(ether.ETH_TYPE_IP),
+                           ipv4.ipv4(proto=inet.IPPROTO_TCP,
+                                     src=self.ipv4_src, dst=self.ipv4_dst),
+                           tcp.tcp(src_port=1234, dst_port=80))
+        self._check(data[:34 + 2], ether.ETH_TYPE_IP, None,
+                    inet.IPPROTO_TCP, self.ipv4_src, self.ipv4_dst)
+        h = fast_parser.extract(data[:10])
+        eq_(h.eth_dst, None)
+        eq_(h.eth_type, None)
+
+    def test_packet(self):
+        data = self._build(self._eth(ether.ETH_TYPE_IP),
+                           ipv4.ipv4(proto=inet.IPPROTO_TCP,
+                                     src=self.ipv4_src, dst=self.ipv4_dst),
+                           tcp.tcp(src_port=1234, dst_port=80))
+        h = fast_parser.extract(data)
+        pkt = h.packet()
+        ok_(pkt is h.packet())
+        eq_(pkt.get_protocol(tcp.tcp).dst_port, 80)
@@ -20,6 +20,7 @@ import logging
 import struct
 import array
 import inspect
+import copy
 from nose.tools import *
 from nose.plugins.skip import Skip, SkipTest
 from ryu.ofproto import ether, inet
@@ -30,6 +31,22 @@ from ryu.lib import addrconv
 LOG = logging.getLogger('test_packet')
 
 
+class _Legacy(packet_base.PacketBase):
+    # a protocol which has only serialize() as third-party ones.
+    def __init__(self, data):
+        super(_Legacy, self).__init__()
+        self.data = data
+        self.payload = None
+
+    @classmethod
+    def parser(cls, buf):
+        pass
+
+    def serialize(self, payload, prev):
+        self.payload = payload
+        return self.data
+
+
 class TestPacket(unittest.TestCase):
     """ Test case for packet
     """
@@ -1526,3 +1543,150 @@ class TestPacket(unittest.TestCase):
         ok_(isinstance(pkt.protocols[0], ethernet.ethernet))
         ok_(isinstance(pkt.protocols[1], ipv4.ipv4))
         ok_(isinstance(pkt.protocols[2], udp.udp))
+
+    def _legacy_serialize(self, pkt):
+        data = bytearray()
+        r = pkt.protocols[::-1]
+        for i, p in enumerate(r):
+            if isinstance(p, packet_base.PacketBase):
+                if i == len(r) - 1:
+                    prev = None
+                else:
+                    prev = r[i + 1]
+                d = p.serialize(data, prev)
+            else:
+                d = str(p)
+            data = d + data
+        return data
+
+    def _test_serialize(self, *protocols):
+        pkt = packet.Packet(protocols=list(copy.deepcopy(protocols)))
+        pkt.serialize()
+        legacy = packet.Packet(protocols=list(copy.deepcopy(protocols)))
+        eq_(pkt.data, self._legacy_serialize(legacy))
+        ok_(isinstance(pkt.data, bytearray))
+
+    def test_serialize_single_buffer(self):
+        e = ethernet.ethernet(self.dst_mac, self.src_mac, ether.ETH_TYPE_IP)
+        self._test_serialize(
+            e, ipv4.ipv4(proto=inet.IPPROTO_TCP, src=self.src_ip,
+                         dst=self.dst_ip),
+            tcp.tcp(self.src_port, self.dst_port), self.payload)
+        self._test_serialize(
+            e, ipv4.ipv4(proto=inet.IPPROTO_UDP, src=self.src_ip,
+                         dst=self.dst_ip),
+            udp.udp(self.src_port, self.dst_port), bytearray('x' * 1401))
+        e6 = ethernet.ethernet(self.dst_mac, self.src_mac,
+                               ether.ETH_TYPE_IPV6)
+        self._test_serialize(
+            e6, ipv6.ipv6(nxt=inet.IPPROTO_ICMPV6),
+            icmpv6.icmpv6(icmpv6.ICMPV6_ECHO_REQUEST,
+                          data=icmpv6.echo(1, 1, 'abc')))
+
+    def test_serialize_into(self):
+        e = ethernet.ethernet(self.dst_mac, self.src_mac, ether.ETH_TYPE_ARP)
+        a = arp.arp_ip(arp.ARP_REQUEST, self.src_mac, self.src_ip,
+                       self.dst_mac, self.dst_ip)
+        self._test_serialize(e, a)
+        e = ethernet.ethernet(self.dst_mac, self.src_mac,
+                              ether.ETH_TYPE_8021Q)
+        self._test_serialize(e, vlan.vlan(3, 0, 100, ether.ETH_TYPE_ARP), a)
+
+        e = ethernet.ethernet(self.dst_mac, self.src_mac, ether.ETH_TYPE_IP)
+        ip = ipv4.ipv4(proto=inet.IPPROTO_ICMP, src=self.src_ip,
+                       dst=self.dst_ip)
+        self._test_serialize(e, ip, icmp.icmp())
+        self._test_serialize(
+            e, ip, icmp.icmp(icmp.ICMP_ECHO_REPLY,
+                             data=icmp.echo(1, 2, 'abc')))
+        self._test_serialize(
+            e, ip, icmp.icmp(icmp.ICMP_DEST_UNREACH,
+                             data=icmp.dest_unreach(data='abcd')))
+        self._test_serialize(e, ip, icmp.icmp(255, data='abcde'))
+
+        ip = ipv4.ipv4(header_length=7, proto=inet.IPPROTO_TCP,
+                       src=self.src_ip, dst=self.dst_ip, option='\x01')
+        self._test_serialize(
+            e, ip, tcp.tcp(self.src_port, self.dst_port, option='\x01'),
+            self.payload)
+        self._test_serialize(
+            e, ip, tcp.tcp(self.src_port, self.dst_port, offset=8,
+                           option='\x01' * 5), 'x')
+        ip = ipv4.ipv4(proto=inet.IPPROTO_UDP, src=self.src_ip,
+                       dst=self.dst_ip)
+        self._test_serialize(e, ip, udp.udp(self.src_port, self.dst_port),
+                             'abc')
+
+        e = ethernet.ethernet(lldp.LLDP_MAC_NEAREST_BRIDGE, self.src_mac,
+                              ether.ETH_TYPE_LLDP)
+        tlvs = (lldp.ChassisID(subtype=lldp.ChassisID.SUB_LOCALLY_ASSIGNED,
+                               chassis_id='dpid:1'),
+                lldp.PortID(subtype=lldp.PortID.SUB_PORT_COMPONENT,
+                            port_id='\x00\x01'),
+                lldp.TTL(ttl=120),
+                lldp.SystemName(system_name='switch1'),
+                lldp.OrganizationallySpecific(
+                    oui='\x00\x12\x0f', subtype=0x02, info='\x07\x01\x00'),
+                lldp.End())
+        self._test_serialize(e, lldp.lldp(tlvs))
+
+    def test_serialize_into_only(self):
+        class _ethernet(ethernet.ethernet):
+            def serialize(self, payload, prev):
+                raise AssertionError('serialize is called')
+
+        pkt = packet.Packet()
+        pkt.add_protocol(_ethernet(self.dst_mac, self.src_mac,
+                                   ether.ETH_TYPE_IP))
+        pkt.add_protocol(ipv4.ipv4(proto=inet.IPPROTO_UDP))
+        pkt.add_protocol(udp.udp(self.src_port, self.dst_port))
+        pkt.add_protocol(self.payload)
+        pkt.serialize()
+        eq_(len(pkt.data), ethernet.ethernet._MIN_LEN +
+            ipv4.ipv4._MIN_LEN + udp.udp._MIN_LEN + len(self.payload))
+
+    def test_serialize_exceed_headroom(self):
+        # headers longer than the headroom
+        e = ethernet.ethernet(self.dst_mac, self.src_mac, ether.ETH_TYPE_IP)
+        option = '\x01' * 40
+        ip = ipv4.ipv4(header_length=15, proto=inet.IPPROTO_TCP,
+                       src=self.src_ip, dst=self.dst_ip, option=option)
+        t = tcp.tcp(self.src_port, self.dst_port, option=option)
+        self._test_serialize(e, ip, t, ip, t)
+        self._test_serialize(e, _Legacy('\x02' * (packet._HEADROOM + 1)),
+                             ip, t, _Legacy('\x03' * 100), ip, t)
+
+    def test_serialize_legacy_protocol(self):
+        pkt = packet.Packet()
+        pkt.add_protocol(_Legacy('\x00\x01'))
+        pkt.add_protocol(self.payload)
+        pkt.serialize()
+        eq_(pkt.data, '\x00\x01' + self.payload)
+        # protocols without _SERIALIZE_VIEW get a copy of the payload.
+        payload = pkt.protocols[0].payload
+        ok_(isinstance(payload, bytearray))
+        eq_(payload, self.payload)
+
+    def test_serialize_legacy_protocol_mixed(self):
+        # the protocols without serialize_into() between the ones with it
+        e = ethernet.ethernet(self.dst_mac, self.src_mac, ether.ETH_TYPE_IP)
+        ip = ipv4.ipv4(proto=inet.IPPROTO_UDP, src=self.src_ip,
+                       dst=self.dst_ip)
+        u = udp.udp(self.src_port, self.dst_port)
+        self._test_serialize(e, _Legacy('\x00' * 6), ip, u,
+                             _Legacy('\x01\x02\x03'), self.payload)
+        pkt = packet.Packet(protocols=[e, ip, u, _Legacy('abc'),
+                                       self.payload])
+        pkt.serialize()
+        eq_(pkt.protocols[3].payload, self.payload)
+        eq_(str(pkt.data[-len(self.payload) - 3:]), 'abc' + self.payload)
+
+    def test_checksum_pieces(self):
+        data = 'abcdefghijk'
+        csum = packet_utils.checksum(data)
+        eq_(packet_utils.checksum('abcd', bytearray('efgh'),
+                                  memoryview(bytearray('ijk'))), csum)
+        # an odd length piece other than the last
+        eq_(packet_utils.checksum('abc', 'defghijk'), csum)
+        eq_(packet_utils.checksum(memoryview(bytearray(data))[:4],
+                                  'efghijk'), csum)
@@ -0,0 +1,134 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+import struct
+from nose.plugins.skip import SkipTest
+from nose.tools import eq_, raises
+
+from ryu.lib import addrconv
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet
+from ryu.lib.packet import packet_utils
+from ryu.lib.packet import tcp
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+
+LOG = logging.getLogger('test_packet_utils')
+
+
+class Test_packet_utils(unittest.TestCase):
+
+    """ Test case for packet_utils
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        packet_utils.NUMPY_MIN_LEN = 2048
+
+    def _build_tcp(self, src='192.0.2.1', ttl=64, payload='x' * 100):
+        pkt = packet.Packet()
+        pkt.add_protocol(ethernet.ethernet(ethertype=ether.ETH_TYPE_IP))
+        pkt.add_protocol(ipv4.ipv4(ttl=ttl, proto=inet.IPPROTO_TCP, src=src,
+                                   dst='192.0.2.2'))
+        pkt.add_protocol(tcp.tcp(src_port=1234, dst_port=80))
+        pkt.add_protocol(payload)
+        pkt.serialize()
+        return pkt
+
+    def test_checksum_pieces(self):
+        data = bytearray(range(256)) * 3
+        expected = packet_utils.checksum(str(data))
+        eq_(packet_utils.checksum(data[:100], memoryview(data)[100:]),
+            expected)
+        # odd pieces
+        eq_(packet_utils.checksum(data[:101], data[101:333],
+                                  memoryview(data)[333:]), expected)
+        # an odd last piece
+        data = data[:-1]
+        expected = packet_utils.checksum(str(data) + '\x00')
+        eq_(packet_utils.checksum(str(data)), expected)
+        eq_(packet_utils.checksum(data), expected)
+        eq_(packet_utils.checksum(data[:100], memoryview(data)[100:]),
+            expected)
+
+    def test_checksum_numpy(self):
+        if packet_utils.numpy is None:
+            raise SkipTest('numpy is not available')
+        data = bytearray(range(256)) * 40 + bytearray('\x01')
+        expected = packet_utils.checksum(str(data))
+        packet_utils.NUMPY_MIN_LEN = 0
+        eq_(packet_utils.checksum(str(data)), expected)
+        eq_(packet_utils.checksum(data), expected)
+        eq_(packet_utils.checksum(memoryview(data)[:1000],
+                                  memoryview(data)[1000:]), expected)
+
+    def test_checksum_batch(self):
+        data = bytearray(range(256)) * 36
+        # the frames of the same length are summed together
+        bufs = ['x' * 9000, bytearray('y' * 64), '\x01\x02\x03',
+                data[:9000], memoryview(data)[1:9001], data[:3], '']
+        eq_(packet_utils.checksum_batch(bufs),
+            [packet_utils.checksum(buf) for buf in bufs])
+
+    def test_checksum_update_ttl(self):
+        pkt = self._build_tcp(ttl=64)
+        ip = pkt.get_protocol(ipv4.ipv4)
+        csum = packet_utils.checksum_update(ip.csum, '\x40\x06', '\x3f\x06')
+        eq_(csum, self._build_tcp(ttl=63).get_protocol(ipv4.ipv4).csum)
+
+    def test_checksum_update_nat(self):
+        old_pkt = self._build_tcp(src='192.0.2.1')
+        new_pkt = self._build_tcp(src='198.51.100.10')
+        old = addrconv.ipv4.text_to_bin('192.0.2.1')
+        new = addrconv.ipv4.text_to_bin('198.51.100.10')
+        for cls in [ipv4.ipv4, tcp.tcp]:
+            csum = packet_utils.checksum_update(
+                old_pkt.get_protocol(cls).csum, old, new)
+            eq_(csum, new_pkt.get_protocol(cls).csum)
+
+    def test_checksum_update_verify(self):
+        # the updated checksum must verify for any change
+        data = bytearray('\x45\x00\x00\x54\x00\x00\x40\x00\x40\x01\x00\x00'
+                         '\xc0\x00\x02\x01\xc0\x00\x02\x02')
+        csum = packet_utils.checksum(data)
+        struct.pack_into('!H', data, 10, csum)
+        for old, new in [('\x00\x00', '\xff\xff'), ('\xff\xff', '\x00\x00'),
+                         ('\x12\x34', '\x12\x34'), ('\x00', '\x80')]:
+            data[16:16 + len(old)] = old
+            csum = packet_utils.checksum(data[:10], data[12:])
+            struct.pack_into('!H', data, 10, csum)
+            data[16:16 + len(new)] = new
+            csum = packet_utils.checksum_update(csum, old, new)
+            struct.pack_into('!H', data, 10, csum)
+            eq_(packet_utils.checksum(data), 0)
+
+    @raises(ValueError)
+    def test_checksum_update_length(self):
+        packet_utils.checksum_update(0, '\x00\x00', '\x00')
+
+    def test_crc32c(self):
+        # RFC 3720 B.4
+        eq_(packet_utils.crc32c('\x00' * 32),
+            struct.unpack('>I', struct.pack('<I', 0x8a9136aa))[0])
+        data = bytearray(range(32))
+        eq_(packet_utils.crc32c(data[:5], memoryview(data)[5:]),
+            struct.unpack('>I', struct.pack('<I', 0x46dd794e))[0])
@@ -0,0 +1,157 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+from nose.tools import eq_, ok_
+
+from ryu.lib.packet import bgp
+from ryu.lib.packet.bgp import RF_IPv4_VPN
+from ryu.services.protocols.bgp.peer import UpdatePacker
+
+LOG = logging.getLogger('test_peer')
+
+
+def _nlri(i):
+    return bgp.BGPNLRI(length=24, addr='10.%d.%d.0' % (i // 256, i % 256))
+
+
+def _vpn_nlri(i):
+    return bgp.LabelledVPNIPAddrPrefix(24, '10.%d.%d.0' % (i // 256, i % 256),
+                                       route_dist=100, labels=[100])
+
+
+def _attrs(as_path=None, next_hop='192.0.2.1'):
+    return [bgp.BGPPathAttributeNextHop(next_hop),
+            bgp.BGPPathAttributeOrigin(0),
+            bgp.BGPPathAttributeAsPath(as_path or [[65000]])]
+
+
+def _update(i, **kwargs):
+    return bgp.BGPUpdate(path_attributes=_attrs(**kwargs), nlri=[_nlri(i)])
+
+
+def _vpn_update(i, withdraw=False):
+    rf = RF_IPv4_VPN
+    if withdraw:
+        return bgp.BGPUpdate(path_attributes=[
+            bgp.BGPPathAttributeMpUnreachNLRI(rf.afi, rf.safi,
+                                              [_vpn_nlri(i)])])
+    attrs = _attrs()[1:]
+    attrs.insert(0, bgp.BGPPathAttributeMpReachNLRI(rf.afi, rf.safi,
+                                                    '192.0.2.1',
+                                                    [_vpn_nlri(i)]))
+    return bgp.BGPUpdate(path_attributes=attrs)
+
+
+def _parse(update):
+    msg, rest = bgp.BGPMessage.parser(str(update.serialize()))
+    eq_(rest, '')
+    return msg
+
+
+def _prefixes(msg):
+    prefixes = [n.prefix for n in msg.nlri + msg.withdrawn_routes]
+    for attr in msg.path_attributes:
+        if isinstance(attr, bgp.BGPPathAttributeMpReachNLRI):
+            prefixes.extend(n.prefix for n in attr.nlri)
+        elif isinstance(attr, bgp.BGPPathAttributeMpUnreachNLRI):
+            prefixes.extend(n.prefix for n in attr.withdrawn_routes)
+    return prefixes
+
+
+class Test_UpdatePacker(unittest.TestCase):
+
+    """ Test case for UpdatePacker
+    """
+
+    def setUp(self):
+        self.packer = UpdatePacker()
+
+    def tearDown(self):
+        pass
+
+    def test_pack(self):
+        for i in range(3):
+            eq_(self.packer.add(_update(i), i), [])
+        eq_(self.packer.add(_update(3, next_hop='192.0.2.2'), 3), [])
+        eq_(self.packer.add(bgp.BGPUpdate(withdrawn_routes=[_nlri(4)]), 4),
+            [])
+        eq_(len(self.packer), 5)
+
+        ready = self.packer.flush()
+        eq_(len(self.packer), 0)
+        eq_([routes for _msg, routes in ready], [[0, 1, 2], [3], [4]])
+        msgs = [_parse(update) for update, _routes in ready]
+        eq_(_prefixes(msgs[0]), ['10.0.0.0/24', '10.0.1.0/24', '10.0.2.0/24'])
+        eq_(msgs[0].get_path_attr(bgp.BGP_ATTR_TYPE_NEXT_HOP).value,
+            '192.0.2.1')
+        eq_(msgs[1].get_path_attr(bgp.BGP_ATTR_TYPE_NEXT_HOP).value,
+            '192.0.2.2')
+        eq_(_prefixes(msgs[2]), ['10.0.4.0/24'])
+        eq_(msgs[2].path_attributes, [])
+        eq_(self.packer.flush(), [])
+
+    def test_pack_mp(self):
+        # the parsed lengths of the prefixes include the label and the route
+        # distinguisher.
+        for i in range(3):
+            eq_(self.packer.add(_vpn_update(i), i), [])
+        for i in range(3, 5):
+            eq_(self.packer.add(_vpn_update(i, withdraw=True), i), [])
+
+        ready = self.packer.flush()
+        eq_([routes for _msg, routes in ready], [[0, 1, 2], [3, 4]])
+        msgs = [_parse(update) for update, _routes in ready]
+        eq_(_prefixes(msgs[0]),
+            ['10.0.0.0/112', '10.0.1.0/112', '10.0.2.0/112'])
+        eq_(len(msgs[0].path_attributes), 3)
+        eq_(_prefixes(msgs[1]), ['10.0.3.0/112', '10.0.4.0/112'])
+        eq_(msgs[0].nlri + msgs[1].nlri, [])
+
+    def test_max_len(self):
+        for updates, length in (([_update(i) for i in range(2000)], 24),
+                                ([_vpn_update(i) for i in range(2000)], 112)):
+            ready = []
+            for i, update in enumerate(updates):
+                ready.extend(self.packer.add(update, i))
+            ready.extend(self.packer.flush())
+
+            ok_(len(ready) > 1)
+            prefixes = []
+            routes = []
+            for update, update_routes in ready:
+                ok_(len(update.serialize()) <= self.packer.max_len)
+                prefixes.extend(_prefixes(_parse(update)))
+                routes.extend(update_routes)
+            eq_(prefixes, ['10.%d.%d.0/%d' % (i // 256, i % 256, length)
+                           for i in range(2000)])
+            eq_(routes, range(2000))
+
+    def test_same_prefix(self):
+        eq_(self.packer.add(_update(0), 0), [])
+        eq_(self.packer.add(_update(1, next_hop='192.0.2.2'), 1), [])
+        eq_(self.packer.add(_update(2), 2), [])
+        ready = self.packer.add(bgp.BGPUpdate(withdrawn_routes=[_nlri(1)]), 3)
+        eq_([routes for _msg, routes in ready], [[0, 2], [1]])
+        eq_([routes for _msg, routes in self.packer.flush()], [[3]])
+
+    def test_clear(self):
+        self.packer.add(_update(0), 0)
+        self.packer.clear()
+        eq_(len(self.packer), 0)
+        eq_(self.packer.flush(), [])
@@ -0,0 +1,113 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+import socket
+from nose.tools import eq_, raises
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import speaker
+
+LOG = logging.getLogger('test_speaker')
+
+
+class _SignalBus(object):
+    def __init__(self):
+        self.errors = []
+
+    def bgp_error(self, peer, code, subcode, reason):
+        self.errors.append((code, subcode))
+
+
+class _BgpProtocol(speaker.BgpProtocol):
+    def __init__(self, socket, signal_bus):
+        super(_BgpProtocol, self).__init__(socket, signal_bus)
+        self.msgs = []
+
+    def _handle_msg(self, msg):
+        self.msgs.append(msg)
+
+
+def _update(i):
+    nlri = [bgp.BGPNLRI(length=24, addr='10.%d.%d.0' % (i % 256, j))
+            for j in range(i % 256)]
+    return bgp.BGPUpdate(path_attributes=[bgp.BGPPathAttributeOrigin(0)],
+                         nlri=nlri)
+
+
+class Test_BgpProtocol(unittest.TestCase):
+
+    """ Test case for BgpProtocol
+    """
+
+    def setUp(self):
+        self.sock, self.peer_sock = socket.socketpair()
+        self.signal_bus = _SignalBus()
+        self.protocol = _BgpProtocol(self.sock, self.signal_bus)
+
+    def tearDown(self):
+        self.sock.close()
+        self.peer_sock.close()
+
+    def _check_received(self, msgs, chunk_len):
+        data = ''.join(str(msg.serialize()) for msg in msgs)
+        for i in range(0, len(data), chunk_len):
+            self.protocol.data_received(data[i:i + chunk_len])
+        eq_([str(msg.serialize()) for msg in self.protocol.msgs],
+            [str(msg.serialize()) for msg in msgs])
+        eq_(self.protocol._recv_head, self.protocol._recv_tail)
+
+    def test_data_received(self):
+        msgs = [bgp.BGPKeepAlive(), _update(3),
+                bgp.BGPNotification(error_code=6, error_subcode=2, data='x')]
+        self._check_received(msgs, 1)
+
+    def test_data_received_chunks(self):
+        # more bytes than the receive buffer, so that partial messages are
+        # moved to the front of the buffer.
+        msgs = [_update(i) for i in range(200)]
+        for chunk_len in (7, 4096, speaker.BGP_RECV_BUFF_LEN + 1):
+            self.protocol.msgs = []
+            self._check_received(msgs, chunk_len)
+
+    def test_recv_loop(self):
+        msgs = [_update(i) for i in range(200)]
+        data = ''.join(str(msg.serialize()) for msg in msgs)
+        self.peer_sock.sendall(data)
+        self.peer_sock.close()
+        reasons = []
+        self.protocol.connection_lost = reasons.append
+        self.protocol._recv_loop()
+        eq_(len(self.protocol.msgs), len(msgs))
+        eq_(reasons, ['Peer closed connection'])
+
+    @raises(bgp.NotSync)
+    def test_bad_marker(self):
+        data = str(bgp.BGPKeepAlive().serialize())
+        try:
+            self.protocol.data_received('\0' + data[1:])
+        finally:
+            eq_(self.signal_bus.errors,
+                [(bgp.BGP_ERROR_MESSAGE_HEADER_ERROR,
+                  bgp.BGP_ERROR_SUB_CONNECTION_NOT_SYNCHRONIZED)])
+
+    @raises(bgp.BadLen)
+    def test_bad_len(self):
+        data = bytearray(bgp.BGPKeepAlive().serialize())
+        data[17] = 20
+        self.protocol.data_received(str(data))
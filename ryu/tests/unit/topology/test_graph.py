@@ -0,0 +1,154 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+import logging
+from nose.tools import eq_, ok_
+
+from ryu.topology import graph
+
+LOG = logging.getLogger('test_graph')
+
+
+class _Port(object):
+    def __init__(self, dpid, port_no):
+        self.dpid = dpid
+        self.port_no = port_no
+
+    def __eq__(self, other):
+        return self.dpid == other.dpid and self.port_no == other.port_no
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((self.dpid, self.port_no))
+
+
+class _Link(object):
+    def __init__(self, src, dst):
+        self.src = src
+        self.dst = dst
+
+    def __eq__(self, other):
+        return self.src == other.src and self.dst == other.dst
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((self.src, self.dst))
+
+
+def _link(src_dpid, src_port_no, dst_dpid, dst_port_no):
+    return _Link(_Port(src_dpid, src_port_no), _Port(dst_dpid, dst_port_no))
+
+
+class Test_Graph(unittest.TestCase):
+
+    """ Test case for ryu.topology.graph
+    """
+
+    def setUp(self):
+        self.graph = graph.Graph()
+
+    def tearDown(self):
+        pass
+
+    def _add(self, src_dpid, src_port_no, dst_dpid, dst_port_no):
+        # both directions
+        link = _link(src_dpid, src_port_no, dst_dpid, dst_port_no)
+        rev_link = _link(dst_dpid, dst_port_no, src_dpid, src_port_no)
+        self.graph.add_link(link)
+        self.graph.add_link(rev_link)
+        return link, rev_link
+
+    def _dpids(self, path):
+        return [link.src.dpid for link in path] + [path[-1].dst.dpid]
+
+    def test_path(self):
+        # 1 - 2 - 3 - 4
+        self._add(1, 1, 2, 1)
+        self._add(2, 2, 3, 1)
+        self._add(3, 2, 4, 1)
+        path = self.graph.get_path(1, 4)
+        eq_(self._dpids(path), [1, 2, 3, 4])
+        eq_([(link.src.port_no, link.dst.port_no) for link in path],
+            [(1, 1), (2, 1), (2, 1)])
+        eq_(self._dpids(self.graph.get_path(4, 2)), [4, 3, 2])
+        eq_(self.graph.get_path(1, 1), [])
+        eq_(self.graph.get_path(1, 5), None)
+        eq_(self.graph.get_path(5, 1), None)
+
+    def test_cache(self):
+        self._add(1, 1, 2, 1)
+        self._add(2, 2, 3, 1)
+        path = self.graph.get_path(1, 3)
+        ok_(self.graph.get_path(1, 3)[0] is path[0])
+        eq_(sorted(self.graph._trees), [1])
+
+        self.graph.get_path(3, 1)
+        eq_(sorted(self.graph._trees), [1, 3])
+        # a parallel link doesn't make any path shorter
+        self._add(1, 2, 2, 2)
+        eq_(sorted(self.graph._trees), [1, 3])
+        # a link which isn't used by the trees
+        self.graph.remove_link(_link(1, 2, 2, 2))
+        eq_(sorted(self.graph._trees), [1, 3])
+
+    def test_add_link(self):
+        # 1 - 2 - 3 - 4
+        self._add(1, 1, 2, 1)
+        self._add(2, 2, 3, 1)
+        self._add(3, 2, 4, 1)
+        self.graph.get_path(1, 4)
+        self.graph.get_path(2, 4)
+        self.graph.get_path(4, 1)
+
+        # 1 - 4 is shorter only from 1 and 4
+        self._add(1, 2, 4, 2)
+        eq_(sorted(self.graph._trees), [2])
+        eq_(self._dpids(self.graph.get_path(1, 4)), [1, 4])
+        eq_(self._dpids(self.graph.get_path(4, 1)), [4, 1])
+        eq_(self._dpids(self.graph.get_path(2, 4)), [2, 3, 4])
+
+    def test_remove_link(self):
+        # 1 - 2 - 3 and 1 - 4 - 5 - 3
+        link, _rev_link = self._add(1, 1, 2, 1)
+        self._add(2, 2, 3, 1)
+        self._add(1, 2, 4, 1)
+        self._add(4, 2, 5, 1)
+        self._add(5, 2, 3, 2)
+        eq_(self._dpids(self.graph.get_path(1, 3)), [1, 2, 3])
+        # reaches 2 through 3
+        eq_(self._dpids(self.graph.get_path(5, 2)), [5, 3, 2])
+
+        self.graph.remove_link(link)
+        eq_(sorted(self.graph._trees), [5])
+        eq_(self._dpids(self.graph.get_path(1, 3)), [1, 4, 5, 3])
+        eq_(self._dpids(self.graph.get_path(1, 2)), [1, 4, 5, 3, 2])
+        eq_(self.graph._edges[1].keys(), [4])
+
+    def test_disconnect(self):
+        link, rev_link = self._add(1, 1, 2, 1)
+        eq_(len(self.graph.get_path(1, 2)), 1)
+        self.graph.remove_link(link)
+        self.graph.remove_link(rev_link)
+        eq_(self.graph.get_path(1, 2), None)
+        eq_(self.graph._edges, {})
+        # removing again does nothing
+        self.graph.remove_link(link)
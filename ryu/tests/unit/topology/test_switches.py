@@ -0,0 +1,327 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import time
+import unittest
+import logging
+from nose.tools import eq_, ok_
+
+from ryu import cfg
+from ryu.base import app_manager  # To suppress cyclic import
+from ryu.controller import controller
+from ryu.controller import handler
+from ryu.controller import ofp_event
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_0
+from ryu.ofproto import ofproto_v1_3
+from ryu.topology import event
+from ryu.topology import switches
+
+LOG = logging.getLogger('test_switches')
+
+
+class _Datapath(ofproto_protocol.ProtocolDesc):
+    # records the buffers sent
+    def __init__(self, dpid, n_ports, version=ofproto_v1_3.OFP_VERSION):
+        super(_Datapath, self).__init__(version=version)
+        self.id = dpid
+        self.xid = 0
+        self.bufs = []
+        self.msgs = []
+        self.ports = {}
+        for port_no in range(1, n_ports + 1):
+            if version == ofproto_v1_0.OFP_VERSION:
+                port = self.ofproto_parser.OFPPhyPort(
+                    port_no, '00:00:00:00:%02x:%02x' % (dpid, port_no),
+                    'port%d' % port_no, 0, 0, 0, 0, 0, 0)
+            else:
+                port = self.ofproto_parser.OFPPort(
+                    port_no, '00:00:00:00:%02x:%02x' % (dpid, port_no),
+                    'port%d' % port_no, 0, 0, 0, 0, 0, 0, 0, 0)
+            self.ports[port_no] = port
+
+    next_xid = controller.Datapath.__dict__['next_xid']
+
+    def send_msg(self, msg):
+        self.msgs.append(msg)
+
+    def send_flow_mod(self, **kwargs):
+        self.msgs.append(kwargs)
+
+    def send(self, buf):
+        self.bufs.append(buf)
+
+    def packet_outs(self, buf):
+        # returns [(xid, lldp src dpid, lldp src port_no), ...]
+        result = []
+        offset = 0
+        while offset < len(buf):
+            version, msg_type, msg_len, xid = ofproto_parser.header(
+                buf, offset)
+            eq_(version, self.ofproto.OFP_VERSION)
+            eq_(msg_type, self.ofproto.OFPT_PACKET_OUT)
+            data = str(buf[offset:offset + msg_len])
+            result.append((xid, ) + switches.LLDPPacket.lldp_parse(
+                data[-switches.Switches.LLDP_PACKET_LEN:]))
+            offset += msg_len
+        return result
+
+
+class Test_Switches(unittest.TestCase):
+
+    """ Test case for ryu.topology.switches
+    """
+
+    def setUp(self):
+        # test_manager reloads ryu.base.app_manager, which makes
+        # Switches a subclass of the stale RyuApp.  It also parses the
+        # command line, after which the reload can't register the
+        # options of switches again.
+        cfg.CONF.clear()
+        reload(switches)
+        cfg.CONF.set_override('observe_links', True)
+        cfg.CONF.set_override('lldp_send_pps', 200)
+        self.switches = switches.Switches()
+        # stop the loops.  the tests drive them.
+        self.switches.close()
+        self.tick = self.switches.LLDP_SEND_GUARD
+        self.period = self.switches.LLDP_SEND_PERIOD_PER_PORT
+
+    def tearDown(self):
+        cfg.CONF.clear_override('observe_links')
+        cfg.CONF.clear_override('lldp_send_pps')
+
+    def _connect(self, dpid, n_ports, version=ofproto_v1_3.OFP_VERSION):
+        dp = _Datapath(dpid, n_ports, version)
+        ev = ofp_event.EventOFPStateChange(dp)
+        ev.state = handler.MAIN_DISPATCHER
+        self.switches.state_change_handler(ev)
+        return dp
+
+    def test_send_lldp_packets(self):
+        dp1 = self._connect(1, 3)
+        dp2 = self._connect(2, 2, ofproto_v1_0.OFP_VERSION)
+        self.switches.send_lldp_packets(list(self.switches.ports))
+
+        # one buffer for each datapath
+        eq_(len(dp1.bufs), 1)
+        xids, dpids, port_nos = zip(*dp1.packet_outs(dp1.bufs[0]))
+        eq_(xids, (1, 2, 3))
+        eq_(dpids, (1, 1, 1))
+        eq_(sorted(port_nos), [1, 2, 3])
+        eq_(len(dp2.bufs), 1)
+        xids, dpids, port_nos = zip(*dp2.packet_outs(dp2.bufs[0]))
+        eq_(xids, (1, 2))
+        eq_(dpids, (2, 2))
+        eq_(sorted(port_nos), [1, 2])
+        for port_data in self.switches.ports.values():
+            eq_(port_data.sent, 1)
+            ok_(port_data.timestamp is not None)
+
+    def test_lldp_template(self):
+        dp = self._connect(1, 1)
+        port = list(self.switches.ports)[0]
+        self.switches.send_lldp_packet(port)
+        msg = self.switches.ports.get_port(port).lldp_msg
+        self.switches.send_lldp_packet(port)
+        ok_(self.switches.ports.get_port(port).lldp_msg is msg)
+
+        # only the xid differs
+        first, second = dp.bufs
+        eq_(dp.packet_outs(first), [(1, 1, 1)])
+        eq_(dp.packet_outs(second), [(2, 1, 1)])
+        eq_(first[:4], second[:4])
+        eq_(first[8:], second[8:])
+
+    def test_budget(self):
+        self._connect(1, 100)
+        now = time.time()
+        # 200 pps allows 10 packets for each tick
+        ports, timeout = self.switches._lldp_due_ports(now, self.tick)
+        eq_(len(ports), 10)
+        eq_(timeout, self.tick)
+        self.switches.send_lldp_packets(ports)
+
+        # no budget is left
+        ports, timeout = self.switches._lldp_due_ports(now, 0)
+        eq_(ports, [])
+        eq_(timeout, self.tick)
+
+        ports, timeout = self.switches._lldp_due_ports(now + self.tick,
+                                                       self.tick)
+        eq_(len(ports), 10)
+
+    def test_spread(self):
+        cfg.CONF.set_override('lldp_send_pps', 100000)
+        self.switches = switches.Switches()
+        self.switches.close()
+        self._connect(1, 90)
+
+        # the new ports are probed at once
+        now = time.time()
+        ports, timeout = self.switches._lldp_due_ports(now, self.tick)
+        eq_(len(ports), 90)
+        eq_(timeout, None)
+        self.switches.send_lldp_packets(ports)
+        for port_data in self.switches.ports.values():
+            port_data.timestamp = now
+
+        # not due yet
+        ports, timeout = self.switches._lldp_due_ports(now, self.tick)
+        eq_(ports, [])
+        ok_(abs(timeout - self.period) < 1e-6)
+
+        # all of them are due, but probed at 90 ports / period
+        now += self.period
+        sent = []
+        for _i in range(int(self.period / self.tick)):
+            ports, timeout = self.switches._lldp_due_ports(now, self.tick)
+            eq_(len(ports), 5)
+            eq_(timeout, self.tick)
+            self.switches.send_lldp_packets(ports)
+            sent.extend(ports)
+            now += self.tick
+        eq_(len(set(sent)), 90)
+
+    def test_changes(self):
+        dp = self._connect(1, 2)
+        changes = self.switches.changes
+        eq_(changes.revision, 1)
+        (revision, ev), = changes.since(0)
+        eq_(revision, 1)
+        ok_(isinstance(ev, event.EventSwitchEnter))
+        eq_(ev.switch.dp, dp)
+
+        ev = ofp_event.EventOFPStateChange(dp)
+        ev.state = handler.DEAD_DISPATCHER
+        self.switches.state_change_handler(ev)
+        eq_([ev.__class__ for _rev, ev in changes.since(1)],
+            [event.EventSwitchLeave])
+        eq_(changes.since(2), [])
+
+    def test_down_port(self):
+        dp = self._connect(1, 2)
+        port = list(self.switches.ports)[0]
+        self.switches.ports.get_port(port).set_down(True)
+
+        now = time.time()
+        ports, timeout = self.switches._lldp_due_ports(now, self.tick)
+        eq_(len(ports), 2)
+        self.switches.send_lldp_packets(ports)
+        # rescheduled without sending
+        eq_(len(dp.packet_outs(dp.bufs[0])), 1)
+        eq_(self.switches.ports.get_port(port).sent, 1)
+
+
+class Test_LinkState(unittest.TestCase):
+
+    """ Test case for ryu.topology.switches.LinkState
+    """
+
+    def setUp(self):
+        self.links = switches.LinkState()
+        self.ports = {}
+        for dpid in range(1, 4):
+            dp = _Datapath(dpid, 3)
+            for port_no, ofpport in dp.ports.items():
+                self.ports[(dpid, port_no)] = switches.Port(dpid, dp.ofproto,
+                                                            ofpport)
+
+    def tearDown(self):
+        pass
+
+    def _update(self, src_dpid, src_port_no, dst_dpid, dst_port_no):
+        src = self.ports[(src_dpid, src_port_no)]
+        dst = self.ports[(dst_dpid, dst_port_no)]
+        self.links.update_link(src, dst)
+        return switches.Link(src, dst)
+
+    def test_get_links(self):
+        link12 = self._update(1, 1, 2, 1)
+        link21 = self._update(2, 1, 1, 1)
+        link13 = self._update(1, 2, 3, 1)
+        eq_(set(self.links.get_links(1)), set([link12, link13]))
+        eq_(self.links.get_links(2), [link21])
+        eq_(self.links.get_links(3), [])
+
+        self.links.link_down(link13)
+        eq_(self.links.get_links(1), [link12])
+        eq_(self.links.graph.get_path(1, 3), None)
+        eq_(self.links.graph.get_path(2, 1), [link21])
+
+    def test_new_peer(self):
+        link12 = self._update(1, 1, 2, 1)
+        eq_(self.links.graph.get_path(1, 2), [link12])
+        link13 = self._update(1, 1, 3, 1)
+        eq_(self.links.keys(), [link13])
+        eq_(self.links.get_links(1), [link13])
+        eq_(self.links.graph.get_path(1, 2), None)
+
+    def test_port_deleted(self):
+        link12 = self._update(1, 1, 2, 1)
+        self._update(2, 1, 1, 1)
+        link23 = self._update(2, 2, 3, 1)
+        dst, rev_link_dst = self.links.port_deleted(link12.src)
+        eq_(dst, link12.dst)
+        eq_(rev_link_dst, link12.src)
+        eq_(self.links.keys(), [link23])
+        eq_(self.links.get_links(1), [])
+        eq_(self.links.graph.get_path(2, 1), None)
+
+    def test_expired_links(self):
+        link12 = self._update(1, 1, 2, 1)
+        link21 = self._update(2, 1, 1, 1)
+        now = time.time()
+        eq_(self.links.expired_links(now - 1), [])
+        eq_(set(self.links.expired_links(now + 1)),
+            set([link12, link21]))
+        # looked at again until they are deleted
+        self.links.link_down(link21)
+        eq_(self.links.expired_links(now + 1), [link12])
+
+        # updated
+        self.links[link12] = now + 10
+        eq_(self.links.expired_links(now + 1), [])
+        eq_(self.links.expired_links(now + 5), [])
+        self.links.rev_link_set_timestamp(link12, now - 5)
+        eq_(self.links.expired_links(now), [link12])
+
+
+class Test_TopologyChanges(unittest.TestCase):
+
+    """ Test case for ryu.topology.switches.TopologyChanges
+    """
+
+    def setUp(self):
+        self.changes = switches.TopologyChanges(3)
+
+    def tearDown(self):
+        pass
+
+    def test_since(self):
+        eq_(self.changes.since(0), [])
+        for ev in ['a', 'b', 'c', 'd']:
+            self.changes.append(ev)
+        eq_(self.changes.revision, 4)
+        eq_(self.changes.since(1), [(2, 'b'), (3, 'c'), (4, 'd')])
+        eq_(self.changes.since(3), [(4, 'd')])
+        eq_(self.changes.since(4), [])
+        # not kept any more
+        eq_(self.changes.since(0), None)
+        # newer than the current one
+        eq_(self.changes.since(5), None)
@@ -35,4 +35,34 @@ def get_all_link(app):
     return get_link(app)
 
 
+def get_path(app, src_dpid, dst_dpid):
+    """
+    Returns the list of the links of a shortest path from the datapath
+    src_dpid to dst_dpid, or None if there is no path.
+    The paths are cached until the links change.
+    """
+    rep = app.send_request(event.EventPathRequest(src_dpid, dst_dpid))
+    return rep.path
+
+
+def get_topology(app):
+    """
+    Returns (revision, switches, links) of the current topology.
+    """
+    rep = app.send_request(event.EventTopologyRequest())
+    return rep.revision, rep.switches, rep.links
+
+
+def get_topology_changes(app, revision):
+    """
+    Returns (revision, changes) where revision is the current revision
+    and changes is the list of (revision, event) of the topology events
+    since the given revision, e.g. EventSwitchEnter and EventLinkAdd.
+    changes is None if they are not kept any more.  Then get the whole
+    topology by get_topology() again.
+    """
+    rep = app.send_request(event.EventTopologyChangesRequest(revision))
+    return rep.revision, rep.changes
+
+
 app_manager.require_app('ryu.topology.switches')
@@ -126,3 +126,76 @@ class EventLinkReply(event.EventReplyBase):
     def __str__(self):
         return 'EventLinkReply<dst=%s, dpid=%s, links=%s>' % \
             (self.dst, self.dpid, len(self.links))
+
+
+class EventPathRequest(event.EventRequestBase):
+    def __init__(self, src_dpid, dst_dpid):
+        super(EventPathRequest, self).__init__()
+        self.dst = 'switches'
+        self.src_dpid = src_dpid
+        self.dst_dpid = dst_dpid
+
+    def __str__(self):
+        return 'EventPathRequest<src=%s, src_dpid=%s, dst_dpid=%s>' % \
+            (self.src, self.src_dpid, self.dst_dpid)
+
+
+class EventPathReply(event.EventReplyBase):
+    # path is a list of Link, or None if there is no path
+    def __init__(self, dst, src_dpid, dst_dpid, path):
+        super(EventPathReply, self).__init__(dst)
+        self.src_dpid = src_dpid
+        self.dst_dpid = dst_dpid
+        self.path = path
+
+    def __str__(self):
+        return 'EventPathReply<dst=%s, src_dpid=%s, dst_dpid=%s, path=%s>' % \
+            (self.dst, self.src_dpid, self.dst_dpid, self.path)
+
+
+class EventTopologyRequest(event.EventRequestBase):
+    def __init__(self):
+        super(EventTopologyRequest, self).__init__()
+        self.dst = 'switches'
+
+    def __str__(self):
+        return 'EventTopologyRequest<src=%s>' % self.src
+
+
+class EventTopologyReply(event.EventReplyBase):
+    # the switches and the links at the revision
+    def __init__(self, dst, revision, switches, links):
+        super(EventTopologyReply, self).__init__(dst)
+        self.revision = revision
+        self.switches = switches
+        self.links = links
+
+    def __str__(self):
+        return 'EventTopologyReply<dst=%s, revision=%d, %s switches, ' \
+            '%s links>' % (self.dst, self.revision, len(self.switches),
+                           len(self.links))
+
+
+class EventTopologyChangesRequest(event.EventRequestBase):
+    def __init__(self, revision):
+        super(EventTopologyChangesRequest, self).__init__()
+        self.dst = 'switches'
+        self.revision = revision
+
+    def __str__(self):
+        return 'EventTopologyChangesRequest<src=%s, revision=%d>' % \
+            (self.src, self.revision)
+
+
+class EventTopologyChangesReply(event.EventReplyBase):
+    # changes is a list of (revision, event) after the requested revision
+    # or None if they are not kept any more
+    def __init__(self, dst, revision, changes):
+        super(EventTopologyChangesReply, self).__init__(dst)
+        self.revision = revision
+        self.changes = changes
+
+    def __str__(self):
+        return 'EventTopologyChangesReply<dst=%s, revision=%d, changes=%s>' \
+            % (self.dst, self.revision,
+               None if self.changes is None else len(self.changes))
@@ -0,0 +1,103 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Graph of the datapaths and the links between them
+
+Graph caches the shortest path tree from each source datapath, which
+is computed by a breadth first search on the first path requested from
+the source.  So the paths between all pairs of the datapaths are
+looked up from the cache until the links change.  A link change
+invalidates only the trees it can change:
+
+- An added link from u to v, the trees in which v gets nearer.
+- A deleted link, the trees which use it.
+"""
+
+import collections
+
+
+class Graph(object):
+    def __init__(self):
+        super(Graph, self).__init__()
+        # dpid -> {dpid -> [Link class, ...]}
+        self._edges = {}
+        # source dpid -> ({dpid -> hops}, {dpid -> Link class to it})
+        self._trees = {}
+
+    def add_link(self, link):
+        u = link.src.dpid
+        v = link.dst.dpid
+        links = self._edges.setdefault(u, {}).setdefault(v, [])
+        if link in links:
+            return
+        links.append(link)
+
+        for src, (hops, _parents) in self._trees.items():
+            if u in hops and (v not in hops or hops[u] + 1 < hops[v]):
+                del self._trees[src]
+
+    def remove_link(self, link):
+        u = link.src.dpid
+        v = link.dst.dpid
+        links = self._edges.get(u, {}).get(v)
+        if not links or link not in links:
+            return
+        links.remove(link)
+        if not links:
+            del self._edges[u][v]
+            if not self._edges[u]:
+                del self._edges[u]
+
+        for src, (_hops, parents) in self._trees.items():
+            if parents.get(v) == link:
+                del self._trees[src]
+
+    def _tree(self, src):
+        tree = self._trees.get(src)
+        if tree is not None:
+            return tree
+
+        hops = {src: 0}
+        parents = {}
+        queue = collections.deque([src])
+        while queue:
+            u = queue.popleft()
+            for v, links in self._edges.get(u, {}).iteritems():
+                if v not in hops:
+                    hops[v] = hops[u] + 1
+                    parents[v] = links[0]
+                    queue.append(v)
+        tree = (hops, parents)
+        self._trees[src] = tree
+        return tree
+
+    def get_path(self, src, dst):
+        """
+        Returns the list of the links of a shortest path from the
+        datapath src to dst, or None if there is no path.
+        The list is empty if src is dst.
+        """
+        _hops, parents = self._tree(src)
+        if dst != src and dst not in parents:
+            return None
+
+        path = []
+        while dst != src:
+            link = parents[dst]
+            path.append(link)
+            dst = link.src.dpid
+        path.reverse()
+        return path
@@ -13,6 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import heapq
+import itertools
 import logging
 import struct
 import time
@@ -20,6 +23,7 @@ import json
 from ryu import cfg
 
 from ryu.topology import event
+from ryu.topology import graph
 from ryu.base import app_manager
 from ryu.controller import ofp_event
 from ryu.controller.handler import set_ev_cls
@@ -50,9 +54,16 @@ CONF.register_cli_opts([
                 help='link discovery: explicitly install flow entry '
                      'to send lldp packet to controller'),
     cfg.BoolOpt('explicit-drop', default=True,
-                help='link discovery: explicitly drop lldp packet in')
+                help='link discovery: explicitly drop lldp packet in'),
+    cfg.IntOpt('lldp-send-pps', default=1000,
+               help='link discovery: maximum number of lldp packets '
+                    'sent per second')
 ])
 
+# the xid in the header of an OpenFlow message
+_XID_OFFSET = 4
+_XID = struct.Struct('!I')
+
 
 class Port(object):
     # This is data class passed by EventPortXXX
@@ -179,6 +190,9 @@ class PortData(object):
         super(PortData, self).__init__()
         self.is_down = is_down
         self.lldp_data = lldp_data
+        # OFPPacketOut of lldp_data serialized on the first send.
+        # Only the xid is patched for each send.
+        self.lldp_msg = None
         self.timestamp = None
         self.sent = 0
 
@@ -310,14 +324,50 @@ class LinkState(dict):
     def __init__(self):
         super(LinkState, self).__init__()
         self._map = {}
+        # dpid -> set of Link class from the datapath
+        self._dpid_links = {}
+        # heap of (timestamp, Link class) to find the expired links.
+        # The entry of a link is pushed when it's added, and pushed
+        # again with the newer timestamp when it's popped.
+        self._expiry = []
+        self._expiry_timestamps = {}    # Link class -> timestamp in heap
+        self.graph = graph.Graph()
+
+    def _add_link(self, link, timestamp):
+        self[link] = timestamp
+        self._dpid_links.setdefault(link.src.dpid, set()).add(link)
+        self._schedule_expiry(link, timestamp)
+        self.graph.add_link(link)
+
+    def _del_link(self, link):
+        del self[link]
+        dpid_links = self._dpid_links[link.src.dpid]
+        dpid_links.remove(link)
+        if not dpid_links:
+            del self._dpid_links[link.src.dpid]
+        del self._expiry_timestamps[link]
+        self.graph.remove_link(link)
+
+    def _schedule_expiry(self, link, timestamp):
+        self._expiry_timestamps[link] = timestamp
+        heapq.heappush(self._expiry, (timestamp, link))
 
     def get_peer(self, src):
         return self._map.get(src, None)
 
+    def get_links(self, dpid):
+        return list(self._dpid_links.get(dpid, ()))
+
     def update_link(self, src, dst):
         link = Link(src, dst)
 
-        self[link] = time.time()
+        old_dst = self._map.get(src)
+        if old_dst is not None and old_dst != dst:
+            self._del_link(Link(src, old_dst))
+        if link in self:
+            self[link] = time.time()
+        else:
+            self._add_link(link, time.time())
         self._map[src] = dst
 
         # return if the reverse link is also up or not
@@ -325,29 +375,76 @@ class LinkState(dict):
         return rev_link in self
 
     def link_down(self, link):
-        del self[link]
+        self._del_link(link)
         del self._map[link.src]
 
     def rev_link_set_timestamp(self, rev_link, timestamp):
         # rev_link may or may not in LinkSet
         if rev_link in self:
             self[rev_link] = timestamp
+            self._schedule_expiry(rev_link, timestamp)
 
     def port_deleted(self, src):
         dst = self.get_peer(src)
         if dst is None:
             raise KeyError()
 
-        link = Link(src, dst)
-        rev_link = Link(dst, src)
-        del self[link]
+        self._del_link(Link(src, dst))
         del self._map[src]
         # reverse link might not exist
-        self.pop(rev_link, None)
         rev_link_dst = self._map.pop(dst, None)
+        if rev_link_dst is not None:
+            self._del_link(Link(dst, rev_link_dst))
 
         return dst, rev_link_dst
 
+    def expired_links(self, deadline):
+        """
+        Returns the links whose timestamps are older than deadline.
+        Only the links expired since the last call and the ones
+        returned by it which are still there are looked at.
+        """
+        expiry = self._expiry
+        expired = []
+        while expiry and expiry[0][0] < deadline:
+            expire, link = heapq.heappop(expiry)
+            if self._expiry_timestamps.get(link) != expire:
+                # deleted, or scheduled again
+                continue
+            timestamp = self[link]
+            if timestamp < deadline:
+                expired.append(link)
+            else:
+                self._schedule_expiry(link, timestamp)
+        # to be looked at again unless they are deleted
+        for link in expired:
+            self._schedule_expiry(link, self[link])
+        return expired
+
+
+class TopologyChanges(object):
+    # the topology events sent by Switches numbered by revision
+    def __init__(self, maxlen):
+        super(TopologyChanges, self).__init__()
+        self.revision = 0
+        self._changes = collections.deque(maxlen=maxlen)
+
+    def append(self, ev):
+        self.revision += 1
+        self._changes.append((self.revision, ev))
+
+    def since(self, revision):
+        """
+        Returns the list of (revision, event) after revision, or None if
+        they are not kept any more.
+        """
+        n = self.revision - revision
+        if n < 0 or n > len(self._changes):
+            return None
+        changes = list(itertools.islice(reversed(self._changes), n))
+        changes.reverse()
+        return changes
+
 
 class LLDPPacket(object):
     # make a LLDP packet for link discovery.
@@ -437,11 +534,12 @@ class Switches(app_manager.RyuApp):
     DEFAULT_TTL = 120  # unused. ignored.
     LLDP_PACKET_LEN = len(LLDPPacket.lldp_packet(0, 0, DONTCARE_STR, 0))
 
-    LLDP_SEND_GUARD = .05
+    LLDP_SEND_GUARD = .05           # interval of the batches of lldp
     LLDP_SEND_PERIOD_PER_PORT = .9
     TIMEOUT_CHECK_PERIOD = 5.
     LINK_TIMEOUT = TIMEOUT_CHECK_PERIOD * 2
     LINK_LLDP_DROP = 5
+    TOPOLOGY_CHANGES_LEN = 4096
 
     def __init__(self, *args, **kwargs):
         super(Switches, self).__init__(*args, **kwargs)
@@ -451,12 +549,16 @@ class Switches(app_manager.RyuApp):
         self.port_state = {}          # datapath_id => ports
         self.ports = PortDataState()  # Port class -> PortData class
         self.links = LinkState()      # Link class -> timestamp
+        self.changes = TopologyChanges(self.TOPOLOGY_CHANGES_LEN)
         self.is_active = True
 
         self.link_discovery = self.CONF.observe_links
         if self.link_discovery:
             self.install_flow = self.CONF.install_lldp_flow
             self.explicit_drop = self.CONF.explicit_drop
+            self.lldp_send_pps = self.CONF.lldp_send_pps
+            self._lldp_budget = 0
+            self._lldp_spread = 0
             self.lldp_event = hub.Event()
             self.link_event = hub.Event()
             self.threads.append(hub.spawn(self.lldp_loop))
@@ -469,6 +571,11 @@ class Switches(app_manager.RyuApp):
             self.link_event.set()
             hub.joinall(self.threads)
 
+    def send_event_to_observers(self, ev, state=None):
+        # every event sent by this is a change of the topology
+        self.changes.append(ev)
+        super(Switches, self).send_event_to_observers(ev, state)
+
     def _register(self, dp):
         assert dp.id is not None
 
@@ -737,65 +844,118 @@ class Switches(app_manager.RyuApp):
             self._drop_packet(msg)
 
     def send_lldp_packet(self, port):
-        try:
-            port_data = self.ports.lldp_sent(port)
-        except KeyError as e:
-            # ports can be modified during our sleep in self.lldp_loop()
-            # LOG.debug('send_lldp: KeyError %s', e)
-            return
-        if port_data.is_down:
-            return
-
-        dp = self.dps.get(port.dpid, None)
-        if dp is None:
-            # datapath was already deleted
-            return
+        self.send_lldp_packets([port])
 
-        # LOG.debug('lldp sent dpid=%s, port_no=%d', dp.id, port.port_no)
+    @staticmethod
+    def _lldp_packet_out(dp, port, port_data):
+        actions = [dp.ofproto_parser.OFPActionOutput(port.port_no)]
         # TODO:XXX
         if dp.ofproto.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
-            actions = [dp.ofproto_parser.OFPActionOutput(port.port_no)]
-            dp.send_packet_out(actions=actions, data=port_data.lldp_data)
+            out = dp.ofproto_parser.OFPPacketOut(
+                dp, buffer_id=0xffffffff, in_port=dp.ofproto.OFPP_NONE,
+                actions=actions, data=port_data.lldp_data)
         elif dp.ofproto.OFP_VERSION >= ofproto_v1_2.OFP_VERSION:
-            actions = [dp.ofproto_parser.OFPActionOutput(port.port_no)]
             out = dp.ofproto_parser.OFPPacketOut(
                 datapath=dp, in_port=dp.ofproto.OFPP_CONTROLLER,
                 buffer_id=dp.ofproto.OFP_NO_BUFFER, actions=actions,
                 data=port_data.lldp_data)
-            dp.send_msg(out)
         else:
             LOG.error('cannot send lldp packet. unsupported version. %x',
                       dp.ofproto.OFP_VERSION)
+            return None
+        out.set_xid(0)
+        out.serialize()
+        return bytearray(out.buf)
+
+    def send_lldp_packets(self, ports):
+        # the PacketOuts to each datapath are sent at once
+        bufs = {}   # Datapath class -> bytearray
+        for port in ports:
+            try:
+                port_data = self.ports.lldp_sent(port)
+            except KeyError as e:
+                # ports can be modified during our sleep in self.lldp_loop()
+                # LOG.debug('send_lldp: KeyError %s', e)
+                continue
+            if port_data.is_down:
+                continue
+
+            dp = self.dps.get(port.dpid, None)
+            if dp is None:
+                # datapath was already deleted
+                continue
+
+            # LOG.debug('lldp sent dpid=%s, port_no=%d', dp.id, port.port_no)
+            msg = port_data.lldp_msg
+            if msg is None or msg[0] != dp.ofproto.OFP_VERSION:
+                msg = self._lldp_packet_out(dp, port, port_data)
+                if msg is None:
+                    continue
+                port_data.lldp_msg = msg
+
+            buf = bufs.setdefault(dp, bytearray())
+            offset = len(buf)
+            buf += msg
+            _XID.pack_into(buf, offset + _XID_OFFSET, dp.next_xid())
+
+        for dp, buf in bufs.items():
+            dp.send(buf)
+
+    def _lldp_due_ports(self, now, elapsed):
+        """
+        Returns the ports to send lldp packets to now, and the time to
+        wait for the next ones or None.
+
+        At most lldp_send_pps packets are sent per second.  The ports
+        already probed are probed again at the rate to probe all of them
+        in LLDP_SEND_PERIOD_PER_PORT, so that the packets are spread
+        evenly over the period rather than sent in bursts.  When the
+        budget doesn't allow that, the period is stretched.
+        """
+        tick = self.LLDP_SEND_GUARD
+        period = self.LLDP_SEND_PERIOD_PER_PORT
+        pps = self.lldp_send_pps
+        spread_pps = len(self.ports) / period
+        self._lldp_budget = min(self._lldp_budget + pps * elapsed,
+                                max(1, pps * tick))
+        self._lldp_spread = min(self._lldp_spread + spread_pps * elapsed,
+                                max(1, spread_pps * tick))
+
+        # self.ports is ordered by the time to send: the new ports and
+        # the ports to check early first, and then the others in the
+        # order they were sent.
+        ports = []
+        for port in self.ports:
+            port_data = self.ports.get_port(port)
+            if port_data.timestamp is not None:
+                expire = port_data.timestamp + period
+                if expire > now:
+                    return ports, expire - now
+            if port_data.is_down:
+                # no packet is sent.  only rescheduled.
+                ports.append(port)
+                continue
+
+            if self._lldp_budget < 1:
+                return ports, tick
+            if port_data.timestamp is not None:
+                if self._lldp_spread < 1:
+                    return ports, tick
+                self._lldp_spread -= 1
+            self._lldp_budget -= 1
+            ports.append(port)
+        return ports, None
 
     def lldp_loop(self):
+        last = time.time()
         while self.is_active:
             self.lldp_event.clear()
 
             now = time.time()
-            timeout = None
-            ports_now = []
-            ports = []
-            for (key, data) in self.ports.items():
-                if data.timestamp is None:
-                    ports_now.append(key)
-                    continue
+            ports, timeout = self._lldp_due_ports(now, now - last)
+            last = now
+            self.send_lldp_packets(ports)
 
-                expire = data.timestamp + self.LLDP_SEND_PERIOD_PER_PORT
-                if expire <= now:
-                    ports.append(key)
-                    continue
-
-                timeout = expire - now
-                break
-
-            for port in ports_now:
-                self.send_lldp_packet(port)
-            for port in ports:
-                self.send_lldp_packet(port)
-                hub.sleep(self.LLDP_SEND_GUARD)      # don't burst
-
-            if timeout is not None and ports:
-                timeout = 0     # We have already slept
             # LOG.debug('lldp sleep %s', timeout)
             self.lldp_event.wait(timeout=timeout)
 
@@ -805,15 +965,15 @@ class Switches(app_manager.RyuApp):
 
             now = time.time()
             deleted = []
-            for (link, timestamp) in self.links.items():
-                # LOG.debug('%s timestamp %d (now %d)', link, timestamp, now)
-                if timestamp + self.LINK_TIMEOUT < now:
-                    src = link.src
-                    if src in self.ports:
-                        port_data = self.ports.get_port(src)
-                        # LOG.debug('port_data %s', port_data)
-                        if port_data.lldp_dropped() > self.LINK_LLDP_DROP:
-                            deleted.append(link)
+            for link in self.links.expired_links(now - self.LINK_TIMEOUT):
+                # LOG.debug('%s timestamp %d (now %d)',
+                #           link, self.links[link], now)
+                src = link.src
+                if src in self.ports:
+                    port_data = self.ports.get_port(src)
+                    # LOG.debug('port_data %s', port_data)
+                    if port_data.lldp_dropped() > self.LINK_LLDP_DROP:
+                        deleted.append(link)
 
             for link in deleted:
                 self.links.link_down(link)
@@ -857,6 +1017,29 @@ class Switches(app_manager.RyuApp):
         if dpid is None:
             links = self.links
         else:
-            links = [link for link in self.links if link.src.dpid == dpid]
+            links = self.links.get_links(dpid)
         rep = event.EventLinkReply(req.src, dpid, links)
         self.reply_to_request(req, rep)
+
+    @set_ev_cls(event.EventPathRequest)
+    def path_request_handler(self, req):
+        # LOG.debug(req)
+        path = self.links.graph.get_path(req.src_dpid, req.dst_dpid)
+        rep = event.EventPathReply(req.src, req.src_dpid, req.dst_dpid, path)
+        self.reply_to_request(req, rep)
+
+    @set_ev_cls(event.EventTopologyRequest)
+    def topology_request_handler(self, req):
+        # LOG.debug(req)
+        switches = [self._get_switch(dpid) for dpid in self.dps]
+        rep = event.EventTopologyReply(req.src, self.changes.revision,
+                                       switches, self.links.keys())
+        self.reply_to_request(req, rep)
+
+    @set_ev_cls(event.EventTopologyChangesRequest)
+    def topology_changes_request_handler(self, req):
+        # LOG.debug(req)
+        rep = event.EventTopologyChangesReply(
+            req.src, self.changes.revision,
+            self.changes.since(req.revision))
+        self.reply_to_request(req, rep)